@@ -0,0 +1,204 @@
+"""
+Differential check and timings for the Arrow compute backend.
+
+For each partner a fresh subprocess generates a seeded synthetic dataset,
+writes its lookups to a throwaway data directory (``PIPELINE_DATA_DIR``)
+and, with object strings and again with Arrow strings, compares the
+``arrow`` backend against the ``pandas`` one:
+
+- ``normalize_lookup_key`` on every raw column (with and without the
+  decimal-suffix strip) and on a column of edge cases (non-ASCII case
+  folding, Python-only whitespace, missing values, numbers);
+- ``aggregate_first_sum_by_group`` on the raw rows grouped by the partner's
+  raw key;
+- the partner's full ``process()``, which runs the welcome back, strategic
+  orders and verified strategic helpers, timed per stage.
+
+Every comparison must be exact (``assert_frame_equal`` /
+``assert_series_equal`` with dtypes); the run exits non-zero otherwise.
+
+Usage:
+    python -m benchmarks.arrow_backend --rows 50k
+    python -m benchmarks.arrow_backend --partners Hearst --rows 1M --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+STRING_MODES = ("object", "arrow")
+# Numeric column summed when grouping each partner's raw rows by its key.
+AGGREGATE_COLUMNS = {
+    "Hearst": ("Job Number", "Revenue"),
+    "Pittsburgh": ("Order #", "Net"),
+    "Boston": ("OrderURN", "Row_Net_Price"),
+    "Houston": ("Order #", "Revenue"),
+}
+
+
+def _edge_cases():
+    import numpy as np
+    import pandas as pd
+
+    return pd.Series(
+        [" ABC.0 ", "12.000", "Straße", "İstanbul", "x\x1c", "\xa0nbsp\xa0", "  ", "", np.nan, None, 12.0, 3, "1.5.0"],
+        dtype=object,
+        name="edge cases",
+    )
+
+
+def _compare(check: Callable[[], None]) -> str:
+    try:
+        check()
+    except AssertionError as exc:
+        return f"DIFFERS: {str(exc).splitlines()[0]}"
+    return "identical"
+
+
+def run_child(partner: str, rows: int, seed: int, repeat: int) -> dict:
+    """Run every comparison for ``partner`` in this process and return the results."""
+    import importlib
+
+    import pandas as pd
+
+    from benchmarks.run_benchmarks import PIPELINE_MODULES
+    from benchmarks.synthetic import generate_dataset, write_dataset
+    from src.config import get_settings
+    from src.configs.common_configs import aggregate_first_sum_by_group, normalize_lookup_key
+    from src.utils.arrow_compute import set_compute_backend
+    from src.utils.dataframe_utils import convert_to_arrow_strings, enable_arrow_strings, enable_copy_on_write
+    from src.utils.excel_file_operations import clear_lookup_cache
+    from src.utils.run_report import RunReport
+
+    enable_copy_on_write()
+    dataset = generate_dataset(partner, rows, seed=seed)
+    write_dataset(dataset, get_settings().data_dir, write_raw=False)
+    pipeline = importlib.import_module(PIPELINE_MODULES[partner])
+    group_column, value_column = AGGREGATE_COLUMNS[partner]
+
+    def both(func):
+        results = {}
+        for backend in ("pandas", "arrow"):
+            set_compute_backend(backend)
+            results[backend] = func()
+        set_compute_backend("pandas")
+        return results["pandas"], results["arrow"]
+
+    results = {}
+    for mode in STRING_MODES:
+        enable_arrow_strings(mode == "arrow")
+        clear_lookup_cache()
+        raw_df = convert_to_arrow_strings(dataset.raw) if mode == "arrow" else dataset.raw
+        checks = {}
+
+        failures = []
+        for column in raw_df.columns:
+            for strip in (True, False):
+                expected, actual = both(lambda: normalize_lookup_key(raw_df[column], strip_decimal_suffix=strip))
+                outcome = _compare(lambda: pd.testing.assert_series_equal(actual, expected))
+                if outcome != "identical":
+                    failures.append(f"{column} (strip={strip}) {outcome}")
+        checks["normalize_lookup_key[raw columns]"] = "DIFFERS: " + "; ".join(failures[:3]) if failures else "identical"
+        for strip in (True, False):
+            edge_cases = _edge_cases()
+            expected, actual = both(lambda: normalize_lookup_key(edge_cases, strip_decimal_suffix=strip))
+            checks[f"normalize_lookup_key[edge cases, strip={strip}]"] = _compare(
+                lambda: pd.testing.assert_series_equal(actual, expected)
+            )
+
+        expected, actual = both(
+            lambda: aggregate_first_sum_by_group(raw_df, group_column=group_column, value_column=value_column)
+        )
+        checks[f"aggregate_first_sum_by_group[{group_column}]"] = _compare(
+            lambda: pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+        )
+
+        stage_seconds: Dict[str, Dict[str, float]] = {}
+        outputs = {}
+        for backend in ("pandas", "arrow"):
+            set_compute_backend(backend)
+            for _ in range(repeat):
+                report = RunReport(partner)
+                with report.activate():
+                    outputs[backend] = pipeline.process(raw_df)
+                for stage in report.stages:
+                    timings = stage_seconds.setdefault(stage.name, {})
+                    timings[backend] = min(timings.get(backend, float("inf")), stage.wall_seconds)
+        set_compute_backend("pandas")
+        checks["process()"] = _compare(
+            lambda: pd.testing.assert_frame_equal(outputs["arrow"], outputs["pandas"], check_exact=True)
+        )
+        results[mode] = {"checks": checks, "stages": stage_seconds}
+    return {"partner": partner, "rows": rows, "modes": results}
+
+
+def run_case(partner: str, rows: int, seed: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"arrow-backend-{partner.casefold()}-") as tmp:
+        env = {**os.environ, "PIPELINE_DATA_DIR": str(Path(tmp) / "data")}
+        command = [
+            sys.executable, "-m", "benchmarks.arrow_backend",
+            "--child", partner, str(rows), "--seed", str(seed), "--repeat", str(repeat),
+        ]
+        completed = subprocess.run(command, env=env, cwd=REPO_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        tail = (completed.stderr or completed.stdout).strip().splitlines()[-3:]
+        return {"partner": partner, "error": "\n".join(tail)}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _print_case(case: dict) -> bool:
+    """Print one partner's results; True when every comparison was identical."""
+    if "error" in case:
+        print(f"{case['partner']:<10} FAILED: {case['error']}")
+        return False
+    passed = True
+    for mode, result in case["modes"].items():
+        print(f"{case['partner']:<10} {case['rows']:>10,} rows, {mode} strings")
+        for name, outcome in result["checks"].items():
+            passed &= outcome == "identical"
+            print(f"    {name:<60} {outcome}")
+        for name, timings in result["stages"].items():
+            speedup = timings["pandas"] / timings["arrow"] if timings["arrow"] else float("inf")
+            print(f"    {name:<28} pandas {timings['pandas']:8.3f} s  arrow {timings['arrow']:8.3f} s  ({speedup:4.1f}x)")
+    return passed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from benchmarks.synthetic import PARTNERS, parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partners", default=",".join(PARTNERS), help="Comma-separated partners to run.")
+    parser.add_argument("--rows", type=parse_size, default=parse_size("50k"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=2, help="process() runs per backend; the fastest counts.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON.")
+    parser.add_argument("--child", nargs=2, metavar=("PARTNER", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        partner, rows = args.child
+        print(json.dumps(run_child(partner, int(rows), args.seed, args.repeat)))
+        return
+
+    cases = []
+    passed = True
+    for partner in [p.strip() for p in args.partners.split(",") if p.strip()]:
+        case = run_case(partner, args.rows, args.seed, args.repeat)
+        passed &= _print_case(case)
+        cases.append(case)
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Object vs Arrow-backed strings on the string-heavy stages.
+
+For each partner a fresh subprocess per mode regenerates the same seeded
+synthetic raw frame, writes its lookups to a throwaway data directory and
+runs the partner's ``process()`` under a run report ``--repeat`` times (the
+first run warms the lookup cache, so later runs time the stages rather than
+the xlsx parsing). The fastest wall time of every stage is reported for
+both modes, with the in-memory size of the raw and processed frames, and
+the two outputs are checked to be identical once the Arrow one is
+converted back to Python strings.
+
+Usage:
+    python -m benchmarks.arrow_strings --rows 200k
+    python -m benchmarks.arrow_strings --partners Hearst --rows 1M --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PARTNERS = "Hearst,Pittsburgh,Boston"
+MODES = ("object", "arrow")
+
+
+def run_child(partner: str, rows: int, seed: int, mode: str, repeat: int, output_path: Path) -> dict:
+    """Run ``process()`` ``repeat`` times in ``mode`` and return per-stage timings."""
+    import importlib
+
+    from benchmarks.run_benchmarks import PIPELINE_MODULES
+    from benchmarks.synthetic import generate_dataset, write_dataset
+    from src.config import get_settings
+    from src.utils.dataframe_utils import (
+        convert_from_arrow_strings,
+        convert_to_arrow_strings,
+        enable_arrow_strings,
+        enable_copy_on_write,
+    )
+    from src.utils.run_report import RunReport
+
+    enable_copy_on_write()
+    enable_arrow_strings(mode == "arrow")
+    dataset = generate_dataset(partner, rows, seed=seed)
+    write_dataset(dataset, get_settings().data_dir, write_raw=False)
+    raw_df = convert_to_arrow_strings(dataset.raw) if mode == "arrow" else dataset.raw
+    del dataset
+    pipeline = importlib.import_module(PIPELINE_MODULES[partner])
+
+    stage_seconds: Dict[str, List[float]] = {}
+    object_text = {}
+    for _ in range(repeat):
+        report = RunReport(partner)
+        with report.activate():
+            processed_df = pipeline.process(raw_df)
+        for stage in report.stages:
+            stage_seconds.setdefault(stage.name, []).append(stage.wall_seconds)
+            if "object_text_columns" in stage.metrics:
+                object_text[stage.name] = stage.metrics["object_text_columns"]
+
+    convert_from_arrow_strings(processed_df).to_pickle(output_path)
+    return {
+        "partner": partner,
+        "mode": mode,
+        "rows": rows,
+        "raw_mb": raw_df.memory_usage(deep=True).sum() / 1024**2,
+        "processed_mb": processed_df.memory_usage(deep=True).sum() / 1024**2,
+        "stages": {name: min(seconds) for name, seconds in stage_seconds.items()},
+        "object_text_columns": object_text,
+    }
+
+
+def run_case(partner: str, rows: int, seed: int, repeat: int) -> dict:
+    """Run both modes of one partner in subprocesses and compare their outputs."""
+    import pandas as pd
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix=f"arrow-{partner.casefold()}-") as tmp:
+        for mode in MODES:
+            env = {**os.environ, "PIPELINE_DATA_DIR": str(Path(tmp) / mode / "data")}
+            command = [
+                sys.executable, "-m", "benchmarks.arrow_strings",
+                "--child", partner, str(rows), mode,
+                "--seed", str(seed), "--repeat", str(repeat),
+                "--output-frame", str(Path(tmp) / f"{mode}.pkl"),
+            ]
+            completed = subprocess.run(command, env=env, cwd=REPO_DIR, capture_output=True, text=True)
+            if completed.returncode != 0:
+                tail = (completed.stderr or completed.stdout).strip().splitlines()[-3:]
+                return {"partner": partner, "error": "\n".join(tail)}
+            results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+        try:
+            pd.testing.assert_frame_equal(pd.read_pickle(Path(tmp) / "object.pkl"), pd.read_pickle(Path(tmp) / "arrow.pkl"))
+            identical = True
+        except AssertionError:
+            identical = False
+    return {"partner": partner, "rows": rows, "identical": identical, **results}
+
+
+def _print_case(case: dict) -> None:
+    if "error" in case:
+        print(f"{case['partner']:<10} FAILED: {case['error']}")
+        return
+    before, after = case["object"], case["arrow"]
+    print(
+        f"{case['partner']:<10} {case['rows']:>10,} rows | raw {before['raw_mb']:.1f} -> {after['raw_mb']:.1f} MB | "
+        f"processed {before['processed_mb']:.1f} -> {after['processed_mb']:.1f} MB | "
+        f"outputs {'identical' if case['identical'] else 'DIFFER'}"
+    )
+    for name, seconds in before["stages"].items():
+        arrow_seconds = after["stages"].get(name)
+        if arrow_seconds is None:
+            continue
+        speedup = seconds / arrow_seconds if arrow_seconds else float("inf")
+        print(f"    {name:<28} {seconds:8.3f} s -> {arrow_seconds:8.3f} s  ({speedup:4.1f}x)")
+    for name, columns in after["object_text_columns"].items():
+        print(f"    WARNING {name} fell back to object for: {columns}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from benchmarks.synthetic import parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partners", default=DEFAULT_PARTNERS, help="Comma-separated partners to run.")
+    parser.add_argument("--rows", type=parse_size, default=parse_size("200k"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="process() runs per mode; the fastest counts.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON.")
+    parser.add_argument("--child", nargs=3, metavar=("PARTNER", "ROWS", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument("--output-frame", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        partner, rows, mode = args.child
+        print(json.dumps(run_child(partner, int(rows), args.seed, mode, args.repeat, args.output_frame)))
+        return
+
+    cases = []
+    for partner in [p.strip() for p in args.partners.split(",") if p.strip()]:
+        case = run_case(partner, args.rows, args.seed, args.repeat)
+        _print_case(case)
+        cases.append(case)
+    if args.output:
+        args.output.write_text(json.dumps(cases, indent=2))
+
+
+if __name__ == "__main__":
+    main()
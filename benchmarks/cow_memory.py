@@ -0,0 +1,174 @@
+"""
+Peak-RSS benchmark for the Copy-on-Write stage contract.
+
+Runs the Boston stages (immigration flags, strategic tagging, strategic
+orders) on a synthetic frame shaped like ``boston_raw_column_types``, once
+with pandas Copy-on-Write disabled and once enabled. Each mode runs in a
+fresh subprocess so the peak resident set size is not shared between modes.
+
+Usage:
+    python -m benchmarks.cow_memory --rows 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.run_report import current_rss_kb, peak_rss_kb, reset_peak_rss
+
+
+def build_boston_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a wide Boston-shaped frame following ``boston_raw_column_types``."""
+    from src.configs.boston_configs import boston_raw_column_types
+
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"value {i}" for i in range(500)], dtype=object)
+    columns = {}
+    for entry in boston_raw_column_types:
+        (col, dtype), = entry.items()
+        if dtype == "float":
+            columns[col] = rng.random(rows) * 100
+        elif dtype == "int":
+            columns[col] = rng.integers(0, 10, rows)
+        else:
+            columns[col] = vocabulary[rng.integers(0, len(vocabulary), rows)]
+
+    columns["OrderURN"] = rng.integers(10**6, 10**6 + rows // 3 + 1, rows).astype(str).astype(object)
+    columns["CustomerURN"] = rng.integers(1, 5000, rows).astype(str).astype(object)
+    columns["Customer_Name"] = np.array([f"Customer {i}" for i in range(5000)], dtype=object)[
+        rng.integers(0, 5000, rows)
+    ]
+    columns["Insert_Date"] = (
+        pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    ).strftime("%m/%d/%Y").to_numpy(dtype=object)
+    columns["ImmigrationAD"] = np.array(["Y", "N", ""], dtype=object)[rng.integers(0, 3, rows)]
+    return pd.DataFrame(columns)
+
+
+def write_boston_lookups(lookup_dir: Path, raw_df: pd.DataFrame, seed: int = 0) -> None:
+    """Write the strategic, strategic orders and immigration lookups the Boston stages read."""
+    rng = np.random.default_rng(seed)
+    customers = raw_df["CustomerURN"].drop_duplicates().sample(frac=0.05, random_state=seed)
+    pd.DataFrame(
+        {
+            "Account Number": customers.to_numpy(),
+            "Complete Name": [f"Customer {c}" for c in customers],
+            "Company": "Boston",
+            "Strategic End Date": "2025-07-01",
+            "Salesperson": "Strategic, Rep",
+        }
+    ).to_csv(lookup_dir / "Strategic Account List.csv", index=False)
+
+    orders = raw_df["OrderURN"].drop_duplicates()
+    pd.DataFrame(
+        {
+            "Order Number": orders.sample(n=min(200, len(orders)), random_state=seed).to_numpy(),
+            "Company": "Boston",
+            "Salesperson": "Orders, Rep",
+        }
+    ).to_excel(lookup_dir / "Strategic Orders.xlsx", index=False)
+    pd.DataFrame(
+        {
+            "Order Number": orders.sample(n=min(2000, len(orders)), random_state=seed + 1).to_numpy(),
+            "Immigration Order": rng.choice([True, False], min(2000, len(orders))),
+        }
+    ).to_excel(lookup_dir / "Boston Immigration Lookup.xlsx", index=False)
+
+
+def run_child(rows: int, copy_on_write: bool) -> dict:
+    """Run the Boston stages once in this process and return timing and memory figures."""
+    pd.set_option("mode.copy_on_write", copy_on_write)
+
+    from src.configs.boston_configs import (
+        calculate_revenue,
+        enforce_strategic_orders_lookup,
+        tag_verified_strategic,
+        update_immigration_flags,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lookup_dir = Path(tmp)
+        raw_df = build_boston_frame(rows)
+        write_boston_lookups(lookup_dir, raw_df)
+
+        frame_mb = raw_df.memory_usage(deep=True).sum() / 2**20
+        baseline_kb = current_rss_kb()
+        peak_reset = reset_peak_rss()
+
+        start = time.perf_counter()
+        processed_df = calculate_revenue(raw_df)
+        processed_df = update_immigration_flags(
+            processed_df,
+            lookup_path=lookup_dir,
+            lookup_file_name="Boston Immigration Lookup.xlsx",
+        )
+        processed_df = tag_verified_strategic(
+            processed_df,
+            lookup_path=lookup_dir,
+            strategic_file_name="Strategic Account List.csv",
+            sheet_name="Strategic Account List",
+            partner_name="Boston",
+        )
+        processed_df = enforce_strategic_orders_lookup(
+            processed_df,
+            lookup_path=lookup_dir,
+            lookup_file_name="Strategic Orders.xlsx",
+            partner_name="Boston",
+        )
+        elapsed = time.perf_counter() - start
+        peak_kb = peak_rss_kb()
+
+    return {
+        "copy_on_write": copy_on_write,
+        "rows": rows,
+        "columns": processed_df.shape[1],
+        "frame_mb": round(frame_mb, 1),
+        "seconds": round(elapsed, 2),
+        "peak_above_baseline_mb": round((peak_kb - baseline_kb) / 1024, 1),
+        "peak_reset_supported": peak_reset,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare peak RSS of the Boston stages with and without Copy-on-Write.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--child", choices=["on", "off"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.rows, copy_on_write=args.child == "on")))
+        return
+
+    results = []
+    for mode in ("off", "on"):
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cow_memory", "--rows", str(args.rows), "--child", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    for result in results:
+        label = "CoW on " if result["copy_on_write"] else "CoW off"
+        print(
+            f"{label}: {result['rows']} rows x {result['columns']} cols ({result['frame_mb']} MB) | "
+            f"{result['seconds']} s | peak RSS above baseline {result['peak_above_baseline_mb']} MB"
+        )
+    off, on = results
+    if off["peak_above_baseline_mb"] > 0:
+        saved = 1 - on["peak_above_baseline_mb"] / off["peak_above_baseline_mb"]
+        print(f"Peak-RSS reduction with Copy-on-Write: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
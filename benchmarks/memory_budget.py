@@ -0,0 +1,203 @@
+"""
+Calibration benchmark for the memory-budget estimates.
+
+For each partner a seeded synthetic raw file is generated once, then every
+measurement runs in a fresh interpreter so peak RSS is not polluted by
+earlier steps:
+
+- ``load``: peak memory above the loaded frame per raw cell, for the regular
+  loader and for the chunk reader (compare with ``EXCEL_READ_BYTES_PER_CELL``
+  / ``CSV_READ_FACTOR``);
+- ``write``: peak memory per output cell of the in-memory and the streaming
+  xlsx writer (compare with ``EXCEL_WRITE_BYTES_PER_CELL``);
+- ``run``: the full pipeline under ``--memory-budget`` in each plan it
+  supports, with the estimated peak next to the measured one. The estimate
+  should stay above the measurement without being far off; chunked runs get
+  a budget just above their estimate, so an underestimate fails the run.
+
+Usage:
+    python -m benchmarks.memory_budget --rows 50k
+    python -m benchmarks.memory_budget --partners Hearst --rows 200k --chunk-rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+STEPS = ("load", "write", "run")
+GENEROUS_BUDGET = 1024**4
+CHUNKED_HEADROOM = 1.25
+
+
+def _raw_source(partner: str):
+    """Return ``(pipeline module, raw path, load kwargs)`` for ``partner``."""
+    import importlib
+
+    from benchmarks.run_benchmarks import PIPELINE_MODULES
+    from src.config import get_settings
+
+    pipeline = importlib.import_module(PIPELINE_MODULES[partner])
+    raw_dir = get_settings().client_dirs[partner.casefold()]["RAW"]
+    raw_path = next(path for path in raw_dir.iterdir() if path.suffix in (".xlsx", ".csv"))
+    if partner in ("Hearst", "Pittsburgh"):
+        return pipeline, raw_path, {"column_types": pipeline.raw_column_types, "sheet_name": "Raw"}
+    if partner == "Houston":
+        return pipeline, raw_path, {"column_types": pipeline.houston_raw_column_types}
+    return pipeline, raw_path, {}
+
+
+def _load(raw_path: Path, load_kwargs: dict, chunked: bool, chunk_rows: int):
+    import pandas as pd
+
+    from src.utils.excel_file_operations import iter_excel_chunks, load_excel_file
+
+    if chunked:
+        return pd.concat(list(iter_excel_chunks(raw_path.parent, raw_path.name, chunk_rows=chunk_rows, **load_kwargs)))
+    if raw_path.suffix == ".csv":
+        return pd.read_csv(raw_path, low_memory=False)
+    return load_excel_file(raw_path.parent, raw_path.name, **load_kwargs)
+
+
+def measure_step(partner: str, step: str, variant: str, chunk_rows: int) -> Dict[str, object]:
+    """Run one measurement in this process and return its numbers."""
+    from src.utils.dataframe_utils import enable_copy_on_write
+    from src.utils.memory_budget import estimate_working_set
+    from src.utils.run_report import current_rss_kb, peak_rss_kb, reset_peak_rss
+
+    enable_copy_on_write()
+    pipeline, raw_path, load_kwargs = _raw_source(partner)
+
+    if step == "load":
+        reset_peak_rss()
+        before = current_rss_kb() * 1024
+        df = _load(raw_path, load_kwargs, variant == "chunked", chunk_rows)
+        frame_bytes = int(df.memory_usage(deep=True).sum())
+        overhead = peak_rss_kb() * 1024 - before - frame_bytes
+        return {
+            "rows": len(df),
+            "frame_mb": frame_bytes / 1024**2,
+            "overhead_mb": overhead / 1024**2,
+            "bytes_per_cell": overhead / max(df.size, 1),
+            "file_factor": overhead / raw_path.stat().st_size,
+        }
+
+    if step == "write":
+        from src.utils.excel_file_operations import write_df_to_excel
+
+        df = _load(raw_path, load_kwargs, False, chunk_rows)
+        with tempfile.TemporaryDirectory(prefix="budget-write-") as tmp:
+            reset_peak_rss()
+            before = current_rss_kb() * 1024
+            write_df_to_excel(df, tmp, "out.xlsx", streaming=variant == "streaming", chunk_rows=chunk_rows)
+            overhead = peak_rss_kb() * 1024 - before
+        return {"rows": len(df), "overhead_mb": overhead / 1024**2, "bytes_per_cell": overhead / max(df.size, 1)}
+
+    from src.config import get_settings
+
+    group_column = pipeline.raw_key_column if partner in ("Hearst", "Pittsburgh") else None
+    estimate = estimate_working_set(raw_path, group_column=group_column, chunk_rows=chunk_rows, **load_kwargs)
+    if variant == "chunked":
+        # Just above the chunked estimate, so the run fails if the estimate is too low.
+        extra = min(int(estimate.chunked_bytes * CHUNKED_HEADROOM), (estimate.chunked_bytes + estimate.in_memory_bytes) // 2)
+    else:
+        extra = GENEROUS_BUDGET
+    reset_peak_rss()
+    before = current_rss_kb() * 1024
+    pipeline.main(["--memory-budget", str(before + extra), "--chunk-rows", str(chunk_rows)])
+    measured = peak_rss_kb() * 1024 - before
+    # The plan the pipeline chose, as recorded in its run report.
+    reports_dir = get_settings().client_dirs[partner.casefold()]["REPORTS"]
+    plan = json.loads(sorted(reports_dir.glob("*.json"))[-1].read_text())["metrics"]["memory_plan"]
+    estimated = plan["chunked_bytes"] if plan["mode"] == "chunked" else plan["in_memory_bytes"]
+    return {
+        "rows": plan["rows"],
+        "mode": plan["mode"],
+        "estimated_mb": estimated / 1024**2,
+        "measured_mb": measured / 1024**2,
+        "ratio": estimated / max(measured, 1),
+    }
+
+
+def _run_child(partner: str, step: str, variant: str, chunk_rows: int, data_dir: Path) -> Dict[str, object]:
+    env = {**os.environ, "PIPELINE_DATA_DIR": str(data_dir)}
+    command = [
+        sys.executable, "-m", "benchmarks.memory_budget",
+        "--child", partner, step, variant, "--chunk-rows", str(chunk_rows),
+    ]
+    completed = subprocess.run(command, env=env, cwd=REPO_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": (completed.stderr or completed.stdout).strip().splitlines()[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _variants(partner: str, step: str) -> List[str]:
+    if step == "load":
+        return ["in_memory"] if partner == "Boston" else ["in_memory", "chunked"]
+    if step == "write":
+        return ["in_memory", "streaming"]
+    return ["in_memory"] if partner == "Boston" else ["in_memory", "chunked"]
+
+
+def calibrate(partners: List[str], rows: int, *, seed: int = 0, chunk_rows: int = 50_000) -> List[dict]:
+    """Measure every step for every partner and print one line per measurement."""
+    from benchmarks.synthetic import generate_dataset, write_dataset
+
+    results = []
+    for partner in partners:
+        with tempfile.TemporaryDirectory(prefix=f"budget-{partner.casefold()}-") as tmp:
+            data_dir = Path(tmp) / "data"
+            write_dataset(generate_dataset(partner, rows, seed=seed), data_dir, write_raw=True)
+            for step in STEPS:
+                for variant in _variants(partner, step):
+                    result = {"partner": partner, "step": step, "variant": variant}
+                    result.update(_run_child(partner, step, variant, chunk_rows, data_dir))
+                    print(_format(result))
+                    results.append(result)
+    return results
+
+
+def _format(result: dict) -> str:
+    label = f"{result['partner']:<10} {result['step']:<5} {result['variant']:<9}"
+    if "error" in result:
+        return f"{label} FAILED: {result['error']}"
+    if result["step"] == "run":
+        return (
+            f"{label} {result['mode']:<9} estimated {result['estimated_mb']:8.1f} MB  measured {result['measured_mb']:8.1f} MB  "
+            f"(estimate / measured {result['ratio']:.2f})"
+        )
+    return f"{label} +{result['overhead_mb']:8.1f} MB  {result['bytes_per_cell']:7.1f} B/cell"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from benchmarks.synthetic import PARTNERS, parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partners", default=",".join(PARTNERS), help="Comma-separated partners to run.")
+    parser.add_argument("--rows", type=parse_size, default=parse_size("50k"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--output", type=Path, default=None, help="Write the measurements as JSON.")
+    parser.add_argument("--child", nargs=3, metavar=("PARTNER", "STEP", "VARIANT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        partner, step, variant = args.child
+        print(json.dumps(measure_step(partner, step, variant, args.chunk_rows)))
+        return
+
+    partners = [p.strip() for p in args.partners.split(",") if p.strip()]
+    results = calibrate(partners, args.rows, seed=args.seed, chunk_rows=args.chunk_rows)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Scaling benchmark for every partner pipeline on synthetic data.
+
+For each partner and size a fresh subprocess generates a seeded synthetic
+dataset (see ``benchmarks.synthetic``), points the pipeline at it through
+``PIPELINE_DATA_DIR`` and runs it under a run report, so each stage's wall
+time, CPU time, throughput and peak memory are measured in isolation.
+
+Sizes up to ``--io-max-rows`` run the full pipeline ``main()`` including
+the Excel/CSV load and write; larger sizes (Excel sheets stop at 1,048,576
+rows) run ``process()`` on the in-memory frame.
+
+Every case is appended to a run-history database; with ``--gate`` the
+suite exits non-zero when a stage's rows/sec or peak memory regressed
+against the trailing median of earlier runs of the same case.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 10k,100k,1M,10M
+    python -m benchmarks.run_benchmarks --partners Hearst,Boston --sizes 10k --gate
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_SIZES = "10k,100k,1M,10M"
+DEFAULT_IO_MAX_ROWS = 100_000
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+HISTORY_DB = RESULTS_DIR / "history.sqlite"
+PIPELINE_MODULES = {
+    "Hearst": "pipelines.hearst_pipeline",
+    "Pittsburgh": "pipelines.pittsburgh_pipeline",
+    "Boston": "pipelines.boston_pipeline",
+    "Houston": "pipelines.houston_pipeline",
+}
+
+
+def run_child(partner: str, rows: int, seed: int, io_max_rows: int, result_path: Path) -> None:
+    """Generate data, run one partner pipeline and write the summary to ``result_path``."""
+    from benchmarks.synthetic import generate_dataset, write_dataset
+    from src.config import get_settings
+    from src.utils.dataframe_utils import enable_copy_on_write
+    from src.utils.run_history import summarize_report
+    from src.utils.run_report import RunReport, peak_rss_kb
+
+    generate_start = time.perf_counter()
+    dataset = generate_dataset(partner, rows, seed=seed)
+    full_pipeline = rows <= io_max_rows
+    write_dataset(dataset, get_settings().data_dir, write_raw=full_pipeline)
+    generate_seconds = time.perf_counter() - generate_start
+
+    pipeline = importlib.import_module(PIPELINE_MODULES[partner])
+    if full_pipeline:
+        del dataset
+        pipeline.main([])
+        reports = sorted((get_settings().data_dir / partner.casefold() / "reports").glob("*.json"))
+        report = json.loads(reports[-1].read_text())
+    else:
+        enable_copy_on_write()
+        raw_df = dataset.raw
+        del dataset
+        run_report = RunReport(partner)
+        with run_report.activate():
+            pipeline.process(raw_df)
+        report = run_report.to_dict()
+
+    summary = {
+        "partner": partner,
+        "rows": rows,
+        "seed": seed,
+        "mode": "full_pipeline" if full_pipeline else "in_memory",
+        "generate_seconds": round(generate_seconds, 3),
+        "peak_rss_mb": round(peak_rss_kb() / 1024, 1),
+        **summarize_report(report, rows),
+    }
+    result_path.write_text(json.dumps(summary, indent=2))
+
+
+def run_case(partner: str, rows: int, seed: int, io_max_rows: int, timeout: Optional[float]) -> dict:
+    """Run one partner/size case in a subprocess against a throwaway data directory."""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{partner.casefold()}-") as tmp:
+        result_path = Path(tmp) / "result.json"
+        env = {**os.environ, "PIPELINE_DATA_DIR": str(Path(tmp) / "data")}
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.run_benchmarks",
+            "--child",
+            partner,
+            str(rows),
+            "--seed",
+            str(seed),
+            "--io-max-rows",
+            str(io_max_rows),
+            "--result-path",
+            str(result_path),
+        ]
+        try:
+            completed = subprocess.run(
+                command,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                cwd=Path(__file__).resolve().parent.parent,
+            )
+        except subprocess.TimeoutExpired:
+            return {"partner": partner, "rows": rows, "seed": seed, "error": f"timed out after {timeout}s"}
+
+        if completed.returncode != 0 or not result_path.exists():
+            tail = (completed.stderr or completed.stdout).strip().splitlines()[-5:]
+            return {"partner": partner, "rows": rows, "seed": seed, "error": "\n".join(tail)}
+        return json.loads(result_path.read_text())
+
+
+def _print_result(result: dict) -> None:
+    label = f"{result['partner']:<10} {result['rows']:>10,} rows"
+    if "error" in result:
+        print(f"{label} | FAILED: {result['error']}")
+        return
+    print(
+        f"{label} | {result['mode']:<13} | {result['wall_seconds']:8.2f} s | "
+        f"{result['rows_per_second'] or 0:>12,.0f} rows/s | peak +{result['peak_memory_delta_mb']:.1f} MB"
+    )
+    for stage in result["stages"]:
+        print(
+            f"    {stage['name']:<28} {stage['wall_seconds']:8.3f} s  "
+            f"{stage['rows_per_second'] or 0:>12,.0f} rows/s  peak +{stage['peak_memory_delta_mb']:.1f} MB"
+        )
+
+
+def case_label(rows: int, seed: int) -> str:
+    return f"synthetic-{rows}-seed{seed}"
+
+
+def record_case(result: dict, db_path: Path, threshold: float) -> List[str]:
+    """Append a benchmark case to the history and return its regressions against earlier runs."""
+    from src.utils.run_history import compare, record_run
+
+    label = case_label(result["rows"], result["seed"])
+    run_id = record_run(
+        result,
+        partner=result["partner"],
+        input_hash=hashlib.sha256(label.encode()).hexdigest()[:16],
+        db_path=db_path,
+        source="benchmark",
+        label=label,
+    )
+    regressions = compare(
+        result["partner"],
+        db_path=db_path,
+        source="benchmark",
+        label=label,
+        run_id=run_id,
+        threshold=threshold,
+    )
+    return [regression.describe() for regression in regressions]
+
+
+def run_suite(
+    partners: List[str],
+    sizes: List[int],
+    *,
+    seed: int = 0,
+    io_max_rows: int = DEFAULT_IO_MAX_ROWS,
+    timeout: Optional[float] = None,
+    history_db: Optional[Path] = HISTORY_DB,
+    threshold: float = 0.2,
+) -> Dict[str, object]:
+    """Run every partner at every size, record each case and return the combined results."""
+    import pandas as pd
+
+    results = []
+    for rows in sizes:
+        for partner in partners:
+            result = run_case(partner, rows, seed, io_max_rows, timeout)
+            _print_result(result)
+            if history_db is not None and "error" not in result:
+                result["regressions"] = record_case(result, history_db, threshold)
+                for regression in result["regressions"]:
+                    print(f"    REGRESSION {regression}")
+            results.append(result)
+    return {
+        "started_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from benchmarks.synthetic import PARTNERS, parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partners", default=",".join(PARTNERS), help="Comma-separated partners to run.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated row counts, e.g. 10k,1M.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--io-max-rows",
+        type=parse_size,
+        default=DEFAULT_IO_MAX_ROWS,
+        help="Largest size run through the full pipeline including file load and write.",
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="Per-case timeout in seconds.")
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path.")
+    parser.add_argument("--history", type=Path, default=HISTORY_DB, help="Run-history database to append to.")
+    parser.add_argument("--no-history", action="store_true", help="Do not record the cases in the history.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative rows/sec drop or peak-memory growth against the trailing median.",
+    )
+    parser.add_argument("--gate", action="store_true", help="Exit non-zero when any case regressed.")
+    parser.add_argument("--child", nargs=2, metavar=("PARTNER", "ROWS"), help=argparse.SUPPRESS)
+    parser.add_argument("--result-path", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        partner, rows = args.child
+        run_child(partner, int(rows), args.seed, args.io_max_rows, args.result_path)
+        return
+
+    partners = [p.strip() for p in args.partners.split(",") if p.strip()]
+    unknown = sorted(set(partners) - set(PIPELINE_MODULES))
+    if unknown:
+        parser.error(f"Unknown partners: {', '.join(unknown)}")
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+
+    suite = run_suite(
+        partners,
+        sizes,
+        seed=args.seed,
+        io_max_rows=args.io_max_rows,
+        timeout=args.timeout,
+        history_db=None if args.no_history else args.history,
+        threshold=args.threshold,
+    )
+    output = args.output or RESULTS_DIR / f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(suite, indent=2))
+    print(f"Results written to {output}")
+
+    if args.gate:
+        failed = [r for r in suite["results"] if "error" in r or r.get("regressions")]
+        if failed:
+            print(f"Benchmark gate failed for {len(failed)} case(s).")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
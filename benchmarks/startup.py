@@ -0,0 +1,131 @@
+"""
+Cold-start benchmark for the settings module and the partner pipelines.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and reports the median cumulative import time, the slowest project-level
+imports and whether importing created anything under the data directory.
+With ``--baseline REF`` the same measurements are taken on a temporary git
+worktree of ``REF`` so the two trees can be compared side by side.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --baseline HEAD~1 --repeat 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = [
+    "src.config",
+    "pipelines.houston_pipeline",
+    "pipelines.boston_pipeline",
+    "pipelines.pittsburgh_pipeline",
+    "pipelines.hearst_pipeline",
+]
+LOCAL_PREFIXES = ("src", "pipelines", "dotenv")
+
+
+def parse_importtime(stderr: str) -> Dict[str, tuple]:
+    """Map module name to ``(self_us, cumulative_us)`` from ``-X importtime`` output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_import(module: str, cwd: Path, data_dir: Path) -> Dict[str, object]:
+    """Import ``module`` in a fresh interpreter and return its timings and side effects."""
+    env = {**os.environ, "PIPELINE_DATA_DIR": str(data_dir), "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = parse_importtime(completed.stderr)
+    created = sorted(str(path.relative_to(data_dir)) for path in data_dir.rglob("*")) if data_dir.exists() else []
+    return {"timings": timings, "total_us": timings[module][1], "created": created}
+
+
+def benchmark_tree(tree: Path, modules: List[str], repeat: int) -> Dict[str, dict]:
+    """Measure every module ``repeat`` times against a throwaway data directory."""
+    results = {}
+    for module in modules:
+        runs = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory(prefix="startup-") as tmp:
+                runs.append(measure_import(module, tree, Path(tmp) / "data"))
+        local = {}
+        for name in runs[0]["timings"]:
+            if name.split(".")[0] in LOCAL_PREFIXES:
+                local[name] = statistics.median(run["timings"].get(name, (0, 0))[0] for run in runs)
+        results[module] = {
+            "median_ms": statistics.median(run["total_us"] for run in runs) / 1000,
+            "slowest_local": sorted(local.items(), key=lambda item: item[1], reverse=True)[:5],
+            "created": runs[0]["created"],
+        }
+    return results
+
+
+@contextmanager
+def baseline_worktree(ref: str) -> Iterator[Path]:
+    """Check ``ref`` out into a temporary git worktree for the duration of the block."""
+    with tempfile.TemporaryDirectory(prefix="startup-baseline-") as tmp:
+        tree = Path(tmp) / "tree"
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", "--quiet", str(tree), ref],
+            cwd=REPO_DIR,
+            check=True,
+        )
+        try:
+            yield tree
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(tree)], cwd=REPO_DIR, check=False)
+
+
+def _print_results(title: str, results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    print(title)
+    for module, result in results.items():
+        line = f"  {module:<32} {result['median_ms']:8.1f} ms"
+        if baseline is not None and module in baseline:
+            before = baseline[module]["median_ms"]
+            line += f"   (baseline {before:8.1f} ms, {result['median_ms'] - before:+7.1f} ms)"
+        print(line)
+        slowest = ", ".join(f"{name} {us / 1000:.1f} ms" for name, us in result["slowest_local"])
+        print(f"      slowest project imports: {slowest}")
+        print(f"      paths created at import: {len(result['created'])}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="Comma-separated modules to import.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module.")
+    parser.add_argument("--baseline", metavar="REF", default=None, help="Git ref to compare against.")
+    args = parser.parse_args(argv)
+
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    baseline = None
+    if args.baseline:
+        with baseline_worktree(args.baseline) as tree:
+            baseline = benchmark_tree(tree, modules, args.repeat)
+        _print_results(f"Baseline {args.baseline}", baseline)
+    _print_results("Working tree", benchmark_tree(REPO_DIR, modules, args.repeat), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Seeded synthetic partner data for benchmarks.
+
+Raw frames follow the partner schemas (Hearst and Pittsburgh
+``raw_column_types``, ``boston_raw_column_types``, ``houston_raw_column_types``):
+every column gets values of its declared type, and the columns the stages
+key on (orders, jobs, accounts, reps, sections, periods) are drawn from
+shared pools so the generated lookups hit a tunable share of them.
+
+Usage:
+    from benchmarks.synthetic import MatchRates, generate_dataset, write_dataset
+    dataset = generate_dataset("Hearst", 100_000, seed=0, match_rates=MatchRates(strategic_accounts=0.1))
+    write_dataset(dataset, "/tmp/bench-data")   # layout of src.config, use with PIPELINE_DATA_DIR
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    BOSTON_FILE,
+    BOSTON_IMMIGRATION_LOOKUP_FILE,
+    HEASRT_FILE,
+    HOUSTON_FILE,
+    MSP_AGENNT_LOOKUP_FILE,
+    MSP_NOT_ASSIGNED_FILE_NAME,
+    MSP_REVENUE_DATE_FILE,
+    MSP_STRATEGIC_FILE,
+    MSP_WELCOME_BACK_FILE,
+    PITTSBURGH_CLASS_LOOKUP_FILE,
+    PITTSBURGH_FILE,
+    STRATEGIC_ORDERS_FILE,
+)
+from src.configs.boston_configs import boston_raw_column_types
+from src.configs.hearst_configs import raw_column_types as hearst_raw_column_types
+from src.configs.houston_configs import houston_raw_column_types
+from src.configs.pittsburgh_configs import raw_column_types as pittsburgh_raw_column_types
+
+PARTNERS = ("Hearst", "Pittsburgh", "Boston", "Houston")
+RAW_SHEET = "Raw"
+DATE_START = pd.Timestamp("2025-01-01")
+DATE_SPAN_DAYS = 365
+# Lookup entries for another partner, so the Company filters have work to do.
+DECOY_COMPANY = "Decoy Media"
+
+
+@dataclass(frozen=True)
+class MatchRates:
+    """Share of the relevant key pool that each lookup contains."""
+
+    strategic_accounts: float = 0.05
+    strategic_orders: float = 0.01
+    welcome_back: float = 0.05
+    agent_mapping: float = 0.5
+    not_assigned: float = 0.5
+    revenue_calendar: float = 1.0
+    class_list: float = 0.6
+    immigration: float = 0.5
+
+
+@dataclass
+class SyntheticLookup:
+    """One lookup sheet; ``location`` is "common", "partner" (lookups dir) or "raw" (raw dir)."""
+
+    location: str
+    file_name: str
+    frame: pd.DataFrame
+    sheet_name: Optional[str] = None
+
+
+@dataclass
+class SyntheticDataset:
+    """A partner's raw frame plus every lookup its stages read."""
+
+    partner: str
+    raw: pd.DataFrame
+    raw_file: str
+    lookups: List[SyntheticLookup] = field(default_factory=list)
+
+
+def parse_size(text: str) -> int:
+    """Parse row counts such as ``"10k"``, ``"1M"`` or ``"250000"``."""
+    text = text.strip().lower().replace("_", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier != 1 else text
+    return int(float(number) * multiplier)
+
+
+def _sample(rng: np.random.Generator, pool: np.ndarray, rate: float) -> np.ndarray:
+    """Pick ``rate`` of ``pool`` without replacement (at least one entry)."""
+    count = min(len(pool), max(1, int(round(len(pool) * rate))))
+    return rng.choice(pool, size=count, replace=False)
+
+
+def _dates(rng: np.random.Generator, rows: int) -> pd.DatetimeIndex:
+    return DATE_START + pd.to_timedelta(rng.integers(0, DATE_SPAN_DAYS, rows), unit="D")
+
+
+def _frame_from_schema(
+    schema: List[Dict[str, object]],
+    rows: int,
+    rng: np.random.Generator,
+) -> Dict[str, object]:
+    """Generate one column per schema entry with values of the declared type."""
+    columns: Dict[str, object] = {}
+    for entry in schema:
+        (col, dtype), = entry.items()
+        if dtype in (int, "int"):
+            columns[col] = rng.integers(0, 100, rows)
+        elif dtype in (float, "float"):
+            columns[col] = np.round(rng.random(rows) * 100, 2)
+        elif dtype in ("date", "datetime64[ns]"):
+            columns[col] = _dates(rng, rows)
+        else:
+            vocabulary = np.array([f"{col} {i}" for i in range(200)], dtype=object)
+            columns[col] = vocabulary[rng.integers(0, len(vocabulary), rows)]
+    return columns
+
+
+def _key_pool(start: int, size: int) -> np.ndarray:
+    return np.arange(start, start + max(size, 1))
+
+
+def _strategic_accounts(
+    rng: np.random.Generator,
+    partner: str,
+    account_numbers: np.ndarray,
+    account_names: np.ndarray,
+    rate: float,
+) -> pd.DataFrame:
+    picks = _sample(rng, np.arange(len(account_numbers)), rate)
+    decoys = max(1, len(picks) // 10)
+    return pd.DataFrame(
+        {
+            "Account Number": np.concatenate([account_numbers[picks].astype(str), [f"D{i}" for i in range(decoys)]]),
+            "Complete Name": np.concatenate([account_names[picks], [f"Decoy Account {i}" for i in range(decoys)]]),
+            "Company": [partner] * len(picks) + [DECOY_COMPANY] * decoys,
+            "Strategic End Date": (_dates(rng, len(picks) + decoys) + pd.Timedelta(days=180)).strftime("%Y-%m-%d"),
+            "Salesperson": [f"Strategic Rep {i % 25}, S" for i in range(len(picks) + decoys)],
+        }
+    )
+
+
+def _strategic_orders(rng: np.random.Generator, partner: str, order_pool: np.ndarray, rate: float) -> pd.DataFrame:
+    orders = _sample(rng, order_pool, rate).astype(str)
+    return pd.DataFrame(
+        {
+            "Order Number": np.concatenate([orders, ["999999999"]]),
+            "Company": [partner] * len(orders) + [DECOY_COMPANY],
+            "Salesperson": [f"Order Rep {i % 10}, O" for i in range(len(orders) + 1)],
+        }
+    )
+
+
+def _welcome_back(rng: np.random.Generator, partner: str, order_pool: np.ndarray, rate: float) -> pd.DataFrame:
+    orders = _sample(rng, order_pool, rate).astype(str)
+    return pd.DataFrame(
+        {
+            "Order Number": orders,
+            "Company": f"{partner}, {DECOY_COMPANY}",
+            "Welcome Back End Date": (_dates(rng, len(orders)) + pd.Timedelta(days=90)).strftime("%Y-%m-%d"),
+        }
+    )
+
+
+def _accounts(rows: int) -> tuple:
+    count = max(rows // 20, 100)
+    numbers = _key_pool(10_000, count)
+    names = np.array([f"Account {n}" for n in numbers], dtype=object)
+    return numbers, names
+
+
+def generate_hearst(rows: int, rng: np.random.Generator, rates: MatchRates) -> SyntheticDataset:
+    columns = _frame_from_schema(hearst_raw_column_types, rows, rng)
+    jobs = _key_pool(1_000_000, rows // 3)
+    account_numbers, account_names = _accounts(rows)
+    reps = np.array([f"Rep {i}, Hearst" for i in range(200)] + ["Assigned, Not", "Wave2, Wave2"], dtype=object)
+    rep_weights = np.full(len(reps), 0.85 / 200)
+    rep_weights[-2:] = [0.1, 0.05]
+    pubs = np.array([f"Pub {i}" for i in range(50)], dtype=object)
+
+    account_idx = rng.integers(0, len(account_numbers), rows)
+    columns.update(
+        {
+            "Year": np.full(rows, 2025),
+            "Period #": rng.integers(1, 13, rows),
+            "Job Number": rng.choice(jobs, rows),
+            "Child Acct #": account_numbers[account_idx].astype(str).astype(object),
+            "Child Acct Name": account_names[account_idx],
+            "Ad Type": np.array(["Display", "Legal", "Classified", "Obit"], dtype=object)[rng.integers(0, 4, rows)],
+            "Full Name LF": rng.choice(reps, rows, p=rep_weights),
+            "Pub": pubs[rng.integers(0, len(pubs), rows)],
+            "Revenue": np.round(rng.random(rows) * 500, 2),
+        }
+    )
+    raw = pd.DataFrame(columns)
+
+    periods = _sample(rng, np.arange(1, 13), rates.revenue_calendar)
+    agents = _sample(rng, reps[:-2], rates.agent_mapping)
+    return SyntheticDataset(
+        partner="Hearst",
+        raw=raw,
+        raw_file=HEASRT_FILE,
+        lookups=[
+            SyntheticLookup(
+                "raw",
+                HEASRT_FILE,
+                pd.DataFrame({"Pub": pubs, "Market": [f"M{i % 7}" for i in range(len(pubs))]}),
+                sheet_name="Hearst Pub Market List",
+            ),
+            SyntheticLookup(
+                "common",
+                MSP_AGENNT_LOOKUP_FILE,
+                pd.DataFrame(
+                    {
+                        "System(s)": ["Hearst, Pittsburgh"] * len(agents) + [DECOY_COMPANY],
+                        "Agent Names": np.concatenate([agents, ["Decoy, Agent"]]),
+                    }
+                ),
+                sheet_name="All Rep Names",
+            ),
+            SyntheticLookup(
+                "common",
+                MSP_NOT_ASSIGNED_FILE_NAME,
+                pd.DataFrame(
+                    {
+                        "Job #": _sample(rng, jobs, rates.not_assigned).astype(str),
+                        "MSP Agent": "Rep 0, Hearst",
+                    }
+                ),
+            ),
+            SyntheticLookup(
+                "common",
+                MSP_STRATEGIC_FILE,
+                _strategic_accounts(rng, "Hearst", account_numbers, account_names, rates.strategic_accounts),
+            ),
+            SyntheticLookup("common", STRATEGIC_ORDERS_FILE, _strategic_orders(rng, "Hearst", jobs, rates.strategic_orders)),
+            SyntheticLookup("common", MSP_WELCOME_BACK_FILE, _welcome_back(rng, "Hearst", jobs, rates.welcome_back)),
+            SyntheticLookup(
+                "common",
+                MSP_REVENUE_DATE_FILE,
+                pd.DataFrame(
+                    {
+                        "Period #": periods,
+                        "Hearst": pd.Timestamp("2024-01-01") + pd.to_timedelta((periods - 1) * 28, unit="D"),
+                    }
+                ),
+            ),
+        ],
+    )
+
+
+def generate_pittsburgh(rows: int, rng: np.random.Generator, rates: MatchRates) -> SyntheticDataset:
+    columns = _frame_from_schema(pittsburgh_raw_column_types, rows, rng)
+    orders = _key_pool(500_000, rows // 3)
+    account_numbers, account_names = _accounts(rows)
+    sections = np.array([f"Section {i}" for i in range(40)], dtype=object)
+    columns.update(
+        {
+            "Order #": rng.choice(orders, rows),
+            "Ad #": rng.integers(1, 10**7, rows),
+            "Customer": account_names[rng.integers(0, len(account_names), rows)],
+            "Section": sections[rng.integers(0, len(sections), rows)],
+            "Net": np.round(rng.random(rows) * 200, 2),
+        }
+    )
+    raw = pd.DataFrame(columns)
+
+    classes = _sample(rng, sections, rates.class_list)
+    return SyntheticDataset(
+        partner="Pittsburgh",
+        raw=raw,
+        raw_file=PITTSBURGH_FILE,
+        lookups=[
+            SyntheticLookup(
+                "partner",
+                PITTSBURGH_CLASS_LOOKUP_FILE,
+                pd.DataFrame({"Class Code in Client Data": classes, "Ad Category": [f"Category {c}" for c in classes]}),
+                sheet_name="Class List",
+            ),
+            SyntheticLookup(
+                "common",
+                MSP_STRATEGIC_FILE,
+                _strategic_accounts(rng, "Pittsburgh", account_numbers, account_names, rates.strategic_accounts),
+            ),
+            SyntheticLookup(
+                "common", STRATEGIC_ORDERS_FILE, _strategic_orders(rng, "Pittsburgh", orders, rates.strategic_orders)
+            ),
+            SyntheticLookup("common", MSP_WELCOME_BACK_FILE, _welcome_back(rng, "Pittsburgh", orders, rates.welcome_back)),
+        ],
+    )
+
+
+def generate_boston(rows: int, rng: np.random.Generator, rates: MatchRates) -> SyntheticDataset:
+    columns = _frame_from_schema(boston_raw_column_types, rows, rng)
+    orders = _key_pool(2_000_000, rows // 3)
+    account_numbers, account_names = _accounts(rows)
+    account_idx = rng.integers(0, len(account_numbers), rows)
+    order_keys = rng.choice(orders, rows)
+    columns.update(
+        {
+            "OrderURN": order_keys.astype(str).astype(object),
+            "CustomerURN": account_numbers[account_idx].astype(str).astype(object),
+            "Customer_Name": account_names[account_idx],
+            "Insert_Date": _dates(rng, rows).strftime("%m/%d/%Y").to_numpy(dtype=object),
+            "ImmigrationAD": np.array(["Y", "N", ""], dtype=object)[rng.integers(0, 3, rows)],
+            "OperatorName": np.array([f"Operator {i}, B" for i in range(30)], dtype=object)[rng.integers(0, 30, rows)],
+        }
+    )
+    raw = pd.DataFrame(columns)
+
+    immigration_orders = _sample(rng, orders, rates.immigration)
+    return SyntheticDataset(
+        partner="Boston",
+        raw=raw,
+        raw_file=BOSTON_FILE,
+        lookups=[
+            SyntheticLookup(
+                "partner",
+                BOSTON_IMMIGRATION_LOOKUP_FILE,
+                pd.DataFrame(
+                    {
+                        "Order Number": immigration_orders,
+                        "Immigration Order": rng.integers(0, 2, len(immigration_orders)).astype(bool),
+                    }
+                ),
+            ),
+            SyntheticLookup(
+                "common",
+                MSP_STRATEGIC_FILE,
+                _strategic_accounts(rng, "Boston", account_numbers, account_names, rates.strategic_accounts),
+            ),
+            SyntheticLookup("common", STRATEGIC_ORDERS_FILE, _strategic_orders(rng, "Boston", orders, rates.strategic_orders)),
+        ],
+    )
+
+
+def generate_houston(rows: int, rng: np.random.Generator, rates: MatchRates) -> SyntheticDataset:
+    columns = _frame_from_schema(houston_raw_column_types, rows, rng)
+    orders = _key_pool(3_000_000, rows // 3)
+    columns.update(
+        {
+            "Order #": rng.choice(orders, rows).astype(str).astype(object),
+            "Revenue": np.round(rng.random(rows) * 300, 2),
+        }
+    )
+    return SyntheticDataset(partner="Houston", raw=pd.DataFrame(columns), raw_file=HOUSTON_FILE)
+
+
+GENERATORS = {
+    "Hearst": generate_hearst,
+    "Pittsburgh": generate_pittsburgh,
+    "Boston": generate_boston,
+    "Houston": generate_houston,
+}
+
+
+def generate_dataset(
+    partner: str,
+    rows: int,
+    *,
+    seed: int = 0,
+    match_rates: Optional[MatchRates] = None,
+) -> SyntheticDataset:
+    """Generate a partner's raw rows and lookups; the same seed always yields the same data."""
+    if partner not in GENERATORS:
+        raise ValueError(f"Unknown partner '{partner}'. Expected one of: {', '.join(PARTNERS)}")
+    rng = np.random.default_rng(seed)
+    return GENERATORS[partner](rows, rng, match_rates or MatchRates())
+
+
+def write_dataset(
+    dataset: SyntheticDataset,
+    data_dir: Union[str, Path],
+    *,
+    write_raw: bool = True,
+) -> Path:
+    """
+    Write the dataset into ``data_dir`` using the ``src.config`` directory layout.
+
+    With ``write_raw=False`` only the lookups are written (raw sheets of several
+    million rows cannot be written to Excel); sheets sharing a workbook with the
+    raw data, like Hearst's market list, are still written.
+    """
+    data_dir = Path(data_dir)
+    partner_dir = data_dir / dataset.partner.casefold()
+    directories = {
+        "common": data_dir / "common_lookups",
+        "partner": partner_dir / "lookups",
+        "raw": partner_dir / "raw",
+    }
+    for directory in directories.values():
+        directory.mkdir(parents=True, exist_ok=True)
+
+    workbooks: Dict[Path, List[tuple]] = {}
+    if write_raw:
+        workbooks.setdefault(directories["raw"] / dataset.raw_file, []).append((RAW_SHEET, dataset.raw))
+    for lookup in dataset.lookups:
+        workbooks.setdefault(directories[lookup.location] / lookup.file_name, []).append(
+            (lookup.sheet_name, lookup.frame)
+        )
+
+    for file_path, sheets in workbooks.items():
+        if file_path.suffix.lower() == ".csv":
+            sheets[0][1].to_csv(file_path, index=False)
+            continue
+        with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            for sheet_name, frame in sheets:
+                frame.to_excel(writer, sheet_name=sheet_name or "Sheet1", index=False)
+    return data_dir
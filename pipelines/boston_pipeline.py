@@ -2,70 +2,301 @@
 
 from __future__ import annotations
 
+import math
+from functools import partial
+from pathlib import Path
+
 import pandas as pd
-import pandas as pd
-from dotenv import load_dotenv
 
 from src.config import (
     BOSTON_FILE,
     BOSTON_IMMIGRATION_LOOKUP_FILE,
-    BOSTON_LOOKUP_DIR,
-    BOSTON_PROCESSED,
     BOSTON_PROCESSED_FILE,
-    BOSTON_RAW_DIR,
-    COMMON_LOOKUP_DIR,
     MSP_STRATEGIC_FILE,
     STRATEGIC_ORDERS_FILE,
+    get_settings,
 )
 from src.configs.boston_configs import (
+    boston_period_column,
+    boston_processed_key_column,
+    boston_raw_key_column,
+    boston_immigration_schema,
+    boston_raw_schema,
     boston_sisense_columns,
+    boston_warehouse_key_column,
+    boston_rollup_columns,
     calculate_revenue,
     enforce_strategic_orders_lookup,
+    order_urn_keys,
     tag_verified_strategic,
     update_immigration_flags,
 )
-from src.utils.excel_file_operations import write_df_to_excel
-from src.utils.dataframe_utils import rearrange_columns
+from src.configs.common_configs import process_partitioned
+from src.utils.arrow_compute import set_compute_backend
+from src.utils.excel_file_operations import iter_excel_chunks, write_df_to_excel
+from src.utils.dataframe_utils import (
+    convert_to_arrow_strings,
+    enable_arrow_strings,
+    enable_copy_on_write,
+    rearrange_columns,
+)
+from src.utils.incremental import file_signature, run_incremental
+from src.utils.lookup_diff import LookupRetagger, retag_changed_lookups, save_lookup_snapshots
+from src.utils.lookup_prefetch import LookupSpec, prefetch_lookups
+from src.utils.memory_budget import exit_on_budget_exceeded, memory_budget, spill_directory
+from src.utils.pipeline_cli import parse_pipeline_args
+from src.utils.preflight import FileCheck, preflight
+from src.utils.processed_dataset import write_processed_history
+from src.utils.rollups import update_rollups
+from src.utils.run_history import record_report
+from src.utils.run_report import RunReport, current_report, run_stage
+from src.utils.sql_engine import export_processed
+from src.utils.tracing import tracing
+from src.utils.warehouse_sink import load_processed
 
-load_dotenv()
+PARTNER_NAME = "Boston"
 
 
-def main() -> None:
-    """Entry point for the Boston pipeline."""
-    partner_name = "Boston"
-    print(f"Processing data for partner: {partner_name}")
-    raw_path = BOSTON_RAW_DIR / BOSTON_FILE
-    raw_df = pd.read_csv(raw_path, low_memory=False)
+def lookup_files() -> list[Path]:
+    """
+    The lookup files the pipeline reads.
+    """
+    settings = get_settings()
+    return [
+        settings.boston_lookup_dir / BOSTON_IMMIGRATION_LOOKUP_FILE,
+        settings.common_lookup_dir / MSP_STRATEGIC_FILE,
+        settings.common_lookup_dir / STRATEGIC_ORDERS_FILE,
+    ]
 
-    processed_df = calculate_revenue(raw_df)
-    processed_df = update_immigration_flags(
-        processed_df,
-        lookup_path=BOSTON_LOOKUP_DIR,
-        lookup_file_name=BOSTON_IMMIGRATION_LOOKUP_FILE,
-    )
+
+def raw_checks() -> list[FileCheck]:
+    """
+    Header checks of the raw file, run before any heavy work; skipped when only re-tagging.
+    """
+    raw_dir = get_settings().boston_raw_dir
+    return [
+        FileCheck.from_schema("Boston raw", raw_dir / BOSTON_FILE, boston_raw_schema),
+    ]
+
+
+def lookup_checks() -> list[FileCheck]:
+    """
+    Header checks of the lookup files, run before any heavy work.
+    """
+    settings = get_settings()
+    return [
+        FileCheck.from_schema(
+            "Immigration lookup", settings.boston_lookup_dir / BOSTON_IMMIGRATION_LOOKUP_FILE, boston_immigration_schema
+        ),
+        FileCheck(
+            "Strategic accounts",
+            settings.common_lookup_dir / MSP_STRATEGIC_FILE,
+            sheet_name="Strategic Account List",
+            columns=("Account Number", "Complete Name", "Company", "Strategic End Date", "Salesperson"),
+        ),
+        FileCheck(
+            "Strategic orders",
+            settings.common_lookup_dir / STRATEGIC_ORDERS_FILE,
+            columns=("Order Number", "Company", "Salesperson"),
+        ),
+    ]
+
+
+def lookup_prefetch() -> list[LookupSpec]:
+    """
+    Lookups read in the background while the raw file loads; arguments match the helpers'
+    load_lookup_file calls.
+    """
+    settings = get_settings()
+    return [
+        LookupSpec(settings.boston_lookup_dir, BOSTON_IMMIGRATION_LOOKUP_FILE, schema=boston_immigration_schema),
+        LookupSpec(settings.common_lookup_dir, MSP_STRATEGIC_FILE, sheet_name="Strategic Account List"),
+        LookupSpec(settings.common_lookup_dir, STRATEGIC_ORDERS_FILE),
+    ]
+
+
+def apply_strategic_tags(processed_df: pd.DataFrame) -> pd.DataFrame:
+    """Derive Strategic_Flag from the strategic account list, then enforce strategic orders."""
     processed_df = tag_verified_strategic(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         strategic_file_name=MSP_STRATEGIC_FILE,
         sheet_name="Strategic Account List",
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
     )
-    processed_df = enforce_strategic_orders_lookup(
+    return enforce_strategic_orders_lookup(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         lookup_file_name=STRATEGIC_ORDERS_FILE,
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
     )
-    if boston_sisense_columns:
-        processed_df = rearrange_columns(processed_df, boston_sisense_columns)
 
-    output_path = write_df_to_excel(
+
+def lookup_retaggers() -> list[LookupRetagger]:
+    """
+    Lookups whose changed rows are re-tagged in place by ``--retag-lookups``.
+    """
+    lookup_dir = get_settings().common_lookup_dir
+    return [
+        LookupRetagger(
+            name="strategic_accounts",
+            lookup_path=lookup_dir,
+            file_name=MSP_STRATEGIC_FILE,
+            sheet_name="Strategic Account List",
+            key_columns=[("CustomerURN", "Account Number"), ("Customer_Name", "Complete Name")],
+            retag=apply_strategic_tags,
+            overwrites_columns=("OperatorName",),
+        ),
+        LookupRetagger(
+            name="strategic_orders",
+            lookup_path=lookup_dir,
+            file_name=STRATEGIC_ORDERS_FILE,
+            key_columns=[("OrderURN", "Order Number")],
+            retag=apply_strategic_tags,
+            strip_decimal_suffix=False,
+            overwrites_columns=("OperatorName",),
+        ),
+    ]
+
+
+def call_stage(name, func, df, *args, **kwargs):
+    """Call a stage without recording it, for stages run once per partition."""
+    return func(df, *args, **kwargs)
+
+
+def process(raw_df: pd.DataFrame, *, record_stages: bool = True) -> pd.DataFrame:
+    """Run the Boston tagging stages on raw rows."""
+    stage = run_stage if record_stages else call_stage
+    processed_df = stage("calculate_revenue", calculate_revenue, raw_df)
+    processed_df = stage(
+        "update_immigration_flags",
+        update_immigration_flags,
         processed_df,
-        path=BOSTON_PROCESSED,
-        file_name=BOSTON_PROCESSED_FILE,
-        sheet_name="Processed",
+        lookup_path=get_settings().boston_lookup_dir,
+        lookup_file_name=BOSTON_IMMIGRATION_LOOKUP_FILE,
     )
+    processed_df = stage("apply_strategic_tags", apply_strategic_tags, processed_df)
+    if boston_sisense_columns:
+        processed_df = rearrange_columns(processed_df, boston_sisense_columns)
+    return processed_df
+
+
+def process_chunked(raw_chunks, *, partitions: int) -> pd.DataFrame:
+    """
+    Like :func:`process`, for raw rows streamed in chunks: the rows are spilled to
+    disk in hash partitions on OrderURN (the immigration flags compare every row of
+    an order; the other stages work per row) and processed one partition at a time.
+    The partitions are recorded as the single stage ``process_partitioned``.
+    """
+    with spill_directory("boston-spill-") as spill_dir:
+        return run_stage(
+            "process_partitioned",
+            process_partitioned,
+            raw_chunks,
+            process=partial(process, record_stages=False),
+            partition_keys=order_urn_keys,
+            spill_dir=spill_dir,
+            partitions=partitions,
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the Boston pipeline."""
+    settings = get_settings()
+    args = parse_pipeline_args(PARTNER_NAME, argv)
+    enable_copy_on_write()
+    enable_arrow_strings(args.arrow_strings)
+    set_compute_backend(args.backend)
+    print(f"Processing data for partner: {PARTNER_NAME}")
+    report = RunReport(PARTNER_NAME, verbose=args.verbose)
+    with exit_on_budget_exceeded(), tracing(args.trace), report.activate(), memory_budget(args.memory_budget, chunk_rows=args.chunk_rows) as budget:
+        checks = lookup_checks() if args.retag_lookups else [*raw_checks(), *lookup_checks()]
+        run_stage("preflight", preflight, checks)
+        with prefetch_lookups(lookup_prefetch()):
+            if args.retag_lookups:
+                with report.stage("retag_changed_lookups") as record:
+                    processed_df = retag_changed_lookups(
+                        state_dir=settings.boston_state_dir,
+                        retaggers=lookup_retaggers(),
+                        partner_name=PARTNER_NAME,
+                        signature=file_signature(lookup_files()),
+                    )
+                    record.rows_out = len(processed_df)
+            else:
+                raw_path = settings.boston_raw_dir / BOSTON_FILE
+                plan = None
+                if budget is not None:
+                    # Incremental runs diff every raw row against the stored state, so they stay in memory.
+                    plan = budget.plan(
+                        raw_path,
+                        partition_column="OrderURN",
+                        output_columns=len(boston_sisense_columns) or None,
+                        allow_chunked=not args.incremental,
+                    )
+                    print(f"Memory plan: {plan.describe()}")
+                    current_report().record_metric("memory_plan", plan.to_dict())
+                if plan is not None and plan.chunked:
+                    # Validated chunk by chunk rather than with schema=, which would also cast
+                    # the columns; the in-memory load keeps the dtypes read_csv infers.
+                    raw_chunks = map(
+                        boston_raw_schema.validate,
+                        iter_excel_chunks(settings.boston_raw_dir, BOSTON_FILE, chunk_rows=plan.chunk_rows),
+                    )
+                    if args.arrow_strings:
+                        raw_chunks = map(convert_to_arrow_strings, raw_chunks)
+                    processed_df = process_chunked(
+                        raw_chunks, partitions=max(1, math.ceil(plan.estimate.rows / plan.chunk_rows))
+                    )
+                else:
+                    with report.stage("load_raw") as record:
+                        raw_df = boston_raw_schema.validate(pd.read_csv(raw_path, low_memory=False))
+                        if args.arrow_strings:
+                            raw_df = convert_to_arrow_strings(raw_df)
+                        record.rows_out = len(raw_df)
+                    if args.incremental:
+                        processed_df = run_stage(
+                            "run_incremental",
+                            run_incremental,
+                            raw_df,
+                            process=process,
+                            state_dir=settings.boston_state_dir,
+                            raw_key_column=boston_raw_key_column,
+                            processed_key_column=boston_processed_key_column,
+                            signature=file_signature(lookup_files()),
+                        )
+                        save_lookup_snapshots(settings.boston_state_dir, lookup_retaggers(), PARTNER_NAME)
+                    else:
+                        processed_df = process(raw_df)
+
+        output_path = run_stage(
+            "write_output",
+            write_df_to_excel,
+            processed_df,
+            path=settings.boston_processed,
+            file_name=BOSTON_PROCESSED_FILE,
+            sheet_name="Processed",
+            split=args.split_output,
+            split_key=boston_warehouse_key_column,
+        )
+        run_stage("export_catalog", export_processed, processed_df, PARTNER_NAME)
+        run_stage("write_history", write_processed_history, processed_df, PARTNER_NAME, period_column=boston_period_column)
+        run_stage("load_warehouse", load_processed, processed_df, PARTNER_NAME, key_column=boston_warehouse_key_column)
+        run_stage(
+            "update_rollups",
+            update_rollups,
+            processed_df,
+            PARTNER_NAME,
+            period_column=boston_period_column,
+            columns=boston_rollup_columns,
+        )
     print(f"✅ Wrote Boston processed file to {output_path}")
+    print(f"Run report written to {report.write(settings.boston_reports_dir)}")
+    record_report(
+        report.to_dict(),
+        partner=PARTNER_NAME,
+        input_files=[settings.boston_raw_dir / BOSTON_FILE, *lookup_files()],
+        db_path=settings.run_history_db,
+    )
 
 
 if __name__ == "__main__":
@@ -3,102 +3,421 @@ import os
 import sys
 from pathlib import Path
 
-# Third-party imports
-from dotenv import load_dotenv
-
-load_dotenv()
 # print(sys.path)
 # sys.path.append(os.path.abspath(os.path.join(os.getcwd(), "..")))
 # print(sys.path)
 
 # Local application imports
 from src.config import (
-    HEARST_RAW_DIR,
-    HEARST_PROCESSED,
     HEASRT_FILE,
     HEASRT_FILE_SISENSE,
-    COMMON_LOOKUP_DIR,
     MSP_AGENNT_LOOKUP_FILE,
     MSP_NOT_ASSIGNED_FILE_NAME,
     MSP_STRATEGIC_FILE,
     MSP_WELCOME_BACK_FILE,
     MSP_REVENUE_DATE_FILE,
     STRATEGIC_ORDERS_FILE,
+    get_settings,
 )
 from src.configs.hearst_configs import (
-    raw_column_types,
+    raw_schema,
+    market_list_schema,
+    not_assigned_schema,
+    raw_key_column,
+    period_column,
+    processed_key_column,
     sisense_columns,
+    warehouse_key_column,
+    rollup_columns,
     calculate_revenue,
+    calculate_revenue_chunked,
     tag_msp_from_rep,
     enrich_with_msp_reference,
     tag_verified_strategic,
+    welcome_back_patch,
     tag_welcome_back,
+    revenue_date_patch,
     assign_revenue_date,
     enforce_strategic_orders_lookup,
 )
-from src.utils.excel_file_operations import load_excel_file, write_df_to_excel
-from src.utils.dataframe_utils import rearrange_columns
+from src.utils.arrow_compute import set_compute_backend
+from src.utils.excel_file_operations import iter_excel_chunks, load_excel_file, load_lookup_file, write_df_to_excel
+from src.utils.dataframe_utils import enable_arrow_strings, enable_copy_on_write, rearrange_columns
+from src.utils.incremental import file_signature, frame_signature, run_incremental
+from src.utils.lookup_diff import LookupRetagger, retag_changed_lookups, save_lookup_snapshots
+from src.utils.lookup_prefetch import LookupSpec, prefetch_lookups
+from src.utils.memory_budget import exit_on_budget_exceeded, memory_budget, spill_directory
+from src.utils.pipeline_cli import parse_pipeline_args
+from src.utils.preflight import FileCheck, preflight
+from src.utils.processed_dataset import write_processed_history
+from src.utils.rollups import update_rollups
+from src.utils.run_history import record_report
+from src.utils.run_report import RunReport, current_report, run_stage
+from src.utils.sql_engine import export_processed
+from src.utils.stage_runner import run_patch_producers
+from src.utils.tracing import tracing
+from src.utils.warehouse_sink import load_processed
 
+PARTNER_NAME = "Hearst"
 
 
-def main():
+def lookup_files():
     """
-    Main entry point: loads the 'Raw' sheet from Hearst Files.xlsx
-    with proper type handling and prints a quick preview.
+    The lookup files the pipeline reads.
+    """
+    lookup_dir = get_settings().common_lookup_dir
+    return [
+        lookup_dir / MSP_AGENNT_LOOKUP_FILE,
+        lookup_dir / MSP_NOT_ASSIGNED_FILE_NAME,
+        lookup_dir / MSP_STRATEGIC_FILE,
+        lookup_dir / STRATEGIC_ORDERS_FILE,
+        lookup_dir / MSP_WELCOME_BACK_FILE,
+        lookup_dir / MSP_REVENUE_DATE_FILE,
+    ]
+
+
+def raw_checks():
+    """
+    Header checks of the raw file, run before any heavy work; skipped when only re-tagging.
+    """
+    raw_dir = get_settings().hearst_raw_dir
+    return [
+        FileCheck.from_schema("Hearst raw", raw_dir / HEASRT_FILE, raw_schema, sheet_name="Raw"),
+        FileCheck.from_schema(
+            "Hearst market list", raw_dir / HEASRT_FILE, market_list_schema, sheet_name="Hearst Pub Market List"
+        ),
+    ]
+
+
+def lookup_checks():
+    """
+    Header checks of the lookup files, run before any heavy work.
+    """
+    lookup_dir = get_settings().common_lookup_dir
+    return [
+        FileCheck(
+            "MSP rep names",
+            lookup_dir / MSP_AGENNT_LOOKUP_FILE,
+            sheet_name="All Rep Names",
+            columns=("System(s)", "Agent Names"),
+        ),
+        FileCheck.from_schema(
+            "Not assigned list",
+            lookup_dir / MSP_NOT_ASSIGNED_FILE_NAME,
+            not_assigned_schema,
+            sheet_name="Not Assigned Reference List",
+        ),
+        FileCheck(
+            "Strategic accounts",
+            lookup_dir / MSP_STRATEGIC_FILE,
+            sheet_name="Strategic Account List",
+            columns=("Account Number", "Complete Name", "Company", "Strategic End Date"),
+        ),
+        FileCheck("Strategic orders", lookup_dir / STRATEGIC_ORDERS_FILE, columns=("Order Number", "Company")),
+        FileCheck(
+            "Welcome back list",
+            lookup_dir / MSP_WELCOME_BACK_FILE,
+            sheet_name="Welcome Back List",
+            columns=("Order Number", "Company", "Welcome Back End Date"),
+        ),
+        FileCheck(
+            "Revenue date calendar",
+            lookup_dir / MSP_REVENUE_DATE_FILE,
+            any_of=(("Period #", "Period", "Period#", "Period Num"),),
+            containing=(PARTNER_NAME,),
+        ),
+    ]
+
+
+def lookup_prefetch():
+    """
+    Lookups read in the background while the raw file loads; arguments match the helpers'
+    load_lookup_file calls.
+    """
+    lookup_dir = get_settings().common_lookup_dir
+    return [
+        LookupSpec(lookup_dir, MSP_AGENNT_LOOKUP_FILE, sheet_name="All Rep Names"),
+        LookupSpec(
+            lookup_dir,
+            MSP_NOT_ASSIGNED_FILE_NAME,
+            sheet_name="Not Assigned Reference List",
+            schema=not_assigned_schema,
+        ),
+        LookupSpec(lookup_dir, MSP_STRATEGIC_FILE, sheet_name="Strategic Account List"),
+        LookupSpec(lookup_dir, STRATEGIC_ORDERS_FILE),
+        LookupSpec(lookup_dir, MSP_WELCOME_BACK_FILE, sheet_name="Welcome Back List"),
+        LookupSpec(lookup_dir, MSP_REVENUE_DATE_FILE),
+    ]
+
+
+def apply_strategic_tags(processed_df):
+    """
+    Derive Verified Strategic from the strategic account list, then enforce strategic orders.
     """
-    partner_name = "Hearst"
-    print(f"Processing data for partner: {partner_name}")
-    raw_df = load_excel_file(
-        path=HEARST_RAW_DIR,                 # or "/full/path/to/dir"
-        file_name=HEASRT_FILE,
-        column_types=raw_column_types,
-        sheet_name="Raw",                    # or omit to read the first sheet
-    )
-    # write_df_to_excel(raw_df, HEARST_PROCESSED, "checking.xlsx", sheet_name="Sisense")
-    processed_df = calculate_revenue(raw_df)
-    processed_df = tag_msp_from_rep(
-        processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
-        lookup_file_name=MSP_AGENNT_LOOKUP_FILE,
-        lookup_sheet_name="All Rep Names",
-        processed_name_column="Full Name LF",
-        partner_name=partner_name,
-    )
-    processed_df = enrich_with_msp_reference(
-        processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
-        lookup_file_name=MSP_NOT_ASSIGNED_FILE_NAME,
-        lookup_sheet_name="Not Assigned Reference List",
-    )
     processed_df = tag_verified_strategic(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         strategic_file_name=MSP_STRATEGIC_FILE,
         sheet_name="Strategic Account List",
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
     )
-    processed_df = enforce_strategic_orders_lookup(
+    return enforce_strategic_orders_lookup(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         lookup_file_name=STRATEGIC_ORDERS_FILE,
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
     )
-    processed_df = tag_welcome_back(
+
+
+def apply_welcome_back_tags(processed_df):
+    """
+    Flag Welcome Back rows from the welcome back list.
+    """
+    return tag_welcome_back(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         welcome_back_file=MSP_WELCOME_BACK_FILE,
         sheet_name="Welcome Back List",
+        partner_name=PARTNER_NAME,
+    )
+
+
+def lookup_retaggers():
+    """
+    Lookups whose changed rows are re-tagged in place by ``--retag-lookups``.
+    """
+    lookup_dir = get_settings().common_lookup_dir
+    return [
+        LookupRetagger(
+            name="strategic_accounts",
+            lookup_path=lookup_dir,
+            file_name=MSP_STRATEGIC_FILE,
+            sheet_name="Strategic Account List",
+            key_columns=[("Child Acct #", "Account Number"), ("Child Acct Name", "Complete Name")],
+            retag=apply_strategic_tags,
+        ),
+        LookupRetagger(
+            name="strategic_orders",
+            lookup_path=lookup_dir,
+            file_name=STRATEGIC_ORDERS_FILE,
+            key_columns=[("Job Number +", "Order Number")],
+            retag=apply_strategic_tags,
+            strip_decimal_suffix=False,
+        ),
+        LookupRetagger(
+            name="welcome_back",
+            lookup_path=lookup_dir,
+            file_name=MSP_WELCOME_BACK_FILE,
+            sheet_name="Welcome Back List",
+            key_columns=[("Job Number +", "Order Number")],
+            retag=apply_welcome_back_tags,
+            strip_decimal_suffix=False,
+        ),
+    ]
+
+
+def process(raw_df):
+    """
+    Run the Hearst revenue aggregation and tagging stages on raw rows.
+    """
+    return tag_revenue(run_stage("calculate_revenue", calculate_revenue, raw_df))
+
+
+def process_chunked(raw_chunks):
+    """
+    Like :func:`process`, for raw rows streamed in chunks: the per-job partial
+    revenue is spilled to disk so only the aggregated rows are held in memory.
+    """
+    with spill_directory("hearst-spill-") as spill_dir:
+        processed_df = run_stage("calculate_revenue", calculate_revenue_chunked, raw_chunks, spill_dir=spill_dir)
+    return tag_revenue(processed_df)
+
+
+def tag_revenue(processed_df):
+    """
+    Run the tagging stages on the aggregated revenue rows.
+    """
+    partner_name = PARTNER_NAME
+    processed_df = run_stage(
+        "tag_msp_from_rep",
+        tag_msp_from_rep,
+        processed_df,
+        lookup_path=get_settings().common_lookup_dir,
+        lookup_file_name=MSP_AGENNT_LOOKUP_FILE,
+        lookup_sheet_name="All Rep Names",
+        processed_name_column="Full Name LF",
         partner_name=partner_name,
     )
-    processed_df = assign_revenue_date(
+    processed_df = run_stage(
+        "enrich_with_msp_reference",
+        enrich_with_msp_reference,
+        processed_df,
+        lookup_path=get_settings().common_lookup_dir,
+        lookup_file_name=MSP_NOT_ASSIGNED_FILE_NAME,
+        lookup_sheet_name="Not Assigned Reference List",
+    )
+    processed_df = run_stage("apply_strategic_tags", apply_strategic_tags, processed_df)
+    # Welcome back and revenue date read and write disjoint columns.
+    processed_df = run_patch_producers(
+        processed_df,
+        [
+            lambda df: run_stage(
+                "welcome_back",
+                welcome_back_patch,
+                df,
+                lookup_path=get_settings().common_lookup_dir,
+                welcome_back_file=MSP_WELCOME_BACK_FILE,
+                sheet_name="Welcome Back List",
+                partner_name=partner_name,
+            ),
+            lambda df: run_stage(
+                "revenue_date",
+                revenue_date_patch,
+                df,
+                lookup_path=get_settings().common_lookup_dir,
+                calendar_file=MSP_REVENUE_DATE_FILE,
+                partner_name=partner_name,
+                calendar_year_or_not=False,
+            ),
+        ],
+    )
+    return rearrange_columns(processed_df, sisense_columns)
+
+
+def refresh_revenue_date(processed_df):
+    """
+    Recompute Revenue Date on rows kept by an incremental run; the calendar dates move to the current year.
+    """
+    return run_stage(
+        "refresh_revenue_date",
+        assign_revenue_date,
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         calendar_file=MSP_REVENUE_DATE_FILE,
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
         calendar_year_or_not=False,
     )
-    processed_df = rearrange_columns(processed_df, sisense_columns)
-    write_df_to_excel(processed_df, HEARST_PROCESSED, HEASRT_FILE_SISENSE, sheet_name="Sisense")
+
+
+def incremental_signature():
+    """
+    Signature of everything besides the raw rows that the stored output depends on:
+    the lookup files and the Pub Market List sheet of the raw workbook.
+    """
+    market_list = load_lookup_file(
+        get_settings().hearst_raw_dir,
+        HEASRT_FILE,
+        sheet_name="Hearst Pub Market List",
+        schema=market_list_schema,
+    )
+    return f"{file_signature(lookup_files())}|{frame_signature('Hearst Pub Market List', market_list)}"
+
+
+def plan_raw_load(budget, *, incremental=False):
+    """
+    Estimate the raw file against the memory budget and record the chosen plan.
+    """
+    plan = budget.plan(
+        get_settings().hearst_raw_dir / HEASRT_FILE,
+        column_types=raw_schema.column_types(),
+        sheet_name="Raw",
+        group_column=raw_key_column,
+        output_columns=len(sisense_columns),
+        allow_chunked=not incremental,
+    )
+    print(f"Memory plan: {plan.describe()}")
+    current_report().record_metric("memory_plan", plan.to_dict())
+    return plan
+
+
+def main(argv=None):
+    """
+    Main entry point: loads the 'Raw' sheet from Hearst Files.xlsx,
+    processes it (optionally incrementally) and writes the Sisense file.
+    """
+    settings = get_settings()
+    args = parse_pipeline_args(PARTNER_NAME, argv)
+    enable_copy_on_write()
+    enable_arrow_strings(args.arrow_strings)
+    set_compute_backend(args.backend)
+    print(f"Processing data for partner: {PARTNER_NAME}")
+    report = RunReport(PARTNER_NAME, verbose=args.verbose)
+    with exit_on_budget_exceeded(), tracing(args.trace), report.activate(), memory_budget(args.memory_budget, chunk_rows=args.chunk_rows) as budget:
+        checks = lookup_checks() if args.retag_lookups else [*raw_checks(), *lookup_checks()]
+        run_stage("preflight", preflight, checks)
+        with prefetch_lookups(lookup_prefetch()):
+            if args.retag_lookups:
+                with report.stage("retag_changed_lookups") as record:
+                    processed_df = retag_changed_lookups(
+                        state_dir=settings.hearst_state_dir,
+                        retaggers=lookup_retaggers(),
+                        partner_name=PARTNER_NAME,
+                        signature=incremental_signature(),
+                    )
+                    record.rows_out = len(processed_df)
+            elif budget is not None and plan_raw_load(budget, incremental=args.incremental).chunked:
+                raw_chunks = iter_excel_chunks(
+                    settings.hearst_raw_dir,
+                    HEASRT_FILE,
+                    schema=raw_schema,
+                    sheet_name="Raw",
+                    chunk_rows=budget.chunk_rows,
+                )
+                processed_df = process_chunked(raw_chunks)
+            else:
+                with report.stage("load_raw") as record:
+                    raw_df = load_excel_file(
+                        path=settings.hearst_raw_dir,        # or "/full/path/to/dir"
+                        file_name=HEASRT_FILE,
+                        schema=raw_schema,
+                        sheet_name="Raw",                    # or omit to read the first sheet
+                        workers=args.parse_workers,
+                    )
+                    record.rows_out = len(raw_df)
+                # write_df_to_excel(raw_df, settings.hearst_processed, "checking.xlsx", sheet_name="Sisense")
+                if args.incremental:
+                    processed_df = run_stage(
+                        "run_incremental",
+                        run_incremental,
+                        raw_df,
+                        process=process,
+                        state_dir=settings.hearst_state_dir,
+                        raw_key_column=raw_key_column,
+                        processed_key_column=processed_key_column,
+                        signature=incremental_signature(),
+                        refresh=refresh_revenue_date,
+                    )
+                    save_lookup_snapshots(settings.hearst_state_dir, lookup_retaggers(), PARTNER_NAME)
+                else:
+                    processed_df = process(raw_df)
+        run_stage(
+            "write_output",
+            write_df_to_excel,
+            processed_df,
+            settings.hearst_processed,
+            HEASRT_FILE_SISENSE,
+            sheet_name="Sisense",
+            split=args.split_output,
+            split_key=warehouse_key_column,
+        )
+        run_stage("export_catalog", export_processed, processed_df, PARTNER_NAME)
+        run_stage("write_history", write_processed_history, processed_df, PARTNER_NAME, period_column=period_column)
+        run_stage("load_warehouse", load_processed, processed_df, PARTNER_NAME, key_column=warehouse_key_column)
+        run_stage(
+            "update_rollups",
+            update_rollups,
+            processed_df,
+            PARTNER_NAME,
+            period_column=period_column,
+            columns=rollup_columns,
+        )
+    print(f"Run report written to {report.write(settings.hearst_reports_dir)}")
+    record_report(
+        report.to_dict(),
+        partner=PARTNER_NAME,
+        input_files=[settings.hearst_raw_dir / HEASRT_FILE, *lookup_files()],
+        db_path=settings.run_history_db,
+    )
 
 
 if __name__ == "__main__":
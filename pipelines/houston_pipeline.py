@@ -2,46 +2,149 @@
 
 from __future__ import annotations
 
-from dotenv import load_dotenv
+import pandas as pd
 
 from src.config import (
     HOUSTON_FILE,
-    HOUSTON_PROCESSED,
     HOUSTON_PROCESSED_FILE,
-    HOUSTON_RAW_DIR,
+    get_settings,
 )
 from src.configs.houston_configs import (
     calculate_revenue,
-    houston_raw_column_types,
+    houston_period_column,
+    houston_processed_key_column,
+    houston_raw_key_column,
+    houston_raw_schema,
     houston_sisense_columns,
+    houston_warehouse_key_column,
+    houston_rollup_columns,
 )
-from src.utils.excel_file_operations import load_excel_file, write_df_to_excel
-from src.utils.dataframe_utils import rearrange_columns
+from src.utils.arrow_compute import set_compute_backend
+from src.utils.excel_file_operations import iter_excel_chunks, load_excel_file, write_df_to_excel
+from src.utils.dataframe_utils import enable_arrow_strings, enable_copy_on_write, rearrange_columns
+from src.utils.incremental import run_incremental
+from src.utils.memory_budget import MemoryBudget, MemoryPlan, exit_on_budget_exceeded, memory_budget
+from src.utils.pipeline_cli import parse_pipeline_args
+from src.utils.preflight import FileCheck, preflight
+from src.utils.processed_dataset import write_processed_history
+from src.utils.rollups import update_rollups
+from src.utils.run_history import record_report
+from src.utils.run_report import RunReport, current_report, run_stage
+from src.utils.sql_engine import export_processed
+from src.utils.tracing import tracing
+from src.utils.warehouse_sink import load_processed
 
-load_dotenv()
+PARTNER_NAME = "Houston"
 
 
-def main() -> None:
-    """Entry point for the Houston pipeline."""
-    partner_name = "Houston"
-    print(f"Processing data for partner: {partner_name}")
-    raw_df = load_excel_file(
-        path=HOUSTON_RAW_DIR,
-        file_name=HOUSTON_FILE,
-        column_types=houston_raw_column_types,
-    )
+def preflight_checks() -> list[FileCheck]:
+    """
+    Houston reads no lookups; the raw header is still checked before the load.
+    """
+    raw_dir = get_settings().houston_raw_dir
+    return [
+        FileCheck.from_schema("Houston raw", raw_dir / HOUSTON_FILE, houston_raw_schema),
+    ]
 
-    processed_df = calculate_revenue(raw_df)
+
+def process(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Run the Houston stages on raw rows."""
+    processed_df = run_stage("calculate_revenue", calculate_revenue, raw_df)
     if houston_sisense_columns:
         processed_df = rearrange_columns(processed_df, houston_sisense_columns)
+    return processed_df
+
+
+def plan_raw_load(budget: MemoryBudget, *, incremental: bool = False) -> MemoryPlan:
+    """Estimate the raw file against the memory budget and record the chosen plan."""
+    plan = budget.plan(
+        get_settings().houston_raw_dir / HOUSTON_FILE,
+        column_types=houston_raw_schema.column_types(),
+        output_columns=len(houston_sisense_columns) or None,
+        allow_chunked=not incremental,
+    )
+    print(f"Memory plan: {plan.describe()}")
+    current_report().record_metric("memory_plan", plan.to_dict())
+    return plan
+
 
-    output_path = write_df_to_excel(
-        processed_df,
-        path=HOUSTON_PROCESSED,
-        file_name=HOUSTON_PROCESSED_FILE,
-        sheet_name="Processed",
+def load_raw_chunked(chunk_rows: int) -> pd.DataFrame:
+    """Load the raw file chunk by chunk, without the full workbook ``pd.read_excel`` builds."""
+    chunks = iter_excel_chunks(
+        get_settings().houston_raw_dir,
+        HOUSTON_FILE,
+        schema=houston_raw_schema,
+        chunk_rows=chunk_rows,
     )
+    return pd.concat(list(chunks), ignore_index=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the Houston pipeline."""
+    settings = get_settings()
+    args = parse_pipeline_args(PARTNER_NAME, argv)
+    enable_copy_on_write()
+    enable_arrow_strings(args.arrow_strings)
+    set_compute_backend(args.backend)
+    print(f"Processing data for partner: {PARTNER_NAME}")
+    report = RunReport(PARTNER_NAME, verbose=args.verbose)
+    with exit_on_budget_exceeded(), tracing(args.trace), report.activate(), memory_budget(args.memory_budget, chunk_rows=args.chunk_rows) as budget:
+        run_stage("preflight", preflight, preflight_checks())
+        chunked = budget is not None and plan_raw_load(budget, incremental=args.incremental).chunked
+        with report.stage("load_raw") as record:
+            if chunked:
+                raw_df = load_raw_chunked(budget.chunk_rows)
+            else:
+                raw_df = load_excel_file(
+                    path=settings.houston_raw_dir,
+                    file_name=HOUSTON_FILE,
+                    schema=houston_raw_schema,
+                    workers=args.parse_workers,
+                )
+            record.rows_out = len(raw_df)
+
+        if args.incremental:
+            processed_df = run_stage(
+                "run_incremental",
+                run_incremental,
+                raw_df,
+                process=process,
+                state_dir=settings.houston_state_dir,
+                raw_key_column=houston_raw_key_column,
+                processed_key_column=houston_processed_key_column,
+            )
+        else:
+            processed_df = process(raw_df)
+
+        output_path = run_stage(
+            "write_output",
+            write_df_to_excel,
+            processed_df,
+            path=settings.houston_processed,
+            file_name=HOUSTON_PROCESSED_FILE,
+            sheet_name="Processed",
+            split=args.split_output,
+            split_key=houston_warehouse_key_column,
+        )
+        run_stage("export_catalog", export_processed, processed_df, PARTNER_NAME)
+        run_stage("write_history", write_processed_history, processed_df, PARTNER_NAME, period_column=houston_period_column)
+        run_stage("load_warehouse", load_processed, processed_df, PARTNER_NAME, key_column=houston_warehouse_key_column)
+        run_stage(
+            "update_rollups",
+            update_rollups,
+            processed_df,
+            PARTNER_NAME,
+            period_column=houston_period_column,
+            columns=houston_rollup_columns,
+        )
     print(f"✅ Wrote Houston processed file to {output_path}")
+    print(f"Run report written to {report.write(settings.houston_reports_dir)}")
+    record_report(
+        report.to_dict(),
+        partner=PARTNER_NAME,
+        input_files=[settings.houston_raw_dir / HOUSTON_FILE],
+        db_path=settings.run_history_db,
+    )
 
 
 if __name__ == "__main__":
@@ -2,87 +2,345 @@
 
 from __future__ import annotations
 
-from dotenv import load_dotenv
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
 
 from src.config import (
-    COMMON_LOOKUP_DIR,
     MSP_WELCOME_BACK_FILE,
     MSP_STRATEGIC_FILE,
     PITTSBURGH_CLASS_LOOKUP_FILE,
     PITTSBURGH_FILE,
-    PITTSBURGH_PROCESSED,
     PITTSBURGH_PROCESSED_FILE,
-    PITTSBURGH_RAW_DIR,
-    PITTSBURGH_LOOKUP_DIR,
     STRATEGIC_ORDERS_FILE,
+    get_settings,
 )
 from src.configs.pittsburgh_configs import (
-    raw_column_types,
+    raw_schema,
+    class_list_schema,
+    raw_key_column,
+    period_column,
+    processed_key_column,
     sisense_columns,
+    warehouse_key_column,
+    rollup_columns,
     calculate_revenue,
+    calculate_revenue_chunked,
+    welcome_back_patch,
     tag_welcome_back,
     tag_verified_strategic,
+    revenue_date_patch,
     assign_revenue_date,
-    tag_msp_from_class_lookup,
+    msp_class_patch,
     enforce_strategic_orders_lookup,
 )
-from src.utils.excel_file_operations import load_excel_file, write_df_to_excel
-from src.utils.dataframe_utils import rearrange_columns
+from src.utils.arrow_compute import set_compute_backend
+from src.utils.excel_file_operations import iter_excel_chunks, load_excel_file, write_df_to_excel
+from src.utils.dataframe_utils import enable_arrow_strings, enable_copy_on_write, rearrange_columns
+from src.utils.incremental import file_signature, run_incremental
+from src.utils.lookup_diff import LookupRetagger, retag_changed_lookups, save_lookup_snapshots
+from src.utils.lookup_prefetch import LookupSpec, prefetch_lookups
+from src.utils.memory_budget import MemoryBudget, MemoryPlan, exit_on_budget_exceeded, memory_budget, spill_directory
+from src.utils.pipeline_cli import parse_pipeline_args
+from src.utils.preflight import FileCheck, preflight
+from src.utils.processed_dataset import write_processed_history
+from src.utils.rollups import update_rollups
+from src.utils.run_history import record_report
+from src.utils.run_report import RunReport, current_report, run_stage
+from src.utils.sql_engine import export_processed
+from src.utils.stage_runner import run_patch_producers
+from src.utils.tracing import tracing
+from src.utils.warehouse_sink import load_processed
 
-load_dotenv()
+PARTNER_NAME = "Pittsburgh"
 
 
-def main() -> None:
-    """Entry point for the Pittsburgh pipeline."""
-    partner_name = "Pittsburgh"
-    print(f"Processing data for partner: {partner_name}")
-    raw_df = load_excel_file(
-        path=PITTSBURGH_RAW_DIR,
-        file_name=PITTSBURGH_FILE,
-        column_types=raw_column_types,
-        sheet_name="Raw",
-    )
+def lookup_files() -> list[Path]:
+    """
+    The lookup files the pipeline reads.
+    """
+    settings = get_settings()
+    return [
+        settings.common_lookup_dir / MSP_STRATEGIC_FILE,
+        settings.common_lookup_dir / STRATEGIC_ORDERS_FILE,
+        settings.common_lookup_dir / MSP_WELCOME_BACK_FILE,
+        settings.pittsburgh_lookup_dir / PITTSBURGH_CLASS_LOOKUP_FILE,
+    ]
+
+
+def raw_checks() -> list[FileCheck]:
+    """
+    Header checks of the raw file, run before any heavy work; skipped when only re-tagging.
+    """
+    raw_dir = get_settings().pittsburgh_raw_dir
+    return [
+        FileCheck.from_schema("Pittsburgh raw", raw_dir / PITTSBURGH_FILE, raw_schema, sheet_name="Raw"),
+    ]
+
+
+def lookup_checks() -> list[FileCheck]:
+    """
+    Header checks of the lookup files, run before any heavy work.
+    """
+    settings = get_settings()
+    return [
+        FileCheck(
+            "Strategic accounts",
+            settings.common_lookup_dir / MSP_STRATEGIC_FILE,
+            sheet_name="Strategic Account List",
+            columns=("Complete Name", "Company", "Strategic End Date"),
+        ),
+        FileCheck(
+            "Strategic orders",
+            settings.common_lookup_dir / STRATEGIC_ORDERS_FILE,
+            columns=("Order Number", "Company"),
+        ),
+        FileCheck(
+            "Welcome back list",
+            settings.common_lookup_dir / MSP_WELCOME_BACK_FILE,
+            sheet_name="Welcome Back List",
+            columns=("Order Number", "Company", "Welcome Back End Date"),
+        ),
+        FileCheck.from_schema(
+            "Class list",
+            settings.pittsburgh_lookup_dir / PITTSBURGH_CLASS_LOOKUP_FILE,
+            class_list_schema,
+            sheet_name="Class List",
+        ),
+    ]
+
 
-    processed_df = calculate_revenue(raw_df)
+def lookup_prefetch() -> list[LookupSpec]:
+    """
+    Lookups read in the background while the raw file loads; arguments match the helpers'
+    load_lookup_file calls.
+    """
+    settings = get_settings()
+    return [
+        LookupSpec(settings.common_lookup_dir, MSP_STRATEGIC_FILE, sheet_name="Strategic Account List"),
+        LookupSpec(settings.common_lookup_dir, STRATEGIC_ORDERS_FILE),
+        LookupSpec(settings.common_lookup_dir, MSP_WELCOME_BACK_FILE, sheet_name="Welcome Back List"),
+        LookupSpec(
+            settings.pittsburgh_lookup_dir,
+            PITTSBURGH_CLASS_LOOKUP_FILE,
+            sheet_name="Class List",
+            schema=class_list_schema,
+        ),
+    ]
 
+
+def apply_strategic_tags(processed_df: pd.DataFrame) -> pd.DataFrame:
+    """Derive Verified Strategic from the strategic account list, then enforce strategic orders."""
     processed_df = tag_verified_strategic(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         strategic_file_name=MSP_STRATEGIC_FILE,
         sheet_name="Strategic Account List",
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
     )
-    processed_df = enforce_strategic_orders_lookup(
+    return enforce_strategic_orders_lookup(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         lookup_file_name=STRATEGIC_ORDERS_FILE,
-        partner_name=partner_name,
+        partner_name=PARTNER_NAME,
     )
-    processed_df = tag_welcome_back(
+
+
+def apply_welcome_back_tags(processed_df: pd.DataFrame) -> pd.DataFrame:
+    """Flag WB 3-6 rows from the welcome back list."""
+    return tag_welcome_back(
         processed_df,
-        lookup_path=COMMON_LOOKUP_DIR,
+        lookup_path=get_settings().common_lookup_dir,
         welcome_back_file=MSP_WELCOME_BACK_FILE,
         sheet_name="Welcome Back List",
-        partner_name=partner_name,
-    )
-    processed_df = tag_msp_from_class_lookup(
-        processed_df,
-        lookup_path=PITTSBURGH_LOOKUP_DIR,
-        lookup_file_name=PITTSBURGH_CLASS_LOOKUP_FILE,
+        partner_name=PARTNER_NAME,
     )
-    processed_df = assign_revenue_date(
+
+
+def lookup_retaggers() -> list[LookupRetagger]:
+    """
+    Lookups whose changed rows are re-tagged in place by ``--retag-lookups``.
+    """
+    lookup_dir = get_settings().common_lookup_dir
+    return [
+        LookupRetagger(
+            name="strategic_accounts",
+            lookup_path=lookup_dir,
+            file_name=MSP_STRATEGIC_FILE,
+            sheet_name="Strategic Account List",
+            key_columns=[("Customer", "Complete Name")],
+            retag=apply_strategic_tags,
+        ),
+        LookupRetagger(
+            name="strategic_orders",
+            lookup_path=lookup_dir,
+            file_name=STRATEGIC_ORDERS_FILE,
+            key_columns=[("Order #", "Order Number")],
+            retag=apply_strategic_tags,
+            strip_decimal_suffix=False,
+        ),
+        LookupRetagger(
+            name="welcome_back",
+            lookup_path=lookup_dir,
+            file_name=MSP_WELCOME_BACK_FILE,
+            sheet_name="Welcome Back List",
+            key_columns=[("Order #", "Order Number")],
+            retag=apply_welcome_back_tags,
+            strip_decimal_suffix=False,
+        ),
+    ]
+
+
+def process(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Run the Pittsburgh revenue aggregation and tagging stages on raw rows."""
+    return tag_revenue(run_stage("calculate_revenue", calculate_revenue, raw_df))
+
+
+def process_chunked(raw_chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Like :func:`process`, aggregating raw chunks with per-order partials spilled to disk."""
+    with spill_directory("pittsburgh-spill-") as spill_dir:
+        processed_df = run_stage("calculate_revenue", calculate_revenue_chunked, raw_chunks, spill_dir=spill_dir)
+    return tag_revenue(processed_df)
+
+
+def tag_revenue(processed_df: pd.DataFrame) -> pd.DataFrame:
+    """Run the tagging stages on the aggregated revenue rows."""
+    partner_name = PARTNER_NAME
+    processed_df = run_stage("apply_strategic_tags", apply_strategic_tags, processed_df)
+    # Welcome back, class-list MSP and revenue date read and write disjoint columns.
+    processed_df = run_patch_producers(
         processed_df,
-        partner_name=partner_name,
+        [
+            lambda df: run_stage(
+                "welcome_back",
+                welcome_back_patch,
+                df,
+                lookup_path=get_settings().common_lookup_dir,
+                welcome_back_file=MSP_WELCOME_BACK_FILE,
+                sheet_name="Welcome Back List",
+                partner_name=partner_name,
+            ),
+            lambda df: run_stage(
+                "msp_class",
+                msp_class_patch,
+                df,
+                lookup_path=get_settings().pittsburgh_lookup_dir,
+                lookup_file_name=PITTSBURGH_CLASS_LOOKUP_FILE,
+            ),
+            lambda df: run_stage("revenue_date", revenue_date_patch, df, partner_name=partner_name),
+        ],
     )
-    processed_df = rearrange_columns(processed_df, sisense_columns)
-    output_path = write_df_to_excel(
-        processed_df,
-        path=PITTSBURGH_PROCESSED,
-        file_name=PITTSBURGH_PROCESSED_FILE,
-        sheet_name="Sisense",
+    return rearrange_columns(processed_df, sisense_columns)
+
+
+def refresh_revenue_date(processed_df: pd.DataFrame) -> pd.DataFrame:
+    """Re-stamp Revenue Date on rows kept by an incremental run with the current month."""
+    return run_stage("refresh_revenue_date", assign_revenue_date, processed_df, partner_name=PARTNER_NAME)
+
+
+def plan_raw_load(budget: MemoryBudget, *, incremental: bool = False) -> MemoryPlan:
+    """Estimate the raw file against the memory budget and record the chosen plan."""
+    plan = budget.plan(
+        get_settings().pittsburgh_raw_dir / PITTSBURGH_FILE,
+        column_types=raw_schema.column_types(),
+        sheet_name="Raw",
+        group_column=raw_key_column,
+        output_columns=len(sisense_columns),
+        allow_chunked=not incremental,
     )
+    print(f"Memory plan: {plan.describe()}")
+    current_report().record_metric("memory_plan", plan.to_dict())
+    return plan
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the Pittsburgh pipeline."""
+    settings = get_settings()
+    args = parse_pipeline_args(PARTNER_NAME, argv)
+    enable_copy_on_write()
+    enable_arrow_strings(args.arrow_strings)
+    set_compute_backend(args.backend)
+    print(f"Processing data for partner: {PARTNER_NAME}")
+    report = RunReport(PARTNER_NAME, verbose=args.verbose)
+    with exit_on_budget_exceeded(), tracing(args.trace), report.activate(), memory_budget(args.memory_budget, chunk_rows=args.chunk_rows) as budget:
+        checks = lookup_checks() if args.retag_lookups else [*raw_checks(), *lookup_checks()]
+        run_stage("preflight", preflight, checks)
+        with prefetch_lookups(lookup_prefetch()):
+            if args.retag_lookups:
+                with report.stage("retag_changed_lookups") as record:
+                    processed_df = retag_changed_lookups(
+                        state_dir=settings.pittsburgh_state_dir,
+                        retaggers=lookup_retaggers(),
+                        partner_name=PARTNER_NAME,
+                        signature=file_signature(lookup_files()),
+                    )
+                    record.rows_out = len(processed_df)
+            elif budget is not None and plan_raw_load(budget, incremental=args.incremental).chunked:
+                raw_chunks = iter_excel_chunks(
+                    settings.pittsburgh_raw_dir,
+                    PITTSBURGH_FILE,
+                    schema=raw_schema,
+                    sheet_name="Raw",
+                    chunk_rows=budget.chunk_rows,
+                )
+                processed_df = process_chunked(raw_chunks)
+            else:
+                with report.stage("load_raw") as record:
+                    raw_df = load_excel_file(
+                        path=settings.pittsburgh_raw_dir,
+                        file_name=PITTSBURGH_FILE,
+                        schema=raw_schema,
+                        sheet_name="Raw",
+                        workers=args.parse_workers,
+                    )
+                    record.rows_out = len(raw_df)
+                if args.incremental:
+                    processed_df = run_stage(
+                        "run_incremental",
+                        run_incremental,
+                        raw_df,
+                        process=process,
+                        state_dir=settings.pittsburgh_state_dir,
+                        raw_key_column=raw_key_column,
+                        processed_key_column=processed_key_column,
+                        signature=file_signature(lookup_files()),
+                        refresh=refresh_revenue_date,
+                    )
+                    save_lookup_snapshots(settings.pittsburgh_state_dir, lookup_retaggers(), PARTNER_NAME)
+                else:
+                    processed_df = process(raw_df)
+
+        output_path = run_stage(
+            "write_output",
+            write_df_to_excel,
+            processed_df,
+            path=settings.pittsburgh_processed,
+            file_name=PITTSBURGH_PROCESSED_FILE,
+            sheet_name="Sisense",
+            split=args.split_output,
+            split_key=warehouse_key_column,
+        )
+        run_stage("export_catalog", export_processed, processed_df, PARTNER_NAME)
+        run_stage("write_history", write_processed_history, processed_df, PARTNER_NAME, period_column=period_column)
+        run_stage("load_warehouse", load_processed, processed_df, PARTNER_NAME, key_column=warehouse_key_column)
+        run_stage(
+            "update_rollups",
+            update_rollups,
+            processed_df,
+            PARTNER_NAME,
+            period_column=period_column,
+            columns=rollup_columns,
+        )
 
     print(f"✅ Wrote Pittsburgh processed file to {output_path}")
+    print(f"Run report written to {report.write(settings.pittsburgh_reports_dir)}")
+    record_report(
+        report.to_dict(),
+        partner=PARTNER_NAME,
+        input_files=[settings.pittsburgh_raw_dir / PITTSBURGH_FILE, *lookup_files()],
+        db_path=settings.run_history_db,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""
+Run several partner pipelines, each in its own worker process.
+
+The lookups the pipelines declare in ``lookup_prefetch()`` are checked and
+loaded once here, published as memory-mapped Arrow files (see
+:mod:`src.utils.shared_lookups`) and attached by every worker before its
+pipeline starts. The Strategic Account List, Strategic Orders and Welcome
+Back List are therefore read once per run instead of once per partner, and
+the workers share one copy of them in memory.
+
+Options after ``--`` are passed to every pipeline, except that a
+``--trace PATH`` is written per partner (``PATH``'s stem plus ``_hearst``,
+``_boston``, ...) so the workers do not overwrite one file.
+
+Usage:
+    python -m pipelines.run_all
+    python -m pipelines.run_all --partners Hearst Boston --workers 2 -- --arrow-strings
+    python -m pipelines.run_all -- --trace reports/trace.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from src.utils.dataframe_utils import enable_arrow_strings
+from src.utils.excel_file_operations import clear_lookup_cache
+from src.utils.pipeline_cli import parse_pipeline_args
+from src.utils.preflight import preflight
+from src.utils.shared_lookups import SharedLookup, attach_lookups, publish_lookups
+
+PIPELINE_MODULES: Dict[str, str] = {
+    "Hearst": "pipelines.hearst_pipeline",
+    "Pittsburgh": "pipelines.pittsburgh_pipeline",
+    "Boston": "pipelines.boston_pipeline",
+    "Houston": "pipelines.houston_pipeline",
+}
+
+
+def run_partner(partner: str, pipeline_argv: Sequence[str], shared: Sequence[SharedLookup]) -> None:
+    """Worker entry point: attach the shared lookups, then run one partner's pipeline."""
+    module = importlib.import_module(PIPELINE_MODULES[partner])
+    # The lookup cache is keyed on the Arrow strings mode, so set it as the pipeline will before attaching.
+    enable_arrow_strings(parse_pipeline_args(partner, pipeline_argv).arrow_strings)
+    print(f"[{partner}] Attached {attach_lookups(shared)} shared lookups")
+    module.main(list(pipeline_argv))
+
+
+def partner_argv(pipeline_argv: Sequence[str], trace: Optional[str], partner: str) -> List[str]:
+    """Pipeline options for one worker, with ``--trace`` pointed at a file of its own."""
+    if trace is None:
+        return list(pipeline_argv)
+    path = Path(trace)
+    # The last --trace wins, so appending one overrides the shared path however it was spelled.
+    return [*pipeline_argv, "--trace", str(path.with_name(f"{path.stem}_{partner.casefold()}{path.suffix}"))]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point; returns the process exit code (1 if any partner failed)."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    pipeline_argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    own_argv = argv[: argv.index("--")] if "--" in argv else argv
+
+    parser = argparse.ArgumentParser(description="Run several partner pipelines in worker processes.")
+    parser.add_argument(
+        "--partners",
+        nargs="+",
+        choices=list(PIPELINE_MODULES),
+        default=list(PIPELINE_MODULES),
+        help="Partners to run (default: all).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per partner, at most one per CPU).",
+    )
+    args = parser.parse_args(own_argv)
+    # Reject bad pipeline options here rather than once per worker.
+    pipeline_args = parse_pipeline_args("partner", pipeline_argv)
+    enable_arrow_strings(pipeline_args.arrow_strings)
+
+    modules = [importlib.import_module(PIPELINE_MODULES[partner]) for partner in args.partners]
+    preflight([check for module in modules if hasattr(module, "lookup_checks") for check in module.lookup_checks()])
+    specs = [spec for module in modules if hasattr(module, "lookup_prefetch") for spec in module.lookup_prefetch()]
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="shared-lookups-") as directory:
+        shared = publish_lookups(specs, directory)
+        print(f"Published {len(shared)} shared lookups")
+        clear_lookup_cache()
+        workers = args.workers or max(1, min(len(args.partners), os.cpu_count() or 1))
+        # Spawned workers start from a clean interpreter and get the lookups only through the mapped files.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {
+                partner: pool.submit(
+                    run_partner, partner, partner_argv(pipeline_argv, pipeline_args.trace, partner), shared
+                )
+                for partner in args.partners
+            }
+            for partner, future in futures.items():
+                try:
+                    future.result()
+                except SystemExit as exc:
+                    # A pipeline over its memory budget exits with just the message.
+                    failures.append(partner)
+                    print(f"[{partner}] FAILED: {exc}")
+                except Exception as exc:
+                    failures.append(partner)
+                    print(f"[{partner}] FAILED: {type(exc).__name__}: {exc}")
+    print(f"Finished {len(args.partners) - len(failures)} of {len(args.partners)} partners")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,66 +1,176 @@
-import os
-from pathlib import Path
+"""
+Pipeline settings and data-tree paths.
 
-from dotenv import load_dotenv
+Importing this module has no side effects: ``.env`` is loaded and paths are
+resolved the first time :func:`get_settings` (or a legacy path constant such
+as ``DATA_DIR`` or ``HEARST_RAW_DIR``) is used, and directories are created
+by the code that first writes into them. Code that runs at import time should
+not bind the path constants; resolve paths when they are needed instead, e.g.
+``get_settings().hearst_raw_dir``, so ``PIPELINE_DATA_DIR`` and
+:func:`reset_settings` take effect.
+"""
 
-load_dotenv()
+import os
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Optional
 
-# Define directories
 PARENT_DIR = Path(__file__).resolve().parent.parent
-DATA_DIR = PARENT_DIR / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 # Client directory scaffolding
 CLIENT_NAMES = ["hearst", "pittsburgh", "boston", "houston"]
-CLIENT_DIRS = {}
-for client in CLIENT_NAMES:
-    base_dir = DATA_DIR / client
-    raw_dir = base_dir / "raw"
-    processed_dir = base_dir / "processed"
-    lookup_dir = base_dir / "lookups"
-    for path in (base_dir, raw_dir, processed_dir, lookup_dir):
-        path.mkdir(parents=True, exist_ok=True)
-    CLIENT_DIRS[client] = {
-        "BASE": base_dir,
-        "RAW": raw_dir,
-        "PROCESSED": processed_dir,
-        "LOOKUPS": lookup_dir,
-    }
-
-COMMON_LOOKUP_DIR = DATA_DIR / "common_lookups"
-COMMON_LOOKUP_DIR.mkdir(parents=True, exist_ok=True)
-
-# Hearst constants (backwards compatibility)
-HEARST_DIR = CLIENT_DIRS["hearst"]["BASE"]
-HEARST_RAW_DIR = CLIENT_DIRS["hearst"]["RAW"]
-HEARST_PROCESSED = CLIENT_DIRS["hearst"]["PROCESSED"]
-HEARST_LOOKUP_DIR = CLIENT_DIRS["hearst"]["LOOKUPS"]
+CLIENT_SUBDIRS = {
+    "BASE": None,
+    "RAW": "raw",
+    "PROCESSED": "processed",
+    "LOOKUPS": "lookups",
+    "STATE": "state",
+    "REPORTS": "reports",
+}
+
+# Per-client path names: ``HEARST_RAW_DIR`` as a constant, ``settings.hearst_raw_dir`` as an attribute.
+_CLIENT_CONSTANT_SUFFIXES = {
+    "BASE": "DIR",
+    "RAW": "RAW_DIR",
+    "PROCESSED": "PROCESSED",
+    "LOOKUPS": "LOOKUP_DIR",
+    "STATE": "STATE_DIR",
+    "REPORTS": "REPORTS_DIR",
+}
+_CLIENT_ATTRIBUTE_KEYS = {suffix.lower(): key for key, suffix in _CLIENT_CONSTANT_SUFFIXES.items()}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Resolved pipeline settings; every data path derives from ``data_dir``.
+
+    Client directories are also attributes named like the legacy constants,
+    e.g. ``settings.hearst_raw_dir`` or ``settings.boston_state_dir``.
+    """
+
+    data_dir: Path
+
+    def __getattr__(self, name: str) -> Path:
+        client, _, suffix = name.partition("_")
+        if client in CLIENT_NAMES and suffix in _CLIENT_ATTRIBUTE_KEYS:
+            return self.client_dirs[client][_CLIENT_ATTRIBUTE_KEYS[suffix]]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Load ``.env`` and read the settings from the environment."""
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        # PIPELINE_DATA_DIR points the pipelines at another data tree (e.g. synthetic benchmark data).
+        return cls(data_dir=Path(os.getenv("PIPELINE_DATA_DIR", PARENT_DIR / "data")))
+
+    @cached_property
+    def client_dirs(self) -> Dict[str, Dict[str, Path]]:
+        client_dirs = {}
+        for client in CLIENT_NAMES:
+            base_dir = self.data_dir / client
+            client_dirs[client] = {
+                key: base_dir if subdir is None else base_dir / subdir for key, subdir in CLIENT_SUBDIRS.items()
+            }
+        return client_dirs
+
+    @property
+    def common_lookup_dir(self) -> Path:
+        return self.data_dir / "common_lookups"
+
+    @property
+    def run_history_db(self) -> Path:
+        """Run history (per-stage timings and memory of every run)."""
+        return self.data_dir / "run_history.sqlite"
+
+    @property
+    def catalog_dir(self) -> Path:
+        """Parquet copies of the processed outputs and compiled lookups, queried by ``src.utils.sql_engine``."""
+        return self.data_dir / "catalog"
+
+    @property
+    def history_dir(self) -> Path:
+        """Processed results of every run, partitioned by partner and revenue period (``src.utils.processed_dataset``)."""
+        return self.data_dir / "history"
+
+    @property
+    def rollups_dir(self) -> Path:
+        """Revenue roll-ups per partner and period for the dashboards (``src.utils.rollups``)."""
+        return self.data_dir / "rollups"
+
+    @property
+    def warehouse_db(self) -> Path:
+        """Processed rows upserted by partner key for dashboards (``src.utils.warehouse_sink``)."""
+        return self.data_dir / "warehouse.sqlite"
+
+
+_SETTINGS: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """Return the process-wide settings, loading them on first use."""
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings.from_env()
+    return _SETTINGS
+
+
+def reset_settings() -> None:
+    """Forget the loaded settings so the next access re-reads the environment."""
+    global _SETTINGS
+    _SETTINGS = None
+
+
+# Path constants resolved lazily through the module ``__getattr__`` below.
+_LAZY_PATHS = {
+    "DATA_DIR": lambda settings: settings.data_dir,
+    "CLIENT_DIRS": lambda settings: settings.client_dirs,
+    "COMMON_LOOKUP_DIR": lambda settings: settings.common_lookup_dir,
+    "RUN_HISTORY_DB": lambda settings: settings.run_history_db,
+    "CATALOG_DIR": lambda settings: settings.catalog_dir,
+    "HISTORY_DIR": lambda settings: settings.history_dir,
+    "ROLLUPS_DIR": lambda settings: settings.rollups_dir,
+    "WAREHOUSE_DB": lambda settings: settings.warehouse_db,
+}
+# Per-client constants (backwards compatibility), e.g. HEARST_RAW_DIR.
+for _client in CLIENT_NAMES:
+    for _key, _suffix in _CLIENT_CONSTANT_SUFFIXES.items():
+        _LAZY_PATHS[f"{_client.upper()}_{_suffix}"] = (
+            lambda settings, client=_client, key=_key: settings.client_dirs[client][key]
+        )
+del _client, _key, _suffix
+
+
+def __getattr__(name: str):
+    try:
+        resolve = _LAZY_PATHS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return resolve(get_settings())
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_PATHS])
+
+
+# Hearst
 HEASRT_FILE = "Hearst Files.xlsx"
 HEASRT_FILE_SISENSE = "Hearst Files Sisense.xlsx"
 
-# Pittsburgh placeholders (ready for future use)
-PITTSBURGH_DIR = CLIENT_DIRS["pittsburgh"]["BASE"]
-PITTSBURGH_RAW_DIR = CLIENT_DIRS["pittsburgh"]["RAW"]
-PITTSBURGH_PROCESSED = CLIENT_DIRS["pittsburgh"]["PROCESSED"]
-PITTSBURGH_LOOKUP_DIR = CLIENT_DIRS["pittsburgh"]["LOOKUPS"]
+# Pittsburgh
 PITTSBURGH_FILE = "PPG Files.xlsx"
 PITTSBURGH_PROCESSED_FILE = "2025_09 PPG Client Processed.xlsx"
 PITTSBURGH_CLASS_LOOKUP_FILE = "Pittsburg Class List.xlsx"
 
-# Boston placeholders
-BOSTON_DIR = CLIENT_DIRS["boston"]["BASE"]
-BOSTON_RAW_DIR = CLIENT_DIRS["boston"]["RAW"]
-BOSTON_PROCESSED = CLIENT_DIRS["boston"]["PROCESSED"]
-BOSTON_LOOKUP_DIR = CLIENT_DIRS["boston"]["LOOKUPS"]
+# Boston
 BOSTON_FILE = "Boston Raw 6.25.csv"
 BOSTON_PROCESSED_FILE = "Boston Processed.xlsx"
 BOSTON_IMMIGRATION_LOOKUP_FILE = "Boston Immigration Lookup.xlsx"
 
-# Houston placeholders
-HOUSTON_DIR = CLIENT_DIRS["houston"]["BASE"]
-HOUSTON_RAW_DIR = CLIENT_DIRS["houston"]["RAW"]
-HOUSTON_PROCESSED = CLIENT_DIRS["houston"]["PROCESSED"]
-HOUSTON_LOOKUP_DIR = CLIENT_DIRS["houston"]["LOOKUPS"]
+# Houston
 HOUSTON_FILE = "HOU Raw 10.25.xlsx"
 HOUSTON_PROCESSED_FILE = "Houston_HCN P10 2025.xlsx"
 HOUSTON_OBITS_LOOKUP_FILE = "Houston Obits Lookup.xlsx"
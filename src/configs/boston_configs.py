@@ -11,7 +11,11 @@ from src.configs.common_configs import (
     enforce_strategic_orders,
     tag_verified_strategic_generic,
 )
-from src.utils.excel_file_operations import load_excel_file
+from src.utils.dataframe_utils import as_text
+from src.utils.excel_file_operations import load_lookup_file
+from src.utils.run_report import diagnostic
+from src.utils.schemas import FileSchema
+from src.utils.tracing import traced
 
 boston_raw_column_types: List[dict[str, object]] = [
     {"OrderURN": "str"},
@@ -147,12 +151,56 @@ boston_sisense_columns: List[str] = [
     "Strategic_Flag",
 ]
 
+# Immigration flags are reconciled per OrderURN, so incremental runs re-process whole orders.
+boston_raw_key_column = "OrderURN"
+boston_processed_key_column = "OrderURN"
+
+# Checked right after load (src.utils.schemas). The raw CSV is read with inferred types,
+# so the column types here are a contract on the file rather than reader options.
+boston_raw_schema = FileSchema.from_column_types(
+    "Boston raw", boston_raw_column_types, non_null=[boston_raw_key_column]
+)
+boston_immigration_schema = FileSchema.of_columns("Boston immigration lookup", ["Order Number", "Immigration Order"])
+# Revenue_Date is not populated yet; history is partitioned by insertion month.
+boston_period_column = "Insert_Date"
+# Natural key of the processed rows in the warehouse (several rows per order).
+boston_warehouse_key_column = "OrderURN"
+# Output columns behind each roll-up measure and dimension (src.utils.rollups); Boston has no MSP or welcome back tags.
+boston_rollup_columns = {
+    "revenue": "Row_Net_Price",
+    "strategic": "Strategic_Flag",
+    "rep": "OperatorName",
+}
+
 
 def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
-    """Boston feed currently passes through raw data."""
-    return raw_df.copy()
+    """Boston feed currently passes through raw data (stages never modify their input in place)."""
+    return raw_df
+
+
+def normalize_order_urn(value: object) -> str:
+    """Order number as compared across rows and lookups: ``"1,234.0"`` and ``"1234"`` match."""
+    if pd.isna(value):
+        return ""
+    text = str(value).strip()
+    if not text:
+        return ""
+    cleaned = text.replace(",", "")
+    try:
+        number = float(cleaned)
+    except ValueError:
+        return cleaned.casefold()
+    if number.is_integer():
+        return str(int(number))
+    return cleaned.casefold()
 
 
+def order_urn_keys(processed_df: pd.DataFrame) -> pd.Series:
+    """Normalized OrderURN of every row; the rows of one order share a key."""
+    return processed_df["OrderURN"].apply(normalize_order_urn)
+
+
+@traced(category="tagging", attributes=("lookup_file_name",))
 def update_immigration_flags(
     processed_df: pd.DataFrame,
     *,
@@ -164,56 +212,41 @@ def update_immigration_flags(
     if "OrderURN" not in processed_df.columns or "ImmigrationAD" not in processed_df.columns:
         raise KeyError("Processed DataFrame must include 'OrderURN' and 'ImmigrationAD'.")
 
-    def normalize_order_value(value: object) -> str:
-        if pd.isna(value):
-            return ""
-        text = str(value).strip()
-        if not text:
-            return ""
-        cleaned = text.replace(",", "")
-        try:
-            number = float(cleaned)
-        except ValueError:
-            return cleaned.casefold()
-        if number.is_integer():
-            return str(int(number))
-        return cleaned.casefold()
+    def normalize_immigration(series: pd.Series) -> pd.Series:
+        return as_text(series).str.strip().str.upper().replace({"": pd.NA, "NAN": pd.NA})
 
-    result_df = processed_df.copy()
-    result_df["_order_key"] = result_df["OrderURN"].apply(normalize_order_value)
-    result_df["_immigration_norm"] = (
-        result_df["ImmigrationAD"].astype(str).str.strip().str.upper().replace({"": pd.NA, "NAN": pd.NA})
-    )
+    order_keys = order_urn_keys(processed_df)
+    immigration_norm = normalize_immigration(processed_df["ImmigrationAD"])
 
-    conflict_counts = result_df.groupby("_order_key")["_immigration_norm"].apply(
-        lambda col: col.replace({"": pd.NA}).dropna().nunique()
-    )
+    # normalize_immigration already maps blanks to NA, which nunique() skips.
+    conflict_counts = immigration_norm.groupby(order_keys).nunique()
     conflicting_keys = conflict_counts[conflict_counts > 1].index.tolist()
     if not conflicting_keys:
-        print("[Boston Immigration] No conflicting ImmigrationAD values found; skipping lookup.")
-        result_df.drop(columns=["_order_key", "_immigration_norm"], inplace=True)
-        return result_df
-
-    conflict_mask = result_df["_order_key"].isin(conflicting_keys)
-    print(f"[Boston Immigration] Rows with conflicting ImmigrationAD values: {int(conflict_mask.sum())}")
-    sample_conflicts = (
-        result_df.loc[conflict_mask, "OrderURN"].drop_duplicates().head(5).tolist()
+        diagnostic("[Boston Immigration]", "No conflicting ImmigrationAD values found; skipping lookup.")
+        return processed_df
+
+    conflict_mask = order_keys.isin(conflicting_keys)
+    diagnostic(
+        "[Boston Immigration]",
+        "Rows with conflicting ImmigrationAD values",
+        lambda: int(conflict_mask.sum()),
+    )
+    diagnostic(
+        "[Boston Immigration]",
+        "Example conflicting OrderURNs",
+        lambda: processed_df.loc[conflict_mask, "OrderURN"].drop_duplicates().head(5).tolist(),
     )
-    print(f"[Boston Immigration] Example conflicting OrderURNs: {sample_conflicts}")
 
-    lookup_df = load_excel_file(
+    lookup_df = load_lookup_file(
         path=lookup_path,
         file_name=lookup_file_name,
         sheet_name=sheet_name,
+        schema=boston_immigration_schema,
     )
 
-    required_cols = {"Order Number", "Immigration Order"}
-    missing = required_cols - set(lookup_df.columns)
-    if missing:
-        raise KeyError(f"Boston immigration lookup missing columns: {', '.join(sorted(missing))}")
-
-    lookup_df = lookup_df.copy()
-    lookup_df["Order Number Normalized"] = lookup_df["Order Number"].apply(normalize_order_value)
+    lookup_df = lookup_df.assign(
+        **{"Order Number Normalized": lookup_df["Order Number"].apply(normalize_order_urn)}
+    )
 
     def to_flag(value: object) -> str:
         if pd.isna(value):
@@ -228,7 +261,7 @@ def update_immigration_flags(
             return "N"
         return "Y" if text.lower() in {"true", "1"} else "N"
 
-    lookup_df["Immigration Order"] = lookup_df["Immigration Order"].apply(to_flag)
+    lookup_df = lookup_df.assign(**{"Immigration Order": lookup_df["Immigration Order"].apply(to_flag)})
     order_map = (
         lookup_df[["Order Number Normalized", "Immigration Order"]]
         .dropna(subset=["Order Number Normalized"])
@@ -236,35 +269,30 @@ def update_immigration_flags(
         .set_index("Order Number Normalized")["Immigration Order"]
     )
 
-    result_df["_lookup_flag"] = result_df["_order_key"].map(order_map)
-    update_mask = conflict_mask & result_df["_lookup_flag"].notna()
+    lookup_flags = order_keys.map(order_map)
+    update_mask = conflict_mask & lookup_flags.notna()
+    immigration = processed_df["ImmigrationAD"]
     if update_mask.any():
-        result_df.loc[update_mask, "ImmigrationAD"] = result_df.loc[update_mask, "_lookup_flag"]
+        immigration = immigration.mask(update_mask, lookup_flags)
 
     missing_keys = set(conflicting_keys) - set(order_map.index)
     if missing_keys:
         missing_examples = (
-            result_df.loc[result_df["_order_key"].isin(list(missing_keys)), "OrderURN"].drop_duplicates().head(5).tolist()
+            processed_df.loc[order_keys.isin(list(missing_keys)), "OrderURN"].drop_duplicates().head(5).tolist()
         )
         print(
             f"[Boston Immigration] WARNING: {len(missing_keys)} conflicting OrderURNs not found in lookup. Examples: {missing_examples}"
         )
 
-    result_df.drop(columns=["_lookup_flag"], inplace=True)
-    result_df["_immigration_norm"] = (
-        result_df["ImmigrationAD"].astype(str).str.strip().str.upper().replace({"": pd.NA, "NAN": pd.NA})
-    )
-    still_conflicts = result_df.groupby("_order_key")["_immigration_norm"].apply(
-        lambda col: col.replace({"": pd.NA}).dropna().nunique()
-    ) > 1
+    immigration_norm = normalize_immigration(immigration)
+    still_conflicts = immigration_norm.groupby(order_keys).nunique() > 1
     if still_conflicts.any():
-        remaining_mask = result_df["_order_key"].isin(still_conflicts[still_conflicts].index)
+        remaining_mask = order_keys.isin(still_conflicts[still_conflicts].index)
         print(
             f"[Boston Immigration] WARNING: {int(remaining_mask.sum())} rows still have conflicting ImmigrationAD values after lookup."
         )
 
-    result_df.drop(columns=["_order_key", "_immigration_norm"], inplace=True)
-    return result_df
+    return processed_df.assign(ImmigrationAD=immigration)
 
 
 def tag_verified_strategic(
@@ -281,7 +309,7 @@ def tag_verified_strategic(
     if missing:
         raise KeyError(f"Processed DataFrame missing columns: {', '.join(sorted(missing))}")
 
-    result_df = tag_verified_strategic_generic(
+    return tag_verified_strategic_generic(
         processed_df,
         lookup_path=lookup_path,
         strategic_file_name=strategic_file_name,
@@ -295,15 +323,12 @@ def tag_verified_strategic(
         lookup_date_column="Strategic End Date",
         company_column="Company",
         output_column="Strategic_Flag",
-        strategic_date_output_column="_strategic_date",
+        strategic_date_output_column=None,
         diagnostics_prefix=f"[{partner_name} Strategic]",
         sales_person_replacement=True,
         processed_sales_column="OperatorName",
     )
 
-    result_df.drop(columns=["_strategic_date"], inplace=True)
-    return result_df
-
 
 def enforce_strategic_orders_lookup(
     processed_df: pd.DataFrame,
@@ -1,13 +1,50 @@
 from __future__ import annotations
 
+import pickle
 from pathlib import Path
-from typing import Sequence
+from typing import Callable, Iterable, Sequence
 
 import pandas as pd
 
-from src.utils.excel_file_operations import load_excel_file
+from src.utils import arrow_compute
+from src.utils.arrow_compute import arrow_backend_enabled
+from src.utils.dataframe_utils import as_text, text_column
+from src.utils.excel_file_operations import load_lookup_file
+from src.utils.memory_budget import check_memory_budget
+from src.utils.run_report import diagnostic
+from src.utils.stage_runner import apply_column_patches
+from src.utils.tracing import traced
 
 
+def normalize_lookup_key(series: pd.Series, *, strip_decimal_suffix: bool = True) -> pd.Series:
+    """
+    Normalize join keys the way the tagging helpers compare them (trimmed, casefolded).
+
+    With ``strip_decimal_suffix`` a trailing ".0" left by Excel floats is removed.
+    """
+    if arrow_backend_enabled():
+        return arrow_compute.normalize_lookup_key(series, strip_decimal_suffix=strip_decimal_suffix)
+    normalized = as_text(series).str.strip().str.casefold()
+    if strip_decimal_suffix:
+        normalized = normalized.str.replace(r"\.0+$", "", regex=True)
+    return normalized
+
+
+def _map_keys(keys: pd.Series, mapping: pd.Series) -> pd.Series:
+    """``keys.map(mapping)``, joined by Arrow kernels under the arrow backend."""
+    if arrow_backend_enabled():
+        return arrow_compute.map_keys(keys, mapping)
+    return keys.map(mapping)
+
+
+def _keys_in(keys: pd.Series, values: Iterable) -> pd.Series:
+    """``keys.isin(values)``, matched by Arrow kernels under the arrow backend."""
+    if arrow_backend_enabled():
+        return arrow_compute.keys_in(keys, values)
+    return keys.isin(values)
+
+
+@traced(category="aggregation", attributes=("group_column", "value_column"))
 def aggregate_first_sum_by_group(
     df: pd.DataFrame,
     *,
@@ -23,18 +60,26 @@ def aggregate_first_sum_by_group(
     if value_column not in df.columns:
         raise KeyError(f"Value column '{value_column}' missing from DataFrame")
 
-    agg_source = df.copy()
+    if arrow_backend_enabled():
+        aggregated = arrow_compute.aggregate_first_sum_by_group(
+            df,
+            group_column=group_column,
+            value_column=value_column,
+            count_column_name=count_column_name,
+        )
+        if aggregated is not None:
+            return aggregated
 
     agg_dict = {
         col: "first"
-        for col in agg_source.columns
+        for col in df.columns
         if col not in (value_column, group_column)
     }
     agg_dict[value_column] = "sum"
 
-    grouped = agg_source.groupby(group_column, as_index=False).agg(agg_dict)
+    grouped = df.groupby(group_column, as_index=False).agg(agg_dict)
     counts = (
-        agg_source.groupby(group_column)
+        df.groupby(group_column)
         .size()
         .reset_index(name=count_column_name)
     )
@@ -51,6 +96,143 @@ def aggregate_first_sum_by_group(
     return merged[ordered_cols]
 
 
+@traced(category="aggregation", attributes=("group_column", "value_column", "partitions"))
+def aggregate_first_sum_by_group_chunked(
+    chunks: Iterable[pd.DataFrame],
+    *,
+    group_column: str,
+    value_column: str,
+    count_column_name: str = "Count of matches",
+    spill_dir: Path | str,
+    partitions: int = 16,
+) -> pd.DataFrame:
+    """
+    :func:`aggregate_first_sum_by_group` over row chunks, spilling partial results to disk.
+
+    Each chunk is aggregated on its own; the partial groups are hash-partitioned
+    on ``group_column`` and pickled to ``spill_dir``. The partitions are then
+    combined one at a time (first of firsts, sum of sums, sum of counts), so
+    the peak is one chunk plus one partition's partials rather than the
+    whole raw frame. The result matches the in-memory helper on the
+    concatenated chunks, up to floating-point summation order.
+    """
+    spill_dir = Path(spill_dir)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    spilled = {partition: [] for partition in range(partitions)}
+    empty_chunk = pd.DataFrame(columns=[group_column, value_column])
+
+    for chunk_number, chunk in enumerate(chunks):
+        check_memory_budget(f"Aggregating {value_column} by {group_column}")
+        if chunk.empty:
+            empty_chunk = chunk
+            continue
+        partial = aggregate_first_sum_by_group(
+            chunk,
+            group_column=group_column,
+            value_column=value_column,
+            count_column_name=count_column_name,
+        )
+        buckets = pd.util.hash_pandas_object(partial[group_column], index=False) % partitions
+        for partition, part in partial.groupby(buckets.to_numpy(), sort=False):
+            spill_path = spill_dir / f"partial_{partition:03d}_{chunk_number:06d}.pkl"
+            part.to_pickle(spill_path, protocol=pickle.HIGHEST_PROTOCOL)
+            spilled[partition].append(spill_path)
+
+    combined = []
+    for partition, paths in spilled.items():
+        if not paths:
+            continue
+        partials = pd.concat([pd.read_pickle(path) for path in paths], ignore_index=True)
+        for path in paths:
+            path.unlink()
+        agg_dict = {
+            col: "first"
+            for col in partials.columns
+            if col not in (value_column, group_column, count_column_name)
+        }
+        agg_dict[value_column] = "sum"
+        agg_dict[count_column_name] = "sum"
+        combined.append(partials.groupby(group_column, as_index=False).agg(agg_dict))
+        check_memory_budget(f"Aggregating {value_column} by {group_column}")
+
+    if not combined:
+        return aggregate_first_sum_by_group(
+            empty_chunk,
+            group_column=group_column,
+            value_column=value_column,
+            count_column_name=count_column_name,
+        )
+
+    merged = (
+        pd.concat(combined, ignore_index=True)
+        .sort_values(group_column, kind="stable")
+        .reset_index(drop=True)
+    )
+    ordered_cols = [
+        c
+        for c in merged.columns
+        if c not in (group_column, value_column, count_column_name)
+    ]
+    ordered_cols += [group_column, value_column, count_column_name]
+    return merged[ordered_cols]
+
+
+@traced(category="partitioning", attributes=("partitions",))
+def process_partitioned(
+    chunks: Iterable[pd.DataFrame],
+    *,
+    process: Callable[[pd.DataFrame], pd.DataFrame],
+    partition_keys: Callable[[pd.DataFrame], pd.Series],
+    spill_dir: Path | str,
+    partitions: int = 16,
+) -> pd.DataFrame:
+    """
+    Run ``process`` over row chunks one hash partition at a time, spilling the partitions to disk.
+
+    The rows of each chunk are hash-partitioned on ``partition_keys(chunk)``
+    and pickled to ``spill_dir``; each partition is then read back and
+    processed on its own, so every row sharing a key is processed together
+    and the peak is one chunk or one partition rather than the whole raw
+    frame at every stage. ``process`` must treat rows of different keys
+    independently. The processed partitions are put back in input order, so
+    the result matches ``process`` on the concatenated chunks.
+    """
+    spill_dir = Path(spill_dir)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    spilled = {partition: [] for partition in range(partitions)}
+    empty_chunk = None
+    offset = 0
+
+    for chunk_number, chunk in enumerate(chunks):
+        check_memory_budget("Partitioning raw rows")
+        if chunk.empty:
+            empty_chunk = chunk
+            continue
+        # Chunks have a fresh RangeIndex each; number the rows across chunks to restore their order later.
+        chunk = chunk.set_axis(pd.RangeIndex(offset, offset + len(chunk)))
+        offset += len(chunk)
+        buckets = pd.util.hash_pandas_object(partition_keys(chunk), index=False) % partitions
+        for partition, part in chunk.groupby(buckets.to_numpy(), sort=False):
+            spill_path = spill_dir / f"rows_{partition:03d}_{chunk_number:06d}.pkl"
+            part.to_pickle(spill_path, protocol=pickle.HIGHEST_PROTOCOL)
+            spilled[partition].append(spill_path)
+
+    processed = []
+    for partition, paths in spilled.items():
+        if not paths:
+            continue
+        rows = pd.concat([pd.read_pickle(path) for path in paths])
+        for path in paths:
+            path.unlink()
+        processed.append(process(rows))
+        check_memory_budget("Processing partitioned rows")
+
+    if not processed:
+        return process(empty_chunk if empty_chunk is not None else pd.DataFrame())
+    return pd.concat(processed).sort_index().reset_index(drop=True)
+
+
+@traced(category="tagging", attributes=("lookup_file_name", "partner_name"))
 def tag_msp_from_rep(
     processed_df: pd.DataFrame,
     *,
@@ -66,38 +248,24 @@ def tag_msp_from_rep(
     if processed_name_column not in processed_df.columns:
         raise KeyError(f"Processed DataFrame missing column: {processed_name_column}")
 
-    rep_list = load_excel_file(
+    rep_list = load_lookup_file(
         path=lookup_path,
         file_name=lookup_file_name,
         sheet_name=lookup_sheet_name,
     )
 
     partner_lower = partner_name.casefold()
-    rep_list["_system_lower"] = rep_list["System(s)"].astype(str).str.casefold().str.strip()
-    rep_list["_agent_lower"] = rep_list["Agent Names"].astype(str).str.casefold().str.strip()
+    system_lower = as_text(rep_list["System(s)"]).str.casefold().str.strip()
+    agent_lower = as_text(rep_list["Agent Names"]).str.casefold().str.strip()
+    msp_agents = agent_lower[
+        system_lower.str.contains(partner_lower, na=False)
+        & (agent_lower != "wave2, wave2")
+    ].unique()
 
-    processed_df = processed_df.copy()
-    processed_df["_processed_name_lower"] = (
-        processed_df[processed_name_column].astype(str).str.casefold().str.strip()
-    )
+    processed_name_lower = as_text(processed_df[processed_name_column]).str.casefold().str.strip()
+    msp_flag = text_column(processed_name_lower.isin(msp_agents).map({True: "MSP", False: "Non-MSP"}))
 
-    rep_filtered = rep_list[
-        rep_list["_system_lower"].str.contains(partner_lower, na=False)
-        & (rep_list["_agent_lower"] != "wave2, wave2")
-    ].copy()
-    rep_filtered = rep_filtered.drop_duplicates(subset=["_agent_lower"], keep="first").reset_index(drop=True)
-
-    merged = processed_df.merge(
-        rep_filtered[["_agent_lower"]].rename(columns={"_agent_lower": "_join_key"}),
-        how="left",
-        left_on="_processed_name_lower",
-        right_on="_join_key",
-        indicator=True,
-    )
-
-    merged["MSP/non-MSP"] = merged["_merge"].map({"both": "MSP", "left_only": "Non-MSP"})
-    merged = merged.drop(columns=["_processed_name_lower", "_join_key", "_merge"], errors="ignore")
-    return merged
+    return processed_df.assign(**{"MSP/non-MSP": msp_flag}).reset_index(drop=True)
 
 
 """
@@ -222,7 +390,8 @@ def tag_verified_strategic_generic(
 """
 
 
-def tag_verified_strategic_generic(
+@traced(category="tagging", attributes=("strategic_file_name", "sheet_name", "partner_name"))
+def verified_strategic_patch_generic(
     processed_df: pd.DataFrame,
     *,
     lookup_path: Path | str,
@@ -234,13 +403,15 @@ def tag_verified_strategic_generic(
     lookup_date_column: str = "Strategic End Date",
     company_column: str = "Company",
     output_column: str = "Verified Strategic",
-    strategic_date_output_column: str = "_strategic_date",
+    strategic_date_output_column: str | None = "_strategic_date",
     diagnostics_prefix: str = "[Strategic]",
     sales_person_replacement: bool = False,
     processed_sales_column: str | None = None,
 ) -> pd.DataFrame:
     """
-    Generic strategic tagging helper that uses fuzzy matching for processed/lookup columns.
+    Compute the strategic columns (flag, optional strategic date, replaced salesperson) as a column patch.
+
+    Pass ``strategic_date_output_column=None`` to leave the matched date out of the patch.
     """
     if not processed_lookup_columns:
         raise ValueError("processed_lookup_columns must contain at least one mapping")
@@ -250,7 +421,7 @@ def tag_verified_strategic_generic(
     if missing_processed:
         raise KeyError(f"Processed DataFrame missing columns: {', '.join(sorted(missing_processed))}")
 
-    lookup_df = load_excel_file(
+    lookup_df = load_lookup_file(
         path=lookup_path,
         file_name=strategic_file_name,
         sheet_name=sheet_name,
@@ -261,39 +432,30 @@ def tag_verified_strategic_generic(
     if missing_lookup:
         raise KeyError(f"Lookup DataFrame missing columns: {', '.join(sorted(missing_lookup))}")
 
-    lookup_df = lookup_df.copy()
     partner_lower = partner_name.casefold()
-    lookup_df[company_column] = lookup_df[company_column].astype(str)
-    lookup_df = lookup_df[
-        lookup_df[company_column].str.casefold().str.contains(partner_lower, na=False)
-    ]
-    lookup_df[lookup_date_column] = pd.to_datetime(lookup_df[lookup_date_column], errors="coerce")
-    lookup_df = lookup_df.dropna(subset=[lookup_date_column])
+    company_names = as_text(lookup_df[company_column])
+    lookup_df = lookup_df[company_names.str.casefold().str.contains(partner_lower, na=False)]
+    lookup_df = lookup_df.assign(
+        **{lookup_date_column: pd.to_datetime(lookup_df[lookup_date_column], errors="coerce")}
+    ).dropna(subset=[lookup_date_column])
 
     if lookup_df.empty:
         raise ValueError(f"{diagnostics_prefix} Lookup does not contain usable rows for partner '{partner_name}'.")
 
-    result_df = processed_df.copy()
-
-    def _normalize(series: pd.Series) -> pd.Series:
-        return (
-            series.astype(str)
-            .str.strip()
-            .str.casefold()
-            .str.replace(r"\.0+$", "", regex=True)
-        )
-
     normalized_processed = {
-        col: _normalize(result_df[col])
+        col: normalize_lookup_key(processed_df[col])
         for col, _ in processed_lookup_columns
     }
-    for _, lookup_col in processed_lookup_columns:
-        norm_col = f"_norm_{lookup_col}"
-        lookup_df[norm_col] = _normalize(lookup_df[lookup_col])
+    lookup_df = lookup_df.assign(
+        **{
+            f"_norm_{lookup_col}": normalize_lookup_key(lookup_df[lookup_col])
+            for _, lookup_col in processed_lookup_columns
+        }
+    )
 
-    strategic_dates = pd.Series(pd.NaT, index=result_df.index, dtype="datetime64[ns]")
+    strategic_dates = pd.Series(pd.NaT, index=processed_df.index, dtype="datetime64[ns]")
 
-    print(f"{diagnostics_prefix} Lookup rows after filtering {partner_name}: {len(lookup_df)}")
+    diagnostic(diagnostics_prefix, f"Lookup rows after filtering {partner_name}", len(lookup_df))
     for processed_col, lookup_col in processed_lookup_columns:
         remaining_mask = strategic_dates.isna()
         if not remaining_mask.any():
@@ -305,30 +467,32 @@ def tag_verified_strategic_generic(
             .drop_duplicates(subset=[norm_lookup_col], keep="first")
             .set_index(norm_lookup_col)[lookup_date_column]
         )
-        mapped = normalized_processed[processed_col].loc[remaining_mask].map(lookup_map)
+        mapped = _map_keys(normalized_processed[processed_col].loc[remaining_mask], lookup_map)
         strategic_dates.loc[remaining_mask] = mapped.combine_first(strategic_dates.loc[remaining_mask])
-        print(
-            f"{diagnostics_prefix} Matches via {processed_col} → {lookup_col}: {int(mapped.notna().sum())}"
+        diagnostic(
+            diagnostics_prefix,
+            f"Matches via {processed_col} → {lookup_col}",
+            lambda mapped=mapped: int(mapped.notna().sum()),
         )
 
-    result_df[strategic_date_output_column] = strategic_dates
-
-    first_issue = pd.to_datetime(result_df[processed_date_column], errors="coerce")
+    first_issue = pd.to_datetime(processed_df[processed_date_column], errors="coerce")
     strategy_mask = first_issue.notna() & strategic_dates.notna()
     verified_mask = strategy_mask & (first_issue < strategic_dates)
 
-    result_df[output_column] = 0
-    result_df.loc[verified_mask, output_column] = 1
+    new_columns = {}
+    if strategic_date_output_column is not None:
+        new_columns[strategic_date_output_column] = strategic_dates
+    new_columns[output_column] = verified_mask.astype("int64")
 
     if sales_person_replacement:
         if processed_sales_column is None:
             raise ValueError("processed_sales_column must be provided when sales_person_replacement is True")
-        if processed_sales_column not in result_df.columns:
+        if processed_sales_column not in processed_df.columns:
             raise KeyError(f"Processed DataFrame missing column: {processed_sales_column}")
         if "Salesperson" not in lookup_df.columns:
             raise KeyError("Strategic lookup missing 'Salesperson' column")
 
-        salesperson_series = pd.Series(index=result_df.index, dtype="object")
+        salesperson_series = None
         for processed_col, lookup_col in processed_lookup_columns:
             norm_lookup_col = f"_norm_{lookup_col}"
             sales_lookup = (
@@ -337,19 +501,67 @@ def tag_verified_strategic_generic(
                 .drop_duplicates(subset=[norm_lookup_col], keep="last")
                 .set_index(norm_lookup_col)["Salesperson"]
             )
-            mapped_sales = normalized_processed[processed_col].map(sales_lookup)
-            salesperson_series = salesperson_series.combine_first(mapped_sales)
+            mapped_sales = _map_keys(normalized_processed[processed_col], sales_lookup)
+            salesperson_series = (
+                mapped_sales if salesperson_series is None else salesperson_series.combine_first(mapped_sales)
+            )
 
         sales_mask = verified_mask & salesperson_series.notna()
-        result_df.loc[sales_mask, processed_sales_column] = salesperson_series.loc[sales_mask]
+        new_columns[processed_sales_column] = processed_df[processed_sales_column].mask(
+            sales_mask, salesperson_series
+        )
 
-    print(f"{diagnostics_prefix} Rows with usable dates: {int(strategy_mask.sum())}")
-    print(f"{diagnostics_prefix} Rows flagged as {output_column}: {int(verified_mask.sum())}")
+    diagnostic(diagnostics_prefix, "Rows with usable dates", lambda: int(strategy_mask.sum()))
+    diagnostic(diagnostics_prefix, f"Rows flagged as {output_column}", lambda: int(verified_mask.sum()))
 
-    return result_df
+    return pd.DataFrame(new_columns, index=processed_df.index)
 
 
-def tag_welcome_back_generic(
+def tag_verified_strategic_generic(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path: Path | str,
+    strategic_file_name: str,
+    sheet_name: str,
+    partner_name: str,
+    processed_lookup_columns: Sequence[tuple[str, str]],
+    processed_date_column: str = "First Issue Date",
+    lookup_date_column: str = "Strategic End Date",
+    company_column: str = "Company",
+    output_column: str = "Verified Strategic",
+    strategic_date_output_column: str | None = "_strategic_date",
+    diagnostics_prefix: str = "[Strategic]",
+    sales_person_replacement: bool = False,
+    processed_sales_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Generic strategic tagging helper; applies :func:`verified_strategic_patch_generic` to ``processed_df``.
+    """
+    return apply_column_patches(
+        processed_df,
+        [
+            verified_strategic_patch_generic(
+                processed_df,
+                lookup_path=lookup_path,
+                strategic_file_name=strategic_file_name,
+                sheet_name=sheet_name,
+                partner_name=partner_name,
+                processed_lookup_columns=processed_lookup_columns,
+                processed_date_column=processed_date_column,
+                lookup_date_column=lookup_date_column,
+                company_column=company_column,
+                output_column=output_column,
+                strategic_date_output_column=strategic_date_output_column,
+                diagnostics_prefix=diagnostics_prefix,
+                sales_person_replacement=sales_person_replacement,
+                processed_sales_column=processed_sales_column,
+            )
+        ],
+    )
+
+
+@traced(category="tagging", attributes=("welcome_back_file", "sheet_name", "partner_name"))
+def welcome_back_patch_generic(
     processed_df: pd.DataFrame,
     *,
     lookup_path: Path | str,
@@ -365,14 +577,14 @@ def tag_welcome_back_generic(
     diagnostics_prefix: str = "[WelcomeBack]",
 ) -> pd.DataFrame:
     """
-    Generic helper to mark Welcome Back rows by matching order numbers and comparing dates.
+    Compute the Welcome Back flag column by matching order numbers and comparing dates.
     """
     required_processed = {processed_order_column, processed_date_column}
     missing_processed = required_processed - set(processed_df.columns)
     if missing_processed:
         raise KeyError(f"Processed DataFrame missing columns: {', '.join(sorted(missing_processed))}")
 
-    lookup_df = load_excel_file(
+    lookup_df = load_lookup_file(
         path=lookup_path,
         file_name=welcome_back_file,
         sheet_name=sheet_name,
@@ -384,14 +596,14 @@ def tag_welcome_back_generic(
         raise KeyError(f"Welcome Back lookup missing columns: {', '.join(sorted(missing_lookup))}")
 
     partner_lower = partner_name.casefold()
-    lookup_df = lookup_df.copy()
-    lookup_df[lookup_company_column] = lookup_df[lookup_company_column].astype(str)
-    lookup_df = lookup_df[
-        lookup_df[lookup_company_column].str.casefold().str.contains(partner_lower, na=False)
-    ]
-    lookup_df[lookup_order_column] = lookup_df[lookup_order_column].astype(str).str.strip().str.casefold()
-    lookup_df[lookup_date_column] = pd.to_datetime(lookup_df[lookup_date_column], errors="coerce")
-    lookup_df = lookup_df.dropna(subset=[lookup_date_column])
+    company_names = as_text(lookup_df[lookup_company_column])
+    lookup_df = lookup_df[company_names.str.casefold().str.contains(partner_lower, na=False)]
+    lookup_df = lookup_df.assign(
+        **{
+            lookup_order_column: normalize_lookup_key(lookup_df[lookup_order_column], strip_decimal_suffix=False),
+            lookup_date_column: pd.to_datetime(lookup_df[lookup_date_column], errors="coerce"),
+        }
+    ).dropna(subset=[lookup_date_column])
 
     if lookup_df.empty:
         raise ValueError(f"{diagnostics_prefix} Lookup does not contain usable rows for partner '{partner_name}'.")
@@ -402,30 +614,62 @@ def tag_welcome_back_generic(
         .set_index(lookup_order_column)[lookup_date_column]
     )
 
-    result_df = processed_df.copy()
-    result_df["_order_key"] = (
-        result_df[processed_order_column].astype(str).str.strip().str.casefold()
-    )
+    order_keys = normalize_lookup_key(processed_df[processed_order_column], strip_decimal_suffix=False)
 
-    mapped_dates = result_df["_order_key"].map(wb_map)
-    first_issue = pd.to_datetime(result_df[processed_date_column], errors="coerce")
+    mapped_dates = _map_keys(order_keys, wb_map)
+    first_issue = pd.to_datetime(processed_df[processed_date_column], errors="coerce")
     valid_mask = first_issue.notna() & mapped_dates.notna()
     welcome_mask = valid_mask & (first_issue < mapped_dates)
 
-    print(f"{diagnostics_prefix} Lookup rows after filtering {partner_name}: {len(lookup_df)}")
-    print(f"{diagnostics_prefix} Matches via {processed_order_column}: {int(mapped_dates.notna().sum())}")
-    print(f"{diagnostics_prefix} Rows with usable dates: {int(valid_mask.sum())}")
-    print(f"{diagnostics_prefix} Rows flagged as {output_column}: {int(welcome_mask.sum())}")
+    diagnostic(diagnostics_prefix, f"Lookup rows after filtering {partner_name}", len(lookup_df))
+    diagnostic(diagnostics_prefix, f"Matches via {processed_order_column}", lambda: int(mapped_dates.notna().sum()))
+    diagnostic(diagnostics_prefix, "Rows with usable dates", lambda: int(valid_mask.sum()))
+    diagnostic(diagnostics_prefix, f"Rows flagged as {output_column}", lambda: int(welcome_mask.sum()))
 
-    result_df[output_column] = 0
-    result_df.loc[welcome_mask, output_column] = 1
+    return pd.DataFrame({output_column: welcome_mask.astype("int64")}, index=processed_df.index)
 
-    result_df.drop(columns=["_order_key"], inplace=True)
 
-    return result_df
+def tag_welcome_back_generic(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path: Path | str,
+    welcome_back_file: str,
+    sheet_name: str,
+    partner_name: str,
+    processed_order_column: str,
+    processed_date_column: str,
+    lookup_order_column: str = "Order Number",
+    lookup_company_column: str = "Company",
+    lookup_date_column: str = "Welcome Back End Date",
+    output_column: str = "Welcome Back",
+    diagnostics_prefix: str = "[WelcomeBack]",
+) -> pd.DataFrame:
+    """
+    Generic helper to mark Welcome Back rows; applies :func:`welcome_back_patch_generic` to ``processed_df``.
+    """
+    return apply_column_patches(
+        processed_df,
+        [
+            welcome_back_patch_generic(
+                processed_df,
+                lookup_path=lookup_path,
+                welcome_back_file=welcome_back_file,
+                sheet_name=sheet_name,
+                partner_name=partner_name,
+                processed_order_column=processed_order_column,
+                processed_date_column=processed_date_column,
+                lookup_order_column=lookup_order_column,
+                lookup_company_column=lookup_company_column,
+                lookup_date_column=lookup_date_column,
+                output_column=output_column,
+                diagnostics_prefix=diagnostics_prefix,
+            )
+        ],
+    )
 
 
-def enforce_strategic_orders(
+@traced(category="tagging", attributes=("lookup_file_name", "partner_name"))
+def strategic_orders_patch_generic(
     processed_df: pd.DataFrame,
     *,
     lookup_path: Path | str,
@@ -437,13 +681,13 @@ def enforce_strategic_orders(
     sales_person_replacement: bool = False,
     processed_sales_column: str | None = None,
 ) -> pd.DataFrame:
-    """Ensure orders listed in the strategic orders lookup are flagged as strategic."""
+    """Compute the strategic flag (and salesperson) updates for orders in the strategic orders lookup."""
     if processed_order_column not in processed_df.columns:
         raise KeyError(f"Processed DataFrame missing column: {processed_order_column}")
     if processed_verified_column not in processed_df.columns:
         raise KeyError(f"Processed DataFrame missing column: {processed_verified_column}")
 
-    lookup_df = load_excel_file(
+    lookup_df = load_lookup_file(
         path=lookup_path,
         file_name=lookup_file_name,
     )
@@ -455,38 +699,31 @@ def enforce_strategic_orders(
 
     partner_lower = partner_name.casefold()
     lookup_subset = lookup_df[
-        lookup_df["Company"].astype(str).str.casefold().str.contains(partner_lower, na=False)
+        as_text(lookup_df["Company"]).str.casefold().str.contains(partner_lower, na=False)
     ]
 
-    lookup_orders = (
-        lookup_subset[lookup_order_column]
-        .dropna()
-        .astype(str)
-        .str.strip()
-        .str.casefold()
+    lookup_orders = normalize_lookup_key(
+        lookup_subset[lookup_order_column].dropna(),
+        strip_decimal_suffix=False,
     )
     strategic_order_set = set(lookup_orders)
 
-    result_df = processed_df.copy()
-    processed_order_keys = (
-        result_df[processed_order_column]
-        .astype(str)
-        .str.strip()
-        .str.casefold()
-    )
+    processed_order_keys = normalize_lookup_key(processed_df[processed_order_column], strip_decimal_suffix=False)
 
-    match_mask = processed_order_keys.isin(strategic_order_set)
+    match_mask = _keys_in(processed_order_keys, strategic_order_set)
     if not match_mask.any():
-        return result_df
+        return pd.DataFrame(index=processed_df.index)
 
-    verified_series = result_df[processed_verified_column].fillna(0)
+    verified_series = processed_df[processed_verified_column].fillna(0)
     update_mask = match_mask & verified_series.ne(1)
-    result_df.loc[update_mask, processed_verified_column] = 1
+    new_columns = {
+        processed_verified_column: processed_df[processed_verified_column].mask(update_mask, 1),
+    }
 
     if sales_person_replacement:
         if processed_sales_column is None:
             raise ValueError("processed_sales_column must be provided when sales_person_replacement is True")
-        if processed_sales_column not in result_df.columns:
+        if processed_sales_column not in processed_df.columns:
             raise KeyError(f"Processed DataFrame missing column: {processed_sales_column}")
         if "Salesperson" not in lookup_subset.columns:
             raise KeyError("Strategic orders lookup missing 'Salesperson' column")
@@ -494,19 +731,57 @@ def enforce_strategic_orders(
         sales_map = (
             lookup_subset[[lookup_order_column, "Salesperson"]]
             .dropna(subset=[lookup_order_column])
-            .assign(**{lookup_order_column: lambda df: df[lookup_order_column].astype(str).str.strip().str.casefold()})
+            .assign(
+                **{
+                    lookup_order_column: lambda df: normalize_lookup_key(
+                        df[lookup_order_column], strip_decimal_suffix=False
+                    )
+                }
+            )
             .drop_duplicates(subset=[lookup_order_column], keep="last")
             .set_index(lookup_order_column)["Salesperson"]
         )
 
-        mapped_sales = processed_order_keys.map(sales_map)
+        mapped_sales = _map_keys(processed_order_keys, sales_map)
         sales_mask = update_mask & mapped_sales.notna()
-        result_df.loc[sales_mask, processed_sales_column] = mapped_sales.loc[sales_mask]
+        new_columns[processed_sales_column] = processed_df[processed_sales_column].mask(sales_mask, mapped_sales)
 
-    return result_df
+    return pd.DataFrame(new_columns, index=processed_df.index)
 
 
-def assign_revenue_date_generic(
+def enforce_strategic_orders(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path: Path | str,
+    lookup_file_name: str,
+    partner_name: str,
+    processed_order_column: str,
+    processed_verified_column: str = "Verified Strategic",
+    lookup_order_column: str = "Order Number",
+    sales_person_replacement: bool = False,
+    processed_sales_column: str | None = None,
+) -> pd.DataFrame:
+    """Ensure orders listed in the strategic orders lookup are flagged as strategic."""
+    return apply_column_patches(
+        processed_df,
+        [
+            strategic_orders_patch_generic(
+                processed_df,
+                lookup_path=lookup_path,
+                lookup_file_name=lookup_file_name,
+                partner_name=partner_name,
+                processed_order_column=processed_order_column,
+                processed_verified_column=processed_verified_column,
+                lookup_order_column=lookup_order_column,
+                sales_person_replacement=sales_person_replacement,
+                processed_sales_column=processed_sales_column,
+            )
+        ],
+    )
+
+
+@traced(category="tagging", attributes=("calendar_file", "partner_name"))
+def revenue_date_patch_generic(
     processed_df: pd.DataFrame,
     *,
     calendar_year_or_not: bool,
@@ -519,34 +794,28 @@ def assign_revenue_date_generic(
     output_column: str = "Revenue Date",
 ) -> pd.DataFrame:
     """
-    Assign Revenue Date either from the first day of the current month or via a partner-specific calendar lookup.
+    Compute the Revenue Date column from the first day of the current month or a partner-specific calendar lookup.
     """
-    
-
-    result_df = processed_df.copy()
-
     def _format_date(ts: pd.Timestamp) -> str:
         return f"{ts.month}/{ts.day}/{str(ts.year)[-2:]}"
 
     if calendar_year_or_not:
         current = pd.Timestamp.today().normalize().replace(day=1)
-        formatted = _format_date(current)
-        result_df[output_column] = formatted
-        return result_df
+        formatted = pd.Series(_format_date(current), index=processed_df.index)
+        return pd.DataFrame({output_column: text_column(formatted)})
     
     if period_column not in processed_df.columns:
         raise KeyError(f"Processed DataFrame missing required column: {period_column}")
     if lookup_path is None or calendar_file is None:
         raise ValueError("lookup_path and calendar_file must be provided when calendar_year_or_not is False.")
 
-    calendar_df = load_excel_file(
+    calendar_df = load_lookup_file(
         path=lookup_path,
         file_name=calendar_file,
         sheet_name=sheet_name,
     )
 
-    calendar_df = calendar_df.copy()
-    calendar_df.columns = [str(col).strip() for col in calendar_df.columns]
+    calendar_df = calendar_df.rename(columns=lambda col: str(col).strip())
 
     period_col = None
     for candidate in calendar_period_candidates:
@@ -567,18 +836,11 @@ def assign_revenue_date_generic(
 
     partner_column = partner_columns[0]
 
-    def _normalize(series: pd.Series) -> pd.Series:
-        return (
-            series.astype(str)
-            .str.strip()
-            .str.casefold()
-            .str.replace(r"\.0+$", "", regex=True)
-        )
-
-    calendar_df["_period_key"] = _normalize(calendar_df[period_col])
+    calendar_df = calendar_df.assign(_period_key=normalize_lookup_key(calendar_df[period_col]))
     calendar_df = calendar_df[calendar_df["_period_key"].ne("")]
-    calendar_df[partner_column] = pd.to_datetime(calendar_df[partner_column], errors="coerce")
-    calendar_df = calendar_df.dropna(subset=[partner_column])
+    calendar_df = calendar_df.assign(
+        **{partner_column: pd.to_datetime(calendar_df[partner_column], errors="coerce")}
+    ).dropna(subset=[partner_column])
 
     if calendar_df.empty:
         raise ValueError("Calendar lookup does not contain usable dates.")
@@ -588,7 +850,7 @@ def assign_revenue_date_generic(
         .set_index("_period_key")[partner_column]
     )
 
-    processed_period_key = _normalize(result_df[period_column])
+    processed_period_key = normalize_lookup_key(processed_df[period_column])
     mapped_dates = processed_period_key.map(period_map)
 
     current_year = pd.Timestamp.today().year
@@ -600,10 +862,40 @@ def assign_revenue_date_generic(
         lambda dt: _format_date(dt) if pd.notna(dt) else pd.NA
     )
 
-    matched_count = adjusted_dates.notna().sum()
-    print(f"[RevenueDate] Calendar rows: {len(calendar_df)}")
-    print(f"[RevenueDate] Periods matched: {matched_count} / {len(result_df)}")
+    diagnostic("[RevenueDate]", "Calendar rows", len(calendar_df))
+    diagnostic("[RevenueDate]", "Periods matched", lambda: f"{adjusted_dates.notna().sum()} / {len(processed_df)}")
 
-    result_df[output_column] = formatted_dates
+    return pd.DataFrame({output_column: text_column(formatted_dates)}, index=processed_df.index)
 
-    return result_df
+
+def assign_revenue_date_generic(
+    processed_df: pd.DataFrame,
+    *,
+    calendar_year_or_not: bool,
+    partner_name: str,
+    period_column: str,
+    lookup_path: Path | str | None = None,
+    calendar_file: str | None = None,
+    sheet_name: str | None = None,
+    calendar_period_candidates: Sequence[str] = ("Period #", "Period", "Period#", "Period Num"),
+    output_column: str = "Revenue Date",
+) -> pd.DataFrame:
+    """
+    Assign Revenue Date; applies :func:`revenue_date_patch_generic` to ``processed_df``.
+    """
+    return apply_column_patches(
+        processed_df,
+        [
+            revenue_date_patch_generic(
+                processed_df,
+                calendar_year_or_not=calendar_year_or_not,
+                partner_name=partner_name,
+                period_column=period_column,
+                lookup_path=lookup_path,
+                calendar_file=calendar_file,
+                sheet_name=sheet_name,
+                calendar_period_candidates=calendar_period_candidates,
+                output_column=output_column,
+            )
+        ],
+    )
@@ -1,18 +1,24 @@
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 
 import pandas as pd
 
-from src.config import HEARST_RAW_DIR, HEASRT_FILE
+from src.config import HEASRT_FILE, get_settings
 from src.configs.common_configs import (
     aggregate_first_sum_by_group,
-    assign_revenue_date_generic,
+    aggregate_first_sum_by_group_chunked,
     enforce_strategic_orders,
+    revenue_date_patch_generic,
     tag_msp_from_rep,
-    tag_verified_strategic_generic,
-    tag_welcome_back_generic,
+    verified_strategic_patch_generic,
+    welcome_back_patch_generic,
 )
-from src.utils.excel_file_operations import load_excel_file
+from src.utils.dataframe_utils import as_text
+from src.utils.excel_file_operations import load_lookup_file
+from src.utils.run_report import diagnostic
+from src.utils.schemas import FileSchema
+from src.utils.stage_runner import apply_column_patches
+from src.utils.tracing import traced
 
 
 sisense_columns = [
@@ -63,6 +69,30 @@ raw_column_types = [
     {"Revenue": float},
 ]
 
+# Incremental runs re-process every raw row sharing a key with a changed row.
+# calculate_revenue swaps the columns, so the raw Job Number ends up in "Job Number +".
+raw_key_column = "Job Number"
+processed_key_column = "Job Number +"
+
+# Checked right after load (src.utils.schemas). A blank Job Number is allowed: the key is turned into
+# text before the aggregation, so those rows come out with the key "<NA>" rather than being dropped.
+raw_schema = FileSchema.from_column_types("Hearst raw", raw_column_types)
+market_list_schema = FileSchema.of_columns("Hearst Pub Market List", ["Pub", "Market"])
+not_assigned_schema = FileSchema.of_columns("Not Assigned Reference List", ["Job #", "MSP Agent"])
+
+# Processed history is partitioned by the month of this column (see src.utils.processed_dataset).
+period_column = "Revenue Date"
+# Natural key of the processed rows in the warehouse (src.utils.warehouse_sink).
+warehouse_key_column = "Job Number"
+# Output columns behind each roll-up measure and dimension (src.utils.rollups).
+rollup_columns = {
+    "revenue": "Sum of 'Revenue'",
+    "msp": "MSP/non-MSP",
+    "strategic": "Verified Strategic",
+    "welcome_back": "Welcome Back",
+    "rep": "Full Name LF",
+}
+
 
 # def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
 #     """
@@ -114,20 +144,19 @@ raw_column_types = [
 #     return result_df
 
 
-def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
+def prepare_revenue_rows(raw_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Enrich raw Hearst data with market information and aggregate revenue by Job Number +.
+    Row-wise part of :func:`calculate_revenue`: add Market, Job Number + and Sum of 'Revenue'.
     """
-    market_list = load_excel_file(
-        path=HEARST_RAW_DIR,
+    market_list = load_lookup_file(
+        path=get_settings().hearst_raw_dir,
         file_name=HEASRT_FILE,
         sheet_name="Hearst Pub Market List",
+        schema=market_list_schema,
     )
 
-    merged_df = raw_df.copy()
-    market_list = market_list.copy()
-    merged_df["Pub_key"] = merged_df["Pub"].astype(str).str.strip().str.lower()
-    market_list["Pub_key"] = market_list["Pub"].astype(str).str.strip().str.lower()
+    merged_df = raw_df.assign(Pub_key=as_text(raw_df["Pub"]).str.strip().str.lower())
+    market_list = market_list.assign(Pub_key=as_text(market_list["Pub"]).str.strip().str.lower())
 
     merged_df = merged_df.merge(
         market_list[["Pub_key", "Market"]],
@@ -135,32 +164,60 @@ def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
         how="inner",
     )
 
-    merged_df["Job Number"] = merged_df["Job Number"].astype(str).str.strip()
-    merged_df["Market"] = merged_df["Market"].astype(str).str.strip()
+    merged_df["Job Number"] = as_text(merged_df["Job Number"]).str.strip()
+    merged_df["Market"] = as_text(merged_df["Market"]).str.strip()
 
-    merged_df["Job Number +"] = merged_df.apply(
-        lambda r: f"{r['Market']}{r['Job Number']}"
-        if r["Market"] not in ["", "nan", "None"]
-        else r["Job Number"],
-        axis=1,
+    has_market = ~merged_df["Market"].isin(["", "nan", "None"])
+    merged_df["Job Number +"] = (merged_df["Market"] + merged_df["Job Number"]).where(
+        has_market, merged_df["Job Number"]
     )
 
     merged_df["Sum of 'Revenue'"] = pd.to_numeric(merged_df["Revenue"], errors="coerce").fillna(0)
+    return merged_df
+
+
+def finalize_revenue(aggregated: pd.DataFrame) -> pd.DataFrame:
+    """
+    Swap the Job Number columns back and drop zero-revenue groups after aggregation.
+    """
+    aggregated = aggregated.assign(
+        **{
+            "Job Number +": aggregated["Job Number"],
+            "Job Number": aggregated["Job Number +"],
+        }
+    )
+
+    aggregated = aggregated[aggregated["Sum of 'Revenue'"] != 0.0]
+    return aggregated
+
 
+@traced("hearst.calculate_revenue", category="aggregation")
+def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Enrich raw Hearst data with market information and aggregate revenue by Job Number +.
+    """
     aggregated = aggregate_first_sum_by_group(
-        merged_df,
+        prepare_revenue_rows(raw_df),
         group_column="Job Number +",
         value_column="Sum of 'Revenue'",
         count_column_name="Count of matches",
     )
+    return finalize_revenue(aggregated)
 
-    aggregated["Job Number +"], aggregated["Job Number"] = (
-        aggregated["Job Number"].copy(),
-        aggregated["Job Number +"].copy(),
-    )
 
-    aggregated = aggregated[aggregated["Sum of 'Revenue'"] != 0.0]
-    return aggregated
+@traced("hearst.calculate_revenue_chunked", category="aggregation")
+def calculate_revenue_chunked(raw_chunks: Iterable[pd.DataFrame], *, spill_dir: Union[str, Path]) -> pd.DataFrame:
+    """
+    :func:`calculate_revenue` over raw row chunks, spilling partial aggregates to ``spill_dir``.
+    """
+    aggregated = aggregate_first_sum_by_group_chunked(
+        (prepare_revenue_rows(chunk) for chunk in raw_chunks),
+        group_column="Job Number +",
+        value_column="Sum of 'Revenue'",
+        count_column_name="Count of matches",
+        spill_dir=spill_dir,
+    )
+    return finalize_revenue(aggregated)
 
 
 # def tag_msp_from_rep(processed_df: pd.DataFrame) -> pd.DataFrame:
@@ -168,6 +225,7 @@ def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
 
 
 
+@traced(category="tagging", attributes=("lookup_file_name",))
 def enrich_with_msp_reference(
     processed_df: pd.DataFrame,
     *,
@@ -178,50 +236,41 @@ def enrich_with_msp_reference(
     """
     Resolve \"Assigned, Not\" or \"Wave2, Wave2\" rows using the Not Assigned lookup and apply Wave2 clean-up.
     """
-    result_df = processed_df.copy()
-
     job_number_candidates = ["Job Number +", "Job Number", "Job Number "]
-    job_number_col = next((col for col in job_number_candidates if col in result_df.columns), None)
+    job_number_col = next((col for col in job_number_candidates if col in processed_df.columns), None)
     if not job_number_col:
         raise KeyError("Processed DataFrame missing a 'Job Number' column for MSP enrichment.")
 
-    if "Full Name LF" not in result_df.columns:
+    if "Full Name LF" not in processed_df.columns:
         raise KeyError("Processed DataFrame missing required column: Full Name LF")
 
-    lookup_df = load_excel_file(
+    lookup_df = load_lookup_file(
         path=lookup_path,
         file_name=lookup_file_name,
         sheet_name=lookup_sheet_name,
+        schema=not_assigned_schema,
     )
 
-    required_lookup_cols = {"Job #", "MSP Agent"}
-    missing_lookup = required_lookup_cols - set(lookup_df.columns)
-    if missing_lookup:
-        missing = ", ".join(sorted(missing_lookup))
-        raise KeyError(f"Lookup DataFrame missing expected columns: {missing}")
-
-    lookup_df = lookup_df.copy()
-    lookup_df["Job #"] = lookup_df["Job #"].astype(str).str.strip()
-    lookup_df["MSP Agent"] = lookup_df["MSP Agent"].astype(str).str.strip()
+    lookup_df = lookup_df.assign(
+        **{
+            "Job #": as_text(lookup_df["Job #"]).str.strip(),
+            "MSP Agent": as_text(lookup_df["MSP Agent"]).str.strip(),
+        }
+    )
 
     enrich_targets = {"assigned, not", "wave2, wave2"}
     assigned_mask = (
-        result_df["Full Name LF"]
-        .astype(str)
+        as_text(processed_df["Full Name LF"])
         .str.strip()
         .str.casefold()
         .isin(enrich_targets)
     )
 
     if not assigned_mask.any():
-        print("[MSP Enrich] No 'Assigned, Not' or 'Wave2, Wave2' records found; skipping updates.")
-        return result_df
+        diagnostic("[MSP Enrich]", "No 'Assigned, Not' or 'Wave2, Wave2' records found; skipping updates.")
+        return processed_df
 
-    job_series = (
-        result_df.loc[assigned_mask, job_number_col]
-        .astype(str)
-        .str.strip()
-    )
+    job_series = as_text(processed_df.loc[assigned_mask, job_number_col]).str.strip()
 
     job_map = (
         lookup_df[["Job #", "MSP Agent"]]
@@ -233,19 +282,24 @@ def enrich_with_msp_reference(
     mapped_agents = job_series.map(job_map)
     match_mask = mapped_agents.notna()
 
-    print(f"[MSP Enrich] Target rows: {int(assigned_mask.sum())}")
-    print(f"[MSP Enrich] Matches found: {int(match_mask.sum())}")
+    diagnostic("[MSP Enrich]", "Target rows", lambda: int(assigned_mask.sum()))
+    diagnostic("[MSP Enrich]", "Matches found", lambda: int(match_mask.sum()))
+
+    # Only the two touched columns are copied; everything else is shared with processed_df.
+    updated = {"Full Name LF": processed_df["Full Name LF"].copy()}
+    if "MSP/non-MSP" in processed_df.columns:
+        updated["MSP/non-MSP"] = processed_df["MSP/non-MSP"].copy()
 
     matched_indices = job_series.index[match_mask]
-    result_df.loc[matched_indices, "Full Name LF"] = mapped_agents.loc[match_mask]
-    if "MSP/non-MSP" in result_df.columns:
-        result_df.loc[matched_indices, "MSP/non-MSP"] = "MSP"
+    updated["Full Name LF"].loc[matched_indices] = mapped_agents.loc[match_mask]
+    if "MSP/non-MSP" in updated:
+        updated["MSP/non-MSP"].loc[matched_indices] = "MSP"
 
     unmatched_indices = job_series.index[~match_mask]
     if len(unmatched_indices):
-        result_df.loc[unmatched_indices, "Full Name LF"] = "Wave2, Wave2"
-        if "MSP/non-MSP" in result_df.columns:
-            result_df.loc[unmatched_indices, "MSP/non-MSP"] = "Non-MSP"
+        updated["Full Name LF"].loc[unmatched_indices] = "Wave2, Wave2"
+        if "MSP/non-MSP" in updated:
+            updated["MSP/non-MSP"].loc[unmatched_indices] = "Non-MSP"
 
     special_wave2_names = {
         "Palmiero, Kristi",
@@ -254,16 +308,16 @@ def enrich_with_msp_reference(
         "zzzHenderson, Pam",
         "zzzTrapasso, Rose",
     }
-    if "Section" in result_df.columns:
-        section_mask = result_df["Section"].astype(str).str.strip().eq("Wave2 Death Notices")
-        name_mask = result_df["Full Name LF"].astype(str).str.strip().isin(special_wave2_names)
+    if "Section" in processed_df.columns:
+        section_mask = as_text(processed_df["Section"]).str.strip().eq("Wave2 Death Notices")
+        name_mask = as_text(updated["Full Name LF"]).str.strip().isin(special_wave2_names)
         wave2_override = section_mask & name_mask
         if wave2_override.any():
-            result_df.loc[wave2_override, "Full Name LF"] = "Wave2, Wave2"
-            if "MSP/non-MSP" in result_df.columns:
-                result_df.loc[wave2_override, "MSP/non-MSP"] = "Non-MSP"
+            updated["Full Name LF"].loc[wave2_override] = "Wave2, Wave2"
+            if "MSP/non-MSP" in updated:
+                updated["MSP/non-MSP"].loc[wave2_override] = "Non-MSP"
 
-    return result_df
+    return processed_df.assign(**updated)
 
 def tag_verified_strategic(
     processed_df: pd.DataFrame,
@@ -287,7 +341,7 @@ def tag_verified_strategic(
         missing_cols = ", ".join(sorted(missing))
         raise KeyError(f"Processed DataFrame missing expected columns: {missing_cols}")
 
-    result_df = tag_verified_strategic_generic(
+    patch = verified_strategic_patch_generic(
         processed_df,
         lookup_path=lookup_path,
         strategic_file_name=strategic_file_name,
@@ -301,18 +355,15 @@ def tag_verified_strategic(
         lookup_date_column="Strategic End Date",
         company_column="Company",
         output_column="Verified Strategic",
-        strategic_date_output_column="_strategic_date",
+        strategic_date_output_column=None,
         diagnostics_prefix=f"[{partner_name} Strategic]",
     )
 
-    legal_mask = result_df["Ad Type"].astype(str).str.contains("legal", case=False, na=False)
+    legal_mask = as_text(processed_df["Ad Type"]).str.contains("legal", case=False, na=False)
     if legal_mask.any():
-        result_df.loc[legal_mask, "Verified Strategic"] = 0
-        result_df.loc[legal_mask, "_strategic_date"] = pd.NaT
+        patch["Verified Strategic"] = patch["Verified Strategic"].mask(legal_mask, 0)
 
-    result_df.drop(columns=["_strategic_date"], inplace=True)
-
-    return result_df
+    return apply_column_patches(processed_df, [patch])
 
 
 def enforce_strategic_orders_lookup(
@@ -334,7 +385,7 @@ def enforce_strategic_orders_lookup(
     )
 
 
-def tag_welcome_back(
+def welcome_back_patch(
     processed_df: pd.DataFrame,
     *,
     lookup_path: Union[str, Path],
@@ -343,9 +394,9 @@ def tag_welcome_back(
     partner_name: str,
 ) -> pd.DataFrame:
     """
-    Apply the generic welcome back tagging with Hearst-specific columns.
+    Compute the Welcome Back column patch with Hearst-specific columns.
     """
-    return tag_welcome_back_generic(
+    return welcome_back_patch_generic(
         processed_df,
         lookup_path=lookup_path,
         welcome_back_file=welcome_back_file,
@@ -361,7 +412,32 @@ def tag_welcome_back(
     )
 
 
-def assign_revenue_date(
+def tag_welcome_back(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path: Union[str, Path],
+    welcome_back_file: str,
+    sheet_name: str,
+    partner_name: str,
+) -> pd.DataFrame:
+    """
+    Apply the generic welcome back tagging with Hearst-specific columns.
+    """
+    return apply_column_patches(
+        processed_df,
+        [
+            welcome_back_patch(
+                processed_df,
+                lookup_path=lookup_path,
+                welcome_back_file=welcome_back_file,
+                sheet_name=sheet_name,
+                partner_name=partner_name,
+            )
+        ],
+    )
+
+
+def revenue_date_patch(
     processed_df: pd.DataFrame,
     *,
     lookup_path: Union[str, Path],
@@ -371,9 +447,9 @@ def assign_revenue_date(
     sheet_name: Optional[str] = None,
 ) -> pd.DataFrame:
     """
-    Populate Revenue Date using the shared helper.
+    Compute the Revenue Date column patch using the shared helper.
     """
-    return assign_revenue_date_generic(
+    return revenue_date_patch_generic(
         processed_df,
         calendar_year_or_not=calendar_year_or_not,
         partner_name=partner_name,
@@ -384,3 +460,30 @@ def assign_revenue_date(
         calendar_period_candidates=("Period #", "Period", "Period#", "Period Num"),
         output_column="Revenue Date",
     )
+
+
+def assign_revenue_date(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path: Union[str, Path],
+    calendar_file: str,
+    partner_name: str,
+    calendar_year_or_not: bool,
+    sheet_name: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Populate Revenue Date using the shared helper.
+    """
+    return apply_column_patches(
+        processed_df,
+        [
+            revenue_date_patch(
+                processed_df,
+                lookup_path=lookup_path,
+                calendar_file=calendar_file,
+                partner_name=partner_name,
+                calendar_year_or_not=calendar_year_or_not,
+                sheet_name=sheet_name,
+            )
+        ],
+    )
@@ -6,6 +6,8 @@ from typing import List
 
 import pandas as pd
 
+from src.utils.schemas import FileSchema
+
 houston_raw_column_types: List[dict[str, object]] = [
     {"Parent Acct": "str"},
     {"Parent Acct #": "float"},
@@ -63,7 +65,20 @@ houston_sisense_columns: List[str] = [
     "Strategic Flag",
 ]
 
+houston_raw_key_column = "Order #"
+houston_processed_key_column = "Order #"
+
+# Checked right after load (src.utils.schemas). Houston rows are not aggregated, so a row
+# without an Order # is processed like any other.
+houston_raw_schema = FileSchema.from_column_types("Houston raw", houston_raw_column_types)
+# The processed output has no revenue date; history is partitioned by invoice month.
+houston_period_column = "Invoice Date"
+# Natural key of the processed rows in the warehouse (several rows per order).
+houston_warehouse_key_column = "Order #"
+# Houston is not tagged yet, so its roll-ups only split revenue by period.
+houston_rollup_columns = {"revenue": "Revenue"}
+
 
 def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
-    """For now return the Houston raw data unchanged."""
-    return raw_df.copy()
+    """For now return the Houston raw data unchanged (stages never modify their input in place)."""
+    return raw_df
@@ -3,19 +3,24 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Union
+from typing import Iterable, List, Union
 
 import pandas as pd
 
 from src.configs.common_configs import (
     aggregate_first_sum_by_group,
-    assign_revenue_date_generic,
+    aggregate_first_sum_by_group_chunked,
     enforce_strategic_orders,
+    revenue_date_patch_generic,
     tag_msp_from_rep,
-    tag_verified_strategic_generic,
-    tag_welcome_back_generic,
+    verified_strategic_patch_generic,
+    welcome_back_patch_generic,
 )
-from src.utils.excel_file_operations import load_excel_file
+from src.utils.dataframe_utils import as_text
+from src.utils.excel_file_operations import load_lookup_file
+from src.utils.schemas import FileSchema
+from src.utils.stage_runner import apply_column_patches
+from src.utils.tracing import traced
 
 pittsburgh_raw_column_types: List[dict[str, object]] = []
 pittsburgh_sisense_columns: List[str] = []
@@ -61,25 +66,67 @@ raw_column_types = [{'Booking person': 'str'},
  {'Net': 'float'},
  {'% disc.': 'float'}]
 
-def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate Pittsburgh revenue by Order # using the shared helper."""
-    working_df = raw_df.copy()
-    if "Net" not in working_df.columns:
+# Incremental runs re-process every raw row sharing an Order # with a changed row.
+raw_key_column = "Order #"
+processed_key_column = "Order #"
+
+# Checked right after load (src.utils.schemas); rows without an Order # would drop out of the aggregation.
+raw_schema = FileSchema.from_column_types("Pittsburgh raw", raw_column_types, non_null=[raw_key_column])
+class_list_schema = FileSchema.of_columns("Pittsburgh class list", ["Class Code in Client Data", "Ad Category"])
+
+# Processed history is partitioned by the month of this column (see src.utils.processed_dataset).
+period_column = "Revenue Date"
+# Natural key of the processed rows in the warehouse (src.utils.warehouse_sink).
+warehouse_key_column = "Order #"
+# Output columns behind each roll-up measure and dimension (src.utils.rollups).
+rollup_columns = {
+    "revenue": "Sum of 'Net'",
+    "msp": "MSP",
+    "strategic": "Verified Strategic",
+    "welcome_back": "WB 3-6",
+    "rep": "Booking person",
+}
+
+def prepare_revenue_rows(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Row-wise part of :func:`calculate_revenue`: replace Net with a numeric Sum of 'Net'."""
+    if "Net" not in raw_df.columns:
         raise KeyError("Pittsburgh raw data missing 'Net' column")
-    working_df["Sum of 'Net'"] = pd.to_numeric(working_df["Net"], errors="coerce").fillna(0)
-    working_df.drop(columns=["Net"], inplace=True)
+    return raw_df.assign(
+        **{"Sum of 'Net'": pd.to_numeric(raw_df["Net"], errors="coerce").fillna(0)}
+    ).drop(columns=["Net"])
+
+
+def finalize_revenue(aggregated: pd.DataFrame) -> pd.DataFrame:
+    """Add Order # + and drop zero-revenue orders after aggregation."""
+    aggregated = aggregated.assign(**{"Order # +": aggregated["Order #"]})
+    aggregated = aggregated[aggregated["Sum of 'Net'"] != 0]
+
+    return aggregated
 
+
+@traced("pittsburgh.calculate_revenue", category="aggregation")
+def calculate_revenue(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate Pittsburgh revenue by Order # using the shared helper."""
     aggregated = aggregate_first_sum_by_group(
-        working_df,
+        prepare_revenue_rows(raw_df),
         group_column="Order #",
         value_column="Sum of 'Net'",
         count_column_name="Count of matches",
     )
+    return finalize_revenue(aggregated)
 
-    aggregated["Order # +"] = aggregated["Order #"]
-    aggregated = aggregated[aggregated["Sum of 'Net'"] != 0]
 
-    return aggregated
+@traced("pittsburgh.calculate_revenue_chunked", category="aggregation")
+def calculate_revenue_chunked(raw_chunks: Iterable[pd.DataFrame], *, spill_dir) -> pd.DataFrame:
+    """:func:`calculate_revenue` over raw row chunks, spilling partial aggregates to ``spill_dir``."""
+    aggregated = aggregate_first_sum_by_group_chunked(
+        (prepare_revenue_rows(chunk) for chunk in raw_chunks),
+        group_column="Order #",
+        value_column="Sum of 'Net'",
+        count_column_name="Count of matches",
+        spill_dir=spill_dir,
+    )
+    return finalize_revenue(aggregated)
 
 
 
@@ -93,7 +140,7 @@ def tag_verified_strategic(
     partner_name: str,
 ) -> pd.DataFrame:
     """Apply the generic strategic tagging using Pittsburgh-specific column mappings."""
-    result = tag_verified_strategic_generic(
+    patch = verified_strategic_patch_generic(
         processed_df,
         lookup_path=lookup_path,
         strategic_file_name=strategic_file_name,
@@ -106,11 +153,10 @@ def tag_verified_strategic(
         lookup_date_column="Strategic End Date",
         company_column="Company",
         output_column="Verified Strategic",
-        strategic_date_output_column="_strategic_date",
+        strategic_date_output_column=None,
         diagnostics_prefix=f"[{partner_name} Strategic]",
     )
-    result.drop(columns=["_strategic_date"], inplace=True)
-    return result
+    return apply_column_patches(processed_df, [patch])
 
 
 def enforce_strategic_orders_lookup(
@@ -132,7 +178,7 @@ def enforce_strategic_orders_lookup(
     )
 
 
-def tag_welcome_back(
+def welcome_back_patch(
     processed_df: pd.DataFrame,
     *,
     lookup_path,
@@ -140,8 +186,8 @@ def tag_welcome_back(
     sheet_name: str,
     partner_name: str,
 ) -> pd.DataFrame:
-    """Apply the generic Welcome Back tagging using Pittsburgh-specific columns."""
-    return tag_welcome_back_generic(
+    """Compute the WB 3-6 column patch using Pittsburgh-specific columns."""
+    return welcome_back_patch_generic(
         processed_df,
         lookup_path=lookup_path,
         welcome_back_file=welcome_back_file,
@@ -157,18 +203,41 @@ def tag_welcome_back(
     )
 
 
-def assign_revenue_date(
+def tag_welcome_back(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path,
+    welcome_back_file: str,
+    sheet_name: str,
+    partner_name: str,
+) -> pd.DataFrame:
+    """Apply the generic Welcome Back tagging using Pittsburgh-specific columns."""
+    return apply_column_patches(
+        processed_df,
+        [
+            welcome_back_patch(
+                processed_df,
+                lookup_path=lookup_path,
+                welcome_back_file=welcome_back_file,
+                sheet_name=sheet_name,
+                partner_name=partner_name,
+            )
+        ],
+    )
+
+
+def revenue_date_patch(
     processed_df: pd.DataFrame,
     *,
     partner_name: str,
 ) -> pd.DataFrame:
     """
-    Assign Revenue Date for Pittsburgh.
+    Compute the Revenue Date column patch for Pittsburgh.
 
     This client always uses the first day of the current month,
     so we rely on the generic helper with calendar_year_or_not=True.
     """
-    return assign_revenue_date_generic(
+    return revenue_date_patch_generic(
         processed_df,
         calendar_year_or_not=True,
         partner_name=partner_name,
@@ -177,7 +246,13 @@ def assign_revenue_date(
     )
 
 
-def tag_msp_from_class_lookup(
+def assign_revenue_date(processed_df: pd.DataFrame, *, partner_name: str) -> pd.DataFrame:
+    """Assign Revenue Date for Pittsburgh."""
+    return apply_column_patches(processed_df, [revenue_date_patch(processed_df, partner_name=partner_name)])
+
+
+@traced(category="tagging", attributes=("lookup_file_name",))
+def msp_class_patch(
     processed_df: pd.DataFrame,
     *,
     lookup_path: Union[str, Path],
@@ -185,26 +260,21 @@ def tag_msp_from_class_lookup(
     lookup_sheet_name: str = "Class List",
 ) -> pd.DataFrame:
     """
-    Fill the MSP column using the Pittsburgh class list lookup.
+    Compute the MSP column patch from the Pittsburgh class list lookup.
     """
     if "Section" not in processed_df.columns:
         raise KeyError("Processed DataFrame missing required column: Section")
 
-    result_df = processed_df.copy()
-
-    lookup_df = load_excel_file(
+    lookup_df = load_lookup_file(
         path=lookup_path,
         file_name=lookup_file_name,
         sheet_name=lookup_sheet_name,
+        schema=class_list_schema,
     )
 
-    required_cols = {"Class Code in Client Data", "Ad Category"}
-    missing = required_cols - set(lookup_df.columns)
-    if missing:
-        raise KeyError(f"Pittsburgh class lookup missing columns: {', '.join(sorted(missing))}")
-
-    lookup_df = lookup_df.copy()
-    lookup_df["_class_key"] = lookup_df["Class Code in Client Data"].astype(str).str.strip().str.casefold()
+    lookup_df = lookup_df.assign(
+        _class_key=as_text(lookup_df["Class Code in Client Data"]).str.strip().str.casefold()
+    )
     class_map = (
         lookup_df[["_class_key", "Ad Category"]]
         .dropna(subset=["_class_key"])
@@ -212,9 +282,31 @@ def tag_msp_from_class_lookup(
         .set_index("_class_key")["Ad Category"]
     )
 
-    section_keys = result_df["Section"].astype(str).str.strip().str.casefold()
+    section_keys = as_text(processed_df["Section"]).str.strip().str.casefold()
     mapped_categories = section_keys.map(class_map)
 
-    result_df["MSP"] = mapped_categories.where(mapped_categories.notna(), result_df.get("MSP", "Other"))
+    return pd.DataFrame(
+        {"MSP": mapped_categories.where(mapped_categories.notna(), processed_df.get("MSP", "Other"))},
+        index=processed_df.index,
+    )
+
 
-    return result_df
+def tag_msp_from_class_lookup(
+    processed_df: pd.DataFrame,
+    *,
+    lookup_path: Union[str, Path],
+    lookup_file_name: str,
+    lookup_sheet_name: str = "Class List",
+) -> pd.DataFrame:
+    """Fill the MSP column using the Pittsburgh class list lookup."""
+    return apply_column_patches(
+        processed_df,
+        [
+            msp_class_patch(
+                processed_df,
+                lookup_path=lookup_path,
+                lookup_file_name=lookup_file_name,
+                lookup_sheet_name=lookup_sheet_name,
+            )
+        ],
+    )
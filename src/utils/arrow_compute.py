@@ -0,0 +1,286 @@
+"""
+Arrow-compute implementations of the hot ``common_configs`` primitives.
+
+The tagging helpers spend most of their time normalising join keys, looking
+them up in a lookup and grouping the raw rows. With the ``arrow`` backend
+(see :func:`set_compute_backend`, ``--backend arrow`` on the pipelines)
+those steps run as Arrow kernels instead of pandas/Python string methods:
+
+- key normalisation slices the column across ``pa.cpu_count()`` threads
+  (Arrow releases the GIL) and runs trim / lower / regex kernels on each
+  slice;
+- key lookups are ``index_in`` / ``is_in`` hash joins;
+- the group-by aggregation is a multithreaded ``Table.group_by``.
+
+Everything else (date parsing, masking, the final column patches) stays in
+pandas, and every function here returns exactly what its pandas counterpart
+does: same values, dtypes, index and missing-value markers. Inputs the Arrow
+kernels cannot reproduce exactly (non-ASCII case folding, mixed-type keys)
+are handed to the pandas implementation for just those values.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.utils.dataframe_utils import ARROW_STRING_DTYPE, arrow_strings_enabled, is_arrow_string
+
+COMPUTE_BACKENDS = ("pandas", "arrow")
+
+# Below this many values a single kernel call beats the thread hand-off.
+PARALLEL_MIN_ROWS = 200_000
+
+# What Python's str.strip() removes from ASCII text; Arrow's own whitespace
+# class leaves out the \x1c-\x1f separators.
+_ASCII_WHITESPACE = " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+_BACKEND = "pandas"
+
+
+def set_compute_backend(backend: str) -> None:
+    """
+    Select the implementation behind the ``common_configs`` hot helpers.
+
+    Parameters
+    ----------
+    backend : str
+        ``"pandas"`` (the default) or ``"arrow"``.
+
+    Raises
+    ------
+    ValueError
+        If ``backend`` is not one of :data:`COMPUTE_BACKENDS`.
+    """
+    global _BACKEND
+    if backend not in COMPUTE_BACKENDS:
+        raise ValueError(f"Unknown compute backend '{backend}'; expected one of {', '.join(COMPUTE_BACKENDS)}")
+    _BACKEND = backend
+
+
+def compute_backend() -> str:
+    return _BACKEND
+
+
+def arrow_backend_enabled() -> bool:
+    return _BACKEND == "arrow"
+
+
+def _parallel(func: Callable[[pa.Array], pa.Array], array: pa.Array) -> pa.ChunkedArray:
+    """Apply an element-wise kernel ``func`` to slices of ``array`` on a thread pool."""
+    workers = pa.cpu_count()
+    if workers < 2 or len(array) < PARALLEL_MIN_ROWS:
+        return pa.chunked_array([func(array)])
+    step = -(-len(array) // workers)
+    slices = [array.slice(start, step) for start in range(0, len(array), step)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return pa.chunked_array(list(pool.map(func, slices)))
+
+
+def _to_arrow(values) -> pa.Array:
+    array = pa.array(values)
+    return array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+
+
+def _string_array(series: pd.Series) -> Optional[pa.Array]:
+    """``series`` as an Arrow string array if it holds only strings (no missing values), else None."""
+    if is_arrow_string(series):
+        array = _to_arrow(series.array)
+    elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=False) == "string":
+        array = pa.array(series.to_numpy(), type=pa.string())
+    else:
+        return None
+    return array if array.null_count == 0 else None
+
+
+def text_array(series: pd.Series) -> pa.Array:
+    """
+    ``as_text(series)`` as an Arrow string array.
+
+    Arrow-string and all-string object columns are converted directly; any
+    other column goes through ``astype(str)`` first so numbers, dates and
+    missing values are spelled exactly as the pandas path spells them.
+    """
+    if is_arrow_string(series):
+        return pc.fill_null(_to_arrow(series.array), "nan")
+    array = _string_array(series)
+    if array is not None:
+        return array
+    return pa.array(series.astype(str).to_numpy(dtype=object), type=pa.string())
+
+
+def _text_series(array: pa.ChunkedArray | pa.Array, like: pd.Series) -> pd.Series:
+    """Wrap a string array as a Series with ``like``'s index, typed as ``as_text(like)`` would be."""
+    if is_arrow_string(like) or arrow_strings_enabled():
+        values = ARROW_STRING_DTYPE.__from_arrow__(array)
+    else:
+        values = array.to_numpy(zero_copy_only=False)
+    return pd.Series(values, index=like.index, name=like.name)
+
+
+def normalize_lookup_key(series: pd.Series, *, strip_decimal_suffix: bool = True) -> pd.Series:
+    """
+    Arrow version of :func:`src.configs.common_configs.normalize_lookup_key`.
+
+    ASCII values are trimmed, lowercased and (optionally) stripped of a
+    trailing ``.0`` by Arrow kernels. Arrow's Unicode lowercasing is not
+    ``str.casefold`` (``"ß"`` stays ``"ß"``), so non-ASCII values are
+    normalised in Python and patched back in.
+    """
+    text = text_array(series)
+
+    def normalize(array: pa.Array) -> pa.Array:
+        normalized = pc.ascii_lower(pc.utf8_trim(array, characters=_ASCII_WHITESPACE))
+        if strip_decimal_suffix:
+            normalized = pc.replace_substring_regex(normalized, r"\.0+$", "")
+        return normalized
+
+    normalized = _parallel(normalize, text).combine_chunks()
+    non_ascii = pc.invert(pc.string_is_ascii(text))
+    if pc.any(non_ascii).as_py():
+        positions = np.flatnonzero(non_ascii.to_numpy(zero_copy_only=False))
+        patched = pd.Series(text.take(positions).to_numpy(zero_copy_only=False)).str.strip().str.casefold()
+        if strip_decimal_suffix:
+            patched = patched.str.replace(r"\.0+$", "", regex=True)
+        values = normalized.to_numpy(zero_copy_only=False).copy()
+        values[positions] = patched.to_numpy()
+        normalized = pa.array(values, type=pa.string())
+    return _text_series(normalized, series)
+
+
+def _lookup_positions(keys: pd.Series, lookup_keys: Iterable) -> Optional[np.ndarray]:
+    """
+    Position of each key in ``lookup_keys`` (-1 when absent).
+
+    Returns None unless both sides are all strings, since pandas matches
+    missing and non-string keys by their own rules.
+    """
+    lookup_keys = pd.Series(lookup_keys)
+    key_array = _string_array(keys)
+    value_set = _string_array(lookup_keys) if len(lookup_keys) else None
+    if key_array is None or value_set is None:
+        return None
+    positions = _parallel(lambda array: pc.index_in(array, value_set=value_set), key_array)
+    return pc.fill_null(positions.combine_chunks(), -1).to_numpy()
+
+
+def map_keys(keys: pd.Series, mapping: pd.Series) -> pd.Series:
+    """
+    ``keys.map(mapping)`` for text keys, joined with ``index_in``.
+
+    ``mapping`` must have a unique index (the helpers de-duplicate their
+    lookups first, as ``Series.map`` requires).
+    """
+    positions = _lookup_positions(keys, mapping.index)
+    if positions is None:
+        return keys.map(mapping)
+    if isinstance(mapping.dtype, pd.api.extensions.ExtensionDtype):
+        values = mapping.array.take(positions, allow_fill=True)
+    else:
+        values = pd.api.extensions.take(mapping.to_numpy(), positions, allow_fill=True)
+    return pd.Series(values, index=keys.index, name=keys.name)
+
+
+def keys_in(keys: pd.Series, values: Iterable) -> pd.Series:
+    """``keys.isin(values)`` for text keys, using ``is_in``."""
+    values = list(values)
+    positions = _lookup_positions(keys, values)
+    if positions is None:
+        return keys.isin(values)
+    return pd.Series(positions >= 0, index=keys.index, name=keys.name)
+
+
+def _first_values(series: pd.Series, rows: np.ndarray, found: np.ndarray) -> pd.Series:
+    """Values of ``series`` at ``rows``; groups without one (``found`` False) get groupby-first's missing value."""
+    safe_rows = np.where(found, rows, 0)
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        values = series.array.take(np.where(found, rows, -1), allow_fill=True)
+    elif series.dtype == object:
+        # groupby().first() fills all-missing object groups with None.
+        values = series.to_numpy()[safe_rows]
+        values[~found] = None
+    else:
+        values = pd.api.extensions.take(series.to_numpy(), np.where(found, rows, -1), allow_fill=True)
+    return pd.Series(values, name=series.name)
+
+
+def _group_min_rows(codes: np.ndarray, rows: np.ndarray, aggregations: Iterable[str]) -> pa.Table:
+    """Multithreaded ``group_by`` of ``rows`` on ``codes`` (``_row_min``, ``_row_count``...)."""
+    table = pa.table({"_code": pa.array(codes), "_row": pa.array(rows)})
+    return table.group_by("_code", use_threads=True).aggregate([("_row", name) for name in aggregations])
+
+
+def aggregate_first_sum_by_group(
+    df: pd.DataFrame,
+    *,
+    group_column: str,
+    value_column: str,
+    count_column_name: str = "Count of matches",
+) -> Optional[pd.DataFrame]:
+    """
+    Arrow version of :func:`src.configs.common_configs.aggregate_first_sum_by_group`.
+
+    Group keys are dictionary-encoded by Arrow and a multithreaded
+    ``Table.group_by`` over the codes finds each group's first row and row
+    count. ``first`` skips missing values, so only for groups whose first
+    row is missing a column are that group's rows searched again (another
+    ``group_by`` over just those rows). Values are taken from the original
+    columns, so dtypes are untouched, and the sum reuses pandas' compensated
+    group sum over the integer codes, so floating-point totals are
+    bit-identical to the pandas path.
+
+    Returns None when the frame is empty, the key is not a string or
+    integer column or the value column is not numeric; the caller then
+    uses pandas.
+    """
+    values = df[value_column]
+    if df.empty or df.columns.duplicated().any():
+        return None
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return None
+    try:
+        keys = _to_arrow(pa.array(df[group_column], from_pandas=True))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    # Float keys (NaN/-0.0 handling) and categoricals (unobserved groups) follow pandas' own rules.
+    if not (pa.types.is_string(keys.type) or pa.types.is_large_string(keys.type) or pa.types.is_integer(keys.type)):
+        return None
+
+    encoded = pc.dictionary_encode(keys)
+    codes = pc.fill_null(encoded.indices, -1).to_numpy().astype(np.int64)
+    keyed_rows = np.flatnonzero(codes >= 0)  # pandas drops rows with a missing key
+    grouped = _group_min_rows(codes[keyed_rows], keyed_rows, ("min", "count"))
+    group_codes = grouped["_code"].to_numpy()
+    first_row = np.empty(len(encoded.dictionary), dtype=np.int64)
+    first_row[group_codes] = grouped["_row_min"].to_numpy()
+    row_count = np.empty(len(encoded.dictionary), dtype=np.int64)
+    row_count[group_codes] = grouped["_row_count"].to_numpy()
+    # pandas sorts groups by key; Arrow orders strings by UTF-8 bytes, i.e. by code point as Python does.
+    order = pc.sort_indices(encoded.dictionary).to_numpy()
+
+    result = {}
+    first_columns = [col for col in df.columns if col not in (value_column, group_column)]
+    for col in first_columns:
+        series = df[col]
+        missing = series.take(first_row).isna().to_numpy()
+        rows, found = first_row, ~missing
+        if missing.any():
+            candidates = keyed_rows[missing[codes[keyed_rows]]]
+            candidates = candidates[series.take(candidates).notna().to_numpy()]
+            if len(candidates):
+                regrouped = _group_min_rows(codes[candidates], candidates, ("min",))
+                rows, found = first_row.copy(), found.copy()
+                rows[regrouped["_code"].to_numpy()] = regrouped["_row_min"].to_numpy()
+                found[regrouped["_code"].to_numpy()] = True
+        result[col] = _first_values(series, rows[order], found[order])
+    result[group_column] = df[group_column].iloc[first_row[order]].reset_index(drop=True)
+
+    sums = values.iloc[keyed_rows].groupby(codes[keyed_rows]).sum()
+    result[value_column] = sums.reindex(order).reset_index(drop=True).rename(value_column)
+    result[count_column_name] = pd.Series(row_count[order], name=count_column_name)
+    return pd.DataFrame(result)[[*first_columns, group_column, value_column, count_column_name]]
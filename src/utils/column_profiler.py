@@ -0,0 +1,468 @@
+"""
+Streaming column profiler for raw partner files.
+
+Replaces loading a whole drop in a notebook and running
+``infer_column_types`` on it. The file is streamed once in bounded memory:
+
+- CSV files through Arrow's multi-threaded CSV reader, every column as text;
+- Excel sheets row by row through openpyxl's read-only mode.
+
+Row and null counts cover every row. Distinct counts come from a KMV
+(k minimum values) sketch of 64-bit value hashes, exact below
+``SKETCH_SIZE`` distinct values and within about 2% above. Types and date
+formats are inferred from a uniform reservoir sample of rows, so a
+multi-GB CSV costs one read plus a fixed amount of parsing.
+
+The result is a ``column_types`` list in the form the configs modules and
+:func:`src.utils.excel_file_operations.load_excel_file` use, plus the
+columns that look like keys (no nulls, every value distinct) and the text
+columns worth storing as categories.
+
+Usage:
+    python -m src.utils.column_profiler "data/boston/raw/Boston Raw 6.25.csv" --name boston_raw
+    python -m src.utils.column_profiler "data/hearst/raw/Hearst Files.xlsx" --sheet Raw --output hearst_profile.csv
+
+    from src.utils.column_profiler import profile_file
+    profile = profile_file("data/houston/raw/HOU Raw 10.25.xlsx")
+    houston_raw_column_types = profile.column_types()
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from pandas.io.parsers import TextParser
+
+from src.utils.dataframe_utils import write_parquet_frame
+from src.utils.excel_file_operations import iter_sheet_batches
+from src.utils.memory_budget import DEFAULT_CHUNK_ROWS
+
+DEFAULT_SAMPLE_ROWS = 20_000
+CSV_BLOCK_BYTES = 16 * 1024**2
+SKETCH_SIZE = 4_096
+# Share of the sampled non-null values a type must parse; the loader coerces the rest to NaN.
+TYPE_MIN_SHARE = 0.99
+KEY_MIN_DISTINCT_SHARE = 0.99
+CATEGORY_MAX_DISTINCT = 1_000
+CATEGORY_MAX_DISTINCT_SHARE = 0.05
+# Tried in order, so ambiguous day/month text reads as US dates like the partners' files.
+DATE_FORMATS = (
+    "%m/%d/%Y",
+    "%m/%d/%y",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%d-%b-%Y",
+    "%d-%b-%y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+)
+EXCEL_DATE_FORMAT = "excel date"
+
+
+class _DistinctSketch:
+    """KMV sketch: the ``size`` smallest distinct 64-bit hashes seen."""
+
+    def __init__(self, size: int = SKETCH_SIZE) -> None:
+        self.size = size
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def add(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        hashes = pd.util.hash_array(values, categorize=False)
+        if len(self.hashes) == self.size:
+            hashes = hashes[hashes < self.hashes[-1]]
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[: self.size]
+
+    @property
+    def exact(self) -> bool:
+        return len(self.hashes) < self.size
+
+    def estimate(self) -> int:
+        if self.exact:
+            return len(self.hashes)
+        return int(round((self.size - 1) * 2.0**64 / (float(self.hashes[-1]) + 1.0)))
+
+
+class _Reservoir:
+    """
+    Uniform sample of at most ``size`` rows: the rows with the smallest random priorities.
+
+    Candidate rows are collected per chunk (Arrow batches stay Arrow) and
+    cut back to ``size`` only once twice as many have accumulated.
+    """
+
+    def __init__(self, size: int, seed: int) -> None:
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.priorities = np.empty(0)
+        self.pieces: List[Union[pa.Table, pd.DataFrame]] = []
+        self.threshold = np.inf
+
+    def add(self, chunk: Union[pa.RecordBatch, pd.DataFrame]) -> None:
+        priorities = self.rng.random(len(chunk))
+        positions = np.flatnonzero(priorities < self.threshold)
+        if not len(positions):
+            return
+        if isinstance(chunk, pa.RecordBatch):
+            self.pieces.append(pa.Table.from_batches([chunk.take(pa.array(positions))]))
+        else:
+            self.pieces.append(chunk.iloc[positions].reset_index(drop=True))
+        self.priorities = np.concatenate([self.priorities, priorities[positions]])
+        if len(self.priorities) >= 2 * self.size:
+            self._compact()
+
+    def _compact(self) -> None:
+        if len(self.pieces) > 1:
+            tables = isinstance(self.pieces[0], pa.Table)
+            self.pieces = [pa.concat_tables(self.pieces) if tables else pd.concat(self.pieces, ignore_index=True)]
+        if len(self.priorities) > self.size:
+            keep = np.sort(np.argpartition(self.priorities, self.size - 1)[: self.size])
+            piece = self.pieces[0]
+            self.pieces = [piece.take(pa.array(keep)) if isinstance(piece, pa.Table) else piece.iloc[keep]]
+            self.priorities = self.priorities[keep]
+            self.threshold = self.priorities.max()
+
+    def rows(self, columns: List[str]) -> pd.DataFrame:
+        self._compact()
+        if not self.pieces:
+            return pd.DataFrame(columns=columns, dtype=object)
+        piece = self.pieces[0]
+        rows = piece.to_pandas() if isinstance(piece, pa.Table) else piece
+        return rows.reset_index(drop=True)
+
+
+@dataclass
+class ColumnProfile:
+    """Profile of one column; ``dtype`` is its ``column_types`` entry."""
+
+    name: str
+    rows: int
+    nulls: int
+    distinct: int
+    distinct_exact: bool
+    dtype: object = "str"
+    shares: Dict[str, float] = field(default_factory=dict)
+    date_formats: List[str] = field(default_factory=list)
+    leading_zeros: bool = False
+
+    @property
+    def null_rate(self) -> float:
+        return self.nulls / self.rows if self.rows else 0.0
+
+    @property
+    def is_key(self) -> bool:
+        return self.rows > 0 and self.nulls == 0 and self.distinct >= KEY_MIN_DISTINCT_SHARE * self.rows
+
+    @property
+    def is_category(self) -> bool:
+        present = self.rows - self.nulls
+        return (
+            self.dtype == "str"
+            and 0 < self.distinct <= CATEGORY_MAX_DISTINCT
+            and self.distinct <= CATEGORY_MAX_DISTINCT_SHARE * present
+        )
+
+
+@dataclass
+class FileProfile:
+    """Profile of a raw file, as returned by :func:`profile_file`."""
+
+    path: Path
+    rows: int
+    sampled_rows: int
+    columns: List[ColumnProfile]
+    seconds: float
+
+    def column_types(self) -> List[Dict[str, object]]:
+        """The ``column_types`` list for :func:`src.utils.excel_file_operations.load_excel_file`."""
+        return [{column.name: column.dtype} for column in self.columns]
+
+    def key_columns(self) -> List[str]:
+        return [column.name for column in self.columns if column.is_key]
+
+    def category_columns(self) -> List[str]:
+        return [column.name for column in self.columns if column.is_category]
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per column with its counts, type shares and recommendation."""
+        return pd.DataFrame(
+            {
+                "column": column.name,
+                "type": getattr(column.dtype, "__name__", column.dtype),
+                "null_rate": round(column.null_rate, 4),
+                "distinct": column.distinct,
+                "distinct_exact": column.distinct_exact,
+                "int_share": column.shares.get("int", 0.0),
+                "number_share": column.shares.get("number", 0.0),
+                "date_share": column.shares.get("date", 0.0),
+                "date_formats": ", ".join(column.date_formats),
+                "recommendation": "key" if column.is_key else "category" if column.is_category else "",
+            }
+            for column in self.columns
+        )
+
+    def config_snippet(self, name: str = "raw") -> str:
+        """Python source declaring ``<name>_column_types`` with the recommendations as comments."""
+        lines = [
+            f"# Profiled from {self.path.name}: {self.rows:,} rows, types from a {self.sampled_rows:,}-row sample.",
+        ]
+        if self.key_columns():
+            lines.append(f"# Key candidates: {', '.join(self.key_columns())}")
+        if self.category_columns():
+            lines.append(f"# Category candidates: {', '.join(self.category_columns())}")
+        lines.append(f"{name}_column_types: List[dict[str, object]] = [")
+        for column in self.columns:
+            lines.append(f"    {{{_string_literal(column.name)}: {_type_literal(column.dtype)}}},")
+        lines.append("]")
+        return "\n".join(lines)
+
+    def describe(self) -> str:
+        return (
+            f"{self.path.name}: {self.rows:,} rows x {len(self.columns)} columns profiled in {self.seconds:.1f} s "
+            f"(types from {self.sampled_rows:,} sampled rows)"
+        )
+
+
+def _string_literal(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _type_literal(dtype: object) -> str:
+    return dtype.__name__ if isinstance(dtype, type) else _string_literal(str(dtype))
+
+
+def _header_names(header: list) -> List[str]:
+    """Column names as pandas reads them (duplicates become ``name.1``)."""
+    return [str(name) for name in TextParser([header], header=0).read().columns]
+
+
+def _csv_chunks(file_path: Path) -> Iterator[Tuple[List[str], Union[pa.RecordBatch, pd.DataFrame]]]:
+    with pacsv.open_csv(file_path, read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES)) as probe:
+        header = probe.schema.names
+    names = _header_names(header)
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES, column_names=names, skip_rows=1),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in names}, strings_can_be_null=True
+        ),
+    )
+    with reader:
+        for batch in reader:
+            yield names, batch
+
+
+def _excel_chunks(
+    file_path: Path, sheet_name: Optional[Union[str, int]], chunk_rows: int
+) -> Iterator[Tuple[List[str], pd.DataFrame]]:
+    names: Optional[List[str]] = None
+    for header, batch in iter_sheet_batches(file_path, sheet_name, chunk_rows):
+        if names is None:
+            names = _header_names(header)
+        chunk = pd.DataFrame(batch, columns=names, dtype=object)
+        # Empty cells arrive as "" (see _excel_cell_value).
+        yield names, chunk.mask(chunk.eq(""))
+
+
+def _column_stats(values: Union[pa.Array, pd.Series]) -> Tuple[int, np.ndarray]:
+    """Null count and distinct non-null values of one chunk column."""
+    if isinstance(values, pa.Array):
+        return values.null_count, pc.unique(values.drop_null()).to_numpy(zero_copy_only=False)
+    return int(values.isna().sum()), pd.unique(values.dropna().to_numpy())
+
+
+def _parse_dates(text: pd.Series) -> Tuple[pd.Series, Dict[str, int]]:
+    """Whether each distinct text value is a date in one of :data:`DATE_FORMATS`, and the formats matched."""
+    matched = pd.Series(False, index=text.index)
+    formats: Dict[str, int] = {}
+    for date_format in DATE_FORMATS:
+        pending = text[~matched]
+        if pending.empty:
+            break
+        parsed = pd.to_datetime(pending, format=date_format, errors="coerce").notna()
+        if parsed.any():
+            matched[parsed[parsed].index] = True
+            formats[date_format] = int(parsed.sum())
+    return matched, formats
+
+
+def _infer_type(values: pd.Series) -> Tuple[object, Dict[str, float], List[str], bool]:
+    """``column_types`` entry, type shares, date formats and leading zeros of one sampled column."""
+    present = values.dropna()
+    if pd.api.types.infer_dtype(present, skipna=False) == "string":
+        # CSV columns: every value is text, so skip the per-value type checks.
+        present = present.str.strip()
+        present = present[present.ne("")]
+        is_text = pd.Series(True, index=present.index)
+        is_bool = is_datetime = pd.Series(False, index=present.index)
+    else:
+        is_text = present.map(lambda value: isinstance(value, str)).astype(bool)
+        present = present.where(~is_text, present[is_text].str.strip())
+        present = present[~(is_text & present.eq(""))]
+        is_text = present.map(lambda value: isinstance(value, str)).astype(bool)
+        is_bool = present.map(lambda value: isinstance(value, (bool, np.bool_))).astype(bool)
+        is_datetime = present.map(lambda value: isinstance(value, (datetime.date, pd.Timestamp))).astype(bool)
+    if present.empty:
+        return "str", {}, [], False
+
+    numbers = pd.to_numeric(present.where(~(is_bool | is_datetime)), errors="coerce")
+    integral = numbers.notna() & numbers.mod(1).eq(0) & numbers.abs().lt(2**53)
+    text = present[is_text]
+    leading_zeros = bool(text.str.fullmatch(r"0\d+").any())
+
+    distinct_text = pd.Series(text[numbers[is_text].isna()].unique(), dtype=object)
+    matched, text_formats = _parse_dates(distinct_text)
+    date_text = set(distinct_text[matched])
+    is_date = is_datetime | (is_text & present.isin(date_text))
+
+    shares = {
+        "int": round(float(integral.mean()), 4),
+        "number": round(float(numbers.notna().mean()), 4),
+        "date": round(float(is_date.mean()), 4),
+    }
+    date_formats = ([EXCEL_DATE_FORMAT] if is_datetime.any() else []) + sorted(
+        text_formats, key=lambda date_format: -text_formats[date_format]
+    )
+    if leading_zeros:
+        dtype: object = "str"
+    elif shares["int"] >= TYPE_MIN_SHARE:
+        dtype = int
+    elif shares["number"] >= TYPE_MIN_SHARE:
+        dtype = float
+    elif shares["date"] >= TYPE_MIN_SHARE:
+        dtype = "datetime64[ns]"
+    else:
+        dtype = "str"
+    return dtype, shares, date_formats, leading_zeros
+
+
+def profile_file(
+    file_path: Union[str, Path],
+    *,
+    sheet_name: Optional[Union[str, int]] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    max_rows: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    seed: int = 0,
+) -> FileProfile:
+    """
+    Profile every column of a raw CSV or Excel file in one streaming pass.
+
+    Parameters
+    ----------
+    file_path : str | Path
+        The raw file.
+    sheet_name : str | int, optional
+        Excel sheet (default first).
+    sample_rows : int, default DEFAULT_SAMPLE_ROWS
+        Rows kept in the reservoir sample that types and date formats are
+        inferred from.
+    max_rows : int, optional
+        Stop after this many data rows (default: the whole file).
+    chunk_rows : int, default DEFAULT_CHUNK_ROWS
+        Excel rows parsed per chunk; CSV files are read in blocks of
+        ``CSV_BLOCK_BYTES``.
+    seed : int, default 0
+        Seed of the reservoir sample.
+
+    Returns
+    -------
+    FileProfile
+        Per-column counts, inferred ``column_types`` and recommendations.
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Raw file not found: {file_path}")
+    if sample_rows < 1:
+        raise ValueError(f"sample_rows must be positive, got {sample_rows}")
+    started = time.perf_counter()
+    if file_path.suffix.lower() == ".csv":
+        chunks = _csv_chunks(file_path)
+    else:
+        chunks = _excel_chunks(file_path, sheet_name, chunk_rows)
+
+    names: List[str] = []
+    nulls: Dict[str, int] = {}
+    sketches: Dict[str, _DistinctSketch] = {}
+    reservoir = _Reservoir(sample_rows, seed)
+    rows = 0
+    for names, chunk in chunks:
+        if max_rows is not None and rows + len(chunk) > max_rows:
+            chunk = chunk.slice(0, max_rows - rows) if isinstance(chunk, pa.RecordBatch) else chunk.iloc[: max_rows - rows]
+        rows += len(chunk)
+        for i, name in enumerate(names):
+            column = chunk.column(i) if isinstance(chunk, pa.RecordBatch) else chunk.iloc[:, i]
+            null_count, distinct = _column_stats(column)
+            nulls[name] = nulls.get(name, 0) + null_count
+            sketches.setdefault(name, _DistinctSketch()).add(distinct)
+        reservoir.add(chunk)
+        if max_rows is not None and rows >= max_rows:
+            break
+
+    sample = reservoir.rows(names)
+    columns = []
+    for i, name in enumerate(names):
+        sketch = sketches.get(name, _DistinctSketch())
+        dtype, shares, date_formats, leading_zeros = _infer_type(sample.iloc[:, i])
+        columns.append(
+            ColumnProfile(
+                name=name,
+                rows=rows,
+                nulls=nulls.get(name, 0),
+                distinct=sketch.estimate(),
+                distinct_exact=sketch.exact,
+                dtype=dtype,
+                shares=shares,
+                date_formats=date_formats,
+                leading_zeros=leading_zeros,
+            )
+        )
+    return FileProfile(file_path, rows, len(sample), columns, time.perf_counter() - started)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile a raw file and print its column_types.")
+    parser.add_argument("path", type=Path, help="Raw .csv or .xlsx file.")
+    parser.add_argument("--sheet", default=None, help="Excel sheet (default first).")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_ROWS, help="Rows sampled for type inference.")
+    parser.add_argument("--max-rows", type=int, default=None, help="Stop after this many rows (default all).")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Excel rows per chunk.")
+    parser.add_argument("--name", default="raw", help="Prefix of the generated <name>_column_types variable.")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the profile to .parquet or .csv.")
+    args = parser.parse_args(argv)
+
+    profile = profile_file(
+        args.path, sheet_name=args.sheet, sample_rows=args.sample, max_rows=args.max_rows, chunk_rows=args.chunk_rows
+    )
+    print(profile.describe())
+    print(profile.to_frame().to_string(index=False))
+    print()
+    print(profile.config_snippet(args.name))
+    if args.output is not None:
+        if args.output.suffix.lower() == ".csv":
+            profile.to_frame().to_csv(args.output, index=False)
+        else:
+            write_parquet_frame(profile.to_frame(), args.output)
+        print(f"Profile written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,15 @@
-from typing import List
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
 
 import pandas as pd
+import pyarrow as pa
+
+# Arrow-backed strings with NumPy semantics: missing values are NaN and string
+# predicates return NumPy bool arrays, so masks behave as with object columns.
+ARROW_STRING_DTYPE = pd.StringDtype("pyarrow_numpy")
+
+_ARROW_STRINGS = False
 
 
 def rearrange_columns(df: pd.DataFrame, column_order: List[str]) -> pd.DataFrame:
@@ -39,3 +48,159 @@ def rearrange_columns(df: pd.DataFrame, column_order: List[str]) -> pd.DataFrame
     reordered_df = df[existing_columns]
 
     return reordered_df
+
+
+def parquet_safe_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return ``df`` with object columns Arrow cannot type written as strings.
+
+    Excel-sourced object columns often mix ints, strings and dates; those are
+    converted with ``astype(str)`` (nulls kept). ``df`` itself is returned
+    when no column needs it.
+    """
+    safe_df = df
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if safe_df is df:
+                safe_df = df.copy(deep=False)
+            safe_df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return safe_df
+
+
+def write_parquet_frame(df: pd.DataFrame, file_path: str | Path) -> Path:
+    """
+    Atomically write a DataFrame to Parquet, stringifying mixed object columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to persist.
+    file_path : str | Path
+        Destination Parquet file. Parent directories are created as needed.
+
+    Returns
+    -------
+    Path
+        The full path to the written Parquet file.
+
+    Notes
+    -----
+    - Excel-sourced object columns often mix ints, strings and dates, which
+      Arrow cannot type. Such columns are written as strings (nulls kept;
+      see :func:`parquet_safe_frame`).
+    - The file is written next to the destination and swapped in with
+      ``os.replace`` so readers never see a partial file.
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    safe_df = parquet_safe_frame(df)
+    tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+    safe_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def read_parquet_frame(file_path: str | Path) -> pd.DataFrame:
+    """
+    Read a frame written by :func:`write_parquet_frame`.
+
+    Text columns come back as Arrow strings when they are enabled (see
+    :func:`enable_arrow_strings`) and as Python strings otherwise, whichever
+    mode wrote the file.
+    """
+    df = pd.read_parquet(file_path)
+    if _ARROW_STRINGS:
+        return convert_to_arrow_strings(df)
+    return convert_from_arrow_strings(df)
+
+
+def enable_copy_on_write() -> None:
+    """
+    Run pandas with Copy-on-Write semantics.
+
+    The processing helpers never modify their inputs in place and return
+    ``df.assign(...)`` with only the new or modified columns. Under
+    Copy-on-Write those results share every untouched column with the input
+    instead of deep-copying the whole frame at each stage.
+    """
+    pd.set_option("mode.copy_on_write", True)
+
+
+def enable_arrow_strings(enabled: bool = True) -> None:
+    """
+    Keep text columns in Arrow-backed ``string[pyarrow_numpy]`` columns.
+
+    The loaders convert every all-text column as it is read, the helpers
+    build their text columns with :func:`as_text` and :func:`text_column`
+    so they stay Arrow-backed, and the xlsx writer converts back to Python
+    strings only when the workbook is written.
+    """
+    global _ARROW_STRINGS
+    _ARROW_STRINGS = enabled
+
+
+def arrow_strings_enabled() -> bool:
+    return _ARROW_STRINGS
+
+
+def is_arrow_string(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.StringDtype) and series.dtype.storage != "python"
+
+
+def is_text_column(series: pd.Series) -> bool:
+    """True for an object column whose non-missing values are all Python strings."""
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+
+def convert_to_arrow_strings(df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Convert all-text object columns (or just ``columns``) to Arrow strings.
+
+    Columns mixing strings with numbers or dates stay object, so converting
+    never changes a value.
+    """
+    if columns is None:
+        columns = [col for col in df.columns if is_text_column(df[col])]
+    columns = list(columns)
+    if not columns:
+        return df
+    return df.astype({col: ARROW_STRING_DTYPE for col in columns})
+
+
+def convert_from_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert Arrow string columns back to object columns of Python strings (missing values NaN)."""
+    columns = [col for col in df.columns if is_arrow_string(df[col])]
+    if not columns:
+        return df
+    return df.astype({col: object for col in columns})
+
+
+def as_text(series: pd.Series) -> pd.Series:
+    """
+    ``series.astype(str)`` that stays Arrow-backed when Arrow strings are enabled.
+
+    Missing values become ``"nan"`` either way, so keys normalised through
+    this compare the same in both modes.
+    """
+    if is_arrow_string(series):
+        return series.fillna("nan")
+    if _ARROW_STRINGS:
+        return series.astype(str).astype(ARROW_STRING_DTYPE)
+    return series.astype(str)
+
+
+def text_column(series: pd.Series) -> pd.Series:
+    """Store a column of strings as Arrow strings when enabled; values (and missing values) are kept."""
+    if not _ARROW_STRINGS or is_arrow_string(series):
+        return series
+    return series.astype(ARROW_STRING_DTYPE)
+
+
+def object_text_columns(df: pd.DataFrame) -> List[str]:
+    """Columns that hold only strings but are stored as object (i.e. fell back from Arrow strings)."""
+    return [col for col in df.columns if is_text_column(df[col])]
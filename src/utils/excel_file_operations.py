@@ -9,17 +9,70 @@ Usage:
                          sheet_name="Raw")
 """
 
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import threading
+import zipfile
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from typing import Any, List, Dict, Iterator, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
 import pandas as pd
+from pandas.io.parsers import TextParser
 
+from src.utils.dataframe_utils import (
+    ARROW_STRING_DTYPE,
+    arrow_strings_enabled,
+    convert_from_arrow_strings,
+    convert_to_arrow_strings,
+)
+from src.utils.memory_budget import (
+    DEFAULT_CHUNK_ROWS,
+    check_memory_budget,
+    current_budget,
+    excel_write_bytes,
+    spill_directory,
+)
+from src.utils.run_report import record_lookup_cache
+from src.utils.schemas import FileSchema
+from src.utils.tracing import traced
+from src.utils.xlsx_reader import (
+    XLSX_SUFFIXES,
+    RangeParsingUnavailable,
+    SheetRowRanges,
+    iter_range_rows,
+    sheet_xml_size,
+    split_sheet_rows,
+)
 
+# Sheets with less worksheet XML than this are parsed by pandas even when workers are requested:
+# below it, starting the worker processes costs more than the parsing they share.
+PARALLEL_MIN_SHEET_BYTES = 32 * 1024 * 1024
+
+# Rows of an Excel sheet, header included; larger frames are written in parts (see write_df_to_excel).
+EXCEL_MAX_ROWS = 1_048_576
+
+_LOOKUP_CACHE: Dict[Tuple, pd.DataFrame] = {}
+# Lookups being read in the background by prefetch_lookup_file, by cache key.
+_LOOKUP_PENDING: Dict[Tuple, Future] = {}
+_LOOKUP_CACHE_LOCK = threading.Lock()
+
+
+@traced(category="io", attributes=("file_name", "sheet_name"))
 def load_excel_file(
     path: Union[str, Path],
     file_name: str,
     *,
     column_types: Optional[List[Dict[str, object]]] = None,
     sheet_name: Optional[Union[str, int]] = None,
+    nrows: Optional[int] = None,
+    schema: Optional[FileSchema] = None,
+    workers: Optional[int] = None,
 ) -> pd.DataFrame:
     """
     Load an Excel file with optional dtype handling.
@@ -37,6 +90,16 @@ def load_excel_file(
         - "datetime64[ns]" handled via parse_dates
     sheet_name : str | int | None, optional
         Sheet to read. If None, reads the first sheet (index 0).
+    nrows : int, optional
+        Only read the first ``nrows`` data rows.
+    schema : FileSchema, optional
+        Validate the loaded frame against this schema (raises
+        :class:`src.utils.schemas.SchemaError`). Its ``column_types`` are
+        used when ``column_types`` is not given.
+    workers : int, optional
+        Parse a large .xlsx sheet in this many processes, each taking a
+        range of rows (see :func:`read_excel_sheet_parallel`). The result is
+        the same frame; small sheets are read by pandas as usual.
 
     Returns
     -------
@@ -48,12 +111,53 @@ def load_excel_file(
     - Non-numeric junk in numeric columns is coerced to NaN.
     - Integer columns are finalized to nullable Int64 (preserves NaN).
     - If `column_types` is None, pandas infers types normally.
+    - With Arrow strings enabled (see ``enable_arrow_strings``), all-text
+      columns are returned as ``string[pyarrow_numpy]``.
     """
     file_path = Path(path) / file_name
     if not file_path.exists():
         raise FileNotFoundError(f"Excel file not found: {file_path}")
+    if schema is not None and column_types is None:
+        column_types = schema.column_types()
+
+    dtype_dict, parse_dates, converters = _column_type_options(column_types)
+
+    suffix = file_path.suffix.lower()
+    if suffix == ".csv":
+        df = pd.read_csv(
+            file_path,
+            dtype=(dtype_dict or None),
+            parse_dates=(parse_dates or None),
+            converters=(converters or None),
+            nrows=nrows,
+        )
+    else:
+        # Default to first sheet if not specified
+        _sheet = 0 if sheet_name is None else sheet_name
+
+        df = None
+        if workers is not None and workers > 1 and nrows is None and suffix in XLSX_SUFFIXES:
+            df = read_excel_sheet_parallel(file_path, _sheet, column_types=column_types, workers=workers)
+        if df is None:
+            df = pd.read_excel(
+                file_path,
+                sheet_name=_sheet,
+                dtype=(dtype_dict or None),
+                parse_dates=(parse_dates or None),
+                converters=(converters or None),
+                nrows=nrows,
+            )
+
+    df = _finalize_int_columns(df, column_types)
+    if arrow_strings_enabled():
+        df = convert_to_arrow_strings(df)
+    if schema is not None:
+        schema.validate(df)
+    return df
 
-    # Build dtype / parse_dates / converters from column_types (if provided)
+
+def _column_type_options(column_types: Optional[List[Dict[str, object]]]) -> Tuple[dict, list, dict]:
+    """Build read_csv/read_excel ``dtype``, ``parse_dates`` and ``converters`` from ``column_types``."""
     dtype_dict, parse_dates, converters = {}, [], {}
     if column_types:
         for d in column_types:
@@ -70,46 +174,950 @@ def load_excel_file(
             else:
                 # str/object types
                 dtype_dict[col] = dtype
+    return dtype_dict, parse_dates, converters
 
-    suffix = file_path.suffix.lower()
-    if suffix == ".csv":
-        df = pd.read_csv(
-            file_path,
-            dtype=(dtype_dict or None),
-            parse_dates=(parse_dates or None),
-            converters=(converters or None),
-        )
-    else:
-        # Default to first sheet if not specified
-        _sheet = 0 if sheet_name is None else sheet_name
 
-        df = pd.read_excel(
-            file_path,
-            sheet_name=_sheet,
-            dtype=(dtype_dict or None),
-            parse_dates=(parse_dates or None),
-            converters=(converters or None),
-        )
-
-    # Finalize integer columns to pandas nullable Int64
+def _finalize_int_columns(df: pd.DataFrame, column_types: Optional[List[Dict[str, object]]]) -> pd.DataFrame:
+    """Finalize integer columns to pandas nullable Int64."""
     if column_types:
         for d in column_types:
             (col, dtype), = d.items()
             if dtype is int and col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
-
     return df
 
 
+def _lookup_cache_key(
+    file_path: Path,
+    column_types: Optional[List[Dict[str, object]]],
+    sheet_name: Optional[Union[str, int]],
+    schema: Optional[FileSchema],
+) -> Tuple:
+    if not file_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {file_path}")
+    stat = file_path.stat()
+    return (
+        str(file_path.resolve()),
+        # The sheet of a CSV lookup is ignored by the loader, so it is not part of the key either.
+        None if file_path.suffix.lower() == ".csv" else sheet_name,
+        repr(column_types),
+        schema,
+        arrow_strings_enabled(),
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+@traced(category="io", attributes=("file_name", "sheet_name"))
+def load_lookup_file(
+    path: Union[str, Path],
+    file_name: str,
+    *,
+    column_types: Optional[List[Dict[str, object]]] = None,
+    sheet_name: Optional[Union[str, int]] = None,
+    schema: Optional[FileSchema] = None,
+) -> pd.DataFrame:
+    """
+    Load a lookup file through a process-wide cache.
+
+    Same parameters as :func:`load_excel_file`. Entries are keyed on the file's
+    path, size and modification time, so an edited lookup is re-read. Callers
+    receive a shallow copy and must not modify values in place. A lookup is
+    validated against ``schema`` when it is read, not on every cache hit.
+    If the lookup is being read by :func:`prefetch_lookup_file`, the call
+    waits for that read (and raises its error) instead of reading it again.
+    """
+    key = _lookup_cache_key(Path(path) / file_name, column_types, sheet_name, schema)
+    with _LOOKUP_CACHE_LOCK:
+        cached = _LOOKUP_CACHE.get(key)
+        pending = _LOOKUP_PENDING.get(key) if cached is None else None
+    record_lookup_cache(cached is not None or pending is not None)
+    if pending is not None:
+        try:
+            cached = pending.result()
+        except CancelledError:
+            cached = None
+    if cached is None:
+        cached = load_excel_file(path, file_name, column_types=column_types, sheet_name=sheet_name, schema=schema)
+        with _LOOKUP_CACHE_LOCK:
+            _LOOKUP_CACHE[key] = cached
+    return cached.copy(deep=False)
+
+
+def prefetch_lookup_file(
+    executor: Executor,
+    path: Union[str, Path],
+    file_name: str,
+    *,
+    column_types: Optional[List[Dict[str, object]]] = None,
+    sheet_name: Optional[Union[str, int]] = None,
+    schema: Optional[FileSchema] = None,
+) -> Future:
+    """
+    Start reading a lookup into the :func:`load_lookup_file` cache on ``executor``.
+
+    Pass exactly the arguments the tagging helper will pass to
+    :func:`load_lookup_file`, so its call finds the prefetched frame. A lookup
+    that is already cached or being read is not read again.
+
+    Returns
+    -------
+    Future
+        Resolves to the loaded frame (not a copy; do not modify it).
+    """
+    key = _lookup_cache_key(Path(path) / file_name, column_types, sheet_name, schema)
+
+    def load() -> pd.DataFrame:
+        df = load_excel_file(path, file_name, column_types=column_types, sheet_name=sheet_name, schema=schema)
+        with _LOOKUP_CACHE_LOCK:
+            _LOOKUP_CACHE[key] = df
+        return df
+
+    def forget(done: Future) -> None:
+        with _LOOKUP_CACHE_LOCK:
+            if _LOOKUP_PENDING.get(key) is done:
+                del _LOOKUP_PENDING[key]
+
+    with _LOOKUP_CACHE_LOCK:
+        if key in _LOOKUP_CACHE:
+            future: Future = Future()
+            future.set_result(_LOOKUP_CACHE[key])
+            return future
+        if key in _LOOKUP_PENDING:
+            return _LOOKUP_PENDING[key]
+        future = executor.submit(load)
+        _LOOKUP_PENDING[key] = future
+    future.add_done_callback(forget)
+    return future
+
+
+def seed_lookup_cache(
+    df: pd.DataFrame,
+    path: Union[str, Path],
+    file_name: str,
+    *,
+    column_types: Optional[List[Dict[str, object]]] = None,
+    sheet_name: Optional[Union[str, int]] = None,
+    schema: Optional[FileSchema] = None,
+) -> None:
+    """
+    Cache ``df`` as the result of the matching :func:`load_lookup_file` call.
+
+    Used for frames loaded elsewhere, e.g. attached from shared memory by a
+    worker process. ``df`` must be what the loader would return for the file
+    as it is now; the key records the file's current size and mtime.
+    """
+    key = _lookup_cache_key(Path(path) / file_name, column_types, sheet_name, schema)
+    with _LOOKUP_CACHE_LOCK:
+        _LOOKUP_CACHE[key] = df
+
+
+def clear_lookup_cache() -> None:
+    """Drop every cached lookup frame."""
+    with _LOOKUP_CACHE_LOCK:
+        _LOOKUP_CACHE.clear()
+
+
+# Chunked reading ------------------------------------------------------------
+#
+# Type inference runs per chunk, so a column can come out int64 in one chunk
+# and object in another where the whole-file read would type it once. Chunks
+# are therefore parsed in two passes: the first records each column's dtype
+# per chunk, the dtypes are resolved the way the whole-file parser would have
+# typed the column, and the second pass yields chunks cast to those dtypes.
+
+_OBJECT_SENTINEL = "<not a number>"
+
+
+def _dtype_representative(values: pd.Series) -> Any:
+    """A value the parser infers like ``values``; mixing representatives reproduces whole-column inference."""
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.infer_dtype(values, skipna=True) == "boolean":
+        return True
+    if pd.api.types.is_integer_dtype(dtype):
+        return 0
+    if pd.api.types.is_float_dtype(dtype):
+        return 0.5
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return pd.Timestamp("2000-01-01").to_pydatetime()
+    return _OBJECT_SENTINEL
+
+
+def _record_chunk_dtypes(seen: Dict[str, Dict[Any, None]], chunk: pd.DataFrame, columns: List[str]) -> None:
+    for col in columns:
+        values = chunk[col]
+        representatives = seen.setdefault(col, {})
+        if values.notna().any():
+            representatives.setdefault(_dtype_representative(values), None)
+        if values.isna().any():
+            representatives.setdefault("", None)
+
+
+def _record_text_columns(text: Dict[str, bool], chunk: pd.DataFrame) -> None:
+    """Track which columns held only strings in every chunk (see ``convert_to_arrow_strings``)."""
+    for col in chunk.columns:
+        values = chunk[col]
+        if not values.notna().any() or text.get(col) is False:
+            continue
+        text[col] = values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) == "string"
+
+
+def _arrow_text_columns(text: Dict[str, bool], dtypes: Dict[str, Any]) -> List[str]:
+    """Columns to yield as Arrow strings: text in every chunk and object in the whole file."""
+    if not arrow_strings_enabled():
+        return []
+    return [col for col, is_text in text.items() if is_text and dtypes.get(col, np.dtype(object)) == object]
+
+
+def _resolve_dtypes(seen: Dict[str, Dict[Any, None]], csv: bool) -> Dict[str, np.dtype]:
+    """Infer each column's whole-file dtype from the representatives of its chunk dtypes."""
+    if not seen:
+        return {}
+    columns = list(seen)
+    height = max(len(values) for values in seen.values())
+    rows = [
+        [list(seen[col])[i] if i < len(seen[col]) else list(seen[col])[0] for col in columns]
+        for i in range(height)
+    ]
+    if not csv:
+        return TextParser(rows, header=None, names=columns, skip_blank_lines=False).read().dtypes.to_dict()
+
+    buffer = io.StringIO()
+    # The padding column keeps rows of empty representatives from reading as blank lines.
+    pd.DataFrame(rows, columns=columns).assign(_pad=0).to_csv(buffer, index=False)
+    buffer.seek(0)
+    resolved = pd.read_csv(buffer, low_memory=False).drop(columns="_pad").dtypes.to_dict()
+    # The C parser keeps booleans mixed with missing values as Python objects;
+    # leave such columns to per-chunk inference instead of reading them as strings.
+    return {
+        col: dtype
+        for col, dtype in resolved.items()
+        if not (dtype == object and True in seen[col] and _OBJECT_SENTINEL not in seen[col])
+    }
+
+
+def _cast_raw_column(values: pd.Series, dtype: np.dtype) -> pd.Series:
+    """Convert a column parsed as raw objects to the resolved whole-file dtype."""
+    if dtype == object:
+        return values
+    if pd.api.types.is_bool_dtype(dtype):
+        return values.astype(bool)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return pd.to_datetime(values).astype(dtype)
+    return pd.to_numeric(values).astype(dtype)
+
+
+def _excel_value(value: Any, data_type: str) -> Any:
+    """Cell conversion used by pandas' openpyxl reader."""
+    if value is None:
+        return ""
+    if data_type == "e":
+        return np.nan
+    if data_type == "n":
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+def _excel_cell_value(cell) -> Any:
+    return _excel_value(cell.value, cell.data_type)
+
+
+def _iter_sheet_rows(file_path: Path, sheet_name: Optional[Union[str, int]]) -> Iterator[list]:
+    """Yield converted sheet rows like pandas does (trailing empty cells and rows trimmed)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[sheet_name or 0] if not isinstance(sheet_name, str) else workbook[sheet_name]
+        sheet.reset_dimensions()
+        blank_rows = []
+        for row in sheet.rows:
+            values = [_excel_cell_value(cell) for cell in row]
+            while values and values[-1] == "":
+                values.pop()
+            if not values:
+                blank_rows.append(values)
+                continue
+            yield from blank_rows
+            blank_rows.clear()
+            yield values
+    finally:
+        workbook.close()
+
+
+def iter_sheet_batches(file_path: Path, sheet_name, chunk_rows: int) -> Iterator[Tuple[list, List[list]]]:
+    """Yield ``(header, rows)`` batches padded to the header width."""
+    rows = _iter_sheet_rows(file_path, sheet_name)
+    header = next(rows, None)
+    if header is None:
+        return
+    width = len(header)
+    batch = []
+    for row in rows:
+        if len(row) > width:
+            raise ValueError(
+                f"{file_path.name}: a row has more cells ({len(row)}) than the header ({width}); "
+                "load the file without chunking"
+            )
+        batch.append(row + [""] * (width - len(row)))
+        if len(batch) >= chunk_rows:
+            yield header, batch
+            batch = []
+    if batch:
+        yield header, batch
+
+
+def _parse_sheet_batch(
+    batch: List[list],
+    names: List[str],
+    column_types: Optional[List[Dict[str, object]]],
+    seen: Dict[str, Dict[Any, None]],
+    text: Dict[str, bool],
+) -> pd.DataFrame:
+    """
+    Parse rows of converted cell values, keeping untyped columns as raw objects.
+
+    The dtype each untyped column would get from these rows alone is recorded
+    in ``seen`` (and text columns in ``text``); casting the raw columns to
+    ``_resolve_dtypes(seen)`` afterwards gives the whole-sheet dtypes.
+    """
+    dtype_dict, parse_dates, converters = _column_type_options(column_types)
+    typed = set(dtype_dict) | set(parse_dates) | set(converters)
+    untyped = [col for col in names if col not in typed]
+    options = dict(header=None, names=names, parse_dates=(parse_dates or None), skip_blank_lines=False)
+    inferred = TextParser(batch, dtype=(dtype_dict or None), converters=(converters or None), **options).read()
+    _record_chunk_dtypes(seen, inferred, untyped)
+    _record_text_columns(text, inferred)
+    del inferred
+    return TextParser(
+        batch,
+        dtype={**{col: object for col in untyped}, **dtype_dict},
+        converters=(converters or None),
+        **options,
+    ).read()
+
+
+def _iter_excel_sheet_chunks(
+    file_path: Path,
+    column_types: Optional[List[Dict[str, object]]],
+    sheet_name: Optional[Union[str, int]],
+    chunk_rows: int,
+) -> Iterator[pd.DataFrame]:
+    seen: Dict[str, Dict[Any, None]] = {}
+    text: Dict[str, bool] = {}
+
+    with spill_directory(prefix="xlsx-chunks-") as spill_dir:
+        spilled = []
+        names: Optional[List[str]] = None
+        for header, batch in iter_sheet_batches(file_path, sheet_name, chunk_rows):
+            check_memory_budget(f"Loading {file_path.name}")
+            if names is None:
+                names = list(TextParser([header], header=0).read().columns)
+            raw = _parse_sheet_batch(batch, names, column_types, seen, text)
+            spill_path = spill_dir / f"chunk_{len(spilled):06d}.pkl"
+            raw.to_pickle(spill_path, protocol=pickle.HIGHEST_PROTOCOL)
+            spilled.append(spill_path)
+            del raw, batch
+
+        dtypes = _resolve_dtypes(seen, csv=False)
+        arrow_columns = _arrow_text_columns(text, dtypes)
+        for spill_path in spilled:
+            chunk = pd.read_pickle(spill_path)
+            spill_path.unlink()
+            chunk = chunk.assign(**{col: _cast_raw_column(chunk[col], dtype) for col, dtype in dtypes.items()})
+            chunk = _finalize_int_columns(chunk, column_types)
+            yield chunk.astype({col: ARROW_STRING_DTYPE for col in arrow_columns}) if arrow_columns else chunk
+
+
+# Parallel sheet parsing -----------------------------------------------------
+#
+# The worksheet XML is cut into row ranges (see xlsx_reader.split_sheet_rows).
+# Each worker parses its range into raw-object chunks exactly as the chunked
+# reader does, recording the dtype each column would get; the parent stitches
+# the chunks back in row order, re-inserting the blank rows between ranges,
+# and casts them to the whole-sheet dtypes.
+
+
+def _row_values(cells: List[dict]) -> list:
+    """Converted values of one parsed row, as pandas builds them from a read-only sheet."""
+    if not cells:
+        return []
+    width = cells[-1]["column"]
+    values: list = [""] * width
+    for cell in cells:
+        if 1 <= cell["column"] <= width:
+            values[cell["column"] - 1] = _excel_value(cell["value"], cell["data_type"])
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+def _parse_sheet_range(
+    ranges: SheetRowRanges,
+    index: int,
+    names: List[str],
+    column_types: Optional[List[Dict[str, object]]],
+) -> Optional[tuple]:
+    """
+    Worker: parse one row range below the header row.
+
+    Returns ``(first row, last row, first data row, last data row, raw chunk,
+    seen, text)``, or None if a row is wider than the header (pandas would
+    then add columns, which the ranges cannot agree on).
+    """
+    width = len(names)
+    batch: List[list] = []
+    first = last = first_data = last_data = None
+    for number, cells in iter_range_rows(ranges, index):
+        # Row 1 is the header; openpyxl skips rows numbered at or below one already read.
+        if number <= 1 or (last is not None and number <= last):
+            continue
+        first = number if first is None else first
+        last = number
+        values = _row_values(cells)
+        if not values:
+            continue
+        if len(values) > width:
+            return None
+        if last_data is not None:
+            batch.extend([""] * width for _ in range(number - last_data - 1))
+        batch.append(values + [""] * (width - len(values)))
+        first_data = number if first_data is None else first_data
+        last_data = number
+    seen: Dict[str, Dict[Any, None]] = {}
+    text: Dict[str, bool] = {}
+    raw = _parse_sheet_batch(batch, names, column_types, seen, text) if batch else None
+    return first, last, first_data, last_data, raw, seen, text
 
 
+def read_excel_sheet_parallel(
+    file_path: Union[str, Path],
+    sheet_name: Optional[Union[str, int]] = None,
+    *,
+    column_types: Optional[List[Dict[str, object]]] = None,
+    workers: int = 2,
+    min_sheet_bytes: int = PARALLEL_MIN_SHEET_BYTES,
+) -> Optional[pd.DataFrame]:
+    """
+    Parse one .xlsx sheet in ``workers`` processes, each taking a range of rows.
+
+    Returns the frame ``pd.read_excel`` builds for the same ``column_types``
+    (before :func:`load_excel_file` finalizes int and Arrow string columns):
+    same rows in the same order, same values and the same inferred dtypes.
+
+    Returns
+    -------
+    pd.DataFrame | None
+        None when the sheet should be read by pandas instead: its XML is
+        smaller than ``min_sheet_bytes``, it has no header in row 1 or no
+        data rows, a data row is wider than the header, its rows are out
+        of order, or the installed openpyxl cannot parse row ranges (a
+        warning is printed).
+    """
+    file_path = Path(file_path)
+    if workers < 2 or sheet_xml_size(file_path, sheet_name) < min_sheet_bytes:
+        return None
+
+    with spill_directory(prefix="xlsx-ranges-") as spill_dir:
+        try:
+            ranges = split_sheet_rows(file_path, sheet_name, workers, spill_dir)
+            if len(ranges.ranges) < 2:
+                return None
+            rows = iter_range_rows(ranges, 0)
+            first_row = next(rows, None)
+            rows.close()
+        except RangeParsingUnavailable as exc:
+            print(f"[ParallelParse] WARNING: {exc}; parsing {file_path.name} in one process.")
+            return None
+        header = _row_values(first_row[1]) if first_row is not None and first_row[0] == 1 else []
+        if not header:
+            return None
+        names = list(TextParser([header], header=0).read().columns)
+
+        # Spawned workers are safe alongside the caller's threads (e.g. lookup prefetch).
+        context = multiprocessing.get_context("spawn")
+        parts = len(ranges.ranges)
+        with ProcessPoolExecutor(max_workers=min(workers, parts), mp_context=context) as pool:
+            results = list(
+                pool.map(_parse_sheet_range, repeat(ranges), range(parts), repeat(names), repeat(column_types))
+            )
+
+    seen: Dict[str, Dict[Any, None]] = {}
+    text: Dict[str, bool] = {}
+    chunks: List[pd.DataFrame] = []
+    last, last_data = 1, 1
+    for result in results:
+        if result is None:
+            return None
+        first, range_last, first_data, range_last_data, raw, chunk_seen, chunk_text = result
+        if first is None:
+            continue
+        if first <= last:
+            return None
+        last = range_last
+        if raw is None:
+            continue
+        if first_data > last_data + 1:
+            blank = [[""] * len(names) for _ in range(first_data - last_data - 1)]
+            chunks.append(_parse_sheet_batch(blank, names, column_types, seen, text))
+        for col, representatives in chunk_seen.items():
+            merged = seen.setdefault(col, {})
+            for representative in representatives:
+                merged.setdefault(representative, None)
+        for col, is_text in chunk_text.items():
+            if text.get(col) is not False:
+                text[col] = is_text
+        chunks.append(raw)
+        last_data = range_last_data
+    if not chunks:
+        return None
+
+    # Concatenated as frames, a chunk whose column is all missing (e.g. NaT from the
+    # "date" converter) would be filled with NaN; Series keep the parsed values.
+    df = pd.DataFrame({col: pd.concat([chunk[col] for chunk in chunks], ignore_index=True) for col in names})
+    del chunks
+    dtypes = _resolve_dtypes(seen, csv=False)
+    return df.assign(**{col: _cast_raw_column(df[col], dtype) for col, dtype in dtypes.items()})
+
+
+def _iter_csv_chunks(
+    file_path: Path,
+    column_types: Optional[List[Dict[str, object]]],
+    chunk_rows: int,
+) -> Iterator[pd.DataFrame]:
+    dtype_dict, parse_dates, converters = _column_type_options(column_types)
+    options = dict(parse_dates=(parse_dates or None), converters=(converters or None), chunksize=chunk_rows)
+    typed = set(dtype_dict) | set(parse_dates) | set(converters)
+
+    seen: Dict[str, Dict[Any, None]] = {}
+    text: Dict[str, bool] = {}
+    with pd.read_csv(file_path, dtype=(dtype_dict or None), low_memory=False, **options) as reader:
+        for chunk in reader:
+            check_memory_budget(f"Scanning {file_path.name}")
+            _record_chunk_dtypes(seen, chunk, [col for col in chunk.columns if col not in typed])
+            _record_text_columns(text, chunk)
+    resolved = _resolve_dtypes(seen, csv=True)
+    boolean_objects = [col for col in seen if col not in resolved]
+    dtypes = {**resolved, **dtype_dict}
+    arrow_columns = _arrow_text_columns(text, resolved)
+
+    with pd.read_csv(file_path, dtype=(dtypes or None), **options) as reader:
+        for chunk in reader:
+            check_memory_budget(f"Loading {file_path.name}")
+            chunk = chunk.assign(
+                **{col: chunk[col].astype(object) for col in boolean_objects if chunk[col].dtype == bool}
+            )
+            chunk = _finalize_int_columns(chunk, column_types)
+            yield chunk.astype({col: ARROW_STRING_DTYPE for col in arrow_columns}) if arrow_columns else chunk
+
+
+def iter_excel_chunks(
+    path: Union[str, Path],
+    file_name: str,
+    *,
+    column_types: Optional[List[Dict[str, object]]] = None,
+    sheet_name: Optional[Union[str, int]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    schema: Optional[FileSchema] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream an Excel or CSV file as DataFrames of at most ``chunk_rows`` rows.
+
+    Same parameters as :func:`load_excel_file`. Concatenating the chunks
+    gives the frame :func:`load_excel_file` returns, including the inferred
+    dtype of every column, while only one chunk is held in memory. Excel
+    chunks are parsed once and spilled to a temporary directory while the
+    column dtypes are resolved; CSV files are scanned twice instead.
+    With ``schema``, every chunk is validated as it is yielded (key
+    uniqueness within the chunk).
+
+    Yields
+    ------
+    pd.DataFrame
+        Consecutive chunks with a fresh RangeIndex each.
+    """
+    file_path = Path(path) / file_name
+    if not file_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {file_path}")
+    if schema is not None and column_types is None:
+        column_types = schema.column_types()
+    if file_path.suffix.lower() == ".csv":
+        chunks = _iter_csv_chunks(file_path, column_types, chunk_rows)
+    else:
+        chunks = _iter_excel_sheet_chunks(file_path, column_types, sheet_name, chunk_rows)
+    for chunk in chunks:
+        yield schema.validate(chunk) if schema is not None else chunk
+
+
+# Number formats of the cells the write-only writers style (see _register_excel_styles).
+_DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+_DATE_FORMAT = "YYYY-MM-DD"
+_TIMEDELTA_FORMAT = "0"
+
+
+def _excel_header_cell(sheet, value: Any):
+    """Header cell styled like pandas' ``to_excel`` header."""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.font = Font(bold=True)
+    thin = Side(style="thin")
+    cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    cell.alignment = Alignment(horizontal="center", vertical="top")
+    return cell
+
+
+def _excel_column_values(sheet, values: pd.Series) -> list:
+    """Convert a column chunk to cell values the way pandas' Excel writer does."""
+    from openpyxl.cell import WriteOnlyCell
+
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        converted = []
+        for value in values.dt.tz_localize(None) if values.dt.tz is not None else values:
+            if pd.isna(value):
+                converted.append(None)
+            else:
+                cell = WriteOnlyCell(sheet, value=value.to_pydatetime())
+                cell.number_format = _DATETIME_FORMAT
+                converted.append(cell)
+        return converted
+
+    converted = []
+    for value in values.astype(object).tolist():
+        if value is None or value is pd.NaT or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+            converted.append(None)
+        elif isinstance(value, (bool, np.bool_)):
+            converted.append(bool(value))
+        elif isinstance(value, (int, np.integer)):
+            converted.append(int(value))
+        elif isinstance(value, (float, np.floating)):
+            converted.append(("-inf" if value < 0 else "inf") if np.isinf(value) else float(value))
+        elif isinstance(value, str):
+            converted.append(value)
+        elif isinstance(value, datetime.datetime):
+            cell = WriteOnlyCell(sheet, value=pd.Timestamp(value).tz_localize(None).to_pydatetime())
+            cell.number_format = _DATETIME_FORMAT
+            converted.append(cell)
+        elif isinstance(value, datetime.date):
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.number_format = _DATE_FORMAT
+            converted.append(cell)
+        elif isinstance(value, datetime.timedelta):
+            cell = WriteOnlyCell(sheet, value=value.total_seconds() / 86400)
+            cell.number_format = _TIMEDELTA_FORMAT
+            converted.append(cell)
+        else:
+            converted.append(str(value))
+    return converted
+
+
+def _append_frame_rows(
+    sheet,
+    df: pd.DataFrame,
+    chunk_rows: int,
+    file_name: str,
+    rows: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Append the header and rows of ``df`` to a write-only sheet, ``chunk_rows`` rows at a time.
+
+    ``rows`` selects the row positions to write, in order (default: every
+    row); only one chunk of them is taken from ``df`` at a time.
+    """
+    sheet.append([
+        _excel_header_cell(sheet, col if isinstance(col, (str, int, float)) else str(col)) for col in df.columns
+    ])
+    for start in range(0, len(df) if rows is None else len(rows), chunk_rows):
+        check_memory_budget(f"Writing {file_name}")
+        chunk = df.iloc[start:start + chunk_rows] if rows is None else df.iloc[rows[start:start + chunk_rows]]
+        columns = [_excel_column_values(sheet, chunk.iloc[:, i]) for i in range(chunk.shape[1])]
+        for row in zip(*columns):
+            sheet.append(row)
+
+
+def _write_excel_streaming(df: pd.DataFrame, file_path: Path, sheet_name: str, chunk_rows: int) -> None:
+    """Write ``df`` through a write-only workbook, converting ``chunk_rows`` rows at a time."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    _append_frame_rows(sheet, df, chunk_rows, file_path.name)
+    workbook.save(file_path)
+
+
+# Parallel workbook assembly -------------------------------------------------
+#
+# openpyxl's write-only sheets hold their strings inline, so a sheet's XML
+# part depends on the rest of the workbook only through the ids of its cell
+# styles. Registering the same styles in the same order before any row is
+# written gives every sheet, and the skeleton workbook the parts are
+# assembled into, the same style table.
+
+
+def _register_excel_styles(sheet) -> None:
+    """Give the styles the write-only writers use fixed ids: the header style, then each number format."""
+    from openpyxl.cell import WriteOnlyCell
+
+    cells = [_excel_header_cell(sheet, None)]
+    for number_format in (_DATETIME_FORMAT, _DATE_FORMAT, _TIMEDELTA_FORMAT):
+        cell = WriteOnlyCell(sheet)
+        cell.number_format = number_format
+        cells.append(cell)
+    for cell in cells:
+        sheet.parent._cell_styles.add(cell._style)
+
+
+def _serialize_sheet(df: pd.DataFrame, sheet_name: str, chunk_rows: int, part_path: str) -> str:
+    """Worker: write the worksheet XML part of ``df`` to ``part_path``."""
+    from openpyxl import Workbook
+    from openpyxl.worksheet._writer import WorksheetWriter
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    _register_excel_styles(sheet)
+    # Stream the part straight to its file instead of openpyxl's temporary file.
+    sheet._writer = WorksheetWriter(sheet, out=part_path)
+    sheet._writer.write_top()
+    _append_frame_rows(sheet, convert_from_arrow_strings(df), chunk_rows, sheet_name)
+    sheet.close()
+    return part_path
+
+
+@traced(category="io", attributes=("file_name",))
+def write_sheets_to_excel(
+    sheets: Mapping[str, pd.DataFrame],
+    path: str | Path,
+    file_name: str,
+    *,
+    index: bool = False,
+    workers: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Path:
+    """
+    Write several DataFrames as the sheets of one new Excel workbook.
+
+    Each sheet's XML is serialized in its own worker process and the xlsx
+    container is assembled once from the parts, so the write costs about as
+    much as the largest sheet, instead of a ``write_df_to_excel(..., mode="a")``
+    reload and re-save of the whole workbook per sheet.
+
+    Parameters
+    ----------
+    sheets : Mapping[str, pd.DataFrame]
+        Sheet name -> DataFrame, in workbook order.
+    path : str | Path
+        Directory where the file will be saved.
+    file_name : str
+        Name of the Excel file (e.g., 'output.xlsx'); an existing file is replaced.
+    index : bool, default False
+        Whether to write each DataFrame's index.
+    workers : int, optional
+        Worker processes (default: one per sheet, at most one per CPU). With
+        one worker the sheets are serialized in this process.
+    chunk_rows : int, default 50,000
+        Rows converted per step while serializing a sheet.
+
+    Returns
+    -------
+    Path
+        The full path to the written Excel file.
+
+    Raises
+    ------
+    ValueError
+        If ``sheets`` is empty or a sheet name is not valid in Excel (too
+        long, reserved characters, or a case-insensitive duplicate).
+
+    Notes
+    -----
+    Cells are written as the streaming writer of :func:`write_df_to_excel`
+    writes them (pandas' header style and number formats). The workbook is
+    written next to the destination and swapped in, like a new file there.
+    """
+    from openpyxl import Workbook
+
+    if not sheets:
+        raise ValueError("No sheets to write")
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    file_path = path / file_name
+    names = list(sheets)
+
+    skeleton = Workbook(write_only=True)
+    for name in names:
+        if skeleton.create_sheet(title=name).title != name:
+            raise ValueError(f"Duplicate sheet name (Excel ignores case): '{name}'")
+    _register_excel_styles(skeleton.worksheets[0])
+    check_memory_budget(f"Writing {file_name}")
+
+    tmp_path = file_path.with_name(f".{file_path.stem}.tmp{file_path.suffix}")
+    with spill_directory(prefix="xlsx-sheets-") as spill_dir:
+        skeleton_path = spill_dir / "skeleton.xlsx"
+        skeleton.save(skeleton_path)
+        part_paths = [str(spill_dir / f"sheet_{i:03d}.xml") for i in range(len(names))]
+        frames = [df.reset_index() if index else df for df in sheets.values()]
+        arguments = (frames, names, repeat(chunk_rows), part_paths)
+        workers = min(workers or os.cpu_count() or 1, len(names))
+        if workers > 1:
+            # Spawned workers are safe alongside the caller's threads (e.g. lookup prefetch).
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                list(pool.map(_serialize_sheet, *arguments))
+        else:
+            list(map(_serialize_sheet, *arguments))
+        del frames
+
+        # The skeleton holds every sheet, empty and in order; swap in the serialized parts.
+        parts = {sheet.path[1:]: part for sheet, part in zip(skeleton.worksheets, part_paths)}
+        try:
+            with zipfile.ZipFile(skeleton_path) as source, \
+                    zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    if info.filename in parts:
+                        target.write(parts[info.filename], info.filename)
+                    else:
+                        target.writestr(info, source.read(info))
+            os.replace(tmp_path, file_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    print(f"✅ DataFrames written successfully to: {file_path} (Sheets: {', '.join(names)})")
+    return file_path
+
+
+# Oversize frames ------------------------------------------------------------
+#
+# A frame with more rows than an Excel sheet holds is written in parts
+# (numbered sheets of one workbook, or numbered workbooks) by the streaming
+# writer, with a JSON manifest of the parts next to the output.
+
+
+def manifest_path_for(file_path: Union[str, Path]) -> Path:
+    """The manifest :func:`write_df_to_excel` writes next to ``file_path`` when it splits the output."""
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.stem}.parts.json")
+
+
+def _split_rows(
+    df: pd.DataFrame,
+    split_key: Optional[Union[str, Sequence[str]]],
+    capacity: int,
+) -> Tuple[Optional[np.ndarray], List[Tuple[int, int]]]:
+    """
+    Plan the parts of an oversize frame: ``(row order, [(start, stop), ...])``.
+
+    Without ``split_key`` the rows are cut every ``capacity`` rows. With it,
+    parts end only where the key changes. Rows sharing a key that are not
+    adjacent are brought together (groups in order of first appearance, rows
+    in their original order); the order is then a position array, and None
+    when the frame's own order already keeps every key together.
+    """
+    n = len(df)
+    if split_key is None:
+        return None, [(start, min(start + capacity, n)) for start in range(0, n, capacity)]
+    keys = [split_key] if isinstance(split_key, str) else list(split_key)
+    missing = [key for key in keys if key not in df.columns]
+    if missing:
+        raise KeyError(f"Split key column(s) not found: {missing}")
+    codes = df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    order = None
+    if (np.diff(codes) < 0).any():
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+    # Exclusive end position of each key group.
+    ends = np.append(np.flatnonzero(codes[1:] != codes[:-1]) + 1, n)
+    parts, start = [], 0
+    while start < n:
+        # Number of groups ending within this part's capacity; the part ends after the last of them.
+        fitting = np.searchsorted(ends, start + capacity, side="right")
+        stop = ends[fitting - 1] if fitting else start
+        if stop <= start:
+            raise ValueError(
+                f"Rows sharing one {keys} value do not fit in one sheet of {capacity:,} rows; "
+                "choose a finer split key"
+            )
+        parts.append((start, int(stop)))
+        start = int(stop)
+    return order, parts
+
+
+def _write_excel_parts(
+    df: pd.DataFrame,
+    file_path: Path,
+    sheet_name: str,
+    split: str,
+    split_key: Optional[Union[str, Sequence[str]]],
+    max_rows: int,
+    chunk_rows: int,
+) -> Path:
+    """Write an oversize frame in parts and their manifest; returns the workbook ("sheets") or manifest path."""
+    from openpyxl import Workbook
+
+    order, parts = _split_rows(df, split_key, max_rows - 1)
+    width = len(str(len(parts)))
+    if split == "sheets":
+        targets = [(file_path, f"{sheet_name[:31 - width - 1]}_{i:0{width}d}") for i in range(1, len(parts) + 1)]
+    else:
+        targets = [
+            (file_path.with_name(f"{file_path.stem}_{i:0{width}d}{file_path.suffix}"), sheet_name)
+            for i in range(1, len(parts) + 1)
+        ]
+
+    keys = [] if split_key is None else [split_key] if isinstance(split_key, str) else list(split_key)
+    key_values = df[keys] if keys else None
+    entries = []
+    workbook = None
+    for (start, stop), (target, target_sheet) in zip(parts, targets):
+        if workbook is None:
+            workbook = Workbook(write_only=True)
+        rows = np.arange(start, stop) if order is None else order[start:stop]
+        sheet = workbook.create_sheet(title=target_sheet)
+        _append_frame_rows(sheet, df, chunk_rows, target.name, rows=rows)
+        entry = {"file": target.name, "sheet": target_sheet, "rows": stop - start}
+        if key_values is not None:
+            entry["first_key"] = key_values.iloc[rows[0]].tolist()
+            entry["last_key"] = key_values.iloc[rows[-1]].tolist()
+        entries.append(entry)
+        if split == "files" or stop == len(df):
+            tmp_path = target.with_name(f".{target.stem}.tmp{target.suffix}")
+            try:
+                workbook.save(tmp_path)
+                os.replace(tmp_path, target)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            workbook = None
+
+    manifest_path = manifest_path_for(file_path)
+    manifest = {
+        "rows": len(df),
+        "columns": [str(col) for col in df.columns],
+        "split": split,
+        "split_key": keys,
+        "max_rows": max_rows,
+        "parts": entries,
+    }
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, default=str))
+    os.replace(tmp_path, manifest_path)
+    return file_path if split == "sheets" else manifest_path
+
+
+@traced(category="io", attributes=("file_name", "sheet_name"))
 def write_df_to_excel(
     df: pd.DataFrame,
     path: str | Path,
     file_name: str,
     sheet_name: str = "Sisense",
     index: bool = False,
-    mode: str = "w"
+    mode: str = "w",
+    *,
+    streaming: Optional[bool] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    split: str = "sheets",
+    split_key: Optional[Union[str, Sequence[str]]] = None,
+    max_rows: int = EXCEL_MAX_ROWS,
 ) -> Path:
     """
     Writes a pandas DataFrame to an Excel file.
@@ -129,30 +1137,99 @@ def write_df_to_excel(
     mode : {'w', 'a'}, default 'w'
         File mode: 'w' = write (overwrite existing file),
                    'a' = append as a new sheet if file exists.
+    streaming : bool, optional
+        Write rows ``chunk_rows`` at a time through openpyxl's write-only
+        workbook instead of building every cell in memory first. By default
+        this is chosen automatically when a memory budget is active and the
+        in-memory writer would exceed it.
+    chunk_rows : int, default 50,000
+        Rows converted per step when streaming.
+    split : {'sheets', 'files'}, default 'sheets'
+        How a frame with more rows than a sheet holds is written:
+        'sheets' = numbered sheets ``<sheet_name>_1``, ``<sheet_name>_2``, ...
+                   of ``file_name``,
+        'files' = numbered workbooks ``<stem>_1.xlsx``, ``<stem>_2.xlsx``, ...
+                  each with one ``sheet_name`` sheet.
+    split_key : str | list[str], optional
+        Column(s) whose rows must stay in one part (e.g. the order or job
+        number). Parts then end only where the key changes.
+    max_rows : int, default 1,048,576
+        Rows per sheet, header included (Excel's limit).
 
     Returns
     -------
     Path
-        The full path to the written Excel file.
+        The full path to the written Excel file; the manifest when the frame
+        was split into files.
+
+    Raises
+    ------
+    KeyError
+        If a ``split_key`` column is missing.
+    ValueError
+        If an oversize frame is appended, or the rows of one key exceed a sheet.
 
     Notes
     -----
     - Creates the directory if it doesn’t exist.
-    - When mode='a', appends new sheet using openpyxl engine.
+    - A frame too large for one sheet is streamed into parts with the same
+      header, and ``<stem>.parts.json`` (:func:`manifest_path_for`) lists
+      each part's file, sheet, row count and first and last key. Rows that
+      share a key but are not adjacent are written together, in the order
+      each key first appears.
+    - When mode='a', appends new sheet using openpyxl engine. This reloads
+      and re-saves the whole workbook; to write several sheets, use
+      :func:`write_sheets_to_excel`.
+    - New files are written next to the destination and swapped in, so a
+      failed write never leaves a truncated workbook behind.
+    - Arrow string columns are converted to Python strings here, the only
+      place the pipelines need them as objects.
     """
     path = Path(path)
     path.mkdir(parents=True, exist_ok=True)
+    df = convert_from_arrow_strings(df)
 
     file_path = path / file_name
     engine = "openpyxl"
+    appending = mode == "a" and file_path.exists()
+
+    if split not in ("sheets", "files"):
+        raise ValueError(f"split must be 'sheets' or 'files', not {split!r}")
+    if len(df) + 1 > max_rows:
+        if appending:
+            raise ValueError(f"Cannot append {len(df):,} rows as one sheet; write the frame to its own file")
+        written = _write_excel_parts(
+            df.reset_index() if index else df, file_path, sheet_name, split, split_key, max_rows, chunk_rows
+        )
+        print(f"✅ DataFrame of {len(df):,} rows split by {split} to: {written}")
+        return written
+    if not appending:
+        # A manifest left by an earlier split run would describe parts this file replaces.
+        manifest_path_for(file_path).unlink(missing_ok=True)
+
+    budget = current_budget()
+    if streaming is None:
+        streaming = budget is not None and not appending and not budget.fits(excel_write_bytes(df))
+    if streaming and appending:
+        raise ValueError("Streaming writes cannot append a sheet to an existing workbook")
+    if not streaming:
+        check_memory_budget(f"Writing {file_name}", excel_write_bytes(df))
 
     # Handle writing or appending
-    if mode == "a" and file_path.exists():
+    if appending:
         with pd.ExcelWriter(file_path, mode="a", engine=engine, if_sheet_exists="replace") as writer:
             df.to_excel(writer, sheet_name=sheet_name, index=index)
     else:
-        with pd.ExcelWriter(file_path, mode="w", engine=engine) as writer:
-            df.to_excel(writer, sheet_name=sheet_name, index=index)
+        tmp_path = file_path.with_name(f".{file_path.stem}.tmp{file_path.suffix}")
+        try:
+            if streaming:
+                _write_excel_streaming(df.reset_index() if index else df, tmp_path, sheet_name, chunk_rows)
+            else:
+                with pd.ExcelWriter(tmp_path, mode="w", engine=engine) as writer:
+                    df.to_excel(writer, sheet_name=sheet_name, index=index)
+            os.replace(tmp_path, file_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
     print(f"✅ DataFrame written successfully to: {file_path} (Sheet: '{sheet_name}')")
     return file_path
@@ -0,0 +1,265 @@
+"""
+Incremental processing for monthly raw drops.
+
+Each raw row is fingerprinted with a vectorized row hash. Rows whose hash
+(or hash multiplicity) differs from the previous run identify the *affected
+keys*; only raw rows carrying those keys are pushed through the tagging
+stages, and the result replaces the matching rows of the previous output.
+
+Working per key rather than per row keeps aggregated partners correct: if
+any member row of a Hearst "Job Number +" group changes, the whole group is
+re-aggregated from the current raw rows. Columns that depend on the run date
+rather than the raw rows (the revenue date) are recomputed on the kept rows
+by the pipeline's ``refresh`` function.
+
+Usage:
+    from src.utils.incremental import run_incremental
+    processed_df = run_incremental(
+        raw_df,
+        process=process,
+        state_dir=get_settings().hearst_state_dir,
+        raw_key_column="Job Number",
+        processed_key_column="Job Number +",
+        signature=file_signature(lookup_files()),
+        refresh=refresh_revenue_date,
+    )
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from src.utils.dataframe_utils import read_parquet_frame, write_parquet_frame
+from src.utils.run_report import diagnostic
+
+STATE_FINGERPRINT_FILE = "raw_fingerprints.parquet"
+STATE_PROCESSED_FILE = "processed.parquet"
+STATE_META_FILE = "state.json"
+
+
+def hash_rows(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> pd.Series:
+    """
+    Compute a 64-bit fingerprint for every row of ``df``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame to fingerprint.
+    columns : list[str], optional
+        Columns to include. Defaults to all columns, sorted by name so the
+        fingerprint does not depend on column order in the source file.
+
+    Returns
+    -------
+    pd.Series
+        uint64 hashes aligned to ``df.index``.
+    """
+    cols = sorted(df.columns) if columns is None else list(columns)
+    return pd.util.hash_pandas_object(df[cols], index=False)
+
+
+def normalize_key(series: pd.Series) -> pd.Series:
+    """Normalize key values so raw ints, floats and strings compare equal."""
+    return (
+        series.astype(str)
+        .str.strip()
+        .str.replace(r"\.0+$", "", regex=True)
+    )
+
+
+def file_signature(files: Iterable[Union[str, Path]]) -> str:
+    """
+    Describe a set of files by name, size and modification time.
+
+    Used to detect lookup edits between runs; missing files are recorded as such.
+    """
+    parts = []
+    for file in sorted(Path(f) for f in files):
+        if file.exists():
+            stat = file.stat()
+            parts.append(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns}")
+        else:
+            parts.append(f"{file.name}:missing")
+    return "|".join(parts)
+
+
+def frame_signature(name: str, df: pd.DataFrame) -> str:
+    """
+    Describe a lookup frame by its content.
+
+    For lookups that live inside the raw workbook (e.g. the Hearst Pub
+    Market List), whose file signature changes with every raw drop.
+    """
+    digest = hashlib.sha256(hash_rows(df).to_numpy().tobytes()).hexdigest()[:16]
+    return f"{name}:{len(df)}:{digest}"
+
+
+def load_incremental_state(
+    state_dir: Union[str, Path],
+) -> Optional[Tuple[pd.DataFrame, pd.DataFrame, dict]]:
+    """
+    Load the fingerprints, processed output and metadata of the previous run.
+
+    Returns
+    -------
+    tuple | None
+        ``(fingerprints, processed_df, meta)`` or None when no complete state exists.
+    """
+    state_dir = Path(state_dir)
+    paths = [state_dir / name for name in (STATE_FINGERPRINT_FILE, STATE_PROCESSED_FILE, STATE_META_FILE)]
+    if not all(path.exists() for path in paths):
+        return None
+
+    fingerprints = pd.read_parquet(paths[0])
+    processed_df = read_parquet_frame(paths[1])
+    meta = json.loads(paths[2].read_text())
+    return fingerprints, processed_df, meta
+
+
+def save_incremental_state(
+    state_dir: Union[str, Path],
+    *,
+    fingerprints: pd.DataFrame,
+    processed_df: pd.DataFrame,
+    meta: dict,
+) -> Path:
+    """Persist the state of a run; the metadata file is written last so partial saves are ignored."""
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    meta_path = state_dir / STATE_META_FILE
+    if meta_path.exists():
+        meta_path.unlink()
+
+    write_parquet_frame(fingerprints, state_dir / STATE_FINGERPRINT_FILE)
+    write_parquet_frame(processed_df, state_dir / STATE_PROCESSED_FILE)
+
+    tmp_path = meta_path.with_name(f".{meta_path.name}.tmp")
+    tmp_path.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_path, meta_path)
+    return state_dir
+
+
+def find_affected_keys(current: pd.DataFrame, previous: pd.DataFrame) -> pd.Index:
+    """
+    Return the keys whose raw rows were added, removed or changed.
+
+    Both frames hold ``_row_hash`` and ``_key`` columns. Hashes are compared by
+    multiplicity so an extra copy of an identical row still counts as a change
+    (it contributes to aggregated sums).
+    """
+    current_counts = current.groupby("_row_hash").size()
+    previous_counts = previous.groupby("_row_hash").size()
+    counts = pd.concat(
+        [current_counts.rename("current"), previous_counts.rename("previous")],
+        axis=1,
+    ).fillna(0)
+    changed_hashes = counts.index[counts["current"] != counts["previous"]]
+
+    current_keys = current.loc[current["_row_hash"].isin(changed_hashes), "_key"]
+    previous_keys = previous.loc[previous["_row_hash"].isin(changed_hashes), "_key"]
+    return pd.Index(pd.concat([current_keys, previous_keys]).unique())
+
+
+def run_incremental(
+    raw_df: pd.DataFrame,
+    *,
+    process: Callable[[pd.DataFrame], pd.DataFrame],
+    state_dir: Union[str, Path],
+    raw_key_column: str,
+    processed_key_column: str,
+    signature: str = "",
+    refresh: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    diagnostics_prefix: str = "[Incremental]",
+) -> pd.DataFrame:
+    """
+    Process only the raw rows affected since the previous run and merge them into its output.
+
+    Parameters
+    ----------
+    raw_df : pd.DataFrame
+        The full current raw drop.
+    process : callable
+        Partner processing function mapping raw rows to processed rows.
+        It must treat rows sharing ``raw_key_column`` independently of other keys.
+    state_dir : str | Path
+        Directory holding the state of the previous run.
+    raw_key_column : str
+        Raw column identifying the group a row belongs to (e.g. "Job Number").
+    processed_key_column : str
+        Processed column carrying the same key (e.g. "Job Number +" for Hearst).
+    signature : str, default ""
+        Fingerprint of everything besides the raw data that affects the output,
+        typically ``file_signature`` of the lookups. A different signature forces
+        a full run.
+    refresh : callable, optional
+        Recomputes the processed columns that depend on the run date (e.g. the
+        revenue date patch) on the rows kept from the previous output, which
+        must keep their count and order. None when nothing depends on the run
+        date (Houston, Boston).
+    diagnostics_prefix : str, default "[Incremental]"
+        Prefix for progress messages.
+
+    Returns
+    -------
+    pd.DataFrame
+        The full processed output for the current raw drop.
+    """
+    if raw_key_column not in raw_df.columns:
+        raise KeyError(f"Raw DataFrame missing key column: {raw_key_column}")
+
+    raw_keys = normalize_key(raw_df[raw_key_column])
+    fingerprints = pd.DataFrame(
+        {
+            "_row_hash": hash_rows(raw_df).to_numpy(),
+            "_key": raw_keys.to_numpy(),
+        }
+    )
+
+    previous = load_incremental_state(state_dir)
+    if previous is None:
+        diagnostic(diagnostics_prefix, f"No previous state found; processing all {len(raw_df)} rows.")
+        processed_df = process(raw_df)
+    elif previous[2].get("signature") != signature:
+        diagnostic(diagnostics_prefix, f"Lookups changed since the last run; processing all {len(raw_df)} rows.")
+        processed_df = process(raw_df)
+    else:
+        previous_fingerprints, previous_processed, _ = previous
+        if processed_key_column not in previous_processed.columns:
+            raise KeyError(f"Stored processed output missing key column: {processed_key_column}")
+
+        affected_keys = find_affected_keys(fingerprints, previous_fingerprints)
+        delta_mask = raw_keys.isin(affected_keys).to_numpy()
+        diagnostic(diagnostics_prefix, "Affected keys", len(affected_keys))
+        diagnostic(diagnostics_prefix, "Raw rows reprocessed", f"{int(delta_mask.sum())} / {len(raw_df)}")
+
+        kept_mask = ~normalize_key(previous_processed[processed_key_column]).isin(affected_keys)
+        kept_df = previous_processed[kept_mask.to_numpy()]
+        if refresh is not None and len(kept_df):
+            kept_df = refresh(kept_df)
+        if delta_mask.any():
+            delta_df = process(raw_df[delta_mask])
+            processed_df = pd.concat([kept_df, delta_df], ignore_index=True)
+        else:
+            processed_df = kept_df.reset_index(drop=True)
+
+    save_incremental_state(
+        state_dir,
+        fingerprints=fingerprints,
+        processed_df=processed_df,
+        meta={
+            "signature": signature,
+            "raw_key_column": raw_key_column,
+            "processed_key_column": processed_key_column,
+            "raw_rows": len(raw_df),
+            "processed_rows": len(processed_df),
+            "updated_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        },
+    )
+    return processed_df
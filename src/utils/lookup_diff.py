@@ -0,0 +1,309 @@
+"""
+Row-level re-tagging when a shared lookup file changes.
+
+When sales ops edits the Strategic Account List, Strategic Orders or Welcome
+Back List, only processed rows whose normalized key was added, removed or
+changed need new flags. This module diffs the partner's slice of a lookup
+against the snapshot taken at the last run, finds the affected rows through
+a reverse index (normalized key -> processed row positions) and re-applies
+only the relevant tagging helpers to those rows of the stored output.
+
+A lookup whose helpers overwrite processed columns (Boston's OperatorName)
+cannot be re-tagged when keys were removed or changed: the values it
+replaced are gone. The re-tag then stops with :class:`FullRerunRequired`
+before writing anything, so the next ``--incremental`` run sees the new
+lookups and reprocesses every row.
+
+Usage:
+    from src.utils.lookup_diff import LookupRetagger, retag_changed_lookups
+    processed_df = retag_changed_lookups(
+        state_dir=get_settings().hearst_state_dir,
+        retaggers=lookup_retaggers(),
+        partner_name="Hearst",
+        signature=file_signature(lookup_files()),
+    )
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.configs.common_configs import normalize_lookup_key
+from src.utils.dataframe_utils import read_parquet_frame, write_parquet_frame
+from src.utils.excel_file_operations import load_lookup_file
+from src.utils.incremental import (
+    STATE_META_FILE,
+    STATE_PROCESSED_FILE,
+    hash_rows,
+)
+from src.utils.run_report import diagnostic
+
+LOOKUP_SNAPSHOT_DIR = "lookup_snapshots"
+
+
+class FullRerunRequired(ValueError):
+    """Raised when lookup edits cannot be applied by re-tagging the stored output."""
+
+
+@dataclass(frozen=True)
+class LookupRetagger:
+    """
+    Declares how one lookup file feeds a partner's processed output.
+
+    ``key_columns`` pairs processed columns with the lookup columns they are
+    matched against. ``retag`` re-applies the tagging helpers to a subset of
+    processed rows and must preserve row count and order. ``overwrites_columns``
+    lists processed columns the helpers replace irreversibly (e.g. Boston's
+    OperatorName); removed or changed keys of such a lookup need a full rerun.
+    """
+
+    name: str
+    lookup_path: Union[str, Path]
+    file_name: str
+    key_columns: Sequence[Tuple[str, str]]
+    retag: Callable[[pd.DataFrame], pd.DataFrame]
+    sheet_name: Optional[str] = None
+    company_column: str = "Company"
+    strip_decimal_suffix: bool = True
+    overwrites_columns: Sequence[str] = ()
+
+
+@dataclass
+class LookupDiff:
+    """Normalized lookup keys added, removed or changed between two revisions, per lookup column."""
+
+    added: Dict[str, Set[str]] = field(default_factory=dict)
+    removed: Dict[str, Set[str]] = field(default_factory=dict)
+    changed: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def affected_keys(self, lookup_column: str) -> Set[str]:
+        return (
+            self.added.get(lookup_column, set())
+            | self.removed.get(lookup_column, set())
+            | self.changed.get(lookup_column, set())
+        )
+
+    def is_empty(self) -> bool:
+        return not any(self.added.values()) and not any(self.removed.values()) and not any(self.changed.values())
+
+
+def load_partner_lookup(retagger: LookupRetagger, partner_name: str) -> pd.DataFrame:
+    """Load the lookup and keep only the rows whose company mentions ``partner_name``."""
+    lookup_df = load_lookup_file(
+        path=retagger.lookup_path,
+        file_name=retagger.file_name,
+        sheet_name=retagger.sheet_name,
+    )
+    if retagger.company_column not in lookup_df.columns:
+        raise KeyError(f"Lookup '{retagger.file_name}' missing column: {retagger.company_column}")
+
+    partner_mask = (
+        lookup_df[retagger.company_column]
+        .astype(str)
+        .str.casefold()
+        .str.contains(partner_name.casefold(), na=False)
+    )
+    return lookup_df[partner_mask].reset_index(drop=True)
+
+
+def diff_lookup(
+    previous: pd.DataFrame,
+    current: pd.DataFrame,
+    *,
+    lookup_columns: Sequence[str],
+    strip_decimal_suffix: bool = True,
+) -> LookupDiff:
+    """
+    Compare two revisions of a lookup and classify the normalized keys that moved.
+
+    Rows are compared by full-row hash over the columns both revisions share.
+    A key that appears only on rows of the current revision is *added*, only on
+    rows of the previous revision is *removed*, and on both is *changed*.
+    """
+    missing = [col for col in lookup_columns if col not in current.columns or col not in previous.columns]
+    if missing:
+        raise KeyError(f"Lookup revisions missing key columns: {', '.join(missing)}")
+
+    shared_columns = sorted(set(previous.columns) & set(current.columns))
+    previous_hashes = hash_rows(previous.astype(str), shared_columns)
+    current_hashes = hash_rows(current.astype(str), shared_columns)
+
+    removed_rows = previous[~previous_hashes.isin(current_hashes).to_numpy()]
+    added_rows = current[~current_hashes.isin(previous_hashes).to_numpy()]
+
+    diff = LookupDiff()
+    for col in lookup_columns:
+        old_keys = set(normalize_lookup_key(removed_rows[col].dropna(), strip_decimal_suffix=strip_decimal_suffix))
+        new_keys = set(normalize_lookup_key(added_rows[col].dropna(), strip_decimal_suffix=strip_decimal_suffix))
+        diff.changed[col] = old_keys & new_keys
+        diff.added[col] = new_keys - old_keys
+        diff.removed[col] = old_keys - new_keys
+    return diff
+
+
+def build_reverse_index(
+    processed_df: pd.DataFrame,
+    processed_column: str,
+    *,
+    strip_decimal_suffix: bool = True,
+) -> Dict[str, np.ndarray]:
+    """Map each normalized key of ``processed_column`` to the row positions holding it."""
+    keys = normalize_lookup_key(processed_df[processed_column], strip_decimal_suffix=strip_decimal_suffix)
+    return keys.reset_index(drop=True).groupby(keys.to_numpy(), sort=False).indices
+
+
+def affected_positions(
+    reverse_index: Dict[str, np.ndarray],
+    keys: Set[str],
+) -> np.ndarray:
+    """Collect the processed row positions for ``keys`` using a reverse index."""
+    hits = [reverse_index[key] for key in keys if key in reverse_index]
+    if not hits:
+        return np.array([], dtype=np.intp)
+    return np.unique(np.concatenate(hits))
+
+
+def _snapshot_path(state_dir: Path, retagger: LookupRetagger) -> Path:
+    return state_dir / LOOKUP_SNAPSHOT_DIR / f"{retagger.name}.parquet"
+
+
+def save_lookup_snapshots(
+    state_dir: Union[str, Path],
+    retaggers: Sequence[LookupRetagger],
+    partner_name: str,
+) -> None:
+    """Snapshot the partner slice of every lookup, to diff against on the next re-tag."""
+    state_dir = Path(state_dir)
+    for retagger in retaggers:
+        lookup_df = load_partner_lookup(retagger, partner_name)
+        write_parquet_frame(lookup_df.astype(str), _snapshot_path(state_dir, retagger))
+
+
+def retag_changed_lookups(
+    *,
+    state_dir: Union[str, Path],
+    retaggers: Sequence[LookupRetagger],
+    partner_name: str,
+    signature: str = "",
+    diagnostics_prefix: str = "[LookupDiff]",
+) -> pd.DataFrame:
+    """
+    Re-apply tagging helpers to the stored processed rows affected by lookup edits.
+
+    Parameters
+    ----------
+    state_dir : str | Path
+        Partner state directory written by an incremental run.
+    retaggers : list[LookupRetagger]
+        The lookups the partner depends on and how to re-tag their rows.
+        Retaggers sharing the same ``retag`` callable are run once over the
+        union of their affected rows.
+    partner_name : str
+        Partner whose lookup slice is diffed.
+    signature : str, default ""
+        New lookup signature recorded in the state so the next incremental
+        run does not fall back to a full rerun.
+    diagnostics_prefix : str, default "[LookupDiff]"
+        Prefix for progress messages.
+
+    Returns
+    -------
+    pd.DataFrame
+        The updated processed output (also persisted to the state directory).
+
+    Raises
+    ------
+    FullRerunRequired
+        If a retagger with ``overwrites_columns`` has removed or changed keys.
+        Nothing is written, so the stored output, signature and snapshots
+        stay those of the last run.
+    """
+    state_dir = Path(state_dir)
+    processed_path = state_dir / STATE_PROCESSED_FILE
+    meta_path = state_dir / STATE_META_FILE
+    if not processed_path.exists() or not meta_path.exists():
+        raise FileNotFoundError(
+            f"No processed state in {state_dir}; run the pipeline with --incremental once first."
+        )
+
+    processed_df = read_parquet_frame(processed_path)
+    meta = json.loads(meta_path.read_text())
+
+    pending: Dict[Callable, List[np.ndarray]] = {}
+    for retagger in retaggers:
+        snapshot_path = _snapshot_path(state_dir, retagger)
+        if not snapshot_path.exists():
+            raise FileNotFoundError(
+                f"No snapshot of '{retagger.file_name}' in {state_dir}; run the pipeline with --incremental first."
+            )
+
+        previous = pd.read_parquet(snapshot_path)
+        current = load_partner_lookup(retagger, partner_name).astype(str)
+        diff = diff_lookup(
+            previous,
+            current,
+            lookup_columns=[lookup_col for _, lookup_col in retagger.key_columns],
+            strip_decimal_suffix=retagger.strip_decimal_suffix,
+        )
+        if diff.is_empty():
+            diagnostic(diagnostics_prefix, f"{retagger.file_name}: no changes for {partner_name}.")
+            continue
+
+        positions = []
+        for processed_col, lookup_col in retagger.key_columns:
+            reverse_index = build_reverse_index(
+                processed_df,
+                processed_col,
+                strip_decimal_suffix=retagger.strip_decimal_suffix,
+            )
+            positions.append(affected_positions(reverse_index, diff.affected_keys(lookup_col)))
+            diagnostic(
+                diagnostics_prefix,
+                f"{retagger.file_name} {lookup_col}",
+                f"+{len(diff.added[lookup_col])} / -{len(diff.removed[lookup_col])} / "
+                f"~{len(diff.changed[lookup_col])} keys",
+            )
+
+        if retagger.overwrites_columns and (any(diff.removed.values()) or any(diff.changed.values())):
+            raise FullRerunRequired(
+                f"{retagger.file_name} removed or changed keys for {partner_name}; the previous "
+                f"{', '.join(retagger.overwrites_columns)} values cannot be restored by re-tagging. "
+                "Run the pipeline with --incremental instead, which reprocesses every row after a lookup edit."
+            )
+
+        pending.setdefault(retagger.retag, []).extend(positions)
+
+    for retag, position_groups in pending.items():
+        rows = np.unique(np.concatenate(position_groups)) if position_groups else np.array([], dtype=np.intp)
+        diagnostic(diagnostics_prefix, f"Re-tagging via {retag.__name__}", f"{len(rows)} / {len(processed_df)} rows")
+        if not len(rows):
+            continue
+
+        retagged = retag(processed_df.iloc[rows])
+        if len(retagged) != len(rows):
+            raise ValueError(f"{retag.__name__} changed the number of rows while re-tagging.")
+
+        for col in retagged.columns.intersection(processed_df.columns):
+            updated = processed_df[col].astype(object)
+            updated.iloc[rows] = retagged[col].to_numpy()
+            processed_df[col] = updated.infer_objects()
+
+    write_parquet_frame(processed_df, processed_path)
+    meta.update(
+        {
+            "signature": signature,
+            "retagged_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        }
+    )
+    tmp_path = meta_path.with_name(f".{meta_path.name}.tmp")
+    tmp_path.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_path, meta_path)
+    save_lookup_snapshots(state_dir, retaggers, partner_name)
+    return processed_df
@@ -0,0 +1,109 @@
+"""
+Background prefetch of a pipeline's lookup files.
+
+The tagging helpers read their lookups (Strategic Account List, Strategic
+Orders, Welcome Back List, agent mapping, calendar, ...) one after another,
+and only once the raw file has been loaded and aggregated. Inside
+:func:`prefetch_lookups` every declared lookup is read on a thread pool while
+the pipeline loads the raw file; each helper's ``load_lookup_file`` call then
+either finds the frame in the lookup cache or waits for its read to finish.
+Helpers need no changes, and a lookup that fails to load raises in the stage
+that uses it, as before.
+
+Reading overlaps well with the raw load on slow or network storage; on a
+single CPU the parsing itself still shares the interpreter with the raw load.
+
+Usage:
+    from src.utils.lookup_prefetch import LookupSpec, prefetch_lookups
+    lookup_dir = get_settings().common_lookup_dir
+    specs = [
+        LookupSpec(lookup_dir, MSP_WELCOME_BACK_FILE, sheet_name="Welcome Back List"),
+        LookupSpec(lookup_dir, STRATEGIC_ORDERS_FILE),
+    ]
+    with prefetch_lookups(specs):
+        raw_df = load_excel_file(...)
+        processed_df = process(raw_df)
+"""
+
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from src.utils.excel_file_operations import prefetch_lookup_file
+from src.utils.run_report import diagnostic
+from src.utils.schemas import FileSchema
+
+DEFAULT_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class LookupSpec:
+    """
+    One lookup read as its tagging helper reads it.
+
+    ``sheet_name``, ``column_types`` and ``schema`` must match the helper's
+    ``load_lookup_file`` call, otherwise the helper misses the prefetched
+    frame and reads the file again.
+    """
+
+    lookup_path: Union[str, Path]
+    file_name: str
+    sheet_name: Optional[Union[str, int]] = None
+    column_types: Optional[Sequence[Dict[str, object]]] = None
+    schema: Optional[FileSchema] = None
+
+
+class _ContextExecutor(ThreadPoolExecutor):
+    """Runs each task in a copy of the submitting thread's context (run report, tracing)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@contextmanager
+def prefetch_lookups(specs: Sequence[LookupSpec], *, workers: int = DEFAULT_WORKERS) -> Iterator[List[Future]]:
+    """
+    Read ``specs`` into the lookup cache in the background for the duration of the block.
+
+    Parameters
+    ----------
+    specs : list[LookupSpec]
+        The lookups the pipeline's helpers will load.
+    workers : int, default 4
+        Threads reading lookups.
+
+    Yields
+    ------
+    list[Future]
+        One future per spec, resolving to the loaded frame.
+
+    Notes
+    -----
+    Leaving the block cancels reads that have not started (a run that fails
+    early does not wait for them) and waits for the ones in progress.
+    """
+    if not specs:
+        yield []
+        return
+    executor = _ContextExecutor(max_workers=max(1, min(workers, len(specs))), thread_name_prefix="lookup-prefetch")
+    try:
+        futures = [
+            prefetch_lookup_file(
+                executor,
+                spec.lookup_path,
+                spec.file_name,
+                column_types=list(spec.column_types) if spec.column_types is not None else None,
+                sheet_name=spec.sheet_name,
+                schema=spec.schema,
+            )
+            for spec in specs
+        ]
+        diagnostic("[Prefetch]", "Lookups prefetched", len(futures))
+        yield futures
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
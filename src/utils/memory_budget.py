@@ -0,0 +1,429 @@
+"""
+Memory-budgeted execution.
+
+Before a run loads anything, :meth:`MemoryBudget.plan` estimates the working
+set from the raw file's size and schema and picks one of two plans:
+
+- **in memory**: the regular path, used while the estimate fits the budget;
+- **chunked**: the raw file is streamed in row chunks, revenue aggregation
+  spills per-chunk partial results to disk (or, for runs without an
+  aggregation, the rows are spilled in hash partitions that are processed one
+  at a time), and the output is written with a streaming xlsx writer.
+
+If even the chunked plan would exceed the budget the run fails up front with
+:class:`MemoryBudgetExceeded`. While the budget is active the loaders,
+aggregation and writers call :func:`check_memory_budget` at chunk
+boundaries and before writing, so an unexpectedly large run stops with the
+same clear error instead of being OOM-killed halfway through the xlsx.
+Pipelines wrap their run in :func:`exit_on_budget_exceeded`, which turns
+that error into a non-zero exit with just its message.
+
+The budget covers the whole process (RSS), including the interpreter and
+imported libraries.
+
+Usage:
+    from src.utils.memory_budget import memory_budget, parse_memory_size
+    with memory_budget(parse_memory_size("4G")) as budget:
+        plan = budget.plan(raw_path, column_types=raw_column_types, sheet_name="Raw")
+        ...
+"""
+
+from __future__ import annotations
+
+import contextvars
+import re
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from src.utils.run_report import current_rss_kb
+
+DEFAULT_CHUNK_ROWS = 50_000
+SAMPLE_ROWS = 2_000
+# Empirical multipliers (see benchmarks/memory_budget.py) for the transient
+# memory of each step, on top of the DataFrames themselves.
+STAGE_FRAME_FACTOR = 2.5  # live frames while the stages run under copy-on-write
+EXCEL_READ_BYTES_PER_CELL = 80  # openpyxl cell values held by pd.read_excel before parsing
+CSV_READ_FACTOR = 1.5  # pd.read_csv token buffers relative to the file size
+EXCEL_WRITE_BYTES_PER_CELL = 350  # openpyxl cells held by DataFrame.to_excel until save
+XML_BYTES_PER_CELL = 40  # fallback row estimate when a sheet has no dimension record
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+_ACTIVE_BUDGET: contextvars.ContextVar[Optional["MemoryBudget"]] = contextvars.ContextVar(
+    "active_memory_budget", default=None
+)
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised when a run cannot complete within its memory budget."""
+
+
+def parse_memory_size(text: str) -> int:
+    """Parse a size such as ``"512M"``, ``"4G"`` or ``"1.5GiB"`` into bytes."""
+    match = _SIZE_PATTERN.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid memory size {text!r}; expected e.g. 512M or 4G")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.casefold()])
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Human-readable size, e.g. ``1.5 GiB``."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(num_bytes) < 1024 or unit == "GiB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GiB"
+
+
+@dataclass
+class WorkingSetEstimate:
+    """Estimated memory, above the current RSS, of running one raw file."""
+
+    file_path: Path
+    rows: int
+    columns: int
+    frame_bytes: int
+    output_ratio: float
+    chunk_rows: int
+    in_memory_bytes: int
+    chunked_bytes: int
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "file": str(self.file_path),
+            "rows": self.rows,
+            "columns": self.columns,
+            "frame_bytes": self.frame_bytes,
+            "output_ratio": round(self.output_ratio, 4),
+            "chunk_rows": self.chunk_rows,
+            "in_memory_bytes": self.in_memory_bytes,
+            "chunked_bytes": self.chunked_bytes,
+        }
+
+
+@dataclass
+class MemoryPlan:
+    """The execution mode chosen for a run."""
+
+    budget_bytes: int
+    baseline_bytes: int
+    estimate: WorkingSetEstimate
+    chunked: bool
+
+    @property
+    def chunk_rows(self) -> int:
+        return self.estimate.chunk_rows
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "mode": "chunked" if self.chunked else "in_memory",
+            "budget_bytes": self.budget_bytes,
+            "baseline_bytes": self.baseline_bytes,
+            **self.estimate.to_dict(),
+        }
+
+    def describe(self) -> str:
+        mode = f"chunked ({self.chunk_rows:,} rows per chunk)" if self.chunked else "in memory"
+        working_set = self.estimate.chunked_bytes if self.chunked else self.estimate.in_memory_bytes
+        return (
+            f"{mode}: ~{self.estimate.rows:,} rows, estimated peak "
+            f"{format_bytes(self.baseline_bytes + working_set)} "
+            f"of {format_bytes(self.budget_bytes)} budget "
+            f"(in memory {format_bytes(self.estimate.in_memory_bytes)}, "
+            f"chunked {format_bytes(self.estimate.chunked_bytes)} above "
+            f"{format_bytes(self.baseline_bytes)} already in use)"
+        )
+
+
+def _excel_sheet_rows(file_path: Path, sheet_name: Optional[Union[str, int]], columns: int) -> int:
+    """Row count from the sheet's dimension record, falling back to its XML size."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        if sheet_name is None or isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name or 0]
+        else:
+            sheet = workbook[sheet_name]
+        if sheet.max_row and sheet.max_row > 1:
+            return sheet.max_row - 1
+        worksheet_path = getattr(sheet, "_worksheet_path", None)
+    finally:
+        workbook.close()
+
+    with zipfile.ZipFile(file_path) as archive:
+        xml_bytes = archive.getinfo(worksheet_path).file_size if worksheet_path else file_path.stat().st_size * 8
+    return int(xml_bytes / (XML_BYTES_PER_CELL * max(columns, 1)))
+
+
+def _csv_rows(file_path: Path, sample_rows: int) -> int:
+    """Row count extrapolated from the byte length of the first lines."""
+    sampled_bytes, sampled_lines = 0, 0
+    with file_path.open("rb") as handle:
+        handle.readline()  # header
+        for line in handle:
+            sampled_bytes += len(line)
+            sampled_lines += 1
+            if sampled_lines >= sample_rows:
+                break
+    if sampled_lines < sample_rows:
+        return sampled_lines
+    return int(file_path.stat().st_size / (sampled_bytes / sampled_lines))
+
+
+def estimate_working_set(
+    file_path: Union[str, Path],
+    *,
+    column_types: Optional[List[Dict[str, object]]] = None,
+    sheet_name: Optional[Union[str, int]] = None,
+    group_column: Optional[str] = None,
+    partition_column: Optional[str] = None,
+    output_columns: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sample_rows: int = SAMPLE_ROWS,
+) -> WorkingSetEstimate:
+    """
+    Estimate the extra memory needed to run ``file_path`` in memory and chunked.
+
+    Parameters
+    ----------
+    file_path : str | Path
+        Raw CSV or Excel file.
+    column_types : list[dict], optional
+        The loader schema (see ``load_excel_file``); applied to the sample.
+    sheet_name : str | int, optional
+        Excel sheet to read.
+    group_column : str, optional
+        Raw column the run aggregates on. The share of distinct keys in the
+        sample bounds the output size; without it the output is assumed to
+        have as many rows as the input.
+    partition_column : str, optional
+        Raw column a chunked run without ``group_column`` hash-partitions the
+        rows on, processing one partition at a time; without it the stages
+        of a chunked run hold every row.
+    output_columns : int, optional
+        Columns of the written output, when the run adds or drops columns;
+        defaults to the raw column count.
+    chunk_rows : int, default 50,000
+        Rows per chunk for the chunked plan.
+    sample_rows : int, default 2,000
+        Leading rows parsed to measure the in-memory size of a row.
+
+    Returns
+    -------
+    WorkingSetEstimate
+    """
+    from src.utils.excel_file_operations import load_excel_file
+
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Raw file not found: {file_path}")
+
+    sample = load_excel_file(
+        file_path.parent,
+        file_path.name,
+        column_types=column_types,
+        sheet_name=sheet_name,
+        nrows=sample_rows,
+    )
+    columns = len(sample.columns)
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+
+    is_csv = file_path.suffix.lower() == ".csv"
+    if len(sample) < sample_rows:
+        rows = len(sample)
+    elif is_csv:
+        rows = _csv_rows(file_path, sample_rows)
+    else:
+        rows = _excel_sheet_rows(file_path, sheet_name, columns)
+
+    output_ratio = 1.0
+    if group_column is not None and group_column in sample.columns and len(sample):
+        output_ratio = sample[group_column].nunique(dropna=False) / len(sample)
+
+    frame_bytes = int(bytes_per_row * rows)
+    output_bytes = int(frame_bytes * output_ratio)
+    output_cells = int(rows * output_ratio) * (output_columns or columns)
+    chunk_rows = max(min(chunk_rows, rows), 1)
+    chunk_bytes = int(bytes_per_row * chunk_rows)
+
+    if is_csv:
+        load_bytes = int(file_path.stat().st_size * CSV_READ_FACTOR)
+        chunk_load_bytes = int(load_bytes * chunk_rows / max(rows, 1))
+    else:
+        load_bytes = rows * columns * EXCEL_READ_BYTES_PER_CELL
+        chunk_load_bytes = chunk_rows * columns * EXCEL_READ_BYTES_PER_CELL
+
+    in_memory_bytes = int(
+        max(
+            frame_bytes + load_bytes,
+            frame_bytes * STAGE_FRAME_FACTOR,
+            # The raw frame is still referenced while the output is written.
+            frame_bytes + output_bytes + output_cells * EXCEL_WRITE_BYTES_PER_CELL,
+        )
+    )
+    if group_column is not None:
+        # Chunks are aggregated into partial results that are spilled to disk;
+        # only the aggregated output is held for the remaining stages.
+        chunked_bytes = int(chunk_bytes * STAGE_FRAME_FACTOR + chunk_load_bytes + output_bytes * STAGE_FRAME_FACTOR)
+    elif partition_column is not None:
+        # The stages hold one partition (about a chunk) at a time; the processed
+        # partitions and their concatenation are each as large as the output.
+        chunked_bytes = int(chunk_bytes * STAGE_FRAME_FACTOR + chunk_load_bytes + 2 * output_bytes)
+    else:
+        chunked_bytes = int(frame_bytes * STAGE_FRAME_FACTOR + chunk_load_bytes)
+
+    return WorkingSetEstimate(
+        file_path=file_path,
+        rows=rows,
+        columns=columns,
+        frame_bytes=frame_bytes,
+        output_ratio=output_ratio,
+        chunk_rows=chunk_rows,
+        in_memory_bytes=in_memory_bytes,
+        chunked_bytes=chunked_bytes,
+    )
+
+
+def excel_write_bytes(df: pd.DataFrame) -> int:
+    """Estimated extra memory ``DataFrame.to_excel`` needs to build the workbook for ``df``."""
+    return df.size * EXCEL_WRITE_BYTES_PER_CELL
+
+
+class MemoryBudget:
+    """
+    A process-wide RSS budget for one run.
+
+    Parameters
+    ----------
+    budget_bytes : int
+        Largest resident set size the process may reach.
+    chunk_rows : int, default 50,000
+        Rows per chunk when running chunked.
+    """
+
+    def __init__(self, budget_bytes: int, *, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+        if budget_bytes <= 0:
+            raise ValueError("Memory budget must be positive")
+        self.budget_bytes = budget_bytes
+        self.chunk_rows = chunk_rows
+
+    @contextmanager
+    def activate(self) -> Iterator["MemoryBudget"]:
+        """Make this the budget that :func:`check_memory_budget` enforces."""
+        token = _ACTIVE_BUDGET.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE_BUDGET.reset(token)
+
+    def used_bytes(self) -> int:
+        return current_rss_kb() * 1024
+
+    def fits(self, extra_bytes: int = 0) -> bool:
+        return self.used_bytes() + extra_bytes <= self.budget_bytes
+
+    def check(self, what: str, extra_bytes: int = 0) -> None:
+        """Raise :class:`MemoryBudgetExceeded` if ``what`` would take the process over budget."""
+        used = self.used_bytes()
+        if used + extra_bytes > self.budget_bytes:
+            needed = f" + an estimated {format_bytes(extra_bytes)}" if extra_bytes else ""
+            raise MemoryBudgetExceeded(
+                f"{what}: {format_bytes(used)} in use{needed} exceeds the memory budget of "
+                f"{format_bytes(self.budget_bytes)}. Raise --memory-budget or split the input."
+            )
+
+    def plan(
+        self,
+        file_path: Union[str, Path],
+        *,
+        column_types: Optional[List[Dict[str, object]]] = None,
+        sheet_name: Optional[Union[str, int]] = None,
+        group_column: Optional[str] = None,
+        partition_column: Optional[str] = None,
+        output_columns: Optional[int] = None,
+        allow_chunked: bool = True,
+    ) -> MemoryPlan:
+        """
+        Choose in-memory or chunked execution for ``file_path``.
+
+        The keyword arguments are passed to :func:`estimate_working_set`;
+        ``allow_chunked=False`` restricts the choice to the in-memory plan.
+
+        Raises
+        ------
+        MemoryBudgetExceeded
+            If no allowed plan fits the budget.
+        """
+        estimate = estimate_working_set(
+            file_path,
+            column_types=column_types,
+            sheet_name=sheet_name,
+            group_column=group_column,
+            partition_column=partition_column,
+            output_columns=output_columns,
+            chunk_rows=self.chunk_rows,
+        )
+        baseline = self.used_bytes()
+        if baseline + estimate.in_memory_bytes <= self.budget_bytes:
+            return MemoryPlan(self.budget_bytes, baseline, estimate, chunked=False)
+        plan = MemoryPlan(self.budget_bytes, baseline, estimate, chunked=allow_chunked)
+        if allow_chunked and baseline + estimate.chunked_bytes <= self.budget_bytes:
+            return plan
+        hint = "" if allow_chunked else " (chunked execution is not available for this run)"
+        raise MemoryBudgetExceeded(
+            f"{Path(file_path).name} does not fit the memory budget{hint}: {plan.describe()}. "
+            "Raise --memory-budget or split the input."
+        )
+
+
+@contextmanager
+def memory_budget(
+    budget_bytes: Optional[int], *, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[Optional[MemoryBudget]]:
+    """Enforce a budget of ``budget_bytes`` in the enclosed block; None leaves it off."""
+    if budget_bytes is None:
+        yield None
+        return
+    with MemoryBudget(budget_bytes, chunk_rows=chunk_rows).activate() as budget:
+        yield budget
+
+
+@contextmanager
+def exit_on_budget_exceeded() -> Iterator[None]:
+    """Exit non-zero with just the message when the enclosed block exceeds its memory budget."""
+    try:
+        yield
+    except MemoryBudgetExceeded as exc:
+        raise SystemExit(str(exc)) from None
+
+
+def current_budget() -> Optional[MemoryBudget]:
+    """Return the active budget, or None outside of :meth:`MemoryBudget.activate`."""
+    return _ACTIVE_BUDGET.get()
+
+
+def check_memory_budget(what: str, extra_bytes: int = 0) -> None:
+    """Enforce the active budget, if any (see :meth:`MemoryBudget.check`)."""
+    budget = _ACTIVE_BUDGET.get()
+    if budget is not None:
+        budget.check(what, extra_bytes)
+
+
+@contextmanager
+def spill_directory(prefix: str = "spill-") -> Iterator[Path]:
+    """A temporary directory for spilled chunks, removed on exit."""
+    directory = Path(tempfile.mkdtemp(prefix=prefix))
+    try:
+        yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
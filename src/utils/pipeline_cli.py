@@ -0,0 +1,95 @@
+"""
+Shared command-line options for the partner pipelines.
+
+Usage:
+    from src.utils.pipeline_cli import parse_pipeline_args
+    args = parse_pipeline_args("Hearst", argv)
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Optional, Sequence
+
+from src.utils.arrow_compute import COMPUTE_BACKENDS
+from src.utils.memory_budget import DEFAULT_CHUNK_ROWS, parse_memory_size
+
+
+def build_pipeline_parser(partner_name: str) -> argparse.ArgumentParser:
+    """Build the argument parser shared by every partner pipeline."""
+    parser = argparse.ArgumentParser(description=f"Run the {partner_name} processing pipeline.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process raw rows that are new or changed since the last run and merge them "
+        "into the previously processed output.",
+    )
+    parser.add_argument(
+        "--retag-lookups",
+        action="store_true",
+        help="Skip the raw load and re-tag only the stored processed rows affected by edits to "
+        "the strategic and welcome back lookups since the last run.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Compute and print every helper diagnostic count; they are always recorded in the "
+        "run report when computed.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        default=None,
+        help="Write a Chrome trace-event JSON timeline of the run to PATH "
+        "(open it in Perfetto or chrome://tracing).",
+    )
+    parser.add_argument(
+        "--arrow-strings",
+        action="store_true",
+        help="Load raw and lookup text columns as Arrow-backed strings and keep them Arrow-backed "
+        "through every stage; they are converted to Python strings only by the xlsx writer.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=COMPUTE_BACKENDS,
+        default="pandas",
+        help="Implementation of the shared key normalisation, lookup joins and group-by aggregation: "
+        "pandas (default) or multithreaded Arrow compute kernels. Both produce identical output.",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        metavar="SIZE",
+        type=parse_memory_size,
+        default=None,
+        help="Keep the process under SIZE (e.g. 2G or 512M): the raw file is estimated up front and "
+        "processed in chunks with spilling when it would not fit in memory, and the run stops with "
+        "a clear error instead of being killed when even that would exceed the budget.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        metavar="N",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"Raw rows per chunk when --memory-budget selects chunked execution (default {DEFAULT_CHUNK_ROWS:,}).",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Parse a large raw .xlsx sheet in N processes, each taking a range of its rows "
+        "(sheets under 32 MiB of XML are read as usual).",
+    )
+    parser.add_argument(
+        "--split-output",
+        choices=("sheets", "files"),
+        default="sheets",
+        help="How a processed output with more rows than an Excel sheet holds is written: numbered sheets "
+        "(default) or numbered workbooks, never splitting one order or job, with a .parts.json manifest.",
+    )
+    return parser
+
+
+def parse_pipeline_args(partner_name: str, argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse pipeline options from ``argv`` (defaults to ``sys.argv``)."""
+    return build_pipeline_parser(partner_name).parse_args(argv)
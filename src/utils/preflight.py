@@ -0,0 +1,170 @@
+"""
+Header-only preflight of the raw and lookup files a pipeline will read.
+
+A misnamed sheet or a renamed lookup column used to surface as a
+``KeyError`` in a tagging helper, after the raw file had been loaded and
+aggregated. :func:`preflight` reads only the sheet list and the header row
+of every file the pipeline touches (see :mod:`src.utils.xlsx_reader`), on a
+thread pool, and fails before any heavy work with every problem listed:
+missing files, missing sheets (with the sheets that do exist) and missing
+columns.
+
+Each pipeline declares its checks next to ``lookup_files()``; the column
+names are the ones the configs schemas and tagging helpers require.
+
+Usage:
+    from src.utils.preflight import FileCheck, preflight
+    settings = get_settings()
+    checks = [
+        FileCheck.from_schema("Raw", settings.hearst_raw_dir / HEASRT_FILE, raw_schema, sheet_name="Raw"),
+        FileCheck("Welcome back", settings.common_lookup_dir / MSP_WELCOME_BACK_FILE, sheet_name="Welcome Back List",
+                  columns=("Order Number", "Company", "Welcome Back End Date")),
+    ]
+    run_stage("preflight", preflight, checks)
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from src.utils.run_report import diagnostic
+from src.utils.schemas import FileSchema
+from src.utils.xlsx_reader import read_header, sheet_names
+
+DEFAULT_WORKERS = 8
+
+
+class PreflightError(ValueError):
+    """Raised when preflight finds problems; ``problems`` lists every one of them."""
+
+    def __init__(self, problems: List[str]) -> None:
+        self.problems = problems
+        super().__init__(f"Preflight found {len(problems)} problem(s):\n" + "\n".join(f"  - {p}" for p in problems))
+
+
+@dataclass(frozen=True)
+class FileCheck:
+    """
+    What one raw or lookup file must provide.
+
+    ``columns`` must all be present. Each group in ``any_of`` needs at least
+    one of its columns, and each entry of ``containing`` needs a column whose
+    name contains it (case-insensitively); both compare stripped names, the
+    way the calendar lookup is matched. ``sheet_name`` is ignored for CSV
+    files, as in the loaders.
+    """
+
+    label: str
+    path: Union[str, Path]
+    sheet_name: Optional[Union[str, int]] = None
+    columns: Tuple[str, ...] = ()
+    any_of: Tuple[Tuple[str, ...], ...] = ()
+    containing: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_schema(
+        cls,
+        label: str,
+        path: Union[str, Path],
+        schema: FileSchema,
+        *,
+        sheet_name: Optional[Union[str, int]] = None,
+    ) -> "FileCheck":
+        """Check for the required columns of ``schema``."""
+        required = tuple(column.name for column in schema.columns if column.required)
+        return cls(label, path, sheet_name=sheet_name, columns=required)
+
+    @property
+    def is_csv(self) -> bool:
+        return Path(self.path).suffix.lower() == ".csv"
+
+    @property
+    def source(self) -> Tuple[Path, Optional[Union[str, int]]]:
+        """The ``(path, sheet)`` whose header this check reads."""
+        return Path(self.path), None if self.is_csv else self.sheet_name
+
+
+def _read_source(source: Tuple[Path, Optional[Union[str, int]]]) -> Tuple[Optional[List[object]], Optional[str]]:
+    """``(header, None)`` or ``(None, problem)`` for one file and sheet."""
+    path, sheet = source
+    if not path.exists():
+        return None, f"{path}: file not found"
+    try:
+        if isinstance(sheet, str):
+            available = sheet_names(path)
+            if sheet not in available:
+                return None, f"{path.name}: sheet '{sheet}' not found (sheets: {', '.join(available)})"
+        return read_header(path, sheet), None
+    except Exception as exc:  # unreadable or corrupt file: report it with the others
+        return None, f"{path.name}: cannot read header ({type(exc).__name__}: {exc})"
+
+
+def _column_problems(check: FileCheck, header: List[object]) -> List[str]:
+    present = set(header)
+    stripped = [str(col).strip() for col in header]
+    where = f"{check.label} ({Path(check.path).name}"
+    where += f", sheet '{check.sheet_name}')" if check.sheet_name is not None and not check.is_csv else ")"
+
+    problems = []
+    missing = [col for col in check.columns if col not in present]
+    if missing:
+        problems.append(f"{where}: missing columns: {', '.join(missing)}")
+    for group in check.any_of:
+        if not any(col in stripped for col in group):
+            problems.append(f"{where}: needs one of the columns: {', '.join(group)}")
+    for text in check.containing:
+        if not any(text.casefold() in col.casefold() for col in stripped):
+            problems.append(f"{where}: no column containing '{text}'")
+    return problems
+
+
+def preflight(checks: Sequence[FileCheck], *, workers: int = DEFAULT_WORKERS) -> int:
+    """
+    Read the header of every checked file in parallel and verify the checks.
+
+    Each distinct file and sheet is read once, however many checks refer to it.
+
+    Parameters
+    ----------
+    checks : list[FileCheck]
+        The files the pipeline will read and the columns it needs from them.
+    workers : int, default 8
+        Threads reading headers (reads are I/O and zip-inflate bound).
+
+    Returns
+    -------
+    int
+        The number of files and sheets checked.
+
+    Raises
+    ------
+    PreflightError
+        Listing every missing file, sheet and column.
+    """
+    sources = list(dict.fromkeys(check.source for check in checks))
+    if not sources:
+        return 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sources), (os.cpu_count() or 1) * 4))) as pool:
+        results: Dict[Tuple[Path, Optional[Union[str, int]]], Tuple[Optional[List[object]], Optional[str]]] = dict(
+            zip(sources, pool.map(_read_source, sources))
+        )
+
+    problems: List[str] = []
+    for source in sources:
+        problem = results[source][1]
+        if problem is not None:
+            problems.append(problem)
+    for check in checks:
+        header = results[check.source][0]
+        if header is not None:
+            problems.extend(_column_problems(check, header))
+
+    diagnostic("[Preflight]", "Files checked", len(sources))
+    if problems:
+        diagnostic("[Preflight]", "Problems", len(problems))
+        raise PreflightError(problems)
+    return len(sources)
@@ -0,0 +1,339 @@
+"""
+History of processed results as a Hive-partitioned Parquet dataset.
+
+Each run's processed output is split by the month of the partner's period
+column (``Revenue Date`` for Hearst and Pittsburgh, see each configs module)
+and written to::
+
+    <data>/history/partner=<partner>/period=<YYYY-MM>/part-0.parquet
+
+Rows whose period cannot be parsed go to ``period=__HIVE_DEFAULT_PARTITION__``.
+A run replaces only the periods it contains: every partition is one file,
+written next to its final name and swapped in with ``os.replace``, so readers
+see either the previous month or the new one, never a mix. Files are written
+in row groups with min/max statistics, and reads prune partitions by partner
+and period before touching any data, then read only the requested columns.
+
+Usage:
+    python -m src.utils.processed_dataset list
+    python -m src.utils.processed_dataset read --partner Hearst --period 2025Q3 --columns "Pub,Revenue"
+    python -m src.utils.processed_dataset read --period 2025 --output history_2025.parquet
+
+    from src.utils.processed_dataset import read_processed_history
+    q3 = read_processed_history(partners=["Pittsburgh"], periods="2025Q3", columns=["Order #", "Net"])
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.utils.dataframe_utils import (
+    arrow_strings_enabled,
+    convert_to_arrow_strings,
+    parquet_safe_frame,
+    write_parquet_frame,
+)
+from src.utils.sql_engine import table_name
+
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+PART_FILE = "part-0.parquet"
+ROW_GROUP_ROWS = 100_000
+PERIOD_FORMAT = "%Y-%m"
+
+_QUARTER = re.compile(r"^(\d{4})-?Q([1-4])$", re.IGNORECASE)
+_MONTH = re.compile(r"^(\d{4})-(\d{2})$")
+_YEAR = re.compile(r"^(\d{4})$")
+
+
+def _dataset_dir(dataset_dir: Optional[Union[str, Path]]) -> Path:
+    if dataset_dir is not None:
+        return Path(dataset_dir)
+    from src.config import get_settings
+
+    return get_settings().history_dir
+
+
+def revenue_periods(values: pd.Series) -> pd.Series:
+    """
+    ``YYYY-MM`` period of each value, ``None`` where it is not a date.
+
+    Text dates in any of the formats the partners use (``5/20/26``,
+    ``05/21/2025``, ``2025-12-03``) are parsed once per distinct value.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Dates as datetimes or text.
+
+    Returns
+    -------
+    pd.Series
+        Object Series of period strings, aligned to ``values``.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        periods = values.dt.strftime(PERIOD_FORMAT)
+        return periods.astype(object).where(periods.notna(), None)
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques).astype(str), format="mixed", errors="coerce")
+    labels = np.asarray(parsed.strftime(PERIOD_FORMAT).astype(object).where(parsed.notna(), None), dtype=object)
+    periods = np.full(len(values), None, dtype=object)
+    found = codes >= 0
+    periods[found] = labels[codes[found]]
+    return pd.Series(periods, index=values.index, name=values.name)
+
+
+def period_range(spec: str) -> Tuple[str, str]:
+    """
+    First and last ``YYYY-MM`` period of a period spec.
+
+    ``2025`` (a year), ``2025Q3`` (a quarter), ``2025-09`` (a month) or
+    ``START:END`` with either form on both sides (``2025-07:2025Q4``).
+    """
+    spec = spec.strip()
+    if ":" in spec:
+        start, _, end = spec.partition(":")
+        return period_range(start)[0], period_range(end)[1]
+    quarter = _QUARTER.match(spec)
+    if quarter:
+        year, number = quarter.group(1), int(quarter.group(2))
+        return f"{year}-{3 * number - 2:02d}", f"{year}-{3 * number:02d}"
+    month = _MONTH.match(spec)
+    if month and 1 <= int(month.group(2)) <= 12:
+        return spec, spec
+    if _YEAR.match(spec):
+        return f"{spec}-01", f"{spec}-12"
+    raise ValueError(f"Unrecognized period '{spec}'; use YYYY, YYYYQn, YYYY-MM or START:END")
+
+
+def write_partitions(
+    df: pd.DataFrame,
+    partner_name: str,
+    periods: pd.Series,
+    dataset_dir: Union[str, Path],
+    *,
+    row_group_rows: int = ROW_GROUP_ROWS,
+) -> List[Path]:
+    """
+    Replace the ``partner=<partner>/period=<period>`` partitions of ``dataset_dir`` with the rows of ``df``.
+
+    ``periods`` labels each row (missing labels go to the default
+    partition). Partitions of periods absent from ``periods`` are left
+    untouched. Returns the partition files written.
+    """
+    partner_dir = Path(dataset_dir) / f"partner={table_name(partner_name)}"
+    labels = periods.fillna(DEFAULT_PARTITION).to_numpy()
+    table = pa.Table.from_pandas(parquet_safe_frame(df), preserve_index=False)
+
+    written = []
+    for period, rows in sorted(pd.Series(labels).groupby(labels).indices.items()):
+        directory = partner_dir / f"period={period}"
+        directory.mkdir(parents=True, exist_ok=True)
+        part = table if len(rows) == table.num_rows else table.take(pa.array(rows))
+        tmp_path = directory / f".{PART_FILE}.tmp"
+        pq.write_table(part, tmp_path, row_group_size=row_group_rows, write_statistics=True)
+        os.replace(tmp_path, directory / PART_FILE)
+        written.append(directory / PART_FILE)
+    return written
+
+
+def write_processed_history(
+    df: pd.DataFrame,
+    partner_name: str,
+    *,
+    period_column: str,
+    dataset_dir: Optional[Union[str, Path]] = None,
+    row_group_rows: int = ROW_GROUP_ROWS,
+) -> List[Path]:
+    """
+    Write a run's processed output into the history dataset.
+
+    Every period present in ``df`` replaces that partner's partition for
+    the period; other periods are left untouched.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The processed output.
+    partner_name : str
+        Partner name; the partition is ``partner=<name>`` (lowercase).
+    period_column : str
+        Date column whose month selects the partition.
+    dataset_dir : str | Path, optional
+        Defaults to ``get_settings().history_dir``.
+    row_group_rows : int, default ROW_GROUP_ROWS
+        Rows per Parquet row group (each carries min/max statistics).
+
+    Returns
+    -------
+    list[Path]
+        The partition files written.
+    """
+    if period_column not in df.columns:
+        raise KeyError(f"Processed DataFrame missing period column: {period_column}")
+    return write_partitions(
+        df,
+        partner_name,
+        revenue_periods(df[period_column]),
+        _dataset_dir(dataset_dir),
+        row_group_rows=row_group_rows,
+    )
+
+
+def _period_filter(periods: Optional[Union[str, Tuple[str, str]]]) -> Optional[ds.Expression]:
+    if periods is None:
+        return None
+    start, end = period_range(periods) if isinstance(periods, str) else periods
+    return (ds.field("period") >= start) & (ds.field("period") <= end)
+
+
+def _partner_dirs(root: Path, partners: Optional[Sequence[str]]) -> List[Path]:
+    if partners is None:
+        return sorted(path for path in root.glob("partner=*") if path.is_dir())
+    return [root / f"partner={table_name(partner)}" for partner in partners]
+
+
+def _partner_dataset(partner_dir: Path, filter: Optional[ds.Expression]) -> Optional[ds.Dataset]:
+    """The partner's partitions matching ``filter``, with their schemas unified; None when there are none."""
+    partitioning = ds.partitioning(pa.schema([("period", pa.string())]), flavor="hive")
+    dataset = ds.dataset(partner_dir, format="parquet", partitioning=partitioning)
+    fragments = list(dataset.get_fragments(filter=filter))
+    if not fragments:
+        return None
+    # A column that was all-null in one month is typed null there; permissive
+    # unification widens it to the type other months have.
+    schema = pa.unify_schemas(
+        [fragment.physical_schema for fragment in fragments] + [partitioning.schema],
+        promote_options="permissive",
+    )
+    return ds.FileSystemDataset(fragments, schema, ds.ParquetFileFormat(), dataset.filesystem)
+
+
+def read_partitions(
+    dataset_dir: Union[str, Path],
+    *,
+    partners: Optional[Sequence[str]] = None,
+    periods: Optional[Union[str, Tuple[str, str]]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read a partner/period partitioned dataset, touching only the matching partitions and columns.
+
+    Parameters
+    ----------
+    dataset_dir : str | Path
+        Dataset root (the directory holding ``partner=*``).
+    partners : sequence of str, optional
+        Partners to read (all by default).
+    periods : str | tuple[str, str], optional
+        A spec accepted by :func:`period_range` (``"2025Q3"``) or an
+        inclusive ``(first, last)`` pair of ``YYYY-MM`` periods.
+    columns : sequence of str, optional
+        Columns to read. By default every column plus ``partner`` and
+        ``period``.
+
+    Returns
+    -------
+    pd.DataFrame
+        The matching rows, partners concatenated in name order.
+    """
+    filter = _period_filter(periods)
+    frames = []
+    for partner_dir in _partner_dirs(Path(dataset_dir), partners):
+        if not partner_dir.is_dir():
+            raise FileNotFoundError(f"No partitions for partner at {partner_dir}")
+        dataset = _partner_dataset(partner_dir, filter)
+        if dataset is None:
+            continue
+        if columns is not None:
+            missing = [col for col in columns if col not in dataset.schema.names]
+            if missing:
+                raise KeyError(f"{partner_dir.name} partitions missing columns: {', '.join(missing)}")
+        df = dataset.to_table(columns=list(columns) if columns is not None else None, filter=filter).to_pandas()
+        if columns is None:
+            df.insert(0, "partner", partner_dir.name.partition("=")[2])
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=list(columns) if columns is not None else [])
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return convert_to_arrow_strings(df) if arrow_strings_enabled() else df
+
+
+def read_processed_history(
+    dataset_dir: Optional[Union[str, Path]] = None,
+    *,
+    partners: Optional[Sequence[str]] = None,
+    periods: Optional[Union[str, Tuple[str, str]]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read processed history (see :func:`read_partitions`).
+
+    ``dataset_dir`` defaults to ``get_settings().history_dir``.
+    """
+    return read_partitions(_dataset_dir(dataset_dir), partners=partners, periods=periods, columns=columns)
+
+
+def list_partitions(dataset_dir: Optional[Union[str, Path]] = None) -> pd.DataFrame:
+    """One row per partition: partner, period, rows, row groups, bytes on disk (from the file footers)."""
+    records: List[Dict[str, object]] = []
+    for part_path in sorted(_dataset_dir(dataset_dir).glob(f"partner=*/period=*/{PART_FILE}")):
+        metadata = pq.read_metadata(part_path)
+        records.append(
+            {
+                "partner": part_path.parent.parent.name.partition("=")[2],
+                "period": part_path.parent.name.partition("=")[2],
+                "rows": metadata.num_rows,
+                "row_groups": metadata.num_row_groups,
+                "bytes": part_path.stat().st_size,
+            }
+        )
+    return pd.DataFrame.from_records(records, columns=["partner", "period", "rows", "row_groups", "bytes"])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and read the processed history dataset.")
+    parser.add_argument("--dataset", type=Path, default=None, help="Dataset directory (default <data>/history).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the partitions.")
+    read_parser = commands.add_parser("read", help="Read matching partitions.")
+    read_parser.add_argument("--partner", action="append", default=None, help="Partner to read (repeatable).")
+    read_parser.add_argument("--period", default=None, help="YYYY, YYYYQn, YYYY-MM or START:END.")
+    read_parser.add_argument("--columns", default=None, help="Comma-separated columns to read.")
+    read_parser.add_argument("--output", type=Path, default=None, help="Write the rows to .parquet or .csv.")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        partitions = list_partitions(args.dataset)
+        if partitions.empty:
+            print(f"No processed history in {_dataset_dir(args.dataset)}")
+        else:
+            print(partitions.to_string(index=False))
+        return 0
+
+    columns = [col.strip() for col in args.columns.split(",")] if args.columns else None
+    df = read_processed_history(args.dataset, partners=args.partner, periods=args.period, columns=columns)
+    if args.output is None:
+        print(f"{len(df):,} rows x {len(df.columns)} columns")
+        print(df.head(20).to_string())
+    elif args.output.suffix.lower() == ".csv":
+        df.to_csv(args.output, index=False)
+        print(f"{len(df):,} rows written to {args.output}")
+    else:
+        write_parquet_frame(df, args.output)
+        print(f"{len(df):,} rows written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""
+Reconcile a processed output against a reference (e.g. the client's Sisense sheet).
+
+Both sides are aligned on the partner key and every row is fingerprinted
+with a vectorized 64-bit hash over the compared columns, so classifying the
+rows as matching, changed, missing (only in the reference) or extra (only in
+the output) is a hash join. Cell-by-cell comparison then runs on the changed
+rows only, and the differences are streamed to Parquet or CSV in chunks.
+
+Values are compared after canonicalizing each column pair the same way on
+both sides, because the reference is read from Excel and the output from the
+pipeline: numbers are rounded to ``decimals`` places (``12`` equals
+``"12.0"``), dates compare as dates whatever their text format, text is
+stripped and blanks count as missing.
+
+Keys may occur several times (Boston and Houston have several rows per
+order): identical rows are paired first, whatever their order, and the
+remaining rows of a key are paired in file order.
+
+Usage:
+    python -m src.utils.reconcile "data/hearst/raw/Hearst Files.xlsx" \\
+        "data/hearst/processed/Hearst Files Sisense.xlsx" \\
+        --key "Job Number" --expected-sheet Sisense --output hearst_diff.parquet
+
+    from src.utils.reconcile import reconcile
+    result = reconcile(sisense_df, processed_df, key="Job Number", output="diff.csv")
+    print(result.describe())
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.utils.incremental import hash_rows
+
+DEFAULT_DECIMALS = 6
+DEFAULT_CHUNK_ROWS = 100_000
+REPORT_COLUMNS = ("status", "column", "expected", "actual")
+
+
+@dataclass
+class ReconcileResult:
+    """Counts of one :func:`reconcile` run; the cell differences go to its ``output``."""
+
+    key: List[str]
+    expected_rows: int
+    actual_rows: int
+    matching: int
+    changed: int
+    missing: int
+    extra: int
+    column_differences: Dict[str, int] = field(default_factory=dict)
+    only_in_expected: List[str] = field(default_factory=list)
+    only_in_actual: List[str] = field(default_factory=list)
+    output: Optional[Path] = None
+
+    @property
+    def identical(self) -> bool:
+        return not (self.changed or self.missing or self.extra)
+
+    def describe(self) -> str:
+        lines = [
+            f"Reconciled on {', '.join(self.key)}: {self.expected_rows:,} expected rows, {self.actual_rows:,} actual rows",
+            f"  matching {self.matching:,}  changed {self.changed:,}  missing {self.missing:,}  extra {self.extra:,}",
+        ]
+        for column, count in sorted(self.column_differences.items(), key=lambda item: -item[1]):
+            lines.append(f"  {column:<40} {count:>10,} differing rows")
+        if self.only_in_expected:
+            lines.append(f"  columns only in expected: {', '.join(self.only_in_expected)}")
+        if self.only_in_actual:
+            lines.append(f"  columns only in actual: {', '.join(self.only_in_actual)}")
+        if self.output is not None:
+            lines.append(f"  differences written to {self.output}")
+        return "\n".join(lines)
+
+
+def _kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred in ("integer", "floating", "mixed-integer-float", "decimal", "boolean"):
+        return "number"
+    if inferred in ("datetime", "datetime64", "date"):
+        return "date"
+    return "text"
+
+
+def _clean_text(values: pd.Series) -> pd.Series:
+    """
+    Stripped text of every value with a trailing ``.0`` dropped; missing and blank values become None.
+
+    Each distinct value is cleaned once, with Arrow string kernels.
+    """
+    codes, uniques = pd.factorize(values)
+    text = pa.array(pd.Index(uniques).astype(str).to_numpy(dtype=object), type=pa.string())
+    text = pc.replace_substring_regex(pc.utf8_trim_whitespace(text), r"\.0+$", "")
+    cleaned = np.asarray(text.to_numpy(zero_copy_only=False), dtype=object)
+    cleaned[cleaned == ""] = None
+    result = np.full(len(values), None, dtype=object)
+    found = codes >= 0
+    result[found] = cleaned[codes[found]]
+    return pd.Series(result, index=values.index)
+
+
+def _as_numbers(series: pd.Series) -> Optional[pd.Series]:
+    """``series`` as floats, or None when a non-missing value is not a number."""
+    numbers = pd.to_numeric(series, errors="coerce")
+    if numbers.notna().sum() != series.notna().sum():
+        return None
+    return numbers.astype("float64")
+
+
+def _as_dates(series: pd.Series) -> Optional[pd.Series]:
+    """``series`` as datetimes (text parsed once per distinct value), or None when a value is not a date."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.astype("datetime64[ns]")
+    codes, uniques = pd.factorize(series)
+    parsed = pd.to_datetime(pd.Index(uniques).astype(str), format="mixed", errors="coerce")
+    if parsed.isna().any():
+        return None
+    values = parsed.to_numpy(dtype="datetime64[ns]")
+    result = np.full(len(series), np.datetime64("NaT"), dtype="datetime64[ns]")
+    result[codes >= 0] = values[codes[codes >= 0]]
+    return pd.Series(result, index=series.index)
+
+
+def _canonical_pair(expected: pd.Series, actual: pd.Series, decimals: int) -> Tuple[pd.Series, pd.Series]:
+    """Bring one column of both sides to a common, comparable representation."""
+    pair = (expected, actual)
+    kinds = tuple(_kind(series) for series in pair)
+    if set(kinds) <= {"number", "text"} and "number" in kinds:
+        numbers = tuple(
+            _as_numbers(series if kind == "number" else _clean_text(series)) for series, kind in zip(pair, kinds)
+        )
+        if numbers[0] is not None and numbers[1] is not None:
+            # Adding 0.0 folds -0.0 into 0.0, which hashes differently.
+            return tuple(values.round(decimals) + 0.0 for values in numbers)
+    if set(kinds) <= {"date", "text"} and "date" in kinds:
+        dates = tuple(_as_dates(series if kind == "date" else _clean_text(series)) for series, kind in zip(pair, kinds))
+        if dates[0] is not None and dates[1] is not None:
+            return dates
+    return _clean_text(expected), _clean_text(actual)
+
+
+def _key_frames(
+    expected: pd.DataFrame, actual: pd.DataFrame, key: List[str], hashes: Tuple[pd.Series, pd.Series]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Key codes, row hash and row position of every row of both sides.
+
+    Keys are normalized like text columns and factorized over both sides
+    together, so the joins run on integers.
+    """
+    codes = {}
+    for i, col in enumerate(key):
+        cleaned = pd.concat([_clean_text(expected[col]), _clean_text(actual[col])], ignore_index=True)
+        codes[f"key_{i}"] = pd.factorize(cleaned.fillna(""))[0]
+    frames = []
+    for side, (df, side_hashes) in enumerate(((expected, hashes[0]), (actual, hashes[1]))):
+        rows = slice(0, len(expected)) if side == 0 else slice(len(expected), None)
+        frame = pd.DataFrame({name: values[rows] for name, values in codes.items()})
+        frame["hash"] = side_hashes.to_numpy()
+        frame["position"] = np.arange(len(df))
+        frames.append(frame)
+    return frames[0], frames[1]
+
+
+def _align(expected: pd.DataFrame, actual: pd.DataFrame, key_columns: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Pair the rows of both sides.
+
+    Identical rows are paired first (per key and hash, so their order does
+    not matter); the remaining rows of a key are then paired in file order.
+    Returns the identical pairs and the outer join of the remaining rows.
+    """
+    def numbered(frame: pd.DataFrame, by: List[str], name: str) -> pd.DataFrame:
+        return frame.assign(**{name: frame.groupby(by, sort=False).cumcount()})
+
+    exact = pd.merge(
+        numbered(expected, [*key_columns, "hash"], "copy"),
+        numbered(actual, [*key_columns, "hash"], "copy"),
+        on=[*key_columns, "hash", "copy"],
+        how="outer",
+        suffixes=("_expected", "_actual"),
+        indicator=True,
+    )
+    paired = exact["_merge"].eq("both")
+    rest_expected = expected.iloc[exact.loc[exact["_merge"].eq("left_only"), "position_expected"].astype("int64")]
+    rest_actual = actual.iloc[exact.loc[exact["_merge"].eq("right_only"), "position_actual"].astype("int64")]
+    rest = pd.merge(
+        numbered(rest_expected.sort_values("position"), key_columns, "occurrence"),
+        numbered(rest_actual.sort_values("position"), key_columns, "occurrence"),
+        on=[*key_columns, "occurrence"],
+        how="outer",
+        suffixes=("_expected", "_actual"),
+        indicator=True,
+        sort=True,
+    )
+    return exact.loc[paired], rest
+
+
+class _ReportWriter:
+    """Append report chunks to a Parquet or CSV file."""
+
+    def __init__(self, path: Optional[Union[str, Path]], columns: List[str]) -> None:
+        self.path = Path(path) if path is not None else None
+        self.columns = columns
+        self._parquet: Optional[pq.ParquetWriter] = None
+        self._csv_started = False
+        if self.path is not None:
+            if self.path.suffix.lower() not in (".parquet", ".csv"):
+                raise ValueError(f"Unsupported report format '{self.path.suffix}'; use .parquet or .csv")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.path is None or chunk.empty:
+            return
+        chunk = chunk[self.columns]
+        if self.path.suffix.lower() == ".csv":
+            chunk.to_csv(self._tmp_path, mode="a" if self._csv_started else "w", header=not self._csv_started, index=False)
+            self._csv_started = True
+            return
+        table = pa.Table.from_pandas(chunk, schema=self._schema(), preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self._tmp_path, table.schema)
+        self._parquet.write_table(table)
+
+    def _schema(self) -> pa.Schema:
+        return pa.schema([(name, pa.string()) for name in self.columns])
+
+    def close(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self.path.suffix.lower() == ".parquet":
+            pq.write_table(self._schema().empty_table(), self._tmp_path)
+        elif not self._csv_started:
+            pd.DataFrame(columns=self.columns).to_csv(self._tmp_path, index=False)
+        self._tmp_path.replace(self.path)
+        return self.path
+
+
+def _display(values: pd.Series) -> pd.Series:
+    return values.astype(str).where(values.notna(), None).astype(object)
+
+
+def reconcile(
+    expected: pd.DataFrame,
+    actual: pd.DataFrame,
+    *,
+    key: Union[str, Sequence[str]],
+    columns: Optional[Sequence[str]] = None,
+    decimals: int = DEFAULT_DECIMALS,
+    output: Optional[Union[str, Path]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> ReconcileResult:
+    """
+    Compare ``actual`` with ``expected`` row by row on ``key``.
+
+    Parameters
+    ----------
+    expected : pd.DataFrame
+        The reference, e.g. the client's Sisense sheet.
+    actual : pd.DataFrame
+        The output being checked.
+    key : str | list[str]
+        Key column(s), present on both sides.
+    columns : list[str], optional
+        Columns to compare. Defaults to every non-key column present on
+        both sides.
+    decimals : int, default DEFAULT_DECIMALS
+        Numbers are compared after rounding to this many places.
+    output : str | Path, optional
+        ``.parquet`` or ``.csv`` file for the differences: one row per
+        differing cell of a changed row and one per missing or extra row,
+        with the key columns, ``status``, ``column``, ``expected`` and
+        ``actual`` (as text).
+    chunk_rows : int, default DEFAULT_CHUNK_ROWS
+        Changed rows compared and written per chunk.
+
+    Returns
+    -------
+    ReconcileResult
+        Row counts per outcome and differing rows per column.
+    """
+    key = [key] if isinstance(key, str) else list(key)
+    for side, df in (("expected", expected), ("actual", actual)):
+        missing_key = [col for col in key if col not in df.columns]
+        if missing_key:
+            raise KeyError(f"{side} DataFrame missing key columns: {', '.join(missing_key)}")
+    if columns is None:
+        columns = [col for col in expected.columns if col in actual.columns and col not in key]
+    else:
+        absent = [col for col in columns if col not in expected.columns or col not in actual.columns]
+        if absent:
+            raise KeyError(f"Columns not present on both sides: {', '.join(absent)}")
+        columns = list(columns)
+
+    canonical_expected, canonical_actual = {}, {}
+    for col in columns:
+        canonical_expected[col], canonical_actual[col] = _canonical_pair(
+            expected[col].reset_index(drop=True), actual[col].reset_index(drop=True), decimals
+        )
+    canonical_expected = pd.DataFrame(canonical_expected, index=pd.RangeIndex(len(expected)))
+    canonical_actual = pd.DataFrame(canonical_actual, index=pd.RangeIndex(len(actual)))
+
+    key_columns = [f"key_{i}" for i in range(len(key))]
+    identical, rest = _align(
+        *_key_frames(expected, actual, key, (hash_rows(canonical_expected, columns), hash_rows(canonical_actual, columns))),
+        key_columns,
+    )
+    changed = rest.loc[rest["_merge"].eq("both").to_numpy()]
+    missing = rest.loc[rest["_merge"].eq("left_only").to_numpy()]
+    extra = rest.loc[rest["_merge"].eq("right_only").to_numpy()]
+
+    writer = _ReportWriter(output, [*key, *REPORT_COLUMNS])
+    column_differences: Dict[str, int] = {}
+    try:
+        for status, rows, side in (("missing", missing, expected), ("extra", extra, actual)):
+            positions = rows[f"position_{'expected' if status == 'missing' else 'actual'}"].astype("int64").to_numpy()
+            for start in range(0, len(positions), chunk_rows):
+                block = side[key].iloc[positions[start : start + chunk_rows]].reset_index(drop=True)
+                block = block.apply(_display).assign(status=status, column=None, expected=None, actual=None)
+                writer.write(block)
+
+        expected_positions = changed["position_expected"].astype("int64").to_numpy()
+        actual_positions = changed["position_actual"].astype("int64").to_numpy()
+        for start in range(0, len(changed), chunk_rows):
+            exp_rows = expected_positions[start : start + chunk_rows]
+            act_rows = actual_positions[start : start + chunk_rows]
+            keys = expected[key].iloc[exp_rows].reset_index(drop=True).apply(_display)
+            pieces = []
+            for col in columns:
+                left = canonical_expected[col].iloc[exp_rows].reset_index(drop=True)
+                right = canonical_actual[col].iloc[act_rows].reset_index(drop=True)
+                differs = ~((left == right) | (left.isna() & right.isna())).to_numpy()
+                if not differs.any():
+                    continue
+                column_differences[col] = column_differences.get(col, 0) + int(differs.sum())
+                piece = keys.loc[differs].assign(
+                    status="changed",
+                    column=col,
+                    expected=_display(expected[col].iloc[exp_rows[differs]]).to_numpy(),
+                    actual=_display(actual[col].iloc[act_rows[differs]]).to_numpy(),
+                )
+                pieces.append(piece)
+            if pieces:
+                writer.write(pd.concat(pieces, ignore_index=True))
+    finally:
+        report_path = writer.close()
+
+    return ReconcileResult(
+        key=key,
+        expected_rows=len(expected),
+        actual_rows=len(actual),
+        matching=len(identical),
+        changed=len(changed),
+        missing=len(missing),
+        extra=len(extra),
+        column_differences=column_differences,
+        only_in_expected=[col for col in expected.columns if col not in actual.columns and col not in key],
+        only_in_actual=[col for col in actual.columns if col not in expected.columns and col not in key],
+        output=report_path,
+    )
+
+
+def _read_side(path: Path, sheet_name: Optional[str]) -> pd.DataFrame:
+    from src.utils.dataframe_utils import read_parquet_frame
+    from src.utils.excel_file_operations import load_excel_file
+
+    if path.suffix.lower() == ".parquet":
+        return read_parquet_frame(path)
+    return load_excel_file(path.parent, path.name, sheet_name=sheet_name)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile a processed output against a reference.")
+    parser.add_argument("expected", type=Path, help="Reference file (.xlsx, .csv or .parquet).")
+    parser.add_argument("actual", type=Path, help="Output to check (.xlsx, .csv or .parquet).")
+    parser.add_argument("--key", action="append", required=True, help="Key column (repeat for a composite key).")
+    parser.add_argument("--expected-sheet", default=None, help="Sheet of the reference workbook (default first).")
+    parser.add_argument("--actual-sheet", default=None, help="Sheet of the output workbook (default first).")
+    parser.add_argument("--columns", default=None, help="Comma-separated columns to compare (default all shared).")
+    parser.add_argument("--decimals", type=int, default=DEFAULT_DECIMALS)
+    parser.add_argument("--output", type=Path, default=None, help="Write the differences to .parquet or .csv.")
+    args = parser.parse_args(argv)
+
+    result = reconcile(
+        _read_side(args.expected, args.expected_sheet),
+        _read_side(args.actual, args.actual_sheet),
+        key=args.key,
+        columns=[col.strip() for col in args.columns.split(",")] if args.columns else None,
+        decimals=args.decimals,
+        output=args.output,
+    )
+    print(result.describe())
+    return 0 if result.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Revenue roll-ups per partner and period, maintained incrementally.
+
+After tagging, each pipeline run aggregates its processed output to one row
+per period x MSP/non-MSP x strategic x welcome back x rep with the revenue
+and row count, and stores it like the processed history::
+
+    <data>/rollups/partner=<partner>/period=<YYYY-MM>/part-0.parquet
+
+Only the periods present in the run are recomputed, and a period whose
+roll-up did not change is not rewritten, so a rerun of one partner-month
+touches one small file. Dashboards read the roll-ups (a few thousand rows)
+instead of the processed workbooks; :func:`read_rollups` rolls them further
+up to any subset of the dimensions.
+
+Which output column feeds each measure and dimension is declared per partner
+(``rollup_columns`` in the configs modules); dimensions a partner does not
+have are left empty.
+
+Usage:
+    python -m src.utils.rollups show --period 2025Q3 --by msp,strategic
+    python -m src.utils.rollups show --partner Hearst --by rep --output hearst_reps.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.dataframe_utils import parquet_safe_frame, write_parquet_frame
+from src.utils.processed_dataset import (
+    DEFAULT_PARTITION,
+    PART_FILE,
+    read_partitions,
+    revenue_periods,
+    write_partitions,
+)
+from src.utils.run_report import diagnostic
+from src.utils.sql_engine import table_name
+
+ROLLUP_MEASURE = "revenue"
+ROLLUP_DIMENSIONS = ("msp", "strategic", "welcome_back", "rep")
+# 0/1 tag columns; the other dimensions are text.
+FLAG_DIMENSIONS = ("strategic", "welcome_back")
+
+
+def _rollups_dir(rollups_dir: Optional[Union[str, Path]]) -> Path:
+    if rollups_dir is not None:
+        return Path(rollups_dir)
+    from src.config import get_settings
+
+    return get_settings().rollups_dir
+
+
+def _dimension_values(values: pd.Series, dimension: str) -> pd.Series:
+    if dimension in FLAG_DIMENSIONS:
+        return pd.to_numeric(values, errors="coerce").astype("Int64")
+    missing = values.isna().to_numpy()
+    return pd.Series(np.where(missing, None, values.astype(str).to_numpy(dtype=object)), index=values.index, dtype=object)
+
+
+def build_rollup(df: pd.DataFrame, *, period_column: str, columns: Mapping[str, str]) -> pd.DataFrame:
+    """
+    Aggregate a processed output to the roll-up grain.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The processed output.
+    period_column : str
+        Date column whose month is the period (as in the processed history).
+    columns : mapping
+        ``"revenue"`` and any of :data:`ROLLUP_DIMENSIONS` -> output column.
+
+    Returns
+    -------
+    pd.DataFrame
+        ``period``, the dimensions, ``revenue`` (sum) and ``rows`` (count),
+        sorted by period and dimensions. Missing periods and dimension
+        values form their own groups.
+    """
+    unknown = set(columns) - {ROLLUP_MEASURE, *ROLLUP_DIMENSIONS}
+    if unknown or ROLLUP_MEASURE not in columns:
+        raise ValueError(
+            f"Roll-up columns need '{ROLLUP_MEASURE}' and may map {', '.join(ROLLUP_DIMENSIONS)}; "
+            f"got {', '.join(sorted(columns))}"
+        )
+    missing = [col for col in [period_column, *columns.values()] if col not in df.columns]
+    if missing:
+        raise KeyError(f"Processed DataFrame missing roll-up columns: {', '.join(missing)}")
+
+    frame = pd.DataFrame({"period": revenue_periods(df[period_column])}, index=df.index)
+    for dimension in ROLLUP_DIMENSIONS:
+        if dimension in columns:
+            frame[dimension] = _dimension_values(df[columns[dimension]], dimension)
+        else:
+            frame[dimension] = pd.Series(pd.NA, index=df.index, dtype="Int64" if dimension in FLAG_DIMENSIONS else object)
+    frame[ROLLUP_MEASURE] = pd.to_numeric(df[columns[ROLLUP_MEASURE]], errors="coerce")
+
+    grouped = frame.groupby(["period", *ROLLUP_DIMENSIONS], dropna=False, sort=True)[ROLLUP_MEASURE]
+    rollup = pd.DataFrame({ROLLUP_MEASURE: grouped.sum(), "rows": grouped.size()}).reset_index()
+    return rollup.astype({"rows": "int64"})
+
+
+def _partition_unchanged(path: Path, rollup: pd.DataFrame) -> bool:
+    if not path.exists():
+        return False
+    table = pa.Table.from_pandas(parquet_safe_frame(rollup), preserve_index=False)
+    return pq.ParquetFile(path).read().equals(table)
+
+
+def update_rollups(
+    df: pd.DataFrame,
+    partner_name: str,
+    *,
+    period_column: str,
+    columns: Mapping[str, str],
+    rollups_dir: Optional[Union[str, Path]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Recompute the partner's roll-ups for the periods in ``df``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The processed output of a run.
+    partner_name : str
+        Partner name; the partition is ``partner=<name>`` (lowercase).
+    period_column, columns
+        See :func:`build_rollup`.
+    rollups_dir : str | Path, optional
+        Defaults to ``get_settings().rollups_dir``.
+
+    Returns
+    -------
+    dict[str, list[str]]
+        ``{"written": [...], "unchanged": [...]}`` periods.
+    """
+    root = _rollups_dir(rollups_dir)
+    rollup = build_rollup(df, period_column=period_column, columns=columns)
+    periods = rollup["period"].fillna(DEFAULT_PARTITION)
+    partner_dir = root / f"partner={table_name(partner_name)}"
+
+    written, unchanged = [], []
+    for period, part in rollup.groupby(periods, sort=True):
+        body = part.drop(columns="period").reset_index(drop=True)
+        if _partition_unchanged(partner_dir / f"period={period}" / PART_FILE, body):
+            unchanged.append(period)
+        else:
+            written.append(period)
+    if written:
+        changed = periods.isin(written)
+        write_partitions(rollup.loc[changed].drop(columns="period"), partner_name, periods[changed], root)
+    diagnostic(f"[{partner_name} Rollups]", "Periods rewritten", lambda: f"{len(written)} ({len(unchanged)} unchanged)")
+    return {"written": written, "unchanged": unchanged}
+
+
+def read_rollups(
+    rollups_dir: Optional[Union[str, Path]] = None,
+    *,
+    partners: Optional[Sequence[str]] = None,
+    periods: Optional[Union[str, Tuple[str, str]]] = None,
+    by: Sequence[str] = ROLLUP_DIMENSIONS,
+) -> pd.DataFrame:
+    """
+    Revenue and rows per partner, period and the dimensions in ``by``.
+
+    Parameters
+    ----------
+    rollups_dir : str | Path, optional
+        Defaults to ``get_settings().rollups_dir``.
+    partners, periods
+        Partition filters, as for :func:`src.utils.processed_dataset.read_partitions`.
+    by : sequence of str, default ROLLUP_DIMENSIONS
+        Dimensions to keep; the others are summed over.
+    """
+    unknown = [dimension for dimension in by if dimension not in ROLLUP_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown roll-up dimensions: {', '.join(unknown)}; expected {', '.join(ROLLUP_DIMENSIONS)}")
+    keys = ["partner", "period", *by]
+    stored = read_partitions(_rollups_dir(rollups_dir), partners=partners, periods=periods)
+    if stored.empty:
+        return pd.DataFrame(columns=[*keys, ROLLUP_MEASURE, "rows"])
+    grouped = stored.groupby(keys, dropna=False, sort=True)
+    return grouped.agg(**{ROLLUP_MEASURE: (ROLLUP_MEASURE, "sum"), "rows": ("rows", "sum")}).reset_index()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Read the revenue roll-ups.")
+    parser.add_argument("--rollups", type=Path, default=None, help="Roll-ups directory (default <data>/rollups).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show_parser = commands.add_parser("show", help="Roll up to the chosen dimensions.")
+    show_parser.add_argument("--partner", action="append", default=None, help="Partner to read (repeatable).")
+    show_parser.add_argument("--period", default=None, help="YYYY, YYYYQn, YYYY-MM or START:END.")
+    show_parser.add_argument(
+        "--by",
+        default=",".join(ROLLUP_DIMENSIONS),
+        help=f"Comma-separated dimensions to keep (default all: {','.join(ROLLUP_DIMENSIONS)}; '' for none).",
+    )
+    show_parser.add_argument("--output", type=Path, default=None, help="Write the result to .parquet or .csv.")
+    args = parser.parse_args(argv)
+
+    by = [dimension.strip() for dimension in args.by.split(",") if dimension.strip()]
+    result = read_rollups(args.rollups, partners=args.partner, periods=args.period, by=by)
+    if args.output is None:
+        print(result.to_string(index=False, max_rows=60))
+    elif args.output.suffix.lower() == ".csv":
+        result.to_csv(args.output, index=False)
+        print(f"{len(result):,} rows written to {args.output}")
+    else:
+        write_parquet_frame(result, args.output)
+        print(f"{len(result):,} rows written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+"""
+Local SQLite run history with performance regression detection.
+
+Every pipeline run (and every benchmark case) appends its per-stage wall
+time, CPU time, row counts, throughput and peak memory, tagged with the
+partner, a hash of the input files' names, sizes and modification times
+and the code version. ``compare`` checks the latest run against the
+trailing median of the previous runs with the same partner, source and
+label and flags stages whose rows/sec dropped or whose peak memory grew
+beyond a threshold.
+
+Usage:
+    python -m src.utils.run_history compare --partner Hearst --threshold 0.2
+    python -m src.utils.run_history list --partner Boston
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sqlite3
+import statistics
+import subprocess
+import sys
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from src.utils.incremental import file_signature
+
+RUN_LEVEL_STAGE = "(run)"
+DEFAULT_WINDOW = 5
+DEFAULT_THRESHOLD = 0.2
+# Stages faster or lighter than this are too noisy to judge.
+MIN_STAGE_SECONDS = 0.25
+MIN_MEMORY_DELTA_MB = 16.0
+# How long recording a run waits for another process's write (pipelines run side by side under run_all).
+BUSY_TIMEOUT_SECONDS = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    partner TEXT NOT NULL,
+    source TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    started_at TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    rows INTEGER,
+    wall_seconds REAL,
+    rows_per_second REAL,
+    peak_memory_delta_mb REAL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    wall_seconds REAL,
+    cpu_seconds REAL,
+    rows_in INTEGER,
+    rows_out INTEGER,
+    rows_per_second REAL,
+    peak_memory_delta_mb REAL
+);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (partner, source, label, id);
+"""
+
+
+@dataclass(frozen=True)
+class Regression:
+    """One metric of one stage that regressed against the trailing median."""
+
+    partner: str
+    stage: str
+    metric: str
+    current: float
+    baseline: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else float("inf")
+
+    def describe(self) -> str:
+        return (
+            f"{self.partner} {self.stage}: {self.metric} {self.current:,.2f} vs median "
+            f"{self.baseline:,.2f} ({self.change:+.0%})"
+        )
+
+
+def summarize_report(report: Dict[str, Any], rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reduce a run report (``RunReport.to_dict()``) to throughput and memory figures.
+
+    ``rows`` defaults to the row count seen by the first stage.
+    """
+    stages = []
+    for stage in report["stages"]:
+        counted_rows = stage["rows_in"] if stage["rows_in"] is not None else stage["rows_out"]
+        stages.append(
+            {
+                "name": stage["name"],
+                "wall_seconds": stage["wall_seconds"],
+                "cpu_seconds": stage["cpu_seconds"],
+                "rows_in": stage["rows_in"],
+                "rows_out": stage["rows_out"],
+                "rows_per_second": round(counted_rows / stage["wall_seconds"], 1)
+                if counted_rows and stage["wall_seconds"]
+                else None,
+                "peak_memory_delta_mb": stage["peak_memory_delta_mb"],
+            }
+        )
+    if rows is None and stages:
+        first = stages[0]
+        rows = first["rows_in"] if first["rows_in"] is not None else first["rows_out"]
+    return {
+        "started_at": report.get("started_at"),
+        "rows": rows,
+        "wall_seconds": report["wall_seconds"],
+        "rows_per_second": round(rows / report["wall_seconds"], 1) if rows and report["wall_seconds"] else None,
+        "peak_memory_delta_mb": report["peak_memory_delta_mb"],
+        "stages": stages,
+    }
+
+
+def code_version(repo_dir: Optional[Union[str, Path]] = None) -> str:
+    """Short git commit of the working tree, suffixed with ``-dirty`` for local edits."""
+    repo_dir = Path(repo_dir) if repo_dir else Path(__file__).resolve().parents[2]
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repo_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def hash_inputs(files: Iterable[Union[str, Path]], *, contents: bool = False) -> str:
+    """
+    Short SHA-256 identifying the state of ``files`` (missing files hash as such).
+
+    By default only each file's name, size and modification time are hashed
+    (:func:`~src.utils.incremental.file_signature`), so recording a run does
+    not read multi-GB raw drops again; ``contents=True`` hashes the bytes.
+    """
+    if not contents:
+        return hashlib.sha256(file_signature(files).encode()).hexdigest()[:16]
+    digest = hashlib.sha256()
+    for file in sorted(Path(f) for f in files):
+        digest.update(file.name.encode())
+        if not file.exists():
+            digest.update(b"<missing>")
+            continue
+        with file.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def connect(db_path: Union[str, Path]) -> sqlite3.Connection:
+    """Open (and create if needed) the history database."""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def record_run(
+    summary: Dict[str, Any],
+    *,
+    partner: str,
+    input_hash: str,
+    db_path: Union[str, Path],
+    source: str = "pipeline",
+    label: str = "",
+    version: Optional[str] = None,
+) -> int:
+    """Append a summarized run (see :func:`summarize_report`) and return its id."""
+    with closing(connect(db_path)) as connection, connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (partner, source, label, started_at, code_version, input_hash, rows,"
+            " wall_seconds, rows_per_second, peak_memory_delta_mb) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                partner,
+                source,
+                label,
+                summary.get("started_at") or "",
+                version or code_version(),
+                input_hash,
+                summary.get("rows"),
+                summary.get("wall_seconds"),
+                summary.get("rows_per_second"),
+                summary.get("peak_memory_delta_mb"),
+            ),
+        )
+        run_id = cursor.lastrowid
+        connection.executemany(
+            "INSERT INTO stages (run_id, position, name, wall_seconds, cpu_seconds, rows_in, rows_out,"
+            " rows_per_second, peak_memory_delta_mb) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    position,
+                    stage["name"],
+                    stage.get("wall_seconds"),
+                    stage.get("cpu_seconds"),
+                    stage.get("rows_in"),
+                    stage.get("rows_out"),
+                    stage.get("rows_per_second"),
+                    stage.get("peak_memory_delta_mb"),
+                )
+                for position, stage in enumerate(summary.get("stages", []))
+            ],
+        )
+    return run_id
+
+
+def record_report(
+    report: Dict[str, Any],
+    *,
+    partner: str,
+    input_files: Sequence[Union[str, Path]],
+    db_path: Union[str, Path],
+) -> int:
+    """Summarize a pipeline run report and append it to the history."""
+    return record_run(
+        summarize_report(report),
+        partner=partner,
+        input_hash=hash_inputs(input_files),
+        db_path=db_path,
+    )
+
+
+def _stage_metrics(connection: sqlite3.Connection, run_id: int) -> Dict[str, Dict[str, Any]]:
+    run = connection.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    metrics = {
+        RUN_LEVEL_STAGE: {
+            "wall_seconds": run["wall_seconds"],
+            "rows_per_second": run["rows_per_second"],
+            "peak_memory_delta_mb": run["peak_memory_delta_mb"],
+        }
+    }
+    for stage in connection.execute("SELECT * FROM stages WHERE run_id = ? ORDER BY position", (run_id,)):
+        # Concurrent producers may record the same stage name once each; keep the slowest.
+        previous = metrics.get(stage["name"])
+        if previous is None or (stage["wall_seconds"] or 0) > (previous["wall_seconds"] or 0):
+            metrics[stage["name"]] = dict(stage)
+    return metrics
+
+
+def compare(
+    partner: str,
+    *,
+    db_path: Union[str, Path],
+    source: str = "pipeline",
+    label: str = "",
+    run_id: Optional[int] = None,
+    window: int = DEFAULT_WINDOW,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Regression]:
+    """
+    Compare a run against the trailing median of the ``window`` runs before it.
+
+    Parameters
+    ----------
+    partner : str
+        Partner whose history is compared.
+    db_path : str | Path
+        History database.
+    source, label : str
+        Only runs with the same source ("pipeline" or "benchmark") and label
+        (e.g. the benchmark size) are compared.
+    run_id : int, optional
+        Run to check; defaults to the latest matching run.
+    window : int, default 5
+        Number of previous runs forming the baseline.
+    threshold : float, default 0.2
+        Allowed relative drop in rows/sec or growth in peak memory.
+
+    Returns
+    -------
+    list[Regression]
+        Empty when nothing regressed or there is no history to compare with.
+    """
+    with closing(connect(db_path)) as connection, connection:
+        query = "SELECT id FROM runs WHERE partner = ? AND source = ? AND label = ?"
+        params: List[Any] = [partner, source, label]
+        if run_id is not None:
+            query += " AND id <= ?"
+            params.append(run_id)
+        ids = [row["id"] for row in connection.execute(query + " ORDER BY id DESC LIMIT ?", (*params, window + 1))]
+        if len(ids) < 2:
+            return []
+
+        current = _stage_metrics(connection, ids[0])
+        history = [_stage_metrics(connection, previous_id) for previous_id in ids[1:]]
+
+    regressions = []
+    for stage, metrics in current.items():
+        throughput = [h[stage]["rows_per_second"] for h in history if stage in h and h[stage]["rows_per_second"]]
+        if throughput and metrics["rows_per_second"] and (metrics["wall_seconds"] or 0) >= MIN_STAGE_SECONDS:
+            baseline = statistics.median(throughput)
+            if metrics["rows_per_second"] < baseline * (1 - threshold):
+                regressions.append(Regression(partner, stage, "rows/sec", metrics["rows_per_second"], baseline))
+
+        memory = [h[stage]["peak_memory_delta_mb"] for h in history if stage in h and h[stage]["peak_memory_delta_mb"] is not None]
+        if memory and metrics["peak_memory_delta_mb"] is not None:
+            baseline = statistics.median(memory)
+            current_mb = metrics["peak_memory_delta_mb"]
+            if current_mb > baseline * (1 + threshold) and current_mb - baseline >= MIN_MEMORY_DELTA_MB:
+                regressions.append(Regression(partner, stage, "peak memory MB", current_mb, baseline))
+    return regressions
+
+
+def _list_runs(db_path: Union[str, Path], partner: Optional[str], limit: int) -> None:
+    with closing(connect(db_path)) as connection, connection:
+        query = "SELECT * FROM runs"
+        params: List[Any] = []
+        if partner:
+            query += " WHERE partner = ?"
+            params.append(partner)
+        rows = connection.execute(query + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+    for row in rows:
+        print(
+            f"#{row['id']:<5} {row['started_at']:<20} {row['partner']:<10} {row['source']:<9} "
+            f"{row['label'] or '-':<22} {row['code_version']:<14} {row['rows'] or 0:>10,} rows "
+            f"{row['wall_seconds'] or 0:8.2f} s  peak +{row['peak_memory_delta_mb'] or 0:.1f} MB"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from src.config import get_settings
+
+    parser = argparse.ArgumentParser(description="Inspect the pipeline run history.")
+    parser.add_argument("--db", type=Path, default=get_settings().run_history_db, help="History database path.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions against the trailing median.")
+    compare_parser.add_argument("--partner", required=True)
+    compare_parser.add_argument("--source", default="pipeline", choices=("pipeline", "benchmark"))
+    compare_parser.add_argument("--label", default="")
+    compare_parser.add_argument("--run-id", type=int, default=None)
+    compare_parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    list_parser = commands.add_parser("list", help="Show recent runs.")
+    list_parser.add_argument("--partner", default=None)
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        _list_runs(args.db, args.partner, args.limit)
+        return 0
+
+    regressions = compare(
+        args.partner,
+        db_path=args.db,
+        source=args.source,
+        label=args.label,
+        run_id=args.run_id,
+        window=args.window,
+        threshold=args.threshold,
+    )
+    if not regressions:
+        print(f"No regressions for {args.partner} beyond {args.threshold:.0%} of the trailing median.")
+        return 0
+    for regression in regressions:
+        print(f"REGRESSION {regression.describe()}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Structured per-stage run report.
+
+A :class:`RunReport` records, for every pipeline stage, the wall time, CPU
+time, rows in and out, peak memory above the stage's starting RSS, lookup
+cache hits and the diagnostic counts the helpers emit. The report is written
+as one JSON file per partner run.
+
+Helpers report their counts through :func:`diagnostic` instead of ``print``.
+Expensive counts are passed as zero-argument callables and are only
+evaluated in verbose mode; outside of an active report the helpers keep
+printing their diagnostics as before.
+
+Usage:
+    from src.utils.run_report import RunReport, run_stage
+    report = RunReport("Hearst", verbose=args.verbose)
+    with report.activate():
+        processed_df = run_stage("calculate_revenue", calculate_revenue, raw_df)
+    report.write(get_settings().hearst_reports_dir)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from src.utils.dataframe_utils import arrow_strings_enabled, object_text_columns
+from src.utils.tracing import span
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+STATUS_FILE = Path("/proc/self/status")
+CLEAR_REFS_FILE = Path("/proc/self/clear_refs")
+
+_ACTIVE_REPORT: contextvars.ContextVar[Optional["RunReport"]] = contextvars.ContextVar(
+    "active_run_report", default=None
+)
+_ACTIVE_STAGE: contextvars.ContextVar[Optional["StageRecord"]] = contextvars.ContextVar(
+    "active_run_stage", default=None
+)
+
+
+def _read_status_kb(field_name: str) -> Optional[int]:
+    try:
+        for line in STATUS_FILE.read_text().splitlines():
+            if line.startswith(f"{field_name}:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS counter (Linux only); returns False when unsupported."""
+    try:
+        CLEAR_REFS_FILE.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def current_rss_kb() -> int:
+    """Current resident set size in KiB (falls back to the peak where /proc is unavailable)."""
+    rss = _read_status_kb("VmRSS")
+    return rss if rss is not None else peak_rss_kb()
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size in KiB since start or the last :func:`reset_peak_rss`."""
+    peak = _read_status_kb("VmHWM")
+    if peak is not None:
+        return peak
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and KiB elsewhere.
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one stage of a run."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    peak_memory_delta_mb: float = 0.0
+    lookup_cache_hits: int = 0
+    lookup_cache_misses: int = 0
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    _peak_kb: int = field(default=0, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record.pop("_peak_kb")
+        return record
+
+
+class RunReport:
+    """
+    Collects :class:`StageRecord` entries for one partner run.
+
+    Parameters
+    ----------
+    partner_name : str
+        Partner the run belongs to; used in the report file name.
+    verbose : bool, default False
+        Evaluate lazy diagnostic counts and print every diagnostic.
+    """
+
+    def __init__(self, partner_name: str, *, verbose: bool = False) -> None:
+        self.partner_name = partner_name
+        self.verbose = verbose
+        self.started_at = pd.Timestamp.now()
+        self.stages: List[StageRecord] = []
+        self.metrics: Dict[str, Any] = {}
+        self.lookup_cache_hits = 0
+        self.lookup_cache_misses = 0
+        self._peak_resettable = reset_peak_rss()
+        self._start_rss_kb = current_rss_kb()
+        self._peak_kb = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator["RunReport"]:
+        """Make this the report that :func:`run_stage` and :func:`diagnostic` record into."""
+        token = _ACTIVE_REPORT.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE_REPORT.reset(token)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """
+        Measure the enclosed block as one stage.
+
+        Set ``rows_out`` on the yielded record before leaving the block.
+        Nested stages are recorded separately; the enclosing stage's peak
+        includes theirs. CPU time and peak RSS are process-wide, so for
+        stages running concurrently on a thread pool they are approximate.
+        """
+        record = StageRecord(name=name, rows_in=rows_in)
+        parent = _ACTIVE_STAGE.get()
+        token = _ACTIVE_STAGE.set(record)
+
+        if self._peak_resettable:
+            # Fold the peak reached so far into the enclosing stage before resetting it.
+            with self._lock:
+                peak_so_far = peak_rss_kb()
+                self._peak_kb = max(self._peak_kb, peak_so_far)
+                if parent is not None:
+                    parent._peak_kb = max(parent._peak_kb, peak_so_far)
+            reset_peak_rss()
+        start_rss = current_rss_kb()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        with span(name, category="stage") as span_attributes:
+            try:
+                yield record
+            finally:
+                record.wall_seconds = round(time.perf_counter() - start_wall, 6)
+                record.cpu_seconds = round(time.process_time() - start_cpu, 6)
+                record._peak_kb = max(record._peak_kb, peak_rss_kb())
+                record.peak_memory_delta_mb = round(max(record._peak_kb - start_rss, 0) / 1024, 2)
+                span_attributes.update(rows_in=record.rows_in, rows_out=record.rows_out)
+                _ACTIVE_STAGE.reset(token)
+                with self._lock:
+                    if parent is not None:
+                        parent._peak_kb = max(parent._peak_kb, record._peak_kb)
+                    self._peak_kb = max(self._peak_kb, record._peak_kb)
+                    self.stages.append(record)
+
+    def record_lookup_cache(self, hit: bool) -> None:
+        """Count a lookup cache hit or miss against the report and the active stage."""
+        stage = _ACTIVE_STAGE.get()
+        with self._lock:
+            if hit:
+                self.lookup_cache_hits += 1
+                if stage is not None:
+                    stage.lookup_cache_hits += 1
+            else:
+                self.lookup_cache_misses += 1
+                if stage is not None:
+                    stage.lookup_cache_misses += 1
+
+    def record_metric(self, key: str, value: Any) -> None:
+        """Store a diagnostic value on the active stage (or on the run when no stage is active)."""
+        stage = _ACTIVE_STAGE.get()
+        target = stage.metrics if stage is not None else self.metrics
+        with self._lock:
+            target[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished_at = pd.Timestamp.now()
+        peak_kb = max(self._peak_kb, peak_rss_kb())
+        return {
+            "partner": self.partner_name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": finished_at.isoformat(timespec="seconds"),
+            "wall_seconds": round((finished_at - self.started_at).total_seconds(), 6),
+            "peak_memory_delta_mb": round(max(peak_kb - self._start_rss_kb, 0) / 1024, 2),
+            "verbose": self.verbose,
+            "pid": os.getpid(),
+            "lookup_cache_hits": self.lookup_cache_hits,
+            "lookup_cache_misses": self.lookup_cache_misses,
+            "metrics": self.metrics,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def write(self, directory: Union[str, Path]) -> Path:
+        """Write the report as ``<partner>_run_<timestamp>.json`` in ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+        file_path = directory / f"{self.partner_name.casefold()}_run_{stamp}.json"
+        file_path.write_text(json.dumps(self.to_dict(), indent=2, default=str))
+        return file_path
+
+
+def current_report() -> Optional[RunReport]:
+    """Return the active report, or None outside of :meth:`RunReport.activate`."""
+    return _ACTIVE_REPORT.get()
+
+
+def run_stage(name: str, func: Callable[..., Any], df: pd.DataFrame, *args, **kwargs) -> Any:
+    """
+    Call ``func(df, *args, **kwargs)`` as a named stage of the active report.
+
+    Rows in and out are taken from ``df`` and the returned frame (rows in are
+    left unset when ``df`` is an iterator of chunks). With Arrow strings
+    enabled, text columns the stage returned as object are recorded and
+    reported. Without an active report the function is simply called.
+    """
+    report = _ACTIVE_REPORT.get()
+    if report is None:
+        return func(df, *args, **kwargs)
+
+    with report.stage(name, rows_in=len(df) if hasattr(df, "__len__") else None) as record:
+        result = func(df, *args, **kwargs)
+        if hasattr(result, "__len__"):
+            record.rows_out = len(result)
+        if arrow_strings_enabled() and isinstance(result, pd.DataFrame):
+            fallen_back = object_text_columns(result)
+            if fallen_back:
+                record.metrics["object_text_columns"] = fallen_back
+                print(f"[ArrowStrings] WARNING: {name} returned text columns stored as object: {fallen_back}")
+    return result
+
+
+def diagnostic(prefix: str, label: str, value: Union[Any, Callable[[], Any]] = None) -> None:
+    """
+    Report a helper diagnostic such as ``[Strategic] Matches via X: 12``.
+
+    Parameters
+    ----------
+    prefix : str
+        Helper prefix, e.g. ``"[Hearst Strategic]"``.
+    label : str
+        What is being counted. Messages without a value pass ``value=None``.
+    value : object | callable, optional
+        The value, or a zero-argument callable computing it. Callables are
+        only evaluated when nobody is recording (the value is printed, as
+        before) or when the active report is verbose.
+    """
+    report = _ACTIVE_REPORT.get()
+    if report is not None and not report.verbose and callable(value):
+        return
+
+    if callable(value):
+        value = value()
+
+    if report is not None:
+        report.record_metric(f"{prefix} {label}", value)
+        if not report.verbose:
+            return
+
+    print(f"{prefix} {label}" if value is None else f"{prefix} {label}: {value}")
+
+
+def record_lookup_cache(hit: bool) -> None:
+    """Count a lookup cache hit or miss against the active report, if any."""
+    report = _ACTIVE_REPORT.get()
+    if report is not None:
+        report.record_lookup_cache(hit)
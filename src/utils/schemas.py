@@ -0,0 +1,237 @@
+"""
+Schemas for the raw and lookup files, checked right after load.
+
+A :class:`FileSchema` declares the columns a file must have, their types
+(the same entries as the ``column_types`` lists in the configs modules),
+which columns may not be empty and which columns form a unique key. It is
+compiled once, when the configs module is imported, and then:
+
+- gives the loaders their ``column_types`` (``load_excel_file(...,
+  schema=raw_schema)``), so the typed read and the contract cannot drift
+  apart;
+- validates the loaded frame with whole-column checks (dtype tests, one
+  ``isna`` and one hash-based ``duplicated`` per checked column), so a
+  renamed or retyped column fails the run at load time with every problem
+  listed, instead of as a ``KeyError`` deep in a tagging helper.
+
+For very large files ``sample_rows`` limits the value-level checks (nulls,
+integral floats, date objects) to a random sample; column presence, dtypes
+and key uniqueness always cover every row.
+
+Usage:
+    raw_schema = FileSchema.from_column_types("Hearst raw", raw_column_types)
+    raw_df = load_excel_file(get_settings().hearst_raw_dir, HEASRT_FILE, schema=raw_schema, sheet_name="Raw")
+
+    market_list_schema = FileSchema.of_columns("Hearst market list", ["Pub", "Market"], key=["Pub"])
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+
+# column_types entry -> what the validator checks; None means any dtype.
+_DTYPE_KINDS: Dict[Any, str] = {
+    int: "int",
+    "int": "int",
+    "Int64": "int",
+    float: "float",
+    "float": "float",
+    "float64": "float",
+    str: "str",
+    "str": "str",
+    "string": "str",
+    "object": "str",
+    "date": "date",
+    "datetime64[ns]": "datetime",
+}
+_EXAMPLE_VALUES = 5
+
+
+class SchemaError(ValueError):
+    """Raised when a loaded file does not match its schema; ``problems`` lists every violation."""
+
+    def __init__(self, schema_name: str, problems: List[str]) -> None:
+        self.schema_name = schema_name
+        self.problems = problems
+        super().__init__(f"{schema_name} does not match its schema:\n" + "\n".join(f"  - {p}" for p in problems))
+
+
+class ColumnSpec(BaseModel):
+    """One column of a :class:`FileSchema`."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    # A column_types entry (int, float, "str", "date", "datetime64[ns]", ...) or None for any type.
+    dtype: Any = None
+    required: bool = True
+    nullable: bool = True
+
+    @field_validator("dtype")
+    @classmethod
+    def _known_dtype(cls, value: Any) -> Any:
+        if value is not None and value not in _DTYPE_KINDS:
+            raise ValueError(f"Unsupported column type {value!r}")
+        return value
+
+    @property
+    def kind(self) -> Optional[str]:
+        return None if self.dtype is None else _DTYPE_KINDS[self.dtype]
+
+
+class FileSchema(BaseModel):
+    """Required columns, types, nullability and unique key of one raw or lookup file."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    columns: Tuple[ColumnSpec, ...]
+    key: Tuple[str, ...] = ()
+    sample_rows: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _consistent(self) -> "FileSchema":
+        names = [column.name for column in self.columns]
+        duplicated = sorted({name for name in names if names.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"{self.name}: columns declared twice: {', '.join(duplicated)}")
+        undeclared = [col for col in self.key if col not in names]
+        if undeclared:
+            raise ValueError(f"{self.name}: key columns not declared: {', '.join(undeclared)}")
+        if self.sample_rows is not None and self.sample_rows < 1:
+            raise ValueError(f"{self.name}: sample_rows must be positive, got {self.sample_rows}")
+        return self
+
+    @classmethod
+    def from_column_types(
+        cls,
+        name: str,
+        column_types: Sequence[Dict[str, object]],
+        *,
+        key: Sequence[str] = (),
+        non_null: Iterable[str] = (),
+        optional: Iterable[str] = (),
+        sample_rows: Optional[int] = None,
+    ) -> "FileSchema":
+        """
+        Build a schema from a configs ``column_types`` list.
+
+        Every listed column is required unless named in ``optional``; the
+        columns in ``non_null`` (and the key) may not contain missing values.
+        """
+        non_null, optional = {*non_null, *key}, set(optional)
+        columns = []
+        for entry in column_types:
+            (col, dtype), = entry.items()
+            columns.append(ColumnSpec(name=col, dtype=dtype, required=col not in optional, nullable=col not in non_null))
+        return cls(name=name, columns=tuple(columns), key=tuple(key), sample_rows=sample_rows)
+
+    @classmethod
+    def of_columns(
+        cls,
+        name: str,
+        columns: Sequence[str],
+        *,
+        key: Sequence[str] = (),
+        non_null: Iterable[str] = (),
+        sample_rows: Optional[int] = None,
+    ) -> "FileSchema":
+        """Schema that only requires ``columns`` (of any type), e.g. for lookups read with inferred types."""
+        return cls.from_column_types(
+            name, [{col: None} for col in columns], key=key, non_null=non_null, sample_rows=sample_rows
+        )
+
+    def column_types(self) -> List[Dict[str, object]]:
+        """The ``column_types`` list the loaders read the file with (typed columns only)."""
+        return [{column.name: column.dtype} for column in self.columns if column.dtype is not None]
+
+    @cached_property
+    def _checks(self) -> Dict[str, List[ColumnSpec]]:
+        return {
+            "required": [column for column in self.columns if column.required],
+            "typed": [column for column in self.columns if column.kind not in (None, "str")],
+            "non_null": [column for column in self.columns if not column.nullable],
+        }
+
+    def validate(self, df: pd.DataFrame, *, sample_rows: Optional[int] = None) -> pd.DataFrame:
+        """
+        Check ``df`` against the schema.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The loaded file.
+        sample_rows : int, optional
+            Limit the value-level checks to a random sample of this many
+            rows. Defaults to the schema's ``sample_rows`` (all rows if unset).
+
+        Returns
+        -------
+        pd.DataFrame
+            ``df`` itself, so the call can wrap a load.
+
+        Raises
+        ------
+        SchemaError
+            Listing every missing column, wrong dtype, missing value in a
+            non-null column and duplicated key.
+        """
+        problems = []
+        missing = [column.name for column in self._checks["required"] if column.name not in df.columns]
+        if missing:
+            problems.append(f"missing columns: {', '.join(missing)}")
+
+        sample_rows = sample_rows if sample_rows is not None else self.sample_rows
+        sample = df.sample(n=sample_rows, random_state=0) if sample_rows is not None and len(df) > sample_rows else df
+        for column in self._checks["typed"]:
+            if column.name in df.columns:
+                problem = _dtype_problem(sample[column.name], column.kind)
+                if problem:
+                    problems.append(f"{column.name}: {problem}")
+        for column in self._checks["non_null"]:
+            if column.name in df.columns:
+                nulls = int(sample[column.name].isna().sum())
+                if nulls:
+                    scope = f" of {len(sample):,} sampled rows" if sample is not df else ""
+                    problems.append(f"{column.name}: {nulls:,} missing values{scope}")
+        if self.key and all(col in df.columns for col in self.key):
+            duplicated = df.duplicated(subset=list(self.key), keep=False)
+            if duplicated.any():
+                examples = df.loc[duplicated, list(self.key)].drop_duplicates().head(_EXAMPLE_VALUES)
+                problems.append(
+                    f"key {', '.join(self.key)} not unique: {int(duplicated.sum()):,} rows share a key, e.g. "
+                    f"{examples.to_dict('records')}"
+                )
+        if problems:
+            raise SchemaError(self.name, problems)
+        return df
+
+
+def _dtype_problem(values: pd.Series, kind: str) -> Optional[str]:
+    """Why ``values`` do not have the ``kind`` of type, or None."""
+    dtype = values.dtype
+    if kind == "int":
+        if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            return None
+        if pd.api.types.is_float_dtype(dtype):
+            present = values.dropna()
+            fractional = present[present.mod(1).ne(0)]
+            if fractional.empty:
+                return None
+            return f"expected integers, found {fractional.head(_EXAMPLE_VALUES).tolist()}"
+    elif kind == "float":
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            return None
+    elif kind == "datetime":
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return None
+    elif kind == "date":
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return None
+        if pd.api.types.infer_dtype(values, skipna=True) in ("date", "datetime", "empty"):
+            return None
+    return f"expected {kind}, got {dtype}"
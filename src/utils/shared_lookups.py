@@ -0,0 +1,133 @@
+"""
+Lookup tables shared with worker processes through memory-mapped Arrow files.
+
+When several partner pipelines run in worker processes, each would read the
+Strategic Account List, Strategic Orders, Welcome Back List and agent
+mapping itself, or receive a pickled copy. Instead, the parent loads every
+lookup once (:func:`publish_lookups`) and writes it as an uncompressed Arrow
+IPC file. Each worker memory-maps the files and seeds its lookup cache
+(:func:`attach_lookups`), so the tagging helpers' ``load_lookup_file``
+calls hit the cache. Numeric and Arrow string (``--arrow-strings``) columns
+are views of the mapped pages, so the page cache holds one copy of the data
+however many workers run; object text columns are still materialized as
+Python strings in each worker.
+
+A lookup Arrow cannot represent exactly (e.g. a column mixing numbers and
+text) is not published; workers read that file themselves, as before.
+
+Usage:
+    from src.utils.shared_lookups import attach_lookups, publish_lookups
+    with tempfile.TemporaryDirectory() as directory:
+        shared = publish_lookups(specs, directory)       # parent
+        ...
+        attach_lookups(shared)                            # in each worker, before main()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+
+import pyarrow as pa
+
+from src.utils.dataframe_utils import ARROW_STRING_DTYPE, is_arrow_string
+from src.utils.excel_file_operations import load_lookup_file, seed_lookup_cache
+from src.utils.lookup_prefetch import LookupSpec
+from src.utils.run_report import diagnostic
+
+# Schema metadata key listing the positions of Arrow string columns.
+_ARROW_STRING_COLUMNS = b"arrow_string_columns"
+
+
+@dataclass(frozen=True)
+class SharedLookup:
+    """A published lookup: how it is loaded, where its Arrow file is, and the file state it reflects."""
+
+    spec: LookupSpec
+    ipc_path: str
+    # (size, mtime_ns) of the lookup file when it was published.
+    signature: Tuple[int, int]
+
+
+def _signature(spec: LookupSpec) -> Tuple[int, int]:
+    stat = (Path(spec.lookup_path) / spec.file_name).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _load_kwargs(spec: LookupSpec) -> dict:
+    return {
+        "column_types": list(spec.column_types) if spec.column_types is not None else None,
+        "sheet_name": spec.sheet_name,
+        "schema": spec.schema,
+    }
+
+
+def publish_lookups(specs: Sequence[LookupSpec], directory: Union[str, Path]) -> List[SharedLookup]:
+    """
+    Load each distinct lookup once and write it to ``directory`` as an Arrow IPC file.
+
+    Parameters
+    ----------
+    specs : list[LookupSpec]
+        Lookups the workers will load; duplicates are published once.
+    directory : str | Path
+        Where the IPC files are written. It must outlive the workers.
+
+    Returns
+    -------
+    list[SharedLookup]
+        Picklable handles to pass to :func:`attach_lookups` in the workers.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    shared: List[SharedLookup] = []
+    for spec in dict.fromkeys(specs):
+        signature = _signature(spec)
+        df = load_lookup_file(spec.lookup_path, spec.file_name, **_load_kwargs(spec))
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as exc:
+            diagnostic("[SharedLookups]", f"Not shared: {spec.file_name}", str(exc).splitlines()[0])
+            continue
+        arrow_text = [i for i in range(df.shape[1]) if is_arrow_string(df.iloc[:, i])]
+        metadata = {**table.schema.metadata, _ARROW_STRING_COLUMNS: json.dumps(arrow_text)}
+        table = table.replace_schema_metadata(metadata)
+        ipc_path = directory / f"lookup_{len(shared):03d}.arrow"
+        with pa.OSFile(str(ipc_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        shared.append(SharedLookup(spec=spec, ipc_path=str(ipc_path), signature=signature))
+    diagnostic("[SharedLookups]", "Lookups published", len(shared))
+    return shared
+
+
+def attach_lookups(shared: Sequence[SharedLookup]) -> int:
+    """
+    Memory-map published lookups and seed this process's lookup cache with them.
+
+    Call it after :func:`~src.utils.dataframe_utils.enable_arrow_strings`
+    has been set as the pipeline will set it, since the cache is keyed on
+    that mode. A lookup whose file changed since it was published is skipped,
+    so the helper reads the current file.
+
+    Returns
+    -------
+    int
+        The number of lookups attached.
+    """
+    attached = 0
+    for lookup in shared:
+        spec = lookup.spec
+        if not os.path.exists(lookup.ipc_path) or _signature(spec) != lookup.signature:
+            continue
+        table = pa.ipc.open_file(pa.memory_map(lookup.ipc_path, "r")).read_all()
+        # split_blocks keeps each column in its own block, so null-free numeric columns stay views of the map.
+        df = table.to_pandas(split_blocks=True)
+        # The pandas metadata alone would restore Arrow string columns as Python strings.
+        for position in json.loads(table.schema.metadata.get(_ARROW_STRING_COLUMNS, b"[]")):
+            df.isetitem(position, ARROW_STRING_DTYPE.__from_arrow__(table.column(position)))
+        seed_lookup_cache(df, spec.lookup_path, spec.file_name, **_load_kwargs(spec))
+        attached += 1
+    return attached
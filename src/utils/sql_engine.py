@@ -0,0 +1,449 @@
+"""
+In-process SQL over the processed outputs and the compiled lookups.
+
+Every pipeline run writes a Parquet copy of its processed output to
+``<data>/catalog/processed/<partner>.parquet`` (table ``<partner>_processed``).
+Lookup workbooks in ``common_lookups`` and each partner's ``lookups`` folder
+are compiled to ``<data>/catalog/lookups/*.parquet`` the first time they are
+queried after an edit (tables ``lookup_<file>`` and ``lookup_<partner>_<file>``;
+multi-sheet workbooks get one table per sheet, ``..._<sheet>``).
+
+The engine is DuckDB when it is installed (the tables are views over the
+Parquet files, nothing is loaded up front) and SQLite otherwise: the
+Parquet files are streamed into ``catalog/catalog.sqlite`` once per change
+and later queries reuse it. Either way only the query result is turned
+into a DataFrame, not whole workbooks.
+
+Usage:
+    python -m src.utils.sql_engine tables
+    python -m src.utils.sql_engine query "SELECT \\"Verified Strategic\\", COUNT(*) FROM hearst_processed GROUP BY 1"
+    python -m src.utils.sql_engine --register sisense=exports/sisense.csv query \\
+        "SELECT s.*, h.\\"MSP/non-MSP\\" FROM sisense s LEFT JOIN hearst_processed h USING (\\"Job Number\\")" \\
+        --output sis_mer.parquet
+
+    from src.utils.sql_engine import SqlEngine
+    with SqlEngine() as engine:
+        totals = engine.query('SELECT "Pub", SUM("Sum of \\'Revenue\\'") AS revenue FROM hearst_processed GROUP BY 1')
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from src.utils.dataframe_utils import write_parquet_frame
+from src.utils.excel_file_operations import load_excel_file
+from src.utils.incremental import file_signature
+
+ENGINES = ("auto", "duckdb", "sqlite")
+LOOKUP_SUFFIXES = (".xlsx", ".xls", ".csv")
+SQLITE_FILE = "catalog.sqlite"
+LOOKUP_MANIFEST = "_sources.json"
+SQLITE_BATCH_ROWS = 50_000
+
+_CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS _catalog (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    signature TEXT NOT NULL
+);
+"""
+
+
+def table_name(text: str) -> str:
+    """SQL-friendly table name: lowercase words joined by underscores."""
+    return re.sub(r"[^0-9a-z]+", "_", text.casefold()).strip("_")
+
+
+def _catalog_dir(catalog_dir: Optional[Union[str, Path]]) -> Path:
+    if catalog_dir is not None:
+        return Path(catalog_dir)
+    from src.config import get_settings
+
+    return get_settings().catalog_dir
+
+
+def export_processed(
+    df: pd.DataFrame,
+    partner_name: str,
+    catalog_dir: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Write a partner's processed output to the catalog as Parquet.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The processed output (the frame written to the Sisense workbook).
+    partner_name : str
+        Partner name; the table is ``<partner>_processed``.
+    catalog_dir : str | Path, optional
+        Defaults to ``get_settings().catalog_dir``.
+
+    Returns
+    -------
+    Path
+        The written Parquet file.
+    """
+    path = _catalog_dir(catalog_dir) / "processed" / f"{table_name(partner_name)}.parquet"
+    return write_parquet_frame(df, path)
+
+
+def _lookup_dirs(data_dir: Path) -> List[Tuple[str, Path]]:
+    from src.config import CLIENT_NAMES, CLIENT_SUBDIRS
+
+    dirs = [("lookup", data_dir / "common_lookups")]
+    dirs += [(f"lookup_{client}", data_dir / client / CLIENT_SUBDIRS["LOOKUPS"]) for client in CLIENT_NAMES]
+    return dirs
+
+
+def _sheet_names(file_path: Path) -> List[Optional[str]]:
+    if file_path.suffix.lower() == ".csv":
+        return [None]
+    with pd.ExcelFile(file_path) as workbook:
+        return list(workbook.sheet_names)
+
+
+def compile_lookups(
+    catalog_dir: Optional[Union[str, Path]] = None,
+    *,
+    data_dir: Optional[Union[str, Path]] = None,
+) -> Dict[str, Path]:
+    """
+    Compile every lookup workbook sheet to Parquet, skipping unchanged files.
+
+    A manifest next to the Parquet files records each source's signature
+    (size and modification time), so a workbook is only re-read after it
+    was edited; Parquet files of deleted sources are removed.
+
+    Returns
+    -------
+    dict[str, Path]
+        Table name -> compiled Parquet file.
+    """
+    if data_dir is None:
+        from src.config import get_settings
+
+        data_dir = get_settings().data_dir
+    lookups_dir = _catalog_dir(catalog_dir) / "lookups"
+    manifest_path = lookups_dir / LOOKUP_MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    compiled: Dict[str, Path] = {}
+    sources: Dict[str, Any] = {}
+    for prefix, directory in _lookup_dirs(Path(data_dir)):
+        if not directory.is_dir():
+            continue
+        for file_path in sorted(directory.iterdir()):
+            if file_path.suffix.lower() not in LOOKUP_SUFFIXES or file_path.name.startswith("~$"):
+                continue
+            signature = file_signature([file_path])
+            previous = manifest.get(str(file_path))
+            if previous and previous["signature"] == signature and all(
+                (lookups_dir / f"{name}.parquet").exists() for name in previous["tables"]
+            ):
+                tables = previous["tables"]
+            else:
+                sheets = _sheet_names(file_path)
+                tables = {}
+                for sheet in sheets:
+                    name = f"{prefix}_{table_name(file_path.stem)}"
+                    if len(sheets) > 1:
+                        name = f"{name}_{table_name(sheet)}"
+                    df = load_excel_file(directory, file_path.name, sheet_name=sheet)
+                    write_parquet_frame(df, lookups_dir / f"{name}.parquet")
+                    tables[name] = sheet
+            sources[str(file_path)] = {"signature": signature, "tables": tables}
+            compiled.update({name: lookups_dir / f"{name}.parquet" for name in tables})
+
+    for stale in lookups_dir.glob("*.parquet") if lookups_dir.exists() else []:
+        if stale.stem not in compiled:
+            stale.unlink()
+    if compiled or manifest:
+        lookups_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+        tmp_path.write_text(json.dumps(sources, indent=2))
+        os.replace(tmp_path, manifest_path)
+    return compiled
+
+
+def catalog_tables(catalog_dir: Optional[Union[str, Path]] = None) -> Dict[str, Path]:
+    """Table name -> Parquet file for the exported outputs and compiled lookups currently in the catalog."""
+    catalog_dir = _catalog_dir(catalog_dir)
+    tables = {f"{path.stem}_processed": path for path in sorted((catalog_dir / "processed").glob("*.parquet"))}
+    tables.update({path.stem: path for path in sorted((catalog_dir / "lookups").glob("*.parquet"))})
+    return tables
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    """
+    ``"duckdb"`` or ``"sqlite"`` for the requested engine.
+
+    ``auto`` picks DuckDB when it is installed. Asking for ``duckdb``
+    without it installed raises ``ValueError``.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown SQL engine '{engine}'; expected one of {', '.join(ENGINES)}")
+    if engine == "sqlite":
+        return engine
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        if engine == "duckdb":
+            raise ValueError("The duckdb engine needs the 'duckdb' package (pip install duckdb).") from None
+        return "sqlite"
+    return "duckdb"
+
+
+def _record_batches(path: Path) -> Iterator[pa.RecordBatch]:
+    """Stream a Parquet or CSV file as record batches."""
+    if path.suffix.lower() == ".csv":
+        with pa_csv.open_csv(path) as reader:
+            yield from reader
+        return
+    yield from pq.ParquetFile(path).iter_batches(batch_size=SQLITE_BATCH_ROWS)
+
+
+def sqlite_column_type(data_type: pa.DataType) -> str:
+    """SQLite column type for an Arrow type: INTEGER, REAL or TEXT."""
+    if pa.types.is_integer(data_type) or pa.types.is_boolean(data_type):
+        return "INTEGER"
+    if pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+        return "REAL"
+    if pa.types.is_dictionary(data_type):
+        return sqlite_column_type(data_type.value_type)
+    return "TEXT"
+
+
+def _python_values(column: Union[pa.Array, pa.ChunkedArray]) -> list:
+    """``column.to_pylist()`` for numeric and string columns, through NumPy (an order of magnitude faster)."""
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        return column.to_numpy(zero_copy_only=False).tolist()
+    if not column.null_count:
+        return column.to_numpy(zero_copy_only=False).tolist()
+    values = column.fill_null(0).to_numpy(zero_copy_only=False).astype(object)
+    values[column.is_null().to_numpy(zero_copy_only=False)] = None
+    return values.tolist()
+
+
+def sqlite_values(column: Union[pa.Array, pa.ChunkedArray]) -> list:
+    """Python values SQLite can bind: dates and timestamps as ISO text, booleans as 0/1."""
+    data_type = column.type
+    if pa.types.is_dictionary(data_type):
+        return sqlite_values(column.cast(data_type.value_type))
+    if pa.types.is_timestamp(data_type):
+        text = pc.strftime(column, format="%Y-%m-%d %H:%M:%S")
+        return _python_values(pc.replace_substring_regex(text, r"\.0+$", ""))
+    if pa.types.is_boolean(data_type):
+        return _python_values(column.cast(pa.int8()))
+    if pa.types.is_decimal(data_type):
+        return _python_values(column.cast(pa.float64()))
+    if pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_string(data_type):
+        return _python_values(column)
+    try:
+        return _python_values(column.cast(pa.string()))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return [None if value is None else str(value) for value in column.to_pylist()]
+
+
+def quote_identifier(identifier: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SqlEngine:
+    """
+    Embedded SQL engine with the catalog's Parquet files registered as tables.
+
+    Parameters
+    ----------
+    catalog_dir : str | Path, optional
+        Defaults to ``get_settings().catalog_dir``.
+    engine : {"auto", "duckdb", "sqlite"}, default "auto"
+        See :func:`resolve_engine`.
+    tables : mapping, optional
+        Extra ``name -> Parquet/CSV path`` tables (e.g. a Sisense export).
+    compile : bool, default True
+        Compile edited lookup workbooks before registering the tables.
+    """
+
+    def __init__(
+        self,
+        catalog_dir: Optional[Union[str, Path]] = None,
+        *,
+        engine: str = "auto",
+        tables: Optional[Mapping[str, Union[str, Path]]] = None,
+        compile: bool = True,
+    ) -> None:
+        self.catalog_dir = _catalog_dir(catalog_dir)
+        self.engine = resolve_engine(engine)
+        if compile:
+            compile_lookups(self.catalog_dir)
+        self._tables: Dict[str, Path] = {}
+        if self.engine == "duckdb":
+            import duckdb
+
+            self._connection = duckdb.connect()
+        else:
+            self.catalog_dir.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.catalog_dir / SQLITE_FILE)
+            self._connection.executescript(_CATALOG_SCHEMA)
+
+        registered = {**catalog_tables(self.catalog_dir), **{name: Path(path) for name, path in (tables or {}).items()}}
+        for name, path in registered.items():
+            self.register(name, path)
+        if self.engine == "sqlite":
+            self._drop_stale_sqlite_tables()
+
+    def register(self, name: str, path: Union[str, Path]) -> None:
+        """Expose a Parquet or CSV file as table ``name``."""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Table source not found: {path}")
+        if self.engine == "duckdb":
+            reader = "read_csv_auto" if path.suffix.lower() == ".csv" else "read_parquet"
+            literal = "'" + str(path).replace("'", "''") + "'"
+            self._connection.execute(f"CREATE OR REPLACE VIEW {quote_identifier(name)} AS SELECT * FROM {reader}({literal})")
+        else:
+            self._sync_sqlite_table(name, path)
+        self._tables[name] = path
+
+    def _sync_sqlite_table(self, name: str, path: Path) -> None:
+        """(Re)load ``path`` into SQLite table ``name`` unless it is unchanged since the last load."""
+        signature = f"{path.resolve()}|{file_signature([path])}"
+        row = self._connection.execute("SELECT signature FROM _catalog WHERE name = ?", (name,)).fetchone()
+        if row is not None and row[0] == signature:
+            return
+        with self._connection:
+            self._connection.execute(f"DROP TABLE IF EXISTS {quote_identifier(name)}")
+            created = False
+            for batch in _record_batches(path):
+                if not created:
+                    columns = ", ".join(
+                        f"{quote_identifier(field.name)} {sqlite_column_type(field.type)}" for field in batch.schema
+                    )
+                    self._connection.execute(f"CREATE TABLE {quote_identifier(name)} ({columns})")
+                    placeholders = ", ".join("?" * batch.num_columns)
+                    insert = f"INSERT INTO {quote_identifier(name)} VALUES ({placeholders})"
+                    created = True
+                if batch.num_rows:
+                    self._connection.executemany(insert, zip(*(sqlite_values(column) for column in batch.columns)))
+            if not created:
+                schema = pq.read_schema(path) if path.suffix.lower() != ".csv" else pa.schema([])
+                columns = ", ".join(f"{quote_identifier(field.name)} {sqlite_column_type(field.type)}" for field in schema)
+                self._connection.execute(f"CREATE TABLE {quote_identifier(name)} ({columns or '_empty TEXT'})")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO _catalog (name, path, signature) VALUES (?, ?, ?)",
+                (name, str(path), signature),
+            )
+
+    def _drop_stale_sqlite_tables(self) -> None:
+        stale = [
+            name
+            for (name,) in self._connection.execute("SELECT name FROM _catalog").fetchall()
+            if name not in self._tables
+        ]
+        with self._connection:
+            for name in stale:
+                self._connection.execute(f"DROP TABLE IF EXISTS {quote_identifier(name)}")
+                self._connection.execute("DELETE FROM _catalog WHERE name = ?", (name,))
+
+    def tables(self) -> Dict[str, Path]:
+        """Registered table name -> source file."""
+        return dict(self._tables)
+
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+        """Run ``sql`` and return its result as a DataFrame."""
+        if self.engine == "duckdb":
+            return self._connection.execute(sql, params or []).fetch_df()
+        cursor = self._connection.execute(sql, params or [])
+        columns = [description[0] for description in cursor.description or []]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "SqlEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _parse_register(values: Sequence[str]) -> Dict[str, Path]:
+    tables = {}
+    for value in values:
+        name, separator, path = value.partition("=")
+        if not separator or not name or not path:
+            raise ValueError(f"--register expects NAME=PATH, got '{value}'")
+        tables[name] = Path(path)
+    return tables
+
+
+def _write_result(df: pd.DataFrame, output: Path) -> None:
+    suffix = output.suffix.lower()
+    if suffix == ".parquet":
+        write_parquet_frame(df, output)
+    elif suffix == ".csv":
+        df.to_csv(output, index=False)
+    elif suffix == ".xlsx":
+        from src.utils.excel_file_operations import write_df_to_excel
+
+        write_df_to_excel(df, output.parent, output.name)
+    else:
+        raise ValueError(f"Unsupported output format '{suffix}'; use .parquet, .csv or .xlsx")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the processed outputs and lookups with SQL.")
+    parser.add_argument("--catalog", type=Path, default=None, help="Catalog directory (default <data>/catalog).")
+    parser.add_argument("--engine", choices=ENGINES, default="auto")
+    parser.add_argument(
+        "--register",
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="Also expose a Parquet or CSV file as table NAME (repeatable).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("tables", help="List the registered tables and their columns.")
+    commands.add_parser("refresh", help="Compile edited lookups (and load changed tables into SQLite).")
+    query_parser = commands.add_parser("query", help="Run a SQL query.")
+    query_parser.add_argument("sql")
+    query_parser.add_argument("--output", type=Path, default=None, help="Write the result to .parquet, .csv or .xlsx.")
+    query_parser.add_argument("--max-rows", type=int, default=50, help="Rows to print when not writing a file.")
+    args = parser.parse_args(argv)
+
+    with SqlEngine(args.catalog, engine=args.engine, tables=_parse_register(args.register)) as engine:
+        if args.command == "refresh":
+            print(f"{len(engine.tables())} tables up to date ({engine.engine}) in {engine.catalog_dir}")
+            return 0
+        if args.command == "tables":
+            for name, path in engine.tables().items():
+                columns = engine.query(f"SELECT * FROM {quote_identifier(name)} LIMIT 0").columns
+                print(f"{name:<45} {len(columns):>3} columns  {path}")
+            return 0
+        result = engine.query(args.sql)
+        if args.output:
+            _write_result(result, args.output)
+            print(f"{len(result):,} rows written to {args.output}")
+        else:
+            with pd.option_context("display.max_columns", None, "display.width", 200):
+                print(result.to_string(max_rows=args.max_rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
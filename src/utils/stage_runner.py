@@ -0,0 +1,104 @@
+"""
+Column-patch stage runner.
+
+A *column patch* is a DataFrame holding only the columns a stage adds or
+modifies, aligned to the index of the frame it was computed from. Applying
+several patches in one concatenation avoids inserting (and later dropping)
+columns one at a time, which fragments the block manager and forces
+repeated consolidation.
+
+Independent patch producers — stages that read disjoint inputs and write
+disjoint columns — can be run concurrently on a thread pool.
+
+Usage:
+    from src.utils.stage_runner import run_patch_producers
+    processed_df = run_patch_producers(
+        processed_df,
+        [
+            lambda df: welcome_back_patch(df, ...),
+            lambda df: revenue_date_patch(df, ...),
+        ],
+    )
+"""
+
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+import pandas as pd
+
+PatchProducer = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def apply_column_patches(df: pd.DataFrame, patches: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Apply column patches to ``df`` in a single concatenation.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The frame the patches were computed from.
+    patches : list[pd.DataFrame]
+        Frames of new or modified columns, indexed like ``df``.
+
+    Returns
+    -------
+    pd.DataFrame
+        ``df`` with replaced columns kept in place and new columns appended
+        in patch order.
+
+    Raises
+    ------
+    ValueError
+        If two patches write the same column or a patch is not aligned to ``df``.
+    """
+    patches = [patch for patch in patches if len(patch.columns)]
+    if not patches:
+        return df
+
+    seen: set = set()
+    for patch in patches:
+        if not patch.index.equals(df.index):
+            raise ValueError("Column patch index does not match the DataFrame it patches.")
+        overlap = seen.intersection(patch.columns)
+        if overlap:
+            raise ValueError(f"Column patches write the same columns: {', '.join(sorted(map(str, overlap)))}")
+        seen.update(patch.columns)
+
+    replaced = [col for col in df.columns if col in seen]
+    appended = [col for patch in patches for col in patch.columns if col not in df.columns]
+
+    base = df.drop(columns=replaced) if replaced else df
+    result = pd.concat([base, *patches], axis=1)
+    if replaced:
+        result = result[list(df.columns) + appended]
+    return result
+
+
+def run_patch_producers(
+    df: pd.DataFrame,
+    producers: Sequence[PatchProducer],
+    *,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Run independent patch producers concurrently and apply their patches at once.
+
+    Every producer receives the same input frame, so producers must not depend
+    on each other's output columns. Patches are applied in producer order,
+    which keeps the resulting column order deterministic. Each producer runs
+    in a copy of the caller's context, so an active run report still records
+    its stages and diagnostics.
+    """
+    if not producers:
+        return df
+    if len(producers) == 1:
+        return apply_column_patches(df, [producers[0](df)])
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(producers)) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, producer, df) for producer in producers]
+        patches: List[pd.DataFrame] = [future.result() for future in futures]
+
+    return apply_column_patches(df, patches)
@@ -0,0 +1,429 @@
+"""
+Minimal xlsx reader for sheet names and header rows.
+
+Opening a workbook with openpyxl, even read-only, parses the whole shared
+strings table first, which for a raw export is most of the file. This
+module reads the workbook XML directly from the zip archive and stops as
+soon as it has what it needs: the sheet list from ``xl/workbook.xml``, the
+first non-empty row of one worksheet, and only the shared strings that row
+refers to. Reading the header of a 100 MB workbook takes milliseconds.
+
+Column names come out as :func:`pandas.read_excel` names them (blank
+header cells become ``Unnamed: <i>``, duplicates get a ``.1`` suffix).
+Other formats fall back to pandas with ``nrows=0``.
+
+For parsing one large sheet in several processes, :func:`split_sheet_rows`
+inflates the worksheet XML once and cuts it into byte ranges on ``<row>``
+boundaries, and :func:`iter_range_rows` parses one range with openpyxl's
+own worksheet parser (same shared strings, date styles and epoch as a
+read-only workbook, so cells come out exactly as pandas sees them). That
+parser and the workbook's date style sets are openpyxl internals; when the
+installed version lacks them both raise :class:`RangeParsingUnavailable`
+and callers read the sheet serially instead.
+
+Usage:
+    from src.utils.xlsx_reader import read_header, sheet_names
+    sheet_names("data/hearst/raw/Hearst Files.xlsx")      # ['Raw', 'Hearst Pub Market List']
+    read_header("data/hearst/raw/Hearst Files.xlsx", "Raw")
+
+    ranges = split_sheet_rows(file_path, "Raw", parts=4, directory=spill_dir)
+    for row_number, cells in iter_range_rows(ranges, 0):   # in a worker, one range each
+        ...
+"""
+
+from __future__ import annotations
+
+import datetime
+import posixpath
+import re
+import shutil
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+XLSX_SUFFIXES = (".xlsx", ".xlsm")
+# Bytes scanned at a time when looking for a <row> boundary or the end of sheetData.
+_SCAN_BYTES = 1024 * 1024
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_REF = re.compile(r"^([A-Z]+)")
+
+
+def _column_index(reference: str) -> int:
+    """Zero-based column of a cell reference such as ``"AB12"``."""
+    index = 0
+    for letter in _CELL_REF.match(reference).group(1):
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _sheets(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """``(name, worksheet path)`` of every sheet in workbook order."""
+    targets = {}
+    with archive.open("xl/_rels/workbook.xml.rels") as rels:
+        for _, element in iterparse(rels):
+            if element.tag == f"{_PACKAGE_REL_NS}Relationship":
+                target = element.get("Target")
+                path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+                targets[element.get("Id")] = path
+    sheets = []
+    with archive.open("xl/workbook.xml") as workbook:
+        for _, element in iterparse(workbook):
+            if element.tag == f"{_MAIN_NS}sheet":
+                sheets.append((element.get("name"), targets[element.get(f"{_REL_NS}id")]))
+            elif element.tag == f"{_MAIN_NS}sheets":
+                break
+    return sheets
+
+
+def _first_row(archive: zipfile.ZipFile, worksheet_path: str) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """``(column, type, raw value)`` of the cells of the first row holding a value."""
+    cells: List[Tuple[int, Optional[str], Optional[str]]] = []
+    with archive.open(worksheet_path) as sheet:
+        for _, element in iterparse(sheet):
+            if element.tag == f"{_MAIN_NS}c":
+                cell_type = element.get("t")
+                if cell_type == "inlineStr":
+                    value = "".join(text.text or "" for text in element.iter(f"{_MAIN_NS}t"))
+                else:
+                    node = element.find(f"{_MAIN_NS}v")
+                    value = node.text if node is not None else None
+                if value is not None and value != "":
+                    position = _column_index(element.get("r")) if element.get("r") else len(cells)
+                    cells.append((position, cell_type, value))
+                element.clear()
+            elif element.tag == f"{_MAIN_NS}row":
+                if cells:
+                    break
+                element.clear()
+    return cells
+
+
+def _shared_strings(archive: zipfile.ZipFile, indices: List[int]) -> Dict[int, str]:
+    """The shared strings at ``indices``, reading the table only up to the largest one."""
+    wanted, found = set(indices), {}
+    if not wanted or "xl/sharedStrings.xml" not in archive.namelist():
+        return found
+    last = max(wanted)
+    with archive.open("xl/sharedStrings.xml") as strings:
+        index = 0
+        for _, element in iterparse(strings):
+            if element.tag != f"{_MAIN_NS}si":
+                continue
+            if index in wanted:
+                # Plain text or rich text runs; phonetic hints (rPh) are not part of the value.
+                texts = element.findall(f"{_MAIN_NS}t") or element.findall(f"{_MAIN_NS}r/{_MAIN_NS}t")
+                found[index] = "".join(text.text or "" for text in texts)
+            element.clear()
+            if index >= last:
+                break
+            index += 1
+    return found
+
+
+def _cell_value(cell_type: Optional[str], value: str, strings: Dict[int, str]) -> object:
+    if cell_type == "s":
+        return strings.get(int(value), "")
+    if cell_type in ("str", "inlineStr", "e"):
+        return value
+    if cell_type == "b":
+        return value == "1"
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _resolve_sheet(sheets: List[Tuple[str, str]], sheet_name: Optional[Union[str, int]], file_path: Path) -> str:
+    if sheet_name is None or isinstance(sheet_name, int):
+        position = sheet_name or 0
+        if position >= len(sheets):
+            raise ValueError(f"{file_path.name} has {len(sheets)} sheets; no sheet at position {position}")
+        return sheets[position][1]
+    for name, path in sheets:
+        if name == sheet_name:
+            return path
+    raise ValueError(f"Worksheet named '{sheet_name}' not found in {file_path.name}")
+
+
+def sheet_names(file_path: Union[str, Path]) -> List[str]:
+    """Sheet names of a workbook in order (``[]`` for CSV files)."""
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {file_path}")
+    if file_path.suffix.lower() == ".csv":
+        return []
+    if file_path.suffix.lower() not in XLSX_SUFFIXES:
+        return list(pd.ExcelFile(file_path).sheet_names)
+    with zipfile.ZipFile(file_path) as archive:
+        return [name for name, _ in _sheets(archive)]
+
+
+def sheet_xml_size(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]] = None) -> int:
+    """Uncompressed size in bytes of a sheet's worksheet XML (0 for non-xlsx files)."""
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {file_path}")
+    if file_path.suffix.lower() not in XLSX_SUFFIXES:
+        return 0
+    with zipfile.ZipFile(file_path) as archive:
+        return archive.getinfo(_resolve_sheet(_sheets(archive), sheet_name, file_path)).file_size
+
+
+def read_header(file_path: Union[str, Path], sheet_name: Optional[Union[str, int]] = None) -> List[object]:
+    """
+    Column names of a sheet (default first) or CSV file, without reading any data rows.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If the sheet does not exist.
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {file_path}")
+    suffix = file_path.suffix.lower()
+    if suffix == ".csv":
+        return list(pd.read_csv(file_path, nrows=0).columns)
+    if suffix not in XLSX_SUFFIXES:
+        return list(pd.read_excel(file_path, sheet_name=0 if sheet_name is None else sheet_name, nrows=0).columns)
+
+    with zipfile.ZipFile(file_path) as archive:
+        cells = _first_row(archive, _resolve_sheet(_sheets(archive), sheet_name, file_path))
+        strings = _shared_strings(archive, [int(value) for _, cell_type, value in cells if cell_type == "s"])
+    if not cells:
+        return []
+    row: List[object] = [""] * (max(position for position, _, _ in cells) + 1)
+    for position, cell_type, value in cells:
+        row[position] = _cell_value(cell_type, value, strings)
+    return list(TextParser([row], header=0).read().columns)
+
+
+
+# Row ranges -------------------------------------------------------------------
+
+
+class RangeParsingUnavailable(ValueError):
+    """Raised when the installed openpyxl lacks the internals the row-range parser relies on."""
+
+
+def _worksheet_parser() -> type:
+    """openpyxl's private worksheet parser class."""
+    try:
+        from openpyxl.worksheet._reader import WorkSheetParser
+    except ImportError as exc:
+        raise RangeParsingUnavailable(f"openpyxl has no worksheet parser to import ({exc})") from exc
+    return WorkSheetParser
+
+
+@dataclass(frozen=True)
+class SheetRowRanges:
+    """
+    One worksheet's rows as byte ranges of its inflated XML, for parsing in parallel.
+
+    Every range starts at a ``<row>`` element carrying its row number, so a
+    range parses on its own once wrapped in ``root_tag`` / ``end_tag``.
+    Plain data (paths, bytes, sets), so it can be sent to worker processes.
+    """
+
+    xml_path: str
+    root_tag: bytes
+    end_tag: bytes
+    ranges: Tuple[Tuple[int, int], ...]
+    strings_path: str
+    epoch: datetime.datetime
+    date_formats: FrozenSet[int]
+    timedelta_formats: FrozenSet[int]
+
+
+def _find(handle, pattern: "re.Pattern[bytes]", start: int) -> Optional[Tuple[int, bytes]]:
+    """Offset and text of the first match of ``pattern`` at or after ``start``."""
+    overlap = 256
+    position = start
+    while True:
+        handle.seek(position)
+        block = handle.read(_SCAN_BYTES)
+        match = pattern.search(block)
+        if match is not None:
+            return position + match.start(), match.group(0)
+        if len(block) < _SCAN_BYTES:
+            return None
+        position += len(block) - overlap
+
+
+def _rfind(handle, needle: bytes, size: int) -> Optional[int]:
+    """Offset of the last ``needle`` in the file."""
+    end = size
+    while end > 0:
+        start = max(0, end - _SCAN_BYTES)
+        handle.seek(start)
+        block = handle.read(end - start + len(needle))
+        found = block.rfind(needle)
+        if found != -1:
+            return start + found
+        end = start
+    return None
+
+
+def split_sheet_rows(
+    file_path: Union[str, Path],
+    sheet_name: Optional[Union[str, int]],
+    parts: int,
+    directory: Union[str, Path],
+) -> SheetRowRanges:
+    """
+    Inflate a worksheet's XML into ``directory`` and cut its rows into up to ``parts`` byte ranges.
+
+    The shared strings are written to ``directory`` as an Arrow IPC file that
+    workers memory-map instead of each receiving a pickled copy.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    KeyError
+        If the sheet does not exist.
+    RangeParsingUnavailable
+        If the installed openpyxl cannot parse row ranges.
+    """
+    import pyarrow as pa
+    from openpyxl import load_workbook
+
+    file_path, directory = Path(file_path), Path(directory)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {file_path}")
+    _worksheet_parser()
+
+    # A read-only workbook parses exactly what its worksheets use: shared strings, date styles, epoch.
+    workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[sheet_name or 0] if not isinstance(sheet_name, str) else workbook[sheet_name]
+        date_formats = getattr(workbook, "_date_formats", None)
+        timedelta_formats = getattr(workbook, "_timedelta_formats", None)
+        if date_formats is None or timedelta_formats is None:
+            raise RangeParsingUnavailable("openpyxl workbooks no longer record their date and timedelta styles")
+        xml_path = directory / "sheet.xml"
+        with zipfile.ZipFile(file_path) as archive:
+            worksheet_path = _resolve_sheet(_sheets(archive), sheet.title, file_path)
+            with archive.open(worksheet_path) as source, open(xml_path, "wb") as target:
+                shutil.copyfileobj(source, target, _SCAN_BYTES)
+        strings_path = directory / "shared_strings.arrow"
+        table = pa.table({"value": pa.array(list(workbook.shared_strings), type=pa.string())})
+        with pa.OSFile(str(strings_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        epoch = workbook.epoch
+    finally:
+        workbook.close()
+
+    size = xml_path.stat().st_size
+    with open(xml_path, "rb") as handle:
+        root = _find(handle, re.compile(rb"<(?:(\w+):)?worksheet\b[^>]*>"), 0)
+        if root is None:
+            raise ValueError(f"{file_path.name}: worksheet XML has no root element")
+        root_offset, root_tag = root
+        prefix = re.match(rb"<(?:(\w+):)?", root_tag).group(1)
+        tag = prefix + b":" if prefix else b""
+        row_start = re.compile(rb"<" + re.escape(tag) + rb"row[\s>][^>]*>")
+        first = _find(handle, row_start, root_offset)
+        end = _rfind(handle, b"</" + tag + b"sheetData>", size)
+        if first is None or end is None or end < first[0]:
+            offsets = []
+        else:
+            offsets = [first[0]]
+            for part in range(1, max(1, parts)):
+                found = _find(handle, row_start, max(offsets[-1] + 1, size * part // parts))
+                if found is None or found[0] >= end:
+                    break
+                # A row without its number continues the previous row's count; keep it in that range.
+                if b" r=" in found[1]:
+                    offsets.append(found[0])
+            offsets.append(end)
+
+    return SheetRowRanges(
+        xml_path=str(xml_path),
+        root_tag=root_tag,
+        end_tag=b"</" + tag + b"worksheet>",
+        ranges=tuple(zip(offsets[:-1], offsets[1:])),
+        strings_path=str(strings_path),
+        epoch=epoch,
+        date_formats=frozenset(date_formats),
+        timedelta_formats=frozenset(timedelta_formats),
+    )
+
+
+class _RangeSource:
+    """File-like view of ``root_tag + xml[start:end] + end_tag``."""
+
+    def __init__(self, ranges: SheetRowRanges, index: int) -> None:
+        self._start, self._end = ranges.ranges[index]
+        self._handle = open(ranges.xml_path, "rb")
+        self._handle.seek(self._start)
+        self._pieces = [ranges.root_tag, None, ranges.end_tag]
+
+    def read(self, size: int = -1) -> bytes:
+        while self._pieces:
+            piece = self._pieces[0]
+            if piece is None:
+                remaining = self._end - self._handle.tell()
+                data = self._handle.read(remaining if size < 0 else min(size, remaining))
+                if data:
+                    return data
+                self._pieces.pop(0)
+                continue
+            self._pieces.pop(0)
+            if piece:
+                return piece
+        return b""
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class _ArrowStrings:
+    """Shared strings indexed like a list, read from the memory-mapped Arrow file."""
+
+    def __init__(self, strings_path: str) -> None:
+        import pyarrow as pa
+
+        self._values = pa.ipc.open_file(pa.memory_map(strings_path, "r")).read_all().column(0).combine_chunks()
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        return self._values[index].as_py()
+
+
+def iter_range_rows(ranges: SheetRowRanges, index: int) -> Iterator[Tuple[int, List[dict]]]:
+    """
+    Parse one row range, yielding ``(row number, cells)`` as openpyxl's worksheet parser does.
+
+    Each cell is a dict with ``column`` (1-based), ``value`` and
+    ``data_type``; missing rows and cells are not yielded.
+
+    Raises
+    ------
+    RangeParsingUnavailable
+        If the installed openpyxl cannot parse row ranges.
+    """
+    parser_class = _worksheet_parser()
+    source = _RangeSource(ranges, index)
+    try:
+        try:
+            parser = parser_class(
+                source,
+                _ArrowStrings(ranges.strings_path),
+                data_only=True,
+                epoch=ranges.epoch,
+                date_formats=set(ranges.date_formats),
+                timedelta_formats=set(ranges.timedelta_formats),
+            )
+        except TypeError as exc:
+            raise RangeParsingUnavailable(f"openpyxl's worksheet parser takes different arguments ({exc})") from exc
+        yield from parser.parse()
+    finally:
+        source.close()